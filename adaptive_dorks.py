@@ -1,20 +1,63 @@
 # -*- coding: utf-8 -*-
 """
-Adaptive dork selection using bandit-light algorithm.
+Adaptive dork selection using Thompson sampling over leads per API call.
+
+Each dork keeps a Gamma posterior over its lead rate (accepted leads per
+query), stored as two time-decayed sufficient statistics. Selection draws one
+sample per dork and takes the highest draws, so proven dorks get most slots,
+uncertain ones are still tried, and dorks that stopped producing fade out.
 """
 
+import math
 import random
-from typing import Callable, Dict, List, Tuple, Union
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from metrics import MetricsStore, DorkMetrics
 
 
+# Gamma(PRIOR_LEADS, PRIOR_CALLS) prior: 0.25 leads/call, worth two queries
+PRIOR_LEADS = 0.5
+PRIOR_CALLS = 2.0
+# Evidence loses half its weight after this many days
+HALF_LIFE_DAYS = 30.0
+
+
+@dataclass
+class DorkPosterior:
+    """Time-decayed sufficient statistics for one dork (leads and calls observed)."""
+    leads: float = 0.0
+    calls: float = 0.0
+    updated_at: float = 0.0
+
+    def decayed(self, now: float, half_life: float) -> Tuple[float, float]:
+        """Statistics as seen at `now` (half_life in seconds, <= 0 = no decay)."""
+        if half_life <= 0 or now <= self.updated_at:
+            return self.leads, self.calls
+        factor = 0.5 ** ((now - self.updated_at) / half_life)
+        return self.leads * factor, self.calls * factor
+
+    def update(self, leads: float, calls: float, now: float, half_life: float):
+        """Decay to `now`, then add the new observation."""
+        decayed_leads, decayed_calls = self.decayed(now, half_life)
+        self.leads = decayed_leads + leads
+        self.calls = decayed_calls + calls
+        self.updated_at = max(now, self.updated_at)
+
+
 class AdaptiveDorkSelector:
     """
-    Bandit-light algorithm for adaptive dork selection.
-    Maintains core_dorks (top performers) and explore_dorks (new/experimental).
+    Thompson-sampling dork scheduler.
+    Maintains core_dorks (best posterior mean) and explore_dorks (the rest);
+    explore_rate reserves a share of each selection for non-core dorks.
+
+    Posteriors are updated incrementally via record_result() and written to
+    the dork_posteriors table of the metrics database by persist(). Dorks
+    without a stored posterior are seeded once from their MetricsStore totals.
     """
-    
+
     def __init__(
         self,
         metrics_store: MetricsStore,
@@ -22,6 +65,10 @@ class AdaptiveDorkSelector:
         explore_rate: float = 0.15,
         min_core: int = 4,
         max_core: int = 6,
+        half_life_days: float = HALF_LIFE_DAYS,
+        prior_leads: float = PRIOR_LEADS,
+        prior_calls: float = PRIOR_CALLS,
+        rng: Optional[random.Random] = None,
     ):
         self.metrics = metrics_store
         self._dork_loader = all_dorks
@@ -30,10 +77,20 @@ class AdaptiveDorkSelector:
         self.explore_rate = explore_rate
         self.min_core = min_core
         self.max_core = max_core
+        self.half_life = half_life_days * 86400.0
+        self.prior_leads = prior_leads
+        self.prior_calls = prior_calls
+        self.rng = rng or random.Random()
         self.core_dorks: List[str] = []
         self.explore_dorks: List[str] = []
-        # Pools will be initialized lazily when needed
-   
+        self.posteriors: Dict[str, DorkPosterior] = {}
+        self._dirty: Set[str] = set()
+        # Pools and posteriors will be initialized lazily when needed
+
+    @property
+    def db_path(self) -> Optional[str]:
+        return getattr(self.metrics, "db_path", None)
+
     def _load_all_dorks(self):
         """Load all dorks only once, supporting callables."""
         if self._dorks_loaded:
@@ -48,108 +105,187 @@ class AdaptiveDorkSelector:
         except Exception:
             self.all_dorks = []
         self._dorks_loaded = True
-    def _update_pools(self):
-        """Update core and explore pools based on metrics."""
+        self._load_posteriors()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS dork_posteriors (
+                dork TEXT PRIMARY KEY,
+                leads REAL DEFAULT 0.0,
+                calls REAL DEFAULT 0.0,
+                updated_at REAL DEFAULT 0.0
+            )
+        """)
+        return conn
+
+    def _load_posteriors(self):
+        """Load stored posteriors; seed the remaining dorks from MetricsStore."""
+        if self.db_path:
+            conn = self._connect()
+            try:
+                for dork, leads, calls, updated_at in conn.execute(
+                    "SELECT dork, leads, calls, updated_at FROM dork_posteriors"
+                ):
+                    self.posteriors[dork] = DorkPosterior(leads, calls, updated_at)
+            finally:
+                conn.close()
+
+        dork_cache = getattr(self.metrics, "dork_cache", {})
+        for dork in self.all_dorks:
+            if dork in self.posteriors:
+                continue
+            m = dork_cache.get(dork)
+            if m is None or m.queries_total == 0:
+                continue
+            # Same yield definition as DorkMetrics.score()
+            leads = m.accepted_leads if m.accepted_leads > 0 else m.leads_kept
+            self.posteriors[dork] = DorkPosterior(
+                float(leads), float(m.queries_total), m.last_used or time.time()
+            )
+            self._dirty.add(dork)
+
+    def _posterior(self, dork: str) -> DorkPosterior:
+        p = self.posteriors.get(dork)
+        if p is None:
+            p = self.posteriors[dork] = DorkPosterior()
+        return p
+
+    def record_result(self, dork: str, leads: float = 0.0, calls: float = 1.0, now: Optional[float] = None):
+        """
+        Fold one observation into the dork's posterior.
+
+        Args:
+            dork: Dork query
+            leads: Accepted leads attributed to the dork
+            calls: API calls spent on it (1 per executed query)
+            now: Observation time (default: time.time())
+        """
+        self._load_all_dorks()
+        now = time.time() if now is None else now
+        self._posterior(dork).update(leads, calls, now, self.half_life)
+        self._dirty.add(dork)
+
+    def posterior_mean(self, dork: str, now: Optional[float] = None) -> float:
+        """Expected leads per call."""
+        p = self.posteriors.get(dork)
+        if p is None:
+            return self.prior_leads / self.prior_calls
+        leads, calls = p.decayed(time.time() if now is None else now, self.half_life)
+        return (self.prior_leads + leads) / (self.prior_calls + calls)
+
+    def _sample(self, dork: str, now: float) -> float:
+        leads, calls = 0.0, 0.0
+        p = self.posteriors.get(dork)
+        if p is not None:
+            leads, calls = p.decayed(now, self.half_life)
+        return self.rng.gammavariate(self.prior_leads + leads, 1.0 / (self.prior_calls + calls))
+
+    def persist(self) -> int:
+        """Write changed posteriors to the metrics database. Returns rows written."""
+        if not self.db_path:
+            self._dirty.clear()
+            return 0
+        rows = [
+            (dork, p.leads, p.calls, p.updated_at)
+            for dork, p in ((d, self.posteriors.get(d)) for d in self._dirty) if p is not None
+        ]
+        if rows:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO dork_posteriors (dork, leads, calls, updated_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+            finally:
+                conn.close()
+        self._dirty.clear()
+        return len(rows)
+
+    def _update_pools(self, now: Optional[float] = None):
+        """Update core and explore pools based on posterior means."""
         self._load_all_dorks()
-        # Get all dork metrics
-        dork_metrics = [self.metrics.get_dork_metrics(d) for d in self.all_dorks]
-        
-        # Sort by score (best first)
-        dork_metrics.sort(key=lambda d: d.score(), reverse=True)
-        
-        # Core dorks: top performers with at least 1 query tried
-        tried_dorks = [d for d in dork_metrics if d.queries_total > 0]
-        self.core_dorks = [d.dork for d in tried_dorks[:self.max_core]]
-        
+        now = time.time() if now is None else now
+        means = {d: self.posterior_mean(d, now) for d in self.all_dorks}
+        ranked = sorted(self.all_dorks, key=means.__getitem__, reverse=True)
+
+        # Core dorks: best posterior mean among dorks with at least one query
+        tried = [d for d in ranked if self.posteriors.get(d) and self.posteriors[d].calls > 0]
+        self.core_dorks = tried[:self.max_core]
+
         # If not enough tried dorks, add untried ones to core
         if len(self.core_dorks) < self.min_core:
-            untried = [d.dork for d in dork_metrics if d.queries_total == 0]
-            needed = self.min_core - len(self.core_dorks)
-            self.core_dorks.extend(untried[:needed])
-        
+            core_set = set(self.core_dorks)
+            untried = [d for d in self.all_dorks if d not in core_set]
+            self.core_dorks.extend(untried[:self.min_core - len(self.core_dorks)])
+
         # Explore dorks: new or low-performing dorks
         core_set = set(self.core_dorks)
         self.explore_dorks = [d for d in self.all_dorks if d not in core_set]
-    
+
     def select_dorks(
         self,
         num_dorks: int = 8,
         google_ratio: float = 0.25,
         force_update: bool = False,
-    ) -> List[Dict[str, str]]:
+        now: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        Select dorks for this run using ε-greedy strategy.
-        
+        Select dorks for this run by Thompson sampling.
+
+        Every dork draws a lead rate from its posterior and the highest draws
+        win; at least int(num_dorks * explore_rate) slots go to explore dorks
+        when available. Google (the scarce quota) gets the selected dorks with
+        the best posterior mean, DDG the rest.
+
         Args:
             num_dorks: Total number of dorks to select (6-10)
             google_ratio: Ratio of dorks to send to Google (0.25 = 25%)
             force_update: Force pool update before selection
-        
+            now: Selection time (default: time.time(), used for decay)
+
         Returns:
-            List of dork info dicts with keys: dork, pool, source, score
+            List of dork info dicts with keys: dork, pool, source, score, sample
         """
+        now = time.time() if now is None else now
         if force_update or not self.core_dorks:
-            self._update_pools()
-        
-        # Calculate explore count (ε-greedy)
-        num_explore = int(num_dorks * self.explore_rate)
-        num_core = num_dorks - num_explore
-        
-        # Ensure we have enough dorks
-        num_core = min(num_core, len(self.core_dorks))
-        num_explore = min(num_explore, len(self.explore_dorks))
-        
-        # If we don't have enough, adjust
-        if num_core + num_explore < num_dorks:
-            deficit = num_dorks - (num_core + num_explore)
-            if len(self.core_dorks) > num_core:
-                num_core += deficit
-            elif len(self.explore_dorks) > num_explore:
-                num_explore += deficit
-        
+            self._update_pools(now)
+
+        samples = {d: self._sample(d, now) for d in self.all_dorks}
+        ranked = sorted(self.all_dorks, key=samples.__getitem__, reverse=True)
+        chosen = ranked[:num_dorks]
+
+        # Reserve the explore share: swap the weakest core draws for the best explore draws
+        core_set = set(self.core_dorks)
+        num_explore = min(int(num_dorks * self.explore_rate), len(self.explore_dorks))
+        missing = num_explore - sum(1 for d in chosen if d not in core_set)
+        if missing > 0:
+            chosen_set = set(chosen)
+            extra = [d for d in ranked if d not in core_set and d not in chosen_set][:missing]
+            drop = set([d for d in reversed(chosen) if d in core_set][:len(extra)])
+            chosen = [d for d in chosen if d not in drop] + extra
+
         selected = []
-        
-        # Select core dorks (best first)
-        core_selected = self.core_dorks[:num_core]
-        for dork in core_selected:
-            m = self.metrics.get_dork_metrics(dork)
+        for dork in chosen:
             selected.append({
                 "dork": dork,
-                "pool": "core",
+                "pool": "core" if dork in core_set else "explore",
                 "source": "",  # Will be set below
-                "score": m.score(),
+                "score": self.posterior_mean(dork, now),
+                "sample": samples[dork],
             })
-        
-        # Select explore dorks (random)
-        if self.explore_dorks and num_explore > 0:
-            explore_selected = random.sample(
-                self.explore_dorks,
-                min(num_explore, len(self.explore_dorks))
-            )
-            for dork in explore_selected:
-                m = self.metrics.get_dork_metrics(dork)
-                selected.append({
-                    "dork": dork,
-                    "pool": "explore",
-                    "source": "",  # Will be set below
-                    "score": m.score(),
-                })
-        
-        # Shuffle to mix core and explore
-        random.shuffle(selected)
-        
-        # Assign sources: 25% Google, 75% DDG
-        num_google = int(len(selected) * google_ratio)
-        num_google = min(num_google, len(selected))
-        
-        for i, item in enumerate(selected):
-            if i < num_google:
-                item["source"] = "google"
-            else:
-                item["source"] = "ddg"
-        
+
+        # Assign sources: best expected yield to Google, rest to DDG
+        num_google = min(int(len(selected) * google_ratio), len(selected))
+        by_mean = sorted(selected, key=lambda item: item["score"], reverse=True)
+        google = {id(item) for item in by_mean[:num_google]}
+        for item in selected:
+            item["source"] = "google" if id(item) in google else "ddg"
+
         return selected
-    
+
     def promote_to_core(self, dork: str):
         """Manually promote a dork to core pool."""
         self._update_pools()
@@ -157,7 +293,7 @@ class AdaptiveDorkSelector:
             self.explore_dorks.remove(dork)
             if dork not in self.core_dorks:
                 self.core_dorks.append(dork)
-    
+
     def demote_to_explore(self, dork: str):
         """Manually demote a dork to explore pool."""
         self._update_pools()
@@ -165,8 +301,8 @@ class AdaptiveDorkSelector:
             self.core_dorks.remove(dork)
             if dork not in self.explore_dorks:
                 self.explore_dorks.append(dork)
-    
-    def get_pool_info(self) -> Dict[str, any]:
+
+    def get_pool_info(self) -> Dict[str, Any]:
         """Get information about current pools."""
         self._update_pools()
         return {
@@ -174,8 +310,139 @@ class AdaptiveDorkSelector:
             "explore_dorks": len(self.explore_dorks),
             "total_dorks": len(self.all_dorks),
             "explore_rate": self.explore_rate,
-            "core_top_scores": [
-                self.metrics.get_dork_metrics(d).score()
-                for d in self.core_dorks[:5]
-            ],
+            "half_life_days": self.half_life / 86400.0,
+            "core_top_scores": [self.posterior_mean(d) for d in self.core_dorks[:5]],
         }
+
+
+# ----------------------------------------------------------------------
+# Offline evaluation
+# ----------------------------------------------------------------------
+
+class _ReplayStore:
+    """Minimal in-memory stand-in for MetricsStore (no history, no database)."""
+    db_path = None
+
+    def __init__(self):
+        self.dork_cache: Dict[str, DorkMetrics] = {}
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """Poisson draw (Knuth; normal approximation for large rates)."""
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    limit, k, p = math.exp(-lam), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+
+def _legacy_selection(
+    stats: Dict[str, List[float]],
+    dorks: List[str],
+    num_dorks: int,
+    explore_rate: float,
+    min_core: int,
+    max_core: int,
+    rng: random.Random,
+) -> List[str]:
+    """Previous ε-greedy rule: fixed top-score core plus random explore picks."""
+    score = lambda d: stats[d][0] / max(1, stats[d][1]) if stats[d][1] else 0.0
+    ranked = sorted(dorks, key=score, reverse=True)
+    core = [d for d in ranked if stats[d][1] > 0][:max_core]
+    if len(core) < min_core:
+        core += [d for d in ranked if stats[d][1] == 0][:min_core - len(core)]
+    core_set = set(core)
+    explore = [d for d in dorks if d not in core_set]
+    num_explore = min(int(num_dorks * explore_rate), len(explore))
+    num_core = min(num_dorks - num_explore, len(core))
+    deficit = num_dorks - num_core - num_explore
+    if deficit > 0:
+        num_explore = min(len(explore), num_explore + deficit)
+    return core[:num_core] + rng.sample(explore, num_explore)
+
+
+def replay_metrics(
+    history: Iterable[DorkMetrics],
+    runs: int = 200,
+    num_dorks: int = 8,
+    google_ratio: float = 0.25,
+    explore_rate: float = 0.15,
+    run_interval: float = 86400.0,
+    policy: str = "thompson",
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Evaluate a selection policy offline against historical dork metrics.
+
+    Each dork's historical yield (accepted leads, else kept leads, per query)
+    is taken as its true Poisson lead rate. The policy starts cold and runs
+    `runs` selections, one every `run_interval` seconds, observing simulated
+    leads for each selected dork.
+
+    Args:
+        history: DorkMetrics snapshot, e.g. MetricsStore.dork_cache.values()
+        policy: "thompson" (AdaptiveDorkSelector) or "legacy" (ε-greedy)
+        seed: RNG seed for selection and simulated outcomes
+
+    Returns:
+        Dict with calls, leads, leads_per_call, google_leads_per_call and the
+        oracle leads_per_call of always picking the best num_dorks dorks
+    """
+    rates = {}
+    for m in history:
+        if m.queries_total > 0:
+            leads = m.accepted_leads if m.accepted_leads > 0 else m.leads_kept
+            rates[m.dork] = leads / m.queries_total
+        else:
+            rates[m.dork] = 0.0
+    dorks = list(rates)
+    rng = random.Random(seed)
+    outcome_rng = random.Random(seed + 1)
+
+    selector = AdaptiveDorkSelector(_ReplayStore(), dorks, explore_rate=explore_rate, rng=rng)
+    stats = {d: [0.0, 0.0] for d in dorks}
+
+    calls = leads = google_calls = google_leads = 0
+    now = 0.0
+    for _ in range(runs):
+        now += run_interval
+        if policy == "thompson":
+            picks = [(s["dork"], s["source"]) for s in selector.select_dorks(
+                num_dorks=num_dorks, google_ratio=google_ratio, force_update=True, now=now,
+            )]
+        elif policy == "legacy":
+            chosen = _legacy_selection(
+                stats, dorks, num_dorks, explore_rate, selector.min_core, selector.max_core, rng,
+            )
+            rng.shuffle(chosen)
+            num_google = int(len(chosen) * google_ratio)
+            picks = [(d, "google" if i < num_google else "ddg") for i, d in enumerate(chosen)]
+        else:
+            raise ValueError(f"Unknown policy: {policy}")
+
+        for dork, source in picks:
+            found = _poisson(outcome_rng, rates[dork])
+            selector.record_result(dork, leads=found, calls=1, now=now)
+            stats[dork][0] += found
+            stats[dork][1] += 1
+            calls += 1
+            leads += found
+            if source == "google":
+                google_calls += 1
+                google_leads += found
+
+    best = sorted(rates.values(), reverse=True)[:num_dorks]
+    return {
+        "policy": policy,
+        "runs": runs,
+        "calls": calls,
+        "leads": leads,
+        "leads_per_call": leads / max(1, calls),
+        "google_leads_per_call": google_leads / max(1, google_calls),
+        "oracle_leads_per_call": sum(best) / max(1, len(best)),
+    }
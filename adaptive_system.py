@@ -219,6 +219,8 @@ class AdaptiveSearchSystem:
     
     def record_query_execution(self, dork: str):
         """Record that a query was executed."""
+        # Selector first: it seeds unseen dorks from the metrics totals
+        self.dork_selector.record_result(dork, leads=0, calls=1)
         self.metrics.record_query(dork)
     
     def record_serp_results(self, dork: str, count: int):
@@ -241,6 +243,7 @@ class AdaptiveSearchSystem:
     
     def record_accepted_lead(self, dork: str):
         """Record that a lead was accepted (final)."""
+        self.dork_selector.record_result(dork, leads=1, calls=0)
         self.metrics.record_accepted_lead(dork)
     
     def record_lead_dropped(self, url: str, reason: str):
@@ -265,8 +268,9 @@ class AdaptiveSearchSystem:
         Complete a run and update system state.
         Should be called at the end of each scraping run.
         """
-        # Persist metrics
+        # Persist metrics and dork posteriors
         self.metrics.persist()
+        self.dork_selector.persist()
         
         # Increment run counter
         self.run_count += 1
@@ -91,6 +91,8 @@ def parse_args() -> Any:
                     help="Leite Traffic über Tor (SOCKS5 127.0.0.1:9050)")
     ap.add_argument("--reset", action="store_true", 
                     help="Lösche queries_done und urls_seen vor dem Lauf")
+    ap.add_argument("--resume", action="store_true",
+                    help="Unterbrochenen Lauf aus dem Run-Journal fortsetzen (Queries, Frontier, Leads)")
     
     # Industry and query configuration
     ap.add_argument("--industry", 
@@ -0,0 +1,267 @@
+"""
+PDF Text Extraction Worker
+==========================
+Bounded, isolated PDF text extraction for downloaded documents.
+
+pypdf parsing is CPU-bound and can take seconds (or hang) on large or
+malformed files. Extraction therefore runs in a supervised process pool
+instead of on the event loop:
+
+- every document gets a time budget and a page cap;
+- page iteration stops early once a phone number has been found;
+- results are cached by content hash, so a PDF linked from many pages is
+  parsed once; concurrent requests for the same document share one parse;
+- a worker that exceeds its budget is terminated and the pool recreated.
+
+Environment:
+- PDF_WORKERS: worker processes (default: 2)
+- PDF_TIME_BUDGET: seconds per document (default: 8)
+- PDF_MAX_PAGES: pages per document (default: 5)
+- PDF_MAX_BYTES: larger documents are skipped (default: 15 MB)
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+
+# Phone-like sequences (German landline/mobile, international prefix)
+CONTACT_PHONE_RE = re.compile(r"(?:\+49|0049|\b0)[\s/\-().]*\d{2,5}(?:[\s/\-().]*\d){5,10}")
+
+# Extra seconds on top of the in-worker budget before a worker counts as stuck
+_KILL_GRACE = 2.0
+
+
+def extract_pdf_text(
+    data: bytes,
+    max_pages: int = 5,
+    time_budget: float = 8.0,
+    max_chars: int = 200_000,
+    stop_on_contact: bool = True,
+) -> Dict[str, Any]:
+    """
+    Extract text from PDF bytes within a page and time budget.
+
+    Runs inside the worker process, but can also be called directly.
+
+    Args:
+        data: Raw PDF bytes
+        max_pages: Maximum number of pages to read
+        time_budget: Seconds after which no further page is started
+        max_chars: Maximum length of the returned text
+        stop_on_contact: Stop after the first page containing a phone number
+
+    Returns:
+        Dict with text, pages (pages read) and stopped
+        ("end", "page_cap", "time", "contact", "size" or "error")
+    """
+    from pypdf import PdfReader
+
+    deadline = time.monotonic() + time_budget
+    parts = []
+    length = 0
+    pages_read = 0
+    stopped = "end"
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        for index, page in enumerate(reader.pages):
+            if index >= max_pages:
+                stopped = "page_cap"
+                break
+            if time.monotonic() > deadline:
+                stopped = "time"
+                break
+            try:
+                page_text = page.extract_text() or ""
+            except Exception:
+                continue
+            pages_read += 1
+            parts.append(page_text)
+            length += len(page_text) + 1
+            if length >= max_chars:
+                stopped = "size"
+                break
+            if stop_on_contact and CONTACT_PHONE_RE.search(page_text):
+                stopped = "contact"
+                break
+    except Exception as e:
+        return {"text": "\n".join(parts)[:max_chars], "pages": pages_read, "stopped": "error", "error": str(e)}
+
+    return {"text": ("\n".join(parts) + "\n")[:max_chars] if parts else "", "pages": pages_read, "stopped": stopped}
+
+
+class PdfTextExtractor:
+    """
+    Process-pool PDF extractor with per-document budget and result cache.
+
+    Example:
+        >>> extractor = get_pdf_extractor()
+        >>> text = await extractor.extract(pdf_bytes)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        time_budget: float = 8.0,
+        max_pages: int = 5,
+        max_bytes: int = 15 * 1024 * 1024,
+        max_chars: int = 200_000,
+        cache_size: int = 256,
+        use_processes: bool = True,
+    ):
+        """
+        Initialize extractor.
+
+        Args:
+            max_workers: Parallel parses (worker processes)
+            time_budget: Seconds per document
+            max_pages: Page cap per document
+            max_bytes: Documents above this size are not parsed
+            max_chars: Text cap per document
+            cache_size: Number of cached results (by content hash)
+            use_processes: Use worker processes (False: threads, not killable)
+        """
+        self.max_workers = max(1, max_workers)
+        self.time_budget = time_budget
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.cache_size = cache_size
+        self.use_processes = use_processes
+        self.stats = {"parsed": 0, "cache_hits": 0, "timeouts": 0, "errors": 0, "skipped": 0}
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "PdfTextExtractor":
+        """Create an extractor configured via PDF_* environment variables."""
+        kwargs.setdefault("max_workers", int(os.getenv("PDF_WORKERS", "2")))
+        kwargs.setdefault("time_budget", float(os.getenv("PDF_TIME_BUDGET", "8")))
+        kwargs.setdefault("max_pages", int(os.getenv("PDF_MAX_PAGES", "5")))
+        kwargs.setdefault("max_bytes", int(os.getenv("PDF_MAX_BYTES", str(15 * 1024 * 1024))))
+        return cls(**kwargs)
+
+    async def extract(self, data: bytes) -> str:
+        """
+        Return the text of a PDF document, parsed off the event loop.
+
+        Never raises for broken documents; returns "" instead.
+        """
+        if not data:
+            return ""
+        if len(data) > self.max_bytes:
+            self.stats["skipped"] += 1
+            return ""
+
+        key = hashlib.sha256(data).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["cache_hits"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._parse(data)
+            self._remember(key, text)
+            future.set_result(text)
+            return text
+        except BaseException:
+            future.set_result("")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _parse(self, data: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            job = loop.run_in_executor(
+                pool, extract_pdf_text, data, self.max_pages, self.time_budget, self.max_chars
+            )
+            result = await asyncio.wait_for(job, self.time_budget + _KILL_GRACE)
+        except asyncio.TimeoutError:
+            # A single page can block far beyond the budget: kill the worker
+            self.stats["timeouts"] += 1
+            self._recycle_pool(pool)
+            return ""
+        except BrokenProcessPool:
+            self.stats["errors"] += 1
+            self._recycle_pool(pool)
+            return ""
+
+        self.stats["parsed"] += 1
+        if result.get("stopped") == "error":
+            self.stats["errors"] += 1
+        return result.get("text", "")
+
+    def _remember(self, key: str, text: str):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = text
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.use_processes:
+                    try:
+                        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                    except (OSError, NotImplementedError, ImportError):
+                        # e.g. no working multiprocessing in restricted environments
+                        self.use_processes = False
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pdf-text")
+            return self._pool
+
+    def _recycle_pool(self, pool: Executor):
+        # Only the pool the failed job ran on; another job may already have
+        # replaced it, and its fresh workers must survive
+        with self._pool_lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        if isinstance(pool, ProcessPoolExecutor):
+            # ProcessPoolExecutor has no public API to stop a running task
+            for process in list((getattr(pool, "_processes", None) or {}).values()):
+                try:
+                    process.terminate()
+                except Exception:
+                    pass
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Shut down the worker pool."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_PDF_EXTRACTOR: Optional[PdfTextExtractor] = None
+
+
+def get_pdf_extractor() -> PdfTextExtractor:
+    """Get or create the global PDF extractor."""
+    global _PDF_EXTRACTOR
+    if _PDF_EXTRACTOR is None:
+        _PDF_EXTRACTOR = PdfTextExtractor.from_env()
+    return _PDF_EXTRACTOR
@@ -21,8 +21,19 @@ from .retry import (
     should_retry_status,
 )
 from .robots import (
+    RobotsCache,
     check_robots_txt,
+    get_robots_cache,
     robots_allowed_async,
+    robots_crawl_delay,
+)
+from .sitemaps import (
+    SitemapDiscovery,
+    iter_sitemap,
+)
+from .adaptive_concurrency import (
+    AdaptiveConcurrency,
+    record_response,
 )
 from .backoff import (
     retry_with_backoff,
@@ -44,8 +55,17 @@ __all__ = [
     "schedule_retry",
     "should_retry_status",
     # Robots handling
+    "RobotsCache",
     "check_robots_txt",
+    "get_robots_cache",
     "robots_allowed_async",
+    "robots_crawl_delay",
+    # Sitemaps
+    "SitemapDiscovery",
+    "iter_sitemap",
+    # Adaptive concurrency
+    "AdaptiveConcurrency",
+    "record_response",
     # Backoff logic
     "retry_with_backoff",
     "calculate_backoff_delay",
@@ -0,0 +1,378 @@
+"""
+Feedback-driven (AIMD) concurrency control.
+
+Instead of fixed semaphores, the global limit and one limit per host follow
+additive increase / multiplicative decrease:
+
+- every successful response raises a limit by ~1 per "round" (1/limit per response)
+- 429, 503, other 5xx and latency spikes cut a host's limit multiplicatively
+  (at most once per cooldown, so one burst of errors counts as one event)
+- the global limit is only cut when a notable share of the recent responses
+  across all hosts is congested, so a single bad host does not slow everyone
+- Retry-After pauses new requests to that host until the given time
+
+Limits move between a floor and max_factor times the configured starting
+value, so healthy hosts can use more bandwidth than the static config and
+throttling hosts quickly get fewer parallel requests.
+
+Environment:
+- ADAPTIVE_CONCURRENCY: "0" disables the controller (default: 1)
+- ADAPTIVE_MAX_FACTOR: upper bound relative to the configured limits (default: 2)
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+ADAPTIVE_CONCURRENCY = os.getenv("ADAPTIVE_CONCURRENCY", "1") != "0"
+ADAPTIVE_MAX_FACTOR = float(os.getenv("ADAPTIVE_MAX_FACTOR", "2"))
+
+# Upper bound for honoured Retry-After values (seconds)
+MAX_RETRY_AFTER = 120.0
+
+# Latency below this never counts as a spike (seconds)
+MIN_SPIKE_LATENCY = 1.0
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta seconds or HTTP date).
+
+    Returns:
+        Seconds to wait (capped at MAX_RETRY_AFTER), or None
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - (now if now is not None else time.time())
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return None
+    return max(0.0, min(seconds, MAX_RETRY_AFTER))
+
+
+class AIMDLimit:
+    """A single additive-increase / multiplicative-decrease limit."""
+
+    def __init__(
+        self,
+        initial: float,
+        minimum: float = 1.0,
+        maximum: Optional[float] = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.minimum = max(1.0, minimum)
+        self.maximum = max(self.minimum, maximum if maximum is not None else initial)
+        self.limit = min(max(float(initial), self.minimum), self.maximum)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.last_decrease = float("-inf")
+
+    @property
+    def value(self) -> int:
+        return int(self.limit)
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + self.increase / max(1.0, self.limit))
+
+    def on_congestion(self, now: float, factor: Optional[float] = None) -> bool:
+        """Cut the limit; returns False if still within the cooldown of the last cut."""
+        if now - self.last_decrease < self.cooldown:
+            return False
+        self.last_decrease = now
+        self.limit = max(self.minimum, self.limit * (factor if factor is not None else self.decrease))
+        return True
+
+
+class AdaptiveLimiter:
+    """Asyncio slot counter whose capacity follows an AIMDLimit."""
+
+    def __init__(self, aimd: AIMDLimit):
+        self.aimd = aimd
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        while self.in_flight >= self.aimd.value:
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+                raise
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight = max(0, self.in_flight - 1)
+        self.wake()
+
+    def wake(self):
+        free = self.aimd.value - self.in_flight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+
+class _HostState:
+    def __init__(self, limit: AIMDLimit):
+        self.limiter = AdaptiveLimiter(limit)
+        self.blocked_until = 0.0
+        self.last_seen = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.latency_min: Optional[float] = None
+        self.responses = 0
+        self.throttled = 0
+        self.errors = 0
+
+
+class AdaptiveConcurrency:
+    """
+    Global and per-host AIMD limits fed by observed responses.
+
+    Example:
+        >>> ctl = AdaptiveConcurrency(global_limit=35, per_host_limit=3)
+        >>> await ctl.acquire_host(host); await ctl.acquire_global()
+        >>> ctl.record(host, status=429, latency=0.4, retry_after="5")
+        >>> ctl.release(host)
+    """
+
+    def __init__(
+        self,
+        global_limit: int,
+        per_host_limit: int,
+        max_factor: float = ADAPTIVE_MAX_FACTOR,
+        latency_factor: float = 3.0,
+        cooldown: float = 1.0,
+        window: int = 50,
+        global_threshold: float = 0.2,
+        idle_ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize controller.
+
+        Args:
+            global_limit: Starting global concurrency
+            per_host_limit: Starting concurrency per host
+            max_factor: Limits may grow up to this multiple of their start value
+            latency_factor: Latency above this multiple of a host's best latency counts as congestion
+            cooldown: Minimum seconds between two decreases of the same limit
+            window: Number of recent responses considered for the global limit
+            global_threshold: Congested share of the window that cuts the global limit
+            idle_ttl: Seconds without responses after which an unblocked, idle host is pruned
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_factor = max(1.0, max_factor)
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.clock = clock
+        self.global_threshold = global_threshold
+        self.idle_ttl = idle_ttl
+        self._recent: Deque[bool] = deque(maxlen=max(1, window))
+        self.global_limiter = AdaptiveLimiter(AIMDLimit(
+            global_limit,
+            minimum=min(2, global_limit),
+            maximum=global_limit * self.max_factor,
+            decrease=0.75,
+            cooldown=cooldown,
+        ))
+        self.hosts: Dict[str, _HostState] = {}
+
+    def _host(self, host: str) -> _HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = _HostState(AIMDLimit(
+                self.per_host_limit,
+                minimum=1,
+                maximum=self.per_host_limit * self.max_factor,
+                decrease=0.5,
+                cooldown=self.cooldown,
+            ))
+            self.hosts[host] = state
+        return state
+
+    def set_global_limit(self, limit: int):
+        """Apply a new configured global limit (e.g. changed performance params)."""
+        aimd = self.global_limiter.aimd
+        aimd.maximum = max(aimd.minimum, limit * self.max_factor)
+        aimd.limit = min(max(float(limit), aimd.minimum), aimd.maximum)
+        self.global_limiter.wake()
+
+    async def acquire_host(self, host: str):
+        """Take a host slot, then wait out a pending Retry-After for the host."""
+        state = self._host(host)
+        await state.limiter.acquire()
+        try:
+            while True:
+                wait = state.blocked_until - self.clock()
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+        except BaseException:
+            state.limiter.release()
+            raise
+
+    async def acquire_global(self):
+        await self.global_limiter.acquire()
+
+    def release_global(self):
+        self.global_limiter.release()
+
+    def release_host(self, host: str):
+        state = self.hosts.get(host)
+        if state is not None:
+            state.limiter.release()
+
+    def release(self, host: str):
+        self.release_global()
+        self.release_host(host)
+
+    def record(self, host: str, status: int, latency: Optional[float] = None,
+               retry_after: Optional[str] = None):
+        """
+        Feed one response into the controller.
+
+        Args:
+            host: Host of the request
+            status: HTTP status (-1 or 0 for network errors/timeouts)
+            latency: Seconds from request start to response
+            retry_after: Raw Retry-After header value
+        """
+        now = self.clock()
+        state = self._host(host)
+        state.responses += 1
+        state.last_seen = now
+        host_limit = state.limiter.aimd
+        global_limit = self.global_limiter.aimd
+
+        congested = False
+        if status in THROTTLE_STATUSES:
+            state.throttled += 1
+            congested = True
+            wait = parse_retry_after(retry_after)
+            if wait:
+                state.blocked_until = max(state.blocked_until, now + wait)
+        elif status <= 0 or status >= 500:
+            state.errors += 1
+            congested = True
+
+        if latency is not None and latency >= 0 and not congested:
+            if state.latency_min is None or latency < state.latency_min:
+                state.latency_min = latency
+            state.latency_ewma = latency if state.latency_ewma is None else 0.8 * state.latency_ewma + 0.2 * latency
+            if latency >= MIN_SPIKE_LATENCY and latency > self.latency_factor * max(state.latency_min, 0.05):
+                congested = True
+
+        self._recent.append(congested)
+        congestion_rate = sum(self._recent) / len(self._recent)
+
+        if congested:
+            host_limit.on_congestion(now)
+        else:
+            host_limit.on_success()
+            state.limiter.wake()
+
+        if congestion_rate >= self.global_threshold and len(self._recent) >= min(10, self._recent.maxlen):
+            global_limit.on_congestion(now)
+        elif not congested:
+            global_limit.on_success()
+            self.global_limiter.wake()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limits and counters."""
+        now = self.clock()
+        return {
+            "global_limit": self.global_limiter.aimd.value,
+            "global_in_flight": self.global_limiter.in_flight,
+            "congestion_rate": round(sum(self._recent) / len(self._recent), 3) if self._recent else 0.0,
+            "hosts": {
+                host: {
+                    "limit": state.limiter.aimd.value,
+                    "in_flight": state.limiter.in_flight,
+                    "latency_ms": round((state.latency_ewma or 0.0) * 1000, 1),
+                    "responses": state.responses,
+                    "throttled": state.throttled,
+                    "errors": state.errors,
+                    "blocked_for": round(max(0.0, state.blocked_until - now), 1),
+                }
+                for host, state in self.hosts.items()
+            },
+        }
+
+    def prune(self) -> int:
+        """
+        Drop hosts that are neither blocked nor in use and idle for idle_ttl.
+
+        Returns:
+            Number of removed hosts
+        """
+        now = self.clock()
+        stale = [
+            host for host, state in self.hosts.items()
+            if state.limiter.in_flight == 0
+            and state.blocked_until <= now
+            and now - state.last_seen >= self.idle_ttl
+        ]
+        for host in stale:
+            del self.hosts[host]
+        return len(stale)
+
+    def export(self, store) -> Dict[str, Any]:
+        """
+        Write the current state to a metrics store.
+
+        Only currently blocked hosts are written; their backoff in the store
+        is extended, never shortened (see MetricsStore.extend_host_backoff).
+
+        Args:
+            store: metrics.MetricsStore (record_concurrency, extend_host_backoff)
+
+        Returns:
+            The snapshot (all hosts)
+        """
+        self.prune()
+        snap = self.snapshot()
+        blocked = {host: info for host, info in snap["hosts"].items() if info["blocked_for"] > 0}
+        store.record_concurrency({**snap, "hosts": blocked})
+        for host, info in blocked.items():
+            store.extend_host_backoff(host, int(info["blocked_for"]) + 1)
+        return snap
+
+
+_ACTIVE: Optional[AdaptiveConcurrency] = None
+
+
+def set_active_controller(controller: Optional[AdaptiveConcurrency]):
+    """Register the controller that record_response() feeds."""
+    global _ACTIVE
+    _ACTIVE = controller
+
+
+def get_active_controller() -> Optional[AdaptiveConcurrency]:
+    return _ACTIVE
+
+
+def record_response(host: str, status: int, latency: Optional[float] = None,
+                    retry_after: Optional[str] = None):
+    """Feed a response into the active controller (no-op without one)."""
+    if _ACTIVE is not None and host:
+        _ACTIVE.record(host, status, latency, retry_after)
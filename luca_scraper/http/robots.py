@@ -1,37 +1,307 @@
 """
 Robots.txt handling and checking.
+
+robots.txt is fetched once per host and kept in a TTL cache (memory plus an
+optional SQLite table, so restarts do not refetch every host). Concurrent
+checks for the same host share one fetch. The parsed Crawl-delay is exposed
+per host so rate limiters can space out requests.
+
+Status handling (tolerant, as before):
+- 2xx: rules from the file apply
+- 4xx (incl. 404): everything allowed
+- 5xx / network errors: everything allowed, cached for a shorter time
+
+Environment:
+- ROBOTS_RESPECT: "0" disables robots checks (default: 1)
+- ROBOTS_CACHE_TTL: seconds a fetched robots.txt stays valid (default: 6h)
+- ROBOTS_MAX_CRAWL_DELAY: upper bound for honoured Crawl-delay (default: 10s)
 """
 
-from typing import Optional
+import asyncio
+import os
+import sqlite3
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 from urllib.robotparser import RobotFileParser
 
 
+ROBOTS_RESPECT = os.getenv("ROBOTS_RESPECT", "1") != "0"
+ROBOTS_CACHE_TTL = int(os.getenv("ROBOTS_CACHE_TTL", "21600"))  # 6h
+ROBOTS_ERROR_TTL = 600
+ROBOTS_MAX_CRAWL_DELAY = float(os.getenv("ROBOTS_MAX_CRAWL_DELAY", "10"))
+ROBOTS_FETCH_TIMEOUT = 8
+ROBOTS_MAX_BYTES = 512 * 1024
+ROBOTS_USER_AGENT = "VertriebFinder"
+
+# (url, timeout) -> (status, body); status -1 for network errors
+RobotsFetcher = Callable[[str, int], Awaitable[Tuple[int, str]]]
+
+
+@dataclass
+class RobotsPolicy:
+    """Parsed robots.txt of one origin."""
+    parser: RobotFileParser
+    status: int
+    fetched_at: float
+    crawl_delay: Optional[float] = None
+
+    def allows(self, url: str, user_agent: str = ROBOTS_USER_AGENT) -> bool:
+        return self.parser.can_fetch(user_agent, url)
+
+
+def _origin(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme or 'https'}://{parts.netloc.lower()}"
+
+
+def parse_robots(body: str, status: int, fetched_at: Optional[float] = None,
+                 user_agent: str = ROBOTS_USER_AGENT) -> RobotsPolicy:
+    """
+    Build a policy from a robots.txt response.
+
+    Args:
+        body: Response body
+        status: HTTP status (-1 for network errors)
+        fetched_at: Fetch time (default: now)
+        user_agent: Agent whose Crawl-delay is used
+
+    Returns:
+        RobotsPolicy
+    """
+    rp = RobotFileParser()
+    if 200 <= status < 300:
+        rp.parse((body or "")[:ROBOTS_MAX_BYTES].splitlines())
+    else:
+        rp.allow_all = True
+
+    delay = None
+    if not rp.allow_all:
+        try:
+            delay = rp.crawl_delay(user_agent)
+        except Exception:
+            delay = None
+    return RobotsPolicy(
+        parser=rp,
+        status=status,
+        fetched_at=fetched_at if fetched_at is not None else time.time(),
+        crawl_delay=float(delay) if delay is not None else None,
+    )
+
+
+async def _default_fetch(url: str, timeout: int) -> Tuple[int, str]:
+    from .client import USER_AGENT, get_client
+
+    try:
+        client = await get_client(secure=True)
+        r = await client.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout, allow_redirects=True)
+        return r.status_code, r.text or ""
+    except Exception:
+        return -1, ""
+
+
+class RobotsCache:
+    """
+    Per-origin robots.txt cache with coalesced async fetches.
+
+    Example:
+        >>> robots = get_robots_cache()
+        >>> if await robots.allowed(url):
+        ...     delay = robots.crawl_delay(host)
+    """
+
+    def __init__(
+        self,
+        fetcher: Optional[RobotsFetcher] = None,
+        ttl: int = ROBOTS_CACHE_TTL,
+        db_path: Optional[str] = None,
+        user_agent: str = ROBOTS_USER_AGENT,
+        max_crawl_delay: float = ROBOTS_MAX_CRAWL_DELAY,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            fetcher: Async (url, timeout) -> (status, body); default uses the shared HTTP client
+            ttl: Seconds a fetched robots.txt stays valid
+            db_path: SQLite database for the persistent cache (None: memory only)
+            user_agent: Agent name matched against robots.txt groups
+            max_crawl_delay: Upper bound for crawl_delay()
+        """
+        self.fetcher = fetcher or _default_fetch
+        self.ttl = ttl
+        self.db_path = db_path
+        self.user_agent = user_agent
+        self.max_crawl_delay = max_crawl_delay
+        self._policies: Dict[str, RobotsPolicy] = {}
+        self._delays: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        if db_path:
+            self._init_db()
+
+    def _init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS robots_cache (
+                    origin TEXT PRIMARY KEY,
+                    status INTEGER,
+                    body TEXT,
+                    fetched_at REAL
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _is_fresh(self, policy: RobotsPolicy) -> bool:
+        ttl = self.ttl if (policy.status >= 0 and policy.status < 500) else min(self.ttl, ROBOTS_ERROR_TTL)
+        return time.time() - policy.fetched_at < ttl
+
+    def _load(self, origin: str) -> Optional[RobotsPolicy]:
+        if not self.db_path:
+            return None
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                row = conn.execute(
+                    "SELECT status, body, fetched_at FROM robots_cache WHERE origin = ?", (origin,)
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if not row:
+            return None
+        return parse_robots(row[1], row[0], fetched_at=row[2], user_agent=self.user_agent)
+
+    def _store(self, origin: str, status: int, body: str, fetched_at: float):
+        if not self.db_path:
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO robots_cache (origin, status, body, fetched_at) VALUES (?, ?, ?, ?)",
+                    (origin, status, (body or "")[:ROBOTS_MAX_BYTES], fetched_at),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, origin: str, policy: RobotsPolicy):
+        self._policies[origin] = policy
+        host = urllib.parse.urlsplit(origin).netloc
+        if policy.crawl_delay:
+            self._delays[host] = min(policy.crawl_delay, self.max_crawl_delay)
+        else:
+            self._delays.pop(host, None)
+
+    async def get_policy(self, url: str) -> RobotsPolicy:
+        """Return the (cached or freshly fetched) policy for the URL's origin."""
+        origin = _origin(url)
+        policy = self._policies.get(origin)
+        if policy is not None and self._is_fresh(policy):
+            return policy
+
+        pending = self._inflight.get(origin)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[origin] = future
+        try:
+            policy = self._load(origin)
+            if policy is None or not self._is_fresh(policy):
+                status, body = await self.fetcher(origin + "/robots.txt", ROBOTS_FETCH_TIMEOUT)
+                fetched_at = time.time()
+                policy = parse_robots(body, status, fetched_at=fetched_at, user_agent=self.user_agent)
+                self._store(origin, status, body, fetched_at)
+            self._remember(origin, policy)
+            future.set_result(policy)
+            return policy
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters re-raise; mark retrieved so an unawaited future does not warn
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(origin, None)
+
+    async def allowed(self, url: str) -> bool:
+        """Check the URL against its origin's robots.txt, fetching it if needed."""
+        try:
+            policy = await self.get_policy(url)
+        except Exception:
+            return True
+        return policy.allows(url, self.user_agent)
+
+    def allowed_cached(self, url: str) -> bool:
+        """Check against an already cached robots.txt; unknown origins are allowed."""
+        policy = self._policies.get(_origin(url))
+        if policy is None:
+            return True
+        return policy.allows(url, self.user_agent)
+
+    def crawl_delay(self, host: str) -> float:
+        """Honoured Crawl-delay in seconds for a host (0 if none is known)."""
+        return self._delays.get((host or "").lower(), 0.0)
+
+
+_ROBOTS_CACHE: Optional[RobotsCache] = None
+
+
+def get_robots_cache() -> RobotsCache:
+    """Get or create the global robots.txt cache (persisted in SCRAPER_DB)."""
+    global _ROBOTS_CACHE
+    if _ROBOTS_CACHE is None:
+        _ROBOTS_CACHE = RobotsCache(db_path=os.getenv("SCRAPER_DB", "scraper.db"))
+    return _ROBOTS_CACHE
+
+
 def check_robots_txt(url: str, rp: Optional[RobotFileParser] = None) -> bool:
     """
     Check if URL is allowed by robots.txt.
-    
-    Currently returns True (permissive mode).
-    
+
+    Synchronous callers cannot fetch, so only an already cached robots.txt
+    (or the given parser) is consulted.
+
     Args:
         url: URL to check
         rp: Optional RobotFileParser instance
-        
+
     Returns:
         True if allowed
     """
-    return True
+    if not ROBOTS_RESPECT:
+        return True
+    if rp is not None:
+        return rp.can_fetch(ROBOTS_USER_AGENT, url)
+    return get_robots_cache().allowed_cached(url)
 
 
 async def robots_allowed_async(url: str) -> bool:
     """
     Async version of robots.txt check.
-    
-    Currently returns True (permissive mode).
-    
+
+    Fetches and caches the origin's robots.txt on first use.
+
     Args:
         url: URL to check
-        
+
     Returns:
         True if allowed
     """
-    return True
+    if not ROBOTS_RESPECT:
+        return True
+    return await get_robots_cache().allowed(url)
+
+
+def robots_crawl_delay(host: str) -> float:
+    """Crawl-delay in seconds for a host from cached robots.txt (0 if none)."""
+    if not ROBOTS_RESPECT or _ROBOTS_CACHE is None:
+        return 0.0
+    return _ROBOTS_CACHE.crawl_delay(host)
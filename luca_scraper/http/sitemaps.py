@@ -0,0 +1,248 @@
+"""
+Streaming sitemap discovery.
+
+Sitemaps are parsed incrementally (XMLPullParser, element by element) instead
+of building a full document tree, and gzip-compressed sitemaps are inflated
+chunk-wise with a size cap. <loc> entries are filtered while parsing, so only
+URLs passing the accept filter (path_ok/is_denied) are kept.
+
+Nested <sitemapindex> files are followed breadth-first; the children of one
+level are fetched concurrently, bounded by a total fetch budget. Results are
+cached per host together with the lastmod values of the index: once the TTL
+has expired, an index whose entries did not change is not walked again.
+"""
+
+import asyncio
+import re
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+
+# Upper bound for decompressed sitemap size (gzip bombs, huge shop sitemaps)
+MAX_SITEMAP_BYTES = 20 * 1024 * 1024
+_CHUNK = 64 * 1024
+_LOC_RE = re.compile(rb"<loc>\s*(.*?)\s*</loc>", re.I | re.S)
+
+ROOT_CANDIDATES = ("/sitemap.xml", "/sitemap_index.xml", "/sitemap-index.xml")
+
+# (url) -> raw body (bytes/str) or None
+SitemapFetcher = Callable[[str], Awaitable[Optional[Union[bytes, str]]]]
+
+
+@dataclass
+class SitemapEntry:
+    """One <url> or <sitemap> entry."""
+    loc: str
+    lastmod: str = ""
+    is_index: bool = False
+
+
+@dataclass
+class _HostResult:
+    urls: List[str]
+    signature: Tuple[Tuple[str, str], ...]
+    fetched_at: float
+
+
+def _chunks(data: bytes, max_bytes: int) -> Iterator[bytes]:
+    """Yield (decompressed) content in chunks, stopping at max_bytes."""
+    total = 0
+    if data[:2] == b"\x1f\x8b":
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for i in range(0, len(data), _CHUNK):
+            try:
+                chunk = inflater.decompress(data[i:i + _CHUNK], max(0, max_bytes - total))
+            except zlib.error:
+                return
+            total += len(chunk)
+            if chunk:
+                yield chunk
+            if total >= max_bytes:
+                return
+        return
+    for i in range(0, min(len(data), max_bytes), _CHUNK):
+        yield data[i:min(i + _CHUNK, max_bytes)]
+
+
+def iter_sitemap(data: Union[bytes, str], max_bytes: int = MAX_SITEMAP_BYTES) -> Iterator[SitemapEntry]:
+    """
+    Stream the entries of a sitemap or sitemap index.
+
+    Malformed XML falls back to a <loc> regex over the content read so far.
+
+    Args:
+        data: Raw body (plain or gzip)
+        max_bytes: Maximum (decompressed) bytes to read
+
+    Yields:
+        SitemapEntry per <url>/<sitemap> element
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8", errors="replace")
+    if not data:
+        return
+
+    parser = XMLPullParser(events=("end",))
+    seen = []
+    try:
+        for chunk in _chunks(data, max_bytes):
+            seen.append(chunk)
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                tag = elem.tag.rsplit("}", 1)[-1].lower()
+                if tag not in ("url", "sitemap"):
+                    continue
+                loc = lastmod = ""
+                for child in elem:
+                    child_tag = child.tag.rsplit("}", 1)[-1].lower()
+                    if child_tag == "loc":
+                        loc = (child.text or "").strip()
+                    elif child_tag == "lastmod":
+                        lastmod = (child.text or "").strip()
+                # Free parsed elements; only the current entry is kept in memory
+                elem.clear()
+                if loc:
+                    yield SitemapEntry(loc=loc, lastmod=lastmod, is_index=(tag == "sitemap"))
+    except ParseError:
+        raw = b"".join(seen)
+        is_index = b"<sitemapindex" in raw[:1000].lower()
+        for m in _LOC_RE.finditer(raw):
+            loc = m.group(1).decode("utf-8", errors="replace").strip()
+            if loc:
+                yield SitemapEntry(loc=loc, is_index=is_index)
+
+
+class SitemapDiscovery:
+    """
+    Walks a host's sitemaps and collects URLs passing an accept filter.
+
+    Example:
+        >>> discovery = SitemapDiscovery(fetch, accept=lambda u: path_ok(u) and not is_denied(u))
+        >>> urls = await discovery.discover("https://example.com")
+    """
+
+    def __init__(
+        self,
+        fetch: SitemapFetcher,
+        accept: Callable[[str], bool],
+        max_fetches: int = 8,
+        max_urls: int = 200,
+        concurrency: int = 4,
+        cache_ttl: int = 6 * 3600,
+        cache_size: int = 2000,
+        root_candidates: Tuple[str, ...] = ROOT_CANDIDATES,
+    ):
+        """
+        Initialize discovery.
+
+        Args:
+            fetch: Async (url) -> body or None
+            accept: Filter applied to every <loc> while parsing
+            max_fetches: Sitemap fetch budget per host (root + nested)
+            max_urls: Stop after this many accepted URLs
+            concurrency: Parallel fetches of nested sitemaps
+            cache_ttl: Seconds before a host's result is revalidated
+            cache_size: Number of hosts kept in the cache
+            root_candidates: Paths tried (in order) for the root sitemap
+        """
+        self.fetch = fetch
+        self.accept = accept
+        self.max_fetches = max(1, max_fetches)
+        self.max_urls = max_urls
+        self.concurrency = max(1, concurrency)
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.root_candidates = root_candidates
+        self._cache: Dict[str, _HostResult] = {}
+
+    def _accept(self, url: str) -> bool:
+        try:
+            return bool(self.accept(url))
+        except Exception:
+            return False
+
+    def _scan(self, body, urls: List[str], seen: set) -> List[SitemapEntry]:
+        """Collect accepted URLs, return nested sitemap entries."""
+        children = []
+        for entry in iter_sitemap(body):
+            if entry.is_index:
+                children.append(entry)
+                continue
+            if entry.loc in seen or not self._accept(entry.loc):
+                continue
+            seen.add(entry.loc)
+            urls.append(entry.loc)
+            if len(urls) >= self.max_urls:
+                break
+        return children
+
+    async def discover(self, base: str) -> List[str]:
+        """
+        Return accepted page URLs from the host's sitemaps (possibly cached).
+
+        Args:
+            base: Origin, e.g. "https://example.com"
+        """
+        host = urllib.parse.urlparse(base).netloc.lower()
+        cached = self._cache.get(host)
+        if cached and time.time() - cached.fetched_at < self.cache_ttl:
+            return list(cached.urls)
+
+        urls: List[str] = []
+        seen: set = set()
+        fetches = 0
+        children: List[SitemapEntry] = []
+        for path in self.root_candidates:
+            if fetches >= self.max_fetches:
+                break
+            body = await self.fetch(urllib.parse.urljoin(base, path))
+            fetches += 1
+            if not body:
+                continue
+            children = self._scan(body, urls, seen)
+            if urls or children:
+                break
+
+        signature = tuple(sorted((c.loc, c.lastmod) for c in children))
+        if cached and children and signature == cached.signature and all(lm for _, lm in signature):
+            # Index unchanged since the last walk
+            self._remember(host, cached.urls, signature)
+            return list(cached.urls)
+
+        # Newest child sitemaps first
+        queue = sorted(children, key=lambda c: c.lastmod, reverse=True)
+        visited = {c.loc for c in queue}
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def _fetch(loc: str):
+            async with sem:
+                try:
+                    return await self.fetch(loc)
+                except Exception:
+                    return None
+
+        while queue and fetches < self.max_fetches and len(urls) < self.max_urls:
+            level = queue[:self.max_fetches - fetches]
+            queue = queue[len(level):]
+            fetches += len(level)
+            bodies = await asyncio.gather(*(_fetch(c.loc) for c in level))
+            for body in bodies:
+                if not body or len(urls) >= self.max_urls:
+                    continue
+                for child in self._scan(body, urls, seen):
+                    if child.loc not in visited:
+                        visited.add(child.loc)
+                        queue.append(child)
+
+        self._remember(host, urls, signature)
+        return list(urls)
+
+    def _remember(self, host: str, urls: List[str], signature):
+        self._cache.pop(host, None)
+        self._cache[host] = _HostResult(urls=list(urls), signature=signature, fetched_at=time.time())
+        while len(self._cache) > self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
@@ -0,0 +1,251 @@
+"""
+Non-blocking log sink for the scraper.
+
+log() on the event-loop thread only checks the level and enqueues a record.
+Timestamp formatting, JSON encoding, stdout writes and the fan-out to the UI
+queue happen on a background thread, which writes whatever has accumulated
+in one batch with a single flush.
+
+Output formats:
+- text (default): "[2024-01-01 12:00:00] [INFO   ] message {ctx}" as before
+- json: one JSON object per line for machine consumers
+  ({"ts": ..., "level": ..., "msg": ..., "ctx": {...}})
+
+Environment:
+- SCRAPER_LOG_LEVEL: debug|info|warn|error|fatal (default: debug)
+- SCRAPER_LOG_FORMAT: text|json (default: text)
+"""
+
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+
+LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "warn": 30,
+    "warning": 30,
+    "error": 40,
+    "fatal": 50,
+    "critical": 50,
+}
+
+# Level names as stored in scraper_control.ScraperLog
+LEVEL_NAMES = {
+    "debug": "DEBUG",
+    "info": "INFO",
+    "warn": "WARN",
+    "warning": "WARN",
+    "error": "ERROR",
+    "fatal": "CRITICAL",
+    "critical": "CRITICAL",
+}
+
+FORMATS = ("text", "json")
+
+# Records at or above this level are never dropped when the queue is full
+_NEVER_DROP_LEVEL = LEVELS["warn"]
+
+
+def format_text(ts: float, level: str, msg: str, ctx: Dict[str, Any]) -> str:
+    """Format a record like the classic scriptname.log() line."""
+    stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+    ctx_str = (" " + json.dumps(ctx, ensure_ascii=False, default=str)) if ctx else ""
+    return f"[{stamp}] [{level.upper():7}] {msg}{ctx_str}"
+
+
+def format_json(ts: float, level: str, msg: str, ctx: Dict[str, Any]) -> str:
+    """Format a record as a single JSON line."""
+    record = {
+        "ts": datetime.fromtimestamp(ts).isoformat(timespec="milliseconds"),
+        "level": LEVEL_NAMES.get(level.lower(), level.upper()),
+        "msg": msg,
+    }
+    if ctx:
+        record["ctx"] = ctx
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+class LogSink:
+    """
+    Queue-backed log writer running on a daemon thread.
+
+    Example:
+        >>> sink = LogSink.from_env(ui_queue=lambda: UILOGQ)
+        >>> sink.emit("info", "Run gestartet", run_id=5)
+        >>> sink.flush()
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        level: str = "debug",
+        fmt: str = "text",
+        batch_size: int = 500,
+        max_queue: int = 20000,
+        ui_queue: Optional[Callable[[], Optional[queue.Queue]]] = None,
+    ):
+        """
+        Initialize log sink.
+
+        Args:
+            stream: Target stream (default: sys.stdout at write time)
+            level: Minimum level; lower records are dropped before formatting
+            fmt: "text" or "json"
+            batch_size: Max records written per flush
+            max_queue: Queue bound; when full, records below warn are dropped
+            ui_queue: Callable returning the UI queue (or None), receives text lines
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown log format: {fmt}")
+        self.stream = stream
+        self.min_level = LEVELS.get(level.lower(), LEVELS["debug"])
+        self.fmt = fmt
+        self.batch_size = max(1, batch_size)
+        self.ui_queue = ui_queue
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LogSink":
+        """Create a sink configured via SCRAPER_LOG_LEVEL / SCRAPER_LOG_FORMAT."""
+        fmt = os.getenv("SCRAPER_LOG_FORMAT", "text").strip().lower()
+        kwargs.setdefault("level", os.getenv("SCRAPER_LOG_LEVEL", "debug").strip().lower())
+        kwargs.setdefault("fmt", fmt if fmt in FORMATS else "text")
+        return cls(**kwargs)
+
+    def enabled_for(self, level: str) -> bool:
+        """Return True if records of this level are written."""
+        return LEVELS.get(level.lower(), LEVELS["info"]) >= self.min_level
+
+    def emit(self, level: str, msg: str, **ctx):
+        """
+        Enqueue a record without formatting or I/O on the calling thread.
+
+        Args:
+            level: Level name (debug, info, warn, error, fatal)
+            msg: Message
+            **ctx: Structured context
+        """
+        severity = LEVELS.get(level.lower(), LEVELS["info"])
+        if severity < self.min_level:
+            return
+
+        if self._closed:
+            # Interpreter shutdown: write directly
+            self._write([(time.time(), level, msg, ctx)])
+            return
+
+        if self._thread is None:
+            self._start()
+
+        record = (time.time(), level, msg, ctx)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            if severity < _NEVER_DROP_LEVEL:
+                self.dropped += 1
+                return
+            self._queue.put(record)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Block until all records enqueued so far are written.
+
+        Returns:
+            True if the writer caught up within timeout
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Write pending records and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            markers = []
+            stop = False
+            for item in batch:
+                if item is self._STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    records.append(item)
+
+            if records:
+                self._write(records)
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    @staticmethod
+    def _format(formatter: Callable, record: tuple) -> str:
+        ts, level, msg, ctx = record
+        try:
+            return formatter(ts, level, msg, ctx)
+        except Exception as e:
+            return formatter(ts, "error", f"Log record could not be formatted: {e}", {"msg": str(msg)})
+
+    def _write(self, records: List[tuple]):
+        formatter = format_json if self.fmt == "json" else format_text
+        lines = [self._format(formatter, record) for record in records]
+
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            lines.append(formatter(time.time(), "warn", "Log queue full, records dropped", {"dropped": dropped}))
+
+        stream = self.stream or sys.stdout
+        try:
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+        except Exception:
+            pass
+
+        ui = self.ui_queue() if self.ui_queue else None
+        if ui is not None:
+            if self.fmt != "text":
+                lines = [self._format(format_text, record) for record in records]
+            for line in lines:
+                try:
+                    ui.put_nowait(line)
+                except Exception:
+                    pass
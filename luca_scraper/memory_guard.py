@@ -3,13 +3,26 @@ Memory leak prevention and monitoring.
 
 Provides memory usage monitoring, automatic garbage collection,
 and decorators for tracking memory usage of functions.
+
+MemoryAdmission is the backpressure counterpart for the crawl path: it
+lowers the number of concurrently admitted fetch/parse tasks as the process
+RSS approaches a memory budget and admits more again once pressure drops,
+instead of blocking the event loop with gc.collect().
+
+Environment:
+- MEMORY_ADMISSION: "0" disables admission control (default: 1)
+- MEMORY_BUDGET_MB: RSS budget of the scraper process (default: 60% of system memory)
+- MEMORY_RESPONSE_BUDGET_MB: max. response bodies held in flight (default: 256)
 """
 
+import asyncio
 import gc
 import functools
 import psutil
 import os
-from typing import Callable, Optional, Dict, Any
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Dict, Any
 from datetime import datetime
 
 
@@ -184,6 +197,212 @@ class MemoryGuard:
         return stats['percent'] >= self.critical_threshold_percent
 
 
+MEMORY_ADMISSION = os.getenv("MEMORY_ADMISSION", "1") != "0"
+MEMORY_BUDGET_MB = float(os.getenv("MEMORY_BUDGET_MB", "0"))
+MEMORY_RESPONSE_BUDGET_MB = float(os.getenv("MEMORY_RESPONSE_BUDGET_MB", "256"))
+
+
+class MemoryAdmission:
+    """
+    Memory-aware admission controller for concurrent fetch/parse tasks.
+
+    The number of admission slots follows the RSS of the process:
+
+    - below soft_ratio * budget: max_slots
+    - between soft and hard ratio: linearly fewer slots
+    - above hard_ratio * budget: a single slot (drain mode) until RSS falls
+      below resume_ratio * budget again (hysteresis)
+
+    max_slots is additionally capped by response_budget_mb / max_response_mb,
+    so the response bodies held in flight never exceed the response budget.
+    With task_mb (expected memory of one task), slots are also limited to the
+    headroom below the hard limit, so a burst of admissions cannot overshoot
+    the budget before RSS catches up.
+
+    Example:
+        >>> admission = MemoryAdmission(budget_mb=1024, max_slots=40, max_response_mb=2)
+        >>> await admission.acquire()
+        >>> try:
+        ...     await fetch_and_parse(url)
+        ... finally:
+        ...     admission.release()
+    """
+
+    def __init__(
+        self,
+        budget_mb: float,
+        max_slots: int = 64,
+        soft_ratio: float = 0.7,
+        hard_ratio: float = 0.9,
+        resume_ratio: float = 0.8,
+        response_budget_mb: Optional[float] = None,
+        max_response_mb: Optional[float] = None,
+        task_mb: Optional[float] = None,
+        sample_interval: float = 0.2,
+        rss_fn: Optional[Callable[[], float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            budget_mb: RSS budget in MB
+            max_slots: Slots without memory pressure
+            soft_ratio: Share of the budget where slots start to shrink
+            hard_ratio: Share of the budget where only one slot is left
+            resume_ratio: Share of the budget below which drain mode ends
+            response_budget_mb: Max. MB of response bodies in flight (None: no cap)
+            max_response_mb: Largest response body accepted by the fetcher
+            task_mb: Expected memory per admitted task (None: no headroom limit)
+            sample_interval: Min. seconds between two RSS measurements
+            rss_fn: RSS source in MB (injectable for tests)
+            clock: Monotonic clock (injectable for tests)
+        """
+        self.budget_mb = float(budget_mb)
+        self.soft_ratio = soft_ratio
+        self.hard_ratio = max(hard_ratio, soft_ratio)
+        self.resume_ratio = min(resume_ratio, self.hard_ratio)
+        self.sample_interval = sample_interval
+        self.clock = clock
+        self.task_mb = task_mb
+        self.response_budget_mb = response_budget_mb
+        self.max_response_mb = max_response_mb
+        if rss_fn is None:
+            process = psutil.Process(os.getpid())
+            rss_fn = lambda: process.memory_info().rss / 1024 / 1024
+        self._rss_fn = rss_fn
+        self._rss_mb = 0.0
+        self._sampled_at = float("-inf")
+        self.draining = False
+        self.in_flight = 0
+        self.peak_rss_mb = 0.0
+        self.throttled = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.set_max_slots(max_slots)
+
+    def set_max_slots(self, max_slots: int):
+        """Apply a new slot limit, still capped by the response budget."""
+        self.max_slots = max(1, int(max_slots))
+        if self.response_budget_mb and self.max_response_mb:
+            self.max_slots = max(1, min(self.max_slots, int(self.response_budget_mb // self.max_response_mb)))
+        self._wake()
+
+    def rss_mb(self) -> float:
+        """Current RSS in MB (measured at most every sample_interval)."""
+        now = self.clock()
+        if now - self._sampled_at >= self.sample_interval:
+            try:
+                self._rss_mb = float(self._rss_fn())
+            except Exception:
+                pass
+            self._sampled_at = now
+            self.peak_rss_mb = max(self.peak_rss_mb, self._rss_mb)
+        return self._rss_mb
+
+    def slots(self) -> int:
+        """Number of tasks that may run concurrently at the current pressure."""
+        if self.budget_mb <= 0:
+            return self.max_slots
+        usage = self.rss_mb() / self.budget_mb
+        if self.draining:
+            if usage > self.resume_ratio:
+                return 1
+            self.draining = False
+            log("info", "Memory pressure dropped, admission resumed", rss_mb=round(self._rss_mb, 1),
+                budget_mb=self.budget_mb)
+        if usage >= self.hard_ratio:
+            self.draining = True
+            log("warn", "Memory budget nearly exhausted, draining in-flight work", rss_mb=round(self._rss_mb, 1),
+                budget_mb=self.budget_mb, in_flight=self.in_flight)
+            return 1
+        slots = self.max_slots
+        if usage > self.soft_ratio:
+            share = (self.hard_ratio - usage) / (self.hard_ratio - self.soft_ratio)
+            slots = int(round(self.max_slots * share, 6))
+        if self.task_mb:
+            # Counts loaded tasks twice (in RSS and in slots): conservative, never overshoots
+            headroom = self.hard_ratio * self.budget_mb - self._rss_mb
+            slots = min(slots, int(headroom // self.task_mb))
+        return max(1, slots)
+
+    async def acquire(self):
+        """Wait for an admission slot."""
+        waited = False
+        while self.in_flight >= self.slots():
+            waited = True
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                # Woken by release(); the timeout re-checks pressure that drops for other reasons
+                await asyncio.wait_for(fut, timeout=self.sample_interval)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+        if waited:
+            self.throttled += 1
+        self.in_flight += 1
+
+    def release(self):
+        """Return a slot; memory of the finished task is freed, so re-measure."""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._sampled_at = float("-inf")
+        self._wake()
+
+    def _wake(self):
+        if not self._waiters:
+            return
+        free = self.slots() - self.in_flight
+        while free > 0 and self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                free -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pressure and counters."""
+        return {
+            'budget_mb': self.budget_mb,
+            'rss_mb': round(self._rss_mb, 1),
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'slots': self.slots(),
+            'max_slots': self.max_slots,
+            'in_flight': self.in_flight,
+            'draining': self.draining,
+            'throttled': self.throttled,
+        }
+
+
+def memory_admission_from_env(max_slots: int, max_response_bytes: Optional[int] = None) -> Optional[MemoryAdmission]:
+    """
+    Build a MemoryAdmission from MEMORY_* environment settings.
+
+    Args:
+        max_slots: Configured concurrency (upper bound of the slots)
+        max_response_bytes: Largest response body accepted by the fetcher
+
+    Returns:
+        MemoryAdmission, or None if disabled
+    """
+    if not MEMORY_ADMISSION:
+        return None
+    budget_mb = MEMORY_BUDGET_MB
+    if budget_mb <= 0:
+        budget_mb = psutil.virtual_memory().total / 1024 / 1024 * 0.6
+    max_response_mb = (max_response_bytes / 1024 / 1024) if max_response_bytes else None
+    return MemoryAdmission(
+        budget_mb=budget_mb,
+        max_slots=max_slots,
+        response_budget_mb=MEMORY_RESPONSE_BUDGET_MB,
+        max_response_mb=max_response_mb,
+        # Body + decoded text + parse tree: roughly three times the raw response
+        task_mb=max_response_mb * 3 if max_response_mb else None,
+    )
+
+
 # Global memory guard instance
 _memory_guard: Optional[MemoryGuard] = None
 
@@ -264,6 +483,9 @@ def memory_checked(func: Callable) -> Callable:
 def memory_checked_async(func: Callable) -> Callable:
     """
     Decorator to check memory before and after async function execution.
+
+    Does not force garbage collection: gc.collect() would block the event
+    loop; use MemoryAdmission to bound in-flight work instead.
     
     Args:
         func: Async function to decorate
@@ -305,9 +527,8 @@ def memory_checked_async(func: Callable) -> Callable:
                 percent=after_stats['percent'],
                 delta_mb=round(delta_mb, 2)
             )
-            
-            # Check if GC is needed
-            guard.check_and_collect()
+            if after_stats['percent'] >= guard.memory_threshold_percent:
+                log("warn", f"High memory usage after {func.__name__}", percent=after_stats['percent'])
         
         return result
     
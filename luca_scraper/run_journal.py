@@ -0,0 +1,289 @@
+"""
+Crash-safe run journal for the scraper frontier.
+
+run_scrape_once_async() appends its progress to a small SQLite database in
+WAL mode: the query list of the run, the harvested links of every query
+(the frontier), each processed URL together with the leads it produced, and
+finished queries. Entries are buffered and written in batches, so the
+overhead per URL is one list append.
+
+When a run is killed (OOM, deploy, CRM "stop"), ``--resume`` restores the
+newest unfinished run from the journal:
+
+- queries finished in the journal are skipped (no repeated paid searches)
+- the in-flight query reuses its recorded frontier instead of searching again
+- URLs already processed are not fetched again; their leads are restored
+
+Finished runs are removed from the journal.
+
+Environment:
+- RUN_JOURNAL: "0" disables the journal (default: 1)
+- RUN_JOURNAL_PATH: journal database (default: run_journal.db next to SCRAPER_DB)
+- RUN_JOURNAL_FLUSH_EVERY: buffered entries before a write (default: 50)
+- RUN_JOURNAL_FLUSH_INTERVAL: max. seconds between writes (default: 2)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+RUN_JOURNAL_ENABLED = os.getenv("RUN_JOURNAL", "1") != "0"
+RUN_JOURNAL_FLUSH_EVERY = int(os.getenv("RUN_JOURNAL_FLUSH_EVERY", "50"))
+RUN_JOURNAL_FLUSH_INTERVAL = float(os.getenv("RUN_JOURNAL_FLUSH_INTERVAL", "2"))
+
+# Entry kinds
+RUN_START = "run_start"
+RUN_RESUME = "run_resume"
+FRONTIER = "frontier"
+URL_DONE = "url_done"
+QUERY_DONE = "query_done"
+
+
+def default_journal_path() -> str:
+    """run_journal.db next to the scraper database."""
+    explicit = os.getenv("RUN_JOURNAL_PATH")
+    if explicit:
+        return explicit
+    db_path = os.getenv("SCRAPER_DB", "scraper.db")
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "run_journal.db")
+
+
+@dataclass
+class ResumeState:
+    """Frontier of an unfinished run, rebuilt from the journal."""
+
+    journal_id: int
+    queries: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    done_queries: Set[str] = field(default_factory=set)
+    frontier: Dict[str, List[Any]] = field(default_factory=dict)
+    done_urls: Set[str] = field(default_factory=set)
+    rows: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    resumes: int = 0
+
+    @property
+    def pending_queries(self) -> List[str]:
+        return [q for q in self.queries if q not in self.done_queries]
+
+    def rows_for(self, query: str) -> List[Dict[str, Any]]:
+        """Leads of already processed URLs of a not yet finished query."""
+        return list(self.rows.get(query, []))
+
+
+class RunJournal:
+    """
+    Append-only journal of one scraper run.
+
+    Example:
+        >>> journal = RunJournal.start(run_id, queries)          # or RunJournal.resume(state)
+        >>> journal.record_frontier(q, links)
+        >>> journal.record_url(q, url, leads)                     # per processed URL
+        >>> journal.record_query_done(q)
+        >>> journal.finish()                                      # run completed, journal entries dropped
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        journal_id: Optional[int] = None,
+        flush_every: int = RUN_JOURNAL_FLUSH_EVERY,
+        flush_interval: float = RUN_JOURNAL_FLUSH_INTERVAL,
+    ):
+        self.path = path or default_journal_path()
+        self.journal_id = journal_id
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple[int, str, str, str, float]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def start(cls, run_id: int, queries: Iterable[str], params: Optional[Dict[str, Any]] = None,
+              path: Optional[str] = None, **kwargs) -> "RunJournal":
+        """
+        Open a journal for a new run (the scraper run id doubles as journal id).
+
+        Entries of older unfinished runs are dropped: a fresh run supersedes them.
+        """
+        journal = cls(path=path, journal_id=run_id, **kwargs)
+        with journal._conn:
+            journal._conn.execute("DELETE FROM journal WHERE journal_id != ?", (run_id,))
+        journal._append(RUN_START, "", {"queries": list(queries), "params": params or {}})
+        journal.flush()
+        return journal
+
+    @classmethod
+    def resume(cls, state: ResumeState, run_id: Optional[int] = None,
+               path: Optional[str] = None, **kwargs) -> "RunJournal":
+        """Continue journaling an unfinished run restored via load_resume_state()."""
+        journal = cls(path=path, journal_id=state.journal_id, **kwargs)
+        journal._append(RUN_RESUME, "", {"run_id": run_id})
+        journal.flush()
+        return journal
+
+    def finish(self):
+        """Mark the run as completed and drop its entries."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._buffer = []
+            with self._conn:
+                self._conn.execute("DELETE FROM journal WHERE journal_id = ?", (self.journal_id,))
+        self.close()
+
+    def close(self):
+        """Flush buffered entries and close the connection (run stays resumable)."""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._flush_locked()
+            finally:
+                self._conn.close()
+                self._conn = None
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_frontier(self, query: str, links: Iterable[Any]):
+        """Harvested links of a query, before any of them is fetched."""
+        self._append(FRONTIER, query, list(links))
+        self.flush()
+
+    def record_url(self, query: str, url: str, rows: Optional[List[Dict[str, Any]]] = None):
+        """A URL was processed; rows are the leads it produced (url "" for snippet leads)."""
+        self._append(URL_DONE, query, {"url": url, "rows": rows or []})
+
+    def record_query_done(self, query: str):
+        """Query finished: its leads are stored, the frontier is no longer needed."""
+        self._append(QUERY_DONE, query, None)
+        self.flush()
+
+    def _append(self, kind: str, key: str, payload: Any):
+        entry = (self.journal_id, kind, key, json.dumps(payload, ensure_ascii=False, default=str), time.time())
+        with self._lock:
+            if self._conn is None:
+                return
+            self._buffer.append(entry)
+            if (
+                len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        entries, self._buffer = self._buffer, []
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO journal (journal_id, kind, key, payload, ts) VALUES (?, ?, ?, ?, ?)",
+                entries,
+            )
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the journal database (WAL, synchronous=NORMAL) and ensure the schema."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            journal_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL DEFAULT '',
+            payload TEXT,
+            ts REAL NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_run ON journal(journal_id, seq)")
+    conn.commit()
+    return conn
+
+
+def load_resume_state(path: Optional[str] = None) -> Optional[ResumeState]:
+    """
+    Rebuild the frontier of the newest unfinished run.
+
+    Returns:
+        ResumeState, or None if there is nothing to resume
+    """
+    path = path or default_journal_path()
+    if not os.path.exists(path):
+        return None
+    conn = connect(path)
+    try:
+        row = conn.execute(
+            "SELECT journal_id FROM journal WHERE kind = ? ORDER BY seq DESC LIMIT 1", (RUN_START,)
+        ).fetchone()
+        if row is None:
+            return None
+        state = ResumeState(journal_id=row[0])
+        for kind, key, payload in conn.execute(
+            "SELECT kind, key, payload FROM journal WHERE journal_id = ? ORDER BY seq", (state.journal_id,)
+        ):
+            data = json.loads(payload) if payload else None
+            if kind == RUN_START:
+                state.queries = data.get("queries", [])
+                state.params = data.get("params", {})
+            elif kind == RUN_RESUME:
+                state.resumes += 1
+            elif kind == FRONTIER:
+                state.frontier[key] = data or []
+            elif kind == URL_DONE:
+                if data["url"]:
+                    state.done_urls.add(data["url"])
+                if data.get("rows"):
+                    state.rows.setdefault(key, []).extend(data["rows"])
+            elif kind == QUERY_DONE:
+                state.done_queries.add(key)
+                state.frontier.pop(key, None)
+                state.rows.pop(key, None)
+        return state
+    finally:
+        conn.close()
+
+
+def discard_unfinished(path: Optional[str] = None) -> int:
+    """Drop all journal entries (e.g. with --reset). Returns deleted rows."""
+    path = path or default_journal_path()
+    if not os.path.exists(path):
+        return 0
+    conn = connect(path)
+    try:
+        with conn:
+            return conn.execute("DELETE FROM journal").rowcount
+    finally:
+        conn.close()
+
+
+__all__ = [
+    "RUN_JOURNAL_ENABLED",
+    "ResumeState",
+    "RunJournal",
+    "default_journal_path",
+    "discard_unfinished",
+    "load_resume_state",
+]
@@ -10,7 +10,7 @@ import time
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 
 @dataclass
@@ -93,12 +93,45 @@ class HostMetrics:
 
 
 class MetricsStore:
-    """SQLite-backed metrics storage."""
+    """
+    SQLite-backed metrics storage.
+
+    Mutations only mark the touched dork/host as dirty; persist() writes just
+    the dirty rows in one transaction. Optionally flushes automatically after
+    auto_flush_count mutations or auto_flush_interval seconds, and keeps at
+    most max_hosts host entries in memory (clean hosts are evicted and
+    reloaded from the database on demand).
+
+    Code that mutates objects returned by get_dork_metrics/get_host_metrics
+    directly must call mark_dork_dirty/mark_host_dirty, or use persist(full=True).
+    """
     
-    def __init__(self, db_path: str = "metrics.db"):
+    def __init__(
+        self,
+        db_path: str = "metrics.db",
+        auto_flush_count: int = 0,
+        auto_flush_interval: float = 0.0,
+        max_hosts: Optional[int] = None,
+    ):
+        """
+        Args:
+            db_path: SQLite database path
+            auto_flush_count: Flush after this many mutations (0 = off)
+            auto_flush_interval: Flush when a mutation happens this many
+                seconds after the last flush (0 = off)
+            max_hosts: Upper bound for cached host entries (None = unbounded)
+        """
         self.db_path = db_path
+        self.auto_flush_count = auto_flush_count
+        self.auto_flush_interval = auto_flush_interval
+        self.max_hosts = max_hosts
         self.dork_cache: Dict[str, DorkMetrics] = {}
         self.host_cache: Dict[str, HostMetrics] = {}
+        self._dirty_dorks: Set[str] = set()
+        self._dirty_hosts: Set[str] = set()
+        self._pending_mutations = 0
+        self._last_flush = time.monotonic()
+        self.concurrency_state: Dict[str, Any] = {}
         self._init_db()
         self._load_metrics()
     
@@ -134,9 +167,32 @@ class MetricsStore:
             )
         """)
         
+        # Adaptive concurrency state ("*" = global limit)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS concurrency_state (
+                scope TEXT PRIMARY KEY,
+                concurrency_limit INTEGER DEFAULT 0,
+                in_flight INTEGER DEFAULT 0,
+                latency_ms REAL DEFAULT 0.0,
+                responses INTEGER DEFAULT 0,
+                throttled INTEGER DEFAULT 0,
+                errors INTEGER DEFAULT 0,
+                updated_at REAL DEFAULT 0.0
+            )
+        """)
+        
         conn.commit()
         conn.close()
     
+    @staticmethod
+    def _host_from_row(row) -> HostMetrics:
+        return HostMetrics(
+            host=row["host"],
+            hits_total=row["hits_total"],
+            drops_by_reason=defaultdict(int, json.loads(row["drops_by_reason"])),
+            backoff_until=row["backoff_until"],
+        )
+    
     def _load_metrics(self):
         """Load metrics from database into cache."""
         conn = sqlite3.connect(self.db_path)
@@ -157,107 +213,237 @@ class MetricsStore:
                 last_used=row["last_used"],
             )
         
-        # Load host metrics
-        cur.execute("SELECT * FROM host_metrics")
-        for row in cur.fetchall():
-            drops = json.loads(row["drops_by_reason"])
-            self.host_cache[row["host"]] = HostMetrics(
-                host=row["host"],
-                hits_total=row["hits_total"],
-                drops_by_reason=defaultdict(int, drops),
-                backoff_until=row["backoff_until"],
+        # Load host metrics (most recently updated first when bounded)
+        if self.max_hosts is None:
+            cur.execute("SELECT * FROM host_metrics")
+        else:
+            cur.execute(
+                "SELECT * FROM host_metrics ORDER BY updated_at DESC LIMIT ?",
+                (self.max_hosts,),
             )
+        for row in reversed(cur.fetchall()):
+            self.host_cache[row["host"]] = self._host_from_row(row)
         
         conn.close()
     
-    def persist(self):
-        """Persist all metrics to database."""
+    def _load_host(self, host: str) -> Optional[HostMetrics]:
+        """Reload an evicted host from the database."""
         conn = sqlite3.connect(self.db_path)
-        cur = conn.cursor()
-        now = time.time()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute("SELECT * FROM host_metrics WHERE host = ?", (host,)).fetchone()
+        finally:
+            conn.close()
+        return self._host_from_row(row) if row else None
+    
+    def persist(self, full: bool = False) -> int:
+        """
+        Persist modified metrics to database.
         
-        # Persist dork metrics
-        for dork, metrics in self.dork_cache.items():
-            cur.execute("""
-                INSERT OR REPLACE INTO dork_metrics 
-                (dork, queries_total, serp_hits, urls_fetched, leads_found, 
-                 leads_kept, accepted_leads, last_used, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                dork, metrics.queries_total, metrics.serp_hits,
-                metrics.urls_fetched, metrics.leads_found, metrics.leads_kept,
-                metrics.accepted_leads, metrics.last_used, now
-            ))
+        Args:
+            full: Write all cached entries instead of only dirty ones
+        
+        Returns:
+            Number of rows written
+        """
+        dorks = list(self.dork_cache) if full else [d for d in self._dirty_dorks if d in self.dork_cache]
+        hosts = list(self.host_cache) if full else [h for h in self._dirty_hosts if h in self.host_cache]
+        now = time.time()
         
-        # Persist host metrics
-        for host, metrics in self.host_cache.items():
-            drops_json = json.dumps(dict(metrics.drops_by_reason))
-            cur.execute("""
-                INSERT OR REPLACE INTO host_metrics 
-                (host, hits_total, drops_by_reason, backoff_until, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (host, metrics.hits_total, drops_json, metrics.backoff_until, now))
+        if dorks or hosts:
+            dork_rows = []
+            for dork in dorks:
+                m = self.dork_cache[dork]
+                dork_rows.append((
+                    dork, m.queries_total, m.serp_hits, m.urls_fetched,
+                    m.leads_found, m.leads_kept, m.accepted_leads, m.last_used, now
+                ))
+            host_rows = []
+            for host in hosts:
+                h = self.host_cache[host]
+                host_rows.append((
+                    host, h.hits_total, json.dumps(dict(h.drops_by_reason)), h.backoff_until, now
+                ))
+            
+            conn = sqlite3.connect(self.db_path)
+            try:
+                with conn:
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO dork_metrics 
+                        (dork, queries_total, serp_hits, urls_fetched, leads_found, 
+                         leads_kept, accepted_leads, last_used, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, dork_rows)
+                    conn.executemany("""
+                        INSERT OR REPLACE INTO host_metrics 
+                        (host, hits_total, drops_by_reason, backoff_until, updated_at)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, host_rows)
+            finally:
+                conn.close()
         
-        conn.commit()
-        conn.close()
+        # Only cleared after a successful commit, so failed flushes are retried
+        self._dirty_dorks.clear()
+        self._dirty_hosts.clear()
+        self._pending_mutations = 0
+        self._last_flush = time.monotonic()
+        self._evict_hosts()
+        return len(dorks) + len(hosts)
+    
+    def mark_dork_dirty(self, dork: str):
+        """Mark a dork for the next persist() after a direct mutation."""
+        self._dirty_dorks.add(dork)
+        self._after_mutation()
+    
+    def mark_host_dirty(self, host: str):
+        """Mark a host for the next persist() after a direct mutation."""
+        if host:
+            self._dirty_hosts.add(host)
+            self._after_mutation()
+    
+    @property
+    def dirty_count(self) -> int:
+        """Number of entries waiting to be persisted."""
+        return len(self._dirty_dorks) + len(self._dirty_hosts)
+    
+    def _after_mutation(self):
+        self._pending_mutations += 1
+        if self.auto_flush_count and self._pending_mutations >= self.auto_flush_count:
+            self.persist()
+        elif self.auto_flush_interval and time.monotonic() - self._last_flush >= self.auto_flush_interval:
+            self.persist()
+        elif self.max_hosts is not None and len(self.host_cache) > 2 * self.max_hosts:
+            # Too many dirty hosts to evict: flush so they become evictable
+            self.persist()
+    
+    def _evict_hosts(self, keep: str = ""):
+        """Drop least recently used clean hosts beyond max_hosts."""
+        if self.max_hosts is None:
+            return
+        excess = len(self.host_cache) - self.max_hosts
+        if excess <= 0:
+            return
+        for host in list(self.host_cache):
+            if excess <= 0:
+                break
+            if host != keep and host not in self._dirty_hosts:
+                del self.host_cache[host]
+                excess -= 1
     
     def get_dork_metrics(self, dork: str) -> DorkMetrics:
         """Get or create dork metrics."""
         if dork not in self.dork_cache:
             self.dork_cache[dork] = DorkMetrics(dork=dork)
+            self._dirty_dorks.add(dork)
         return self.dork_cache[dork]
     
     def get_host_metrics(self, host: str) -> HostMetrics:
         """Get or create host metrics."""
         if not host:
-            return HostMetrics(host="")
-        if host not in self.host_cache:
-            self.host_cache[host] = HostMetrics(host=host)
-        return self.host_cache[host]
+            return HostMetrics(host="", drops_by_reason=defaultdict(int))
+        h = self.host_cache.get(host)
+        if h is None:
+            if self.max_hosts is not None:
+                h = self._load_host(host)
+            if h is None:
+                h = HostMetrics(host=host, drops_by_reason=defaultdict(int))
+                self._dirty_hosts.add(host)
+            self.host_cache[host] = h
+            self._evict_hosts(keep=host)
+        elif self.max_hosts is not None:
+            # Keep insertion order as LRU order
+            self.host_cache[host] = self.host_cache.pop(host)
+        return h
     
     def record_query(self, dork: str):
         """Record a query execution."""
         m = self.get_dork_metrics(dork)
         m.queries_total += 1
         m.last_used = time.time()
+        self.mark_dork_dirty(dork)
     
     def record_serp_hits(self, dork: str, count: int):
         """Record SERP hits for a dork."""
         m = self.get_dork_metrics(dork)
         m.serp_hits += count
+        self.mark_dork_dirty(dork)
     
     def record_url_fetch(self, dork: str, host: str):
         """Record a URL fetch."""
         m = self.get_dork_metrics(dork)
         m.urls_fetched += 1
+        self._dirty_dorks.add(dork)
         
         h = self.get_host_metrics(host)
         h.hits_total += 1
+        if host:
+            self._dirty_hosts.add(host)
+        self._after_mutation()
     
     def record_lead_found(self, dork: str):
         """Record a lead found."""
         m = self.get_dork_metrics(dork)
         m.leads_found += 1
+        self.mark_dork_dirty(dork)
     
     def record_lead_kept(self, dork: str):
         """Record a lead kept after dropper."""
         m = self.get_dork_metrics(dork)
         m.leads_kept += 1
+        self.mark_dork_dirty(dork)
     
     def record_accepted_lead(self, dork: str):
         """Record a lead accepted (final)."""
         m = self.get_dork_metrics(dork)
         m.accepted_leads += 1
+        self.mark_dork_dirty(dork)
     
     def record_drop(self, host: str, reason: str):
         """Record a lead drop."""
         h = self.get_host_metrics(host)
-        h.drops_by_reason[reason] += 1
+        h.drops_by_reason[reason] = h.drops_by_reason.get(reason, 0) + 1
+        self.mark_host_dirty(host)
     
     def set_host_backoff(self, host: str, duration_seconds: int = 604800):
         """Set host backoff (default 7 days)."""
         h = self.get_host_metrics(host)
         h.backoff_until = time.time() + duration_seconds
+        self.mark_host_dirty(host)
+    
+    def extend_host_backoff(self, host: str, duration_seconds: int):
+        """Back off a host for at least duration_seconds; never shortens an existing backoff."""
+        h = self.get_host_metrics(host)
+        h.backoff_until = max(h.backoff_until or 0, time.time() + duration_seconds)
+        self.mark_host_dirty(host)
+    
+    def record_concurrency(self, snapshot: Dict[str, Any]):
+        """
+        Store a snapshot of the adaptive concurrency controller.
+        
+        Args:
+            snapshot: AdaptiveConcurrency.snapshot() result
+        """
+        self.concurrency_state = snapshot
+        now = time.time()
+        rows = [(
+            "*", snapshot.get("global_limit", 0), snapshot.get("global_in_flight", 0),
+            0.0, 0, 0, 0, now
+        )]
+        for host, info in snapshot.get("hosts", {}).items():
+            rows.append((
+                host, info.get("limit", 0), info.get("in_flight", 0), info.get("latency_ms", 0.0),
+                info.get("responses", 0), info.get("throttled", 0), info.get("errors", 0), now
+            ))
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT OR REPLACE INTO concurrency_state
+                    (scope, concurrency_limit, in_flight, latency_ms, responses, throttled, errors, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+        finally:
+            conn.close()
     
     def get_top_dorks(self, n: int = 10) -> List[DorkMetrics]:
         """Get top N dorks by score."""
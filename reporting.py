@@ -183,14 +183,22 @@ class ReportGenerator:
         selected_dorks: List[Dict],
         mode: str,
         log_file: str = "dork_selection_log.jsonl",
+        max_bytes: int = 5 * 1024 * 1024,
+        backups: int = 3,
     ):
         """
         Log selected dorks for this run.
         
+        The log is rotated like logging.RotatingFileHandler: once it would
+        exceed max_bytes it is renamed to log_file.1 (older files shift up,
+        at most `backups` are kept).
+        
         Args:
             selected_dorks: List of dork selection info
             mode: Current Wasserfall mode
             log_file: Path to log file (JSONL format)
+            max_bytes: Rotation threshold (0 = never rotate)
+            backups: Number of rotated files to keep
         """
         log_entry = {
             "timestamp": time.time(),
@@ -200,9 +208,26 @@ class ReportGenerator:
             "dorks": selected_dorks,
         }
         
+        line = json.dumps(log_entry, ensure_ascii=False) + '\n'
+        path = Path(log_file)
+        if max_bytes and path.exists() and path.stat().st_size + len(line.encode('utf-8')) > max_bytes:
+            self._rotate_log(path, backups)
+        
         # Append to JSONL file
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+    
+    @staticmethod
+    def _rotate_log(path: Path, backups: int):
+        """Shift log -> log.1 -> log.2 ...; drop the oldest beyond `backups`."""
+        if backups <= 0:
+            path.unlink()
+            return
+        for i in range(backups - 1, 0, -1):
+            src = path.with_name(f"{path.name}.{i}")
+            if src.exists():
+                src.replace(path.with_name(f"{path.name}.{i + 1}"))
+        path.replace(path.with_name(f"{path.name}.1"))
     
     def generate_dork_performance_summary(self) -> List[Dict]:
         """
@@ -34,12 +34,11 @@ import threading
 import time
 import traceback
 import urllib.parse
-import pandas
-import pandas as pd
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple, Union
-from flask import Response, render_template_string
+# Heavy, rarely needed modules (pandas, flask, pypdf, selenium) are imported
+# where they are used, so short runs and preview_command start quickly.
 
 # CRITICAL: Initialize Django BEFORE any other imports that use Django models
 # This must happen before importing any module that uses Django models (e.g., learning_engine)
@@ -61,7 +60,6 @@ import aiohttp
 import io
 from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
 from bs4.element import Comment
-from pypdf import PdfReader
 import re
 try:
     from ddgs import DDGS  # Neues Paket
@@ -84,7 +82,11 @@ except Exception:
     ClientConnectorError = ServerDisconnectedError = _NetErr
 from dotenv import load_dotenv
 from urllib.robotparser import RobotFileParser
-from stream2_extraction_layer.open_data_resolver import resolve_company_domain
+from stream2_extraction_layer.open_data_resolver import (
+    close_shared_session as close_company_domain_session,
+    get_shared_session as company_domain_session,
+    resolve_company_domain_async,
+)
 from stream2_extraction_layer.extraction_enhanced import (
     extract_name_enhanced,
     extract_role_with_context,
@@ -135,9 +137,10 @@ from phone_extractor import (
     get_best_phone,
     is_valid_phone as is_valid_phone_enhanced,
 )
-from browser_extractor import (
-    extract_phone_with_browser,
-)
+def extract_phone_with_browser(*args, **kwargs):
+    """Lazy wrapper: browser_extractor (selenium) is imported on first use."""
+    from browser_extractor import extract_phone_with_browser as _extract_phone_with_browser
+    return _extract_phone_with_browser(*args, **kwargs)
 from social_scraper import (
     SOCIAL_MEDIA_DORKS,
     SocialMediaScraper,
@@ -524,6 +527,7 @@ def export_xlsx(filename: str, rows=None):
     con.close()
     if not data:
         return
+    import pandas as pd
     df = pd.DataFrame(data, columns=data[0].keys())
     df.to_excel(filename, index=False)
 
@@ -1279,10 +1283,109 @@ def get_performance_params():
             # Unexpected error - log it but continue with fallback
             log("warn", "Failed to load performance params from Django DB", error=str(e))
     
+    # Values pushed by the ProcessManager at runtime win over the DB snapshot
+    params.update(_CONTROL_STATE["params"])
     return params
 
+# Hot-reload channel: the ProcessManager writes concurrency/delay changes to this
+# JSON file ({"version": n, "params": {...}}) instead of restarting the scraper
+SCRAPER_CONTROL_FILE = os.getenv("SCRAPER_CONTROL_FILE", "")
+_HOT_PARAMS = {"async_limit": int, "pool_size": int, "request_delay": float}
+_CONTROL_STATE: Dict[str, Any] = {"mtime": None, "version": 0, "params": {}}
+
+def poll_control_file(path: Optional[str] = None) -> bool:
+    """
+    Re-read the control file if it changed (one os.stat per call).
+
+    Returns:
+        True if new params were loaded
+    """
+    path = path if path is not None else SCRAPER_CONTROL_FILE
+    if not path:
+        return False
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+    if mtime == _CONTROL_STATE["mtime"]:
+        return False
+    _CONTROL_STATE["mtime"] = mtime
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        params = {
+            key: cast(value)
+            for key, value in (data.get("params") or {}).items()
+            if key in _HOT_PARAMS
+            for cast in (_HOT_PARAMS[key],)
+        }
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        log("warn", "Control-Datei nicht lesbar", path=path, error=str(e))
+        return False
+    if params == _CONTROL_STATE["params"]:
+        return False
+    _CONTROL_STATE["params"] = params
+    _CONTROL_STATE["version"] = int(data.get("version") or 0)
+    return True
+
 # -------------- Logging --------------
+try:
+    from luca_scraper.log_sink import LogSink
+    # Formatting and stdout/UI writes run batched on a background thread
+    LOG_SINK = LogSink.from_env(ui_queue=lambda: UILOGQ)
+except ImportError:
+    LOG_SINK = None
+
+try:
+    from luca_scraper.extraction.pdf_text import get_pdf_extractor
+except ImportError:
+    get_pdf_extractor = None
+
+try:
+    from luca_scraper.http.sitemaps import SitemapDiscovery
+except ImportError:
+    SitemapDiscovery = None
+
+try:
+    from luca_scraper.http.adaptive_concurrency import (
+        ADAPTIVE_CONCURRENCY,
+        AdaptiveConcurrency,
+        record_response,
+        set_active_controller,
+    )
+except ImportError:
+    ADAPTIVE_CONCURRENCY = False
+    AdaptiveConcurrency = None
+
+    def record_response(host, status, latency=None, retry_after=None):
+        return None
+
+try:
+    from luca_scraper.memory_guard import memory_admission_from_env
+except ImportError:
+    memory_admission_from_env = None
+
+try:
+    from luca_scraper.run_journal import (
+        RUN_JOURNAL_ENABLED,
+        RunJournal,
+        discard_unfinished,
+        load_resume_state,
+    )
+except ImportError:
+    RUN_JOURNAL_ENABLED = False
+    RunJournal = None
+
+    def load_resume_state(path=None):
+        return None
+
+    def discard_unfinished(path=None):
+        return 0
+
 def log(level:str, msg:str, **ctx):
+    if LOG_SINK is not None:
+        LOG_SINK.emit(level, msg, **ctx)
+        return
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     ctx_str = (" " + json.dumps(ctx, ensure_ascii=False)) if ctx else ""
     line = f"[{ts}] [{level.upper():7}] {msg}{ctx_str}"
@@ -2684,11 +2787,19 @@ async def http_get_async(url, headers=None, params=None, timeout=HTTP_TIMEOUT):
 
 
 async def fetch_response_async(url: str, headers=None, params=None, timeout=HTTP_TIMEOUT):
+    started = time.monotonic()
     r = await http_get_async(url, headers=headers, params=params, timeout=timeout)
     if r is None:
+        # Timeouts und Verbindungsfehler senken die adaptiven Limits
+        record_response(_host_from(url), -1, time.monotonic() - started)
         _LAST_STATUS[url] = -1
         return None
     status = getattr(r, "status_code", 0)
+    # RÃ¼ckmeldung fÃ¼r die adaptiven Limits (Latenz, 429/5xx, Retry-After)
+    record_response(
+        _host_from(url), status, time.monotonic() - started,
+        (getattr(r, "headers", None) or {}).get("Retry-After"),
+    )
     if status != 200:
         _LAST_STATUS[url] = status
         log("warn", "Nicht-200 beim Abruf â€“ skip", url=url, status=status)
@@ -2735,11 +2846,21 @@ async def fetch_with_login_check(url: str, headers=None, params=None, timeout=HT
     
     return r
 
-def check_robots_txt(url: str, rp: Optional[RobotFileParser] = None) -> bool:
-    return True
+try:
+    from luca_scraper.http.robots import (
+        check_robots_txt,
+        robots_allowed_async,
+        robots_crawl_delay,
+    )
+except ImportError:
+    def check_robots_txt(url: str, rp: Optional[RobotFileParser] = None) -> bool:
+        return True
 
-async def robots_allowed_async(url: str) -> bool:
-    return True
+    async def robots_allowed_async(url: str) -> bool:
+        return True
+
+    def robots_crawl_delay(host: str) -> float:
+        return 0.0
 
 # =========================
 # Suche (modular)
@@ -7702,15 +7823,20 @@ async def process_link_async(url: UrlLike, run_id: int, *, force: bool = False)
                         content_bytes = await resp.read()
                     except Exception:
                         content_bytes = b""
-                f = io.BytesIO(content_bytes)
-                reader = PdfReader(f)
-                text_content = ""
-                for page in reader.pages[:5]:
-                    try:
-                        text_content += (page.extract_text() or "") + "\n"
-                    except Exception:
-                        continue
-                html = text_content
+                if get_pdf_extractor is not None:
+                    # Parsed in a bounded worker pool, cached by content hash
+                    html = await get_pdf_extractor().extract(content_bytes)
+                else:
+                    from pypdf import PdfReader
+                    f = io.BytesIO(content_bytes)
+                    reader = PdfReader(f)
+                    text_content = ""
+                    for page in reader.pages[:5]:
+                        try:
+                            text_content += (page.extract_text() or "") + "\n"
+                        except Exception:
+                            continue
+                    html = text_content
             except Exception as e:
                 log("warn", "PDF parsing failed", url=url, error=str(e))
                 html = ""
@@ -8025,7 +8151,7 @@ async def process_link_async(url: UrlLike, run_id: int, *, force: bool = False)
             title_tag = soup.find('title') if soup else None
             comp_name = extract_company_name(title_tag.get_text() if title_tag else "")
             company_size = detect_company_size(text)
-            company_domain = resolve_company_domain(comp_name) if comp_name else ""
+            company_domain = (await resolve_company_domain_async(comp_name, session=company_domain_session())) if comp_name else ""
             industry = detect_industry(text)
             recency = detect_recency(html)
             hiring_volume = estimate_hiring_volume(text)
@@ -8310,7 +8436,7 @@ async def process_link_async(url: UrlLike, run_id: int, *, force: bool = False)
     title_tag = soup.find('title') if soup else None
     comp_name = extract_company_name(title_tag.get_text() if title_tag else "")
     company_size = detect_company_size(text)
-    company_domain = resolve_company_domain(comp_name) if comp_name else ""
+    company_domain = (await resolve_company_domain_async(comp_name, session=company_domain_session())) if comp_name else ""
     industry = detect_industry(text)
     recency = detect_recency(html)
     hiring_volume = estimate_hiring_volume(text)
@@ -8565,19 +8691,33 @@ def find_internal_links(html: str, base_url: str) -> List[str]:
         return []
 
 
-async def try_sitemaps_async(base: str) -> List[str]:
-    global _SITEMAP_FAILED_HOSTS
-    host = urllib.parse.urlparse(base).netloc.lower()
-    if host.startswith("www."):
-        host = host[4:]
-    SITEMAP_SKIP_HOSTS = {
-        "kleinanzeigen.de", "ebay-kleinanzeigen.de",
-        "t.me", "telegram.me", "facebook.com", "m.facebook.com",
-        "instagram.com", "www.instagram.com", "staseve.eu",
-        "locanto.at", "www.locanto.at", "twitter.com", "x.com"
-    }
-    if (not host) or host in SITEMAP_SKIP_HOSTS or host in _SITEMAP_FAILED_HOSTS:
-        return []
+async def _sitemap_fetch(url: str) -> Optional[bytes]:
+    r = await http_get_async(url, timeout=10)
+    if not r or r.status_code != 200:
+        return None
+    return getattr(r, "content", None) or (r.text or "").encode("utf-8")
+
+
+def _sitemap_url_ok(u: str) -> bool:
+    return (not is_denied(u)) and path_ok(u)
+
+
+_SITEMAP_DISCOVERY = None
+
+def _get_sitemap_discovery():
+    """Streaming Sitemap-Discovery mit verschachtelten Indexen und Host-Cache."""
+    global _SITEMAP_DISCOVERY
+    if _SITEMAP_DISCOVERY is None:
+        _SITEMAP_DISCOVERY = SitemapDiscovery(
+            _sitemap_fetch,
+            accept=_sitemap_url_ok,
+            max_fetches=int(os.getenv("SITEMAP_MAX_FETCHES", "8")),
+            max_urls=max(50, CFG.internal_depth_per_domain * 10),
+        )
+    return _SITEMAP_DISCOVERY
+
+
+async def _try_sitemaps_plain(base: str) -> List[str]:
     candidates = ["/sitemap.xml", "/sitemap_index.xml", "/sitemap-index.xml"]
     out: List[str] = []
     for c in candidates:
@@ -8602,6 +8742,26 @@ async def try_sitemaps_async(base: str) -> List[str]:
             out.append(u)
         if out:
             break
+    return out
+
+
+async def try_sitemaps_async(base: str) -> List[str]:
+    global _SITEMAP_FAILED_HOSTS
+    host = urllib.parse.urlparse(base).netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    SITEMAP_SKIP_HOSTS = {
+        "kleinanzeigen.de", "ebay-kleinanzeigen.de",
+        "t.me", "telegram.me", "facebook.com", "m.facebook.com",
+        "instagram.com", "www.instagram.com", "staseve.eu",
+        "locanto.at", "www.locanto.at", "twitter.com", "x.com"
+    }
+    if (not host) or host in SITEMAP_SKIP_HOSTS or host in _SITEMAP_FAILED_HOSTS:
+        return []
+    if SitemapDiscovery is not None:
+        out = await _get_sitemap_discovery().discover(base)
+    else:
+        out = await _try_sitemaps_plain(base)
     # Dedupe
     out = list(dict.fromkeys(out))
     if not out:
@@ -8956,30 +9116,103 @@ def append_xlsx(path: str, rows: List[Dict[str, Any]], fieldnames: List[str]):
 # =========================
 
 class _Rate:
-    def __init__(self, max_global:int=ASYNC_LIMIT, max_per_host:int=ASYNC_PER_HOST):
+    def __init__(self, max_global:int=ASYNC_LIMIT, max_per_host:int=ASYNC_PER_HOST, crawl_delay=robots_crawl_delay,
+                 adaptive:bool=ADAPTIVE_CONCURRENCY, memory=None):
         self.sem_global = asyncio.Semaphore(max(1, max_global))
         self.per_host: Dict[str, asyncio.Semaphore] = {}
         self.max_per_host = max(1, max_per_host)
         self.lock = asyncio.Lock()
+        # Crawl-delay aus robots.txt: Mindestabstand zwischen Starts pro Host
+        self.crawl_delay = crawl_delay
+        self.last_start: Dict[str, float] = {}
+        # AIMD-Limits (global + pro Host) statt fester Semaphoren, gespeist aus fetch_response_async
+        self.controller = None
+        if adaptive and AdaptiveConcurrency is not None:
+            self.controller = AdaptiveConcurrency(max(1, max_global), self.max_per_host)
+            set_active_controller(self.controller)
+        # Speicher-Backpressure: weniger parallele Fetch/Parse-Tasks, je näher der RSS am Budget liegt
+        self.memory = memory
+        if self.memory is None and memory_admission_from_env is not None:
+            max_slots = self.controller.global_limiter.aimd.maximum if self.controller else max_global
+            self.memory = memory_admission_from_env(int(max_slots), MAX_CONTENT_LENGTH)
 
     async def acquire(self, url:str):
         host = _host_from(url)
-        async with self.lock:
-            if host not in self.per_host:
-                self.per_host[host] = asyncio.Semaphore(self.max_per_host)
-        await self.sem_global.acquire()
-        await self.per_host[host].acquire()
+        # Host-Slot zuerst, damit Warten auf einen Host keinen globalen Slot blockiert
+        if self.controller is not None:
+            await self.controller.acquire_host(host)
+        else:
+            async with self.lock:
+                if host not in self.per_host:
+                    self.per_host[host] = asyncio.Semaphore(self.max_per_host)
+            await self.per_host[host].acquire()
+        delay = self.crawl_delay(host) if self.crawl_delay else 0.0
+        if delay > 0:
+            while True:
+                wait = self.last_start.get(host, 0.0) + delay - time.monotonic()
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+        self.last_start[host] = time.monotonic()
+        if self.controller is not None:
+            await self.controller.acquire_global()
+        else:
+            await self.sem_global.acquire()
+        # Zuletzt: den Speicher-Slot halten nur Tasks, die tatsächlich laden und parsen
+        if self.memory is not None:
+            try:
+                await self.memory.acquire()
+            except BaseException:
+                self._release_slots(host)
+                raise
         return host
 
     def release(self, host:str):
+        if self.memory is not None:
+            self.memory.release()
+        self._release_slots(host)
+
+    def _release_slots(self, host:str):
+        if self.controller is not None:
+            self.controller.release(host)
+            return
         try:
             self.sem_global.release()
             self.per_host.get(host, asyncio.Semaphore(1)).release()
         except Exception:
             pass
 
-async def _bounded_process(urls: List[UrlLike], run_id:int, *, rate:_Rate, force:bool=False):
-    """Prozessiert URLs mit globalem/per-Host-Limit. Liefert (links_checked, leads)."""
+    def set_global_limit(self, max_global:int) -> "_Rate":
+        """Neues konfiguriertes Limit Ã¼bernehmen; adaptive Limits behalten ihren Zustand."""
+        if self.controller is not None:
+            self.controller.set_global_limit(max_global)
+            if self.memory is not None:
+                self.memory.set_max_slots(int(self.controller.global_limiter.aimd.maximum))
+            return self
+        if self.memory is not None:
+            self.memory.set_max_slots(max_global)
+        return _Rate(max_global=max_global, max_per_host=self.max_per_host, crawl_delay=self.crawl_delay, adaptive=False,
+                     memory=self.memory)
+
+    def export_state(self):
+        """Zustand des Controllers in den MetricsStore schreiben (best effort)."""
+        if self.controller is None:
+            return None
+        try:
+            from metrics import get_metrics_store
+            return self.controller.export(get_metrics_store(os.getenv("METRICS_DB", "metrics.db")))
+        except Exception as e:
+            log("debug", "Concurrency-State Export fehlgeschlagen", error=str(e))
+            return None
+
+async def _bounded_process(urls: List[UrlLike], run_id:int, *, rate:_Rate, force:bool=False,
+                           journal=None, query: str = "", done_urls: Optional[set] = None):
+    """
+    Prozessiert URLs mit globalem/per-Host-Limit. Liefert (links_checked, leads).
+
+    Mit journal wird jede verarbeitete URL samt Leads ins Run-Journal geschrieben;
+    URLs in done_urls (aus einem fortgesetzten Lauf) werden übersprungen.
+    """
     links_checked = 0
     collected: List[Dict[str, Any]] = []
     SNIPPET_EMAIL_RE = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}", re.I)
@@ -9005,6 +9238,8 @@ async def _bounded_process(urls: List[UrlLike], run_id:int, *, rate:_Rate, force
             links_checked += int(inc)
             if items:
                 collected.extend(items)
+            if journal is not None:
+                journal.record_url(query, _normalize_for_dedupe(url), items)
         finally:
             rate.release(host)
 
@@ -9014,6 +9249,8 @@ async def _bounded_process(urls: List[UrlLike], run_id:int, *, rate:_Rate, force
         if not raw_url:
             continue
         norm_url = _normalize_for_dedupe(raw_url)
+        if done_urls and norm_url in done_urls:
+            continue
         candidates.append((entry, raw_url, norm_url))
 
     if not candidates:
@@ -9130,6 +9367,8 @@ async def _bounded_process(urls: List[UrlLike], run_id:int, *, rate:_Rate, force
         collected.extend(seed_leads)
     if snippet_leads:
         collected.extend(snippet_leads)
+    if journal is not None and (seed_leads or snippet_leads):
+        journal.record_url(query, "", seed_leads + snippet_leads)
     order_map = {u: i for i, u in enumerate(ordered)}
     candidates.sort(key=lambda tpl: order_map.get(tpl[2], len(order_map)))
 
@@ -9226,7 +9465,8 @@ def emergency_save(run_id, links_checked=None, leads_new_total=None):
 
 
 
-async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, force: bool = False, date_restrict: Optional[str] = None):
+async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, force: bool = False, date_restrict: Optional[str] = None,
+                                resume: bool = False):
     def _uilog(msg, **k):
         if ui_log:
             ui_log(msg)
@@ -9270,6 +9510,7 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
             con.close()
 
     # Get performance params (from env vars/defaults)
+    poll_control_file()
     perf_params = get_performance_params()
     current_async_limit = perf_params.get('async_limit', ASYNC_LIMIT)
     current_request_delay = perf_params.get('request_delay', SLEEP_BETWEEN_QUERIES)
@@ -9283,6 +9524,29 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
     _reset_metrics()
     _uilog(f"Run #{run_id} gestartet (Performance Mode: {perf_params.get('async_limit', 'N/A')} async)")
 
+    # Run-Journal: Frontier-Stand crash-sicher mitschreiben, bei --resume wiederherstellen
+    resume_state = load_resume_state() if resume else None
+    if resume and resume_state is None:
+        _uilog("Resume: Kein unterbrochener Lauf im Journal, starte regulär")
+    run_queries = resume_state.pending_queries if resume_state else list(QUERIES)
+    resume_done_urls = resume_state.done_urls if resume_state else None
+    journal = None
+    if RUN_JOURNAL_ENABLED and RunJournal is not None and not DRY_RUN:
+        try:
+            if resume_state:
+                journal = RunJournal.resume(resume_state, run_id=run_id)
+            else:
+                journal = RunJournal.start(run_id, run_queries, params={"force": force, "date_restrict": date_restrict})
+        except Exception as e:
+            log("warn", "Run-Journal nicht verfügbar", error=str(e))
+            journal = None
+    if resume_state:
+        _uilog(
+            f"Resume: Lauf #{resume_state.journal_id} fortgesetzt – {len(resume_state.done_queries)} Queries erledigt, "
+            f"{len(run_queries)} offen, {len(resume_state.done_urls)} URLs bereits verarbeitet"
+        )
+    stopped = False
+
     # Initialize active learning engine for dork tracking (if learning enabled)
     active_learning_engine = None
     if ACTIVE_MODE_CONFIG and ACTIVE_MODE_CONFIG.get("learning_enabled") and ActiveLearningEngine is not None:
@@ -9405,25 +9669,34 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
         _uilog("ðŸŽ¯ Talent-Hunt-Modus: Suche aktive Vertriebler Ã¼ber LinkedIn/Xing/Team-Seiten (keine Stellengesuche-Portale)")
 
     try:
-        for q in QUERIES:
-            # Periodically refresh performance params (every 30 seconds)
-            if time.time() - last_perf_check > 30:
+        for q in run_queries:
+            # Refresh performance params every 30 seconds, or at once when the
+            # ProcessManager pushed new values through the control file
+            control_changed = poll_control_file()
+            if control_changed or time.time() - last_perf_check > 30:
                 perf_params = get_performance_params()
                 new_async_limit = perf_params.get('async_limit', ASYNC_LIMIT)
                 current_request_delay = perf_params.get('request_delay', SLEEP_BETWEEN_QUERIES)
                 if new_async_limit != current_async_limit:
                     current_async_limit = new_async_limit
-                    rate = _Rate(max_global=current_async_limit, max_per_host=ASYNC_PER_HOST)
+                    rate = rate.set_global_limit(current_async_limit)
                     log("info", "Performance params updated", async_limit=current_async_limit, request_delay=current_request_delay)
+                if control_changed:
+                    log("info", "Konfiguration live übernommen", version=_CONTROL_STATE["version"], **_CONTROL_STATE["params"])
+                rate.export_state()
                 last_perf_check = time.time()
             
             if run_flag and not run_flag.get("running", True):
                 _uilog("STOP erkannt â€“ breche ab")
+                stopped = True
                 break
             # Import TTL config for query cache check
             from luca_scraper.config.defaults import QUERY_CACHE_TTL_HOURS
+
+            # Frontier of the query that was in flight when the previous run died
+            restored_links = resume_state.frontier.get(q) if resume_state else None
             
-            if (not force) and is_query_done(q, ttl_hours=QUERY_CACHE_TTL_HOURS):
+            if (not force) and restored_links is None and is_query_done(q, ttl_hours=QUERY_CACHE_TTL_HOURS):
                 log("info", "Query bereits erledigt (skip)", q=q, ttl_hours=QUERY_CACHE_TTL_HOURS)
                 await asyncio.sleep(current_request_delay)
                 continue
@@ -9433,63 +9706,71 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
             collected_rows = []
             links: List[UrlLike] = []
 
-            try:
-                g_links, had_429 = await google_cse_search_async(q, max_results=60, date_restrict=date_restrict)
-                links.extend(g_links)
-                had_429_flag |= had_429
-            except Exception as e:
-                log("error", "Google-Suche explodiert", q=q, error=str(e))
-
-            if had_429_flag or not links:
+            if restored_links is not None:
+                links = list(restored_links)
+                collected_rows.extend(resume_state.rows_for(q))
+                log("info", "Resume: Frontier aus Journal", q=q, links=len(links), leads=len(collected_rows))
+            else:
                 try:
-                    log("info", "Nutze DuckDuckGo (Fallback)...", q=q)
-                    ddg_links = await duckduckgo_search_async(q, max_results=30, date_restrict=date_restrict)
-                    links.extend(ddg_links)
+                    g_links, had_429 = await google_cse_search_async(q, max_results=60, date_restrict=date_restrict)
+                    links.extend(g_links)
+                    had_429_flag |= had_429
                 except Exception as e:
-                    log("error", "DuckDuckGo-Suche explodiert", q=q, error=str(e))
+                    log("error", "Google-Suche explodiert", q=q, error=str(e))
 
-            if had_429_flag or len(links) < 3:
-                try:
-                    log("info", "Nutze Perplexity (sonar)...", q=q)
-                    pplx_links = await search_perplexity_async(q)
-                    links.extend(pplx_links)
-                except Exception as e:
-                    log("error", "Perplexity-Suche explodiert", q=q, error=str(e))
+                if had_429_flag or not links:
+                    try:
+                        log("info", "Nutze DuckDuckGo (Fallback)...", q=q)
+                        ddg_links = await duckduckgo_search_async(q, max_results=30, date_restrict=date_restrict)
+                        links.extend(ddg_links)
+                    except Exception as e:
+                        log("error", "DuckDuckGo-Suche explodiert", q=q, error=str(e))
+
+                if had_429_flag or len(links) < 3:
+                    try:
+                        log("info", "Nutze Perplexity (sonar)...", q=q)
+                        pplx_links = await search_perplexity_async(q)
+                        links.extend(pplx_links)
+                    except Exception as e:
+                        log("error", "Perplexity-Suche explodiert", q=q, error=str(e))
+
+                if not links:
+                    try:
+                        ddg_links = await duckduckgo_search_async(q, max_results=30, date_restrict=date_restrict)
+                        links.extend(ddg_links)
+                    except Exception as e:
+                        log("error", "DuckDuckGo-Suche explodiert", q=q, error=str(e))
+
+                if not links:
+                    log("warn", "Alle Suchmaschinen erschÃ¶pft (Google, Perplexity, DDG). Mache eine lÃ¤ngere Pause.", q=q)
+                    await asyncio.sleep(current_request_delay + _jitter(1.5,2.5))
 
-            if not links:
                 try:
-                    ddg_links = await duckduckgo_search_async(q, max_results=30, date_restrict=date_restrict)
-                    links.extend(ddg_links)
+                    ka_links = await kleinanzeigen_search_async(q, max_results=KLEINANZEIGEN_MAX_RESULTS)
+                    if ka_links:
+                        links.extend(ka_links)
                 except Exception as e:
-                    log("error", "DuckDuckGo-Suche explodiert", q=q, error=str(e))
-
-            if not links:
-                log("warn", "Alle Suchmaschinen erschÃ¶pft (Google, Perplexity, DDG). Mache eine lÃ¤ngere Pause.", q=q)
-                await asyncio.sleep(current_request_delay + _jitter(1.5,2.5))
+                    log("warn", "Kleinanzeigen-Suche explodiert", q=q, error=str(e))
+
+                if links:
+                    uniq_links: List[UrlLike] = []
+                    seen_links = set()
+                    for item in links:
+                        raw_url = _extract_url(item)
+                        if not raw_url:
+                            continue
+                        nu = _normalize_for_dedupe(raw_url)
+                        if nu in seen_links:
+                            continue
+                        seen_links.add(nu)
+                        if isinstance(item, dict):
+                            uniq_links.append({**item, "url": nu})
+                        else:
+                            uniq_links.append(nu)
+                    links = uniq_links
 
-            try:
-                ka_links = await kleinanzeigen_search_async(q, max_results=KLEINANZEIGEN_MAX_RESULTS)
-                if ka_links:
-                    links.extend(ka_links)
-            except Exception as e:
-                log("warn", "Kleinanzeigen-Suche explodiert", q=q, error=str(e))
-
-            if links:
-                uniq_links: List[UrlLike] = []
-                seen_links = set()
-                for item in links:
-                    raw_url = _extract_url(item)
-                    if not raw_url:
-                        continue
-                    nu = _normalize_for_dedupe(raw_url)
-                    if nu in seen_links:
-                        continue
-                    seen_links.add(nu)
-                    if isinstance(item, dict):
-                        uniq_links.append({**item, "url": nu})
-                    else:
-                        uniq_links.append(nu)
-                links = uniq_links
+            if journal is not None and restored_links is None and links:
+                journal.record_frontier(q, links)
 
             if not links:
                 if had_429_flag:
@@ -9527,7 +9808,8 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
             if skipped_by_learning > 0:
                 log("info", "Learning: Domains gefiltert", skipped=skipped_by_learning)
 
-            chk, rows = await _bounded_process(prim, run_id, rate=rate, force=False)
+            chk, rows = await _bounded_process(prim, run_id, rate=rate, force=False,
+                                               journal=journal, query=q, done_urls=resume_done_urls)
             total_links_checked += chk
             collected_rows.extend(rows)
 
@@ -9560,7 +9842,8 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
                 uniq_pivots.sort(key=lambda tpl: order_map_p.get(tpl[0], len(order_map_p)))
                 pivot_batch = [it for _, it in uniq_pivots][:CFG.internal_depth_per_domain]
                 if pivot_batch:
-                    chk_p, rows_p = await _bounded_process(pivot_batch, run_id, rate=rate, force=False)
+                    chk_p, rows_p = await _bounded_process(pivot_batch, run_id, rate=rate, force=False,
+                                                           journal=journal, query=q, done_urls=resume_done_urls)
                     total_links_checked += chk_p
                     collected_rows.extend(rows_p)
 
@@ -9596,7 +9879,8 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
                             break
                 if internal:
                     internal = prioritize_urls(internal)
-                    chk2, rows2 = await _bounded_process(internal, run_id, rate=rate, force=False)
+                    chk2, rows2 = await _bounded_process(internal, run_id, rate=rate, force=False,
+                                                     journal=journal, query=q, done_urls=resume_done_urls)
                     total_links_checked += chk2
                     collected_rows.extend(rows2)
 
@@ -9726,6 +10010,9 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
                         except Exception as e:
                             log("debug", "Learning tracking failed", error=str(e))
 
+            if journal is not None:
+                journal.record_query_done(q)
+
             if _RETRY_URLS:
                 try:
                     await process_retry_urls(run_id, rate)
@@ -9734,7 +10021,16 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
 
             await asyncio.sleep(current_request_delay + _jitter(0.4,1.2))
 
+        concurrency_state = rate.export_state()
+        if concurrency_state:
+            log("info", "Adaptive Concurrency", global_limit=concurrency_state["global_limit"],
+                congestion_rate=concurrency_state["congestion_rate"], hosts=len(concurrency_state["hosts"]))
+        if rate.memory is not None and rate.memory.throttled:
+            log("info", "Memory-Admission", **rate.memory.snapshot())
         finish_run(run_id, total_links_checked, leads_new_total, "ok", metrics=dict(RUN_METRICS))
+        if journal is not None and not stopped:
+            # Alle Queries abgearbeitet: nichts mehr fortzusetzen
+            journal.finish()
         
         # Post-run learning analysis
         try:
@@ -9772,6 +10068,8 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
         raise
 
     finally:
+        if journal is not None:
+            journal.close()
         global _CLIENT_SECURE, _CLIENT_INSECURE
         for cl in (_CLIENT_SECURE,_CLIENT_INSECURE):
             if cl:
@@ -9779,6 +10077,8 @@ async def run_scrape_once_async(run_flag: Optional[dict] = None, ui_log=None, fo
                 except: pass
         _CLIENT_SECURE=None
         _CLIENT_INSECURE=None
+        try: await close_company_domain_session()
+        except Exception: pass
 
 
 
@@ -10078,10 +10378,37 @@ if __name__ == "__main__":
 
         if args.reset:
             a,b = reset_history()
+            discard_unfinished()
             log("info","Reset durchgefÃ¼hrt", queries_done=a, urls_seen=b)
 
+        # --resume gilt nur für den ersten Durchlauf (Loop-Modus startet danach regulär)
+        RESUME_PENDING = bool(getattr(args, "resume", False))
+
+        def _start_run(resume: bool = False):
+            RUN_FLAG["running"]=True
+            RUN_FLAG["force"]=bool(args.force)
+            asyncio.run(
+                run_scrape_once_async(
+                    RUN_FLAG,
+                    force=bool(args.force),
+                    date_restrict=(args.daterestrict or None),
+                    resume=resume
+                )
+            )
+
         def _run_cycle():
-            global QUERIES
+            global QUERIES, RESUME_PENDING
+            if RESUME_PENDING:
+                RESUME_PENDING = False
+                state = load_resume_state()
+                if state and state.queries:
+                    os.environ["INDUSTRY"] = getattr(args, "industry", "all")
+                    QUERIES = state.queries
+                    log("info", "Resume: Query-Set aus Run-Journal", run=state.journal_id,
+                        total=len(state.queries), open=len(state.pending_queries))
+                    _start_run(resume=True)
+                    return
+                log("info", "Resume: Kein unterbrochener Lauf im Journal")
             selected_industry = getattr(args, "industry", "all")
             # CRITICAL FIX: Set INDUSTRY env variable for _is_candidates_mode()
             os.environ["INDUSTRY"] = selected_industry
@@ -10143,15 +10470,7 @@ if __name__ == "__main__":
                         QUERIES = merged
                         log("info", "Smart Dorks hinzugefuegt", added=len(smart_extra), total=len(QUERIES))
 
-            RUN_FLAG["running"]=True
-            RUN_FLAG["force"]=bool(args.force)
-            asyncio.run(
-                run_scrape_once_async(
-                    RUN_FLAG,
-                    force=bool(args.force),
-                    date_restrict=(args.daterestrict or None)
-                )
-            )
+            _start_run()
 
         if args.ui:
             from flask import Flask
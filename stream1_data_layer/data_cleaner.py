@@ -1,9 +1,17 @@
 """
 Data-Cleaning-Funktionen für Leads: Junk-Filter, Telefon-Normalisierung,
 Deduplication und Validierung werden hier zentral gebündelt.
+
+Für große Exporte gibt es mit iter_clean_leads() eine streamende Variante,
+die alle Schritte in einem Durchlauf erledigt, sowie read_leads(),
+write_leads() und clean_leads_file() für CSV/JSONL.
 """
 
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import csv
+import json
+import os
 import re
 
 
@@ -94,6 +102,36 @@ def _normalize_name(name: str) -> str:
     return re.sub(r"\s+", " ", (name or "").strip().lower())
 
 
+def _dedup_entry(row: Dict[str, Any]) -> Tuple[str, str, Optional[str], Dict[str, Any]]:
+    """Dedup-Schlüssel, Grund, normalisierte Telefonnummer und normalisierte Kopie eines Leads."""
+    email_raw = row.get("email", "")
+    email_norm = email_raw.strip().lower() if isinstance(email_raw, str) else str(email_raw).strip().lower()
+    email_domain = email_norm.split("@", 1)[1].strip() if "@" in email_norm else ""
+    phone_norm = fix_phone_formatting(row.get("telefon"))
+    name_norm = _normalize_name(row.get("name", ""))
+
+    reason = "unknown"
+    if email_norm:
+        key = email_norm
+        reason = "email"
+    elif email_domain:
+        key = email_domain
+        reason = "domain"
+    else:
+        key_tuple = (name_norm, phone_norm or "")
+        key = "|".join(key_tuple)
+        reason = "name_phone" if any(key_tuple) else "phone"
+
+    new_row = dict(row)
+    if phone_norm is not None:
+        new_row["telefon"] = phone_norm
+    return key, reason, phone_norm, new_row
+
+
+def _has_phone(phone: Any) -> bool:
+    return bool(str(phone).strip()) if phone is not None else False
+
+
 def deduplicate_by_email_domain(
     rows: List[Dict[str, Any]],
     *,
@@ -106,27 +144,7 @@ def deduplicate_by_email_domain(
     reason_counts: Dict[str, int] = {}
 
     for row in rows:
-        email_raw = row.get("email", "")
-        email_norm = email_raw.strip().lower() if isinstance(email_raw, str) else str(email_raw).strip().lower()
-        email_domain = email_norm.split("@", 1)[1].strip() if "@" in email_norm else ""
-        phone_norm = fix_phone_formatting(row.get("telefon"))
-        name_norm = _normalize_name(row.get("name", ""))
-
-        reason = "unknown"
-        if email_norm:
-            key = email_norm
-            reason = "email"
-        elif email_domain:
-            key = email_domain
-            reason = "domain"
-        else:
-            key_tuple = (name_norm, phone_norm or "")
-            key = "|".join(key_tuple)
-            reason = "name_phone" if any(key_tuple) else "phone"
-
-        new_row = dict(row)
-        if phone_norm is not None:
-            new_row["telefon"] = phone_norm
+        key, reason, phone_norm, new_row = _dedup_entry(row)
 
         if key not in index_by_key:
             index_by_key[key] = len(dedup_rows)
@@ -135,9 +153,8 @@ def deduplicate_by_email_domain(
 
         existing_idx = index_by_key[key]
         existing_row = dedup_rows[existing_idx]
-        existing_phone = existing_row.get("telefon")
-        has_existing_phone = bool(str(existing_phone).strip()) if existing_phone is not None else False
-        has_new_phone = phone_norm is not None and bool(str(phone_norm).strip())
+        has_existing_phone = _has_phone(existing_row.get("telefon"))
+        has_new_phone = _has_phone(phone_norm)
 
         if has_new_phone and not has_existing_phone:
             dedup_rows[existing_idx] = new_row
@@ -181,41 +198,68 @@ def validate_lead(row: Dict[str, Any]) -> bool:
     return is_valid
 
 
-def validate_dataset(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
-    """Validiert künftig ein ganzes Dataset, behält gültige Leads und liefert Metriken zu Fehlerarten."""
-    valid_rows: List[Dict[str, Any]] = []
-    total = len(rows)
-    invalid_email = 0
-    invalid_phone = 0
-    missing_contact = 0
+def _new_validation_report() -> Dict[str, int]:
+    return {
+        "total": 0,
+        "valid": 0,
+        "invalid": 0,
+        "invalid_email": 0,
+        "invalid_phone": 0,
+        "missing_contact": 0,
+    }
 
-    for row in rows:
-        is_valid, has_valid_email, has_valid_phone = _validate_and_flags(row)
-        has_email_raw = bool((row.get("email") or "").strip())
-        has_phone_raw = bool(str(row.get("telefon") or "").strip())
 
-        if is_valid:
-            valid_rows.append(row)
-        else:
-            if has_email_raw and not has_valid_email:
-                invalid_email += 1
-            if has_phone_raw and not has_valid_phone:
-                invalid_phone += 1
-            if not has_email_raw and not has_phone_raw:
-                missing_contact += 1
+def _validate_counted(row: Dict[str, Any], report: Dict[str, Any]) -> bool:
+    """Validiert einen Lead (normalisiert in-place) und zählt das Ergebnis in report."""
+    is_valid, has_valid_email, has_valid_phone = _validate_and_flags(row)
+    has_email_raw = bool((row.get("email") or "").strip())
+    has_phone_raw = bool(str(row.get("telefon") or "").strip())
+
+    report["total"] += 1
+    if is_valid:
+        report["valid"] += 1
+        return True
+
+    report["invalid"] += 1
+    if has_email_raw and not has_valid_email:
+        report["invalid_email"] += 1
+    if has_phone_raw and not has_valid_phone:
+        report["invalid_phone"] += 1
+    if not has_email_raw and not has_phone_raw:
+        report["missing_contact"] += 1
+    return False
 
-    report = {
-        "total": total,
-        "valid": len(valid_rows),
-        "invalid": total - len(valid_rows),
-        "invalid_email": invalid_email,
-        "invalid_phone": invalid_phone,
-        "missing_contact": missing_contact,
-    }
 
+def validate_dataset(rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Validiert künftig ein ganzes Dataset, behält gültige Leads und liefert Metriken zu Fehlerarten."""
+    report = _new_validation_report()
+    valid_rows = [row for row in rows if _validate_counted(row, report)]
     return valid_rows, report
 
 
+def _passes_conf(row: Dict[str, Any], keys: Sequence[str], threshold: Optional[float]) -> bool:
+    if threshold is None:
+        return True
+    for k in keys:
+        if k in row:
+            try:
+                return float(row.get(k)) >= float(threshold)
+            except Exception:
+                continue
+    return True
+
+
+def _passes_confidence(
+    row: Dict[str, Any],
+    min_confidence_phone: Optional[float],
+    min_confidence_email: Optional[float],
+) -> bool:
+    return (
+        _passes_conf(row, ["phone_confidence", "confidence_phone"], min_confidence_phone)
+        and _passes_conf(row, ["email_confidence", "confidence_email"], min_confidence_email)
+    )
+
+
 def clean_and_validate_leads(
     raw_rows: List[Dict[str, Any]],
     verbose: bool = True,
@@ -226,24 +270,11 @@ def clean_and_validate_leads(
     """Kapselt den gesamten Reinigungs- und Validierungs-Flow für eine Raw-Lead-Liste, optional mit Logs."""
     stage1_rows, removed_junk = filter_junk_rows(raw_rows)
 
-    def _passes_conf(row: Dict[str, Any], keys: List[str], threshold: Optional[float]) -> bool:
-        if threshold is None:
-            return True
-        for k in keys:
-            if k in row:
-                try:
-                    return float(row.get(k)) >= float(threshold)
-                except Exception:
-                    continue
-        return True
-
     filtered_conf: List[Dict[str, Any]] = []
     for r in stage1_rows:
         if "telefon" in r:
             r["telefon"] = fix_phone_formatting(r.get("telefon"))
-        if not _passes_conf(r, ["phone_confidence", "confidence_phone"], min_confidence_phone):
-            continue
-        if not _passes_conf(r, ["email_confidence", "confidence_email"], min_confidence_email):
+        if not _passes_confidence(r, min_confidence_phone, min_confidence_email):
             continue
         filtered_conf.append(r)
 
@@ -260,3 +291,189 @@ def clean_and_validate_leads(
     }
 
     return final_rows, report
+
+
+# ---------------------------------------------------------------------------
+# Streaming-Pipeline
+# ---------------------------------------------------------------------------
+
+
+class _StreamingDeduplicator:
+    """
+    Dedup-Zustand für einen Stream, gleiche Regeln wie deduplicate_by_email_domain().
+
+    Ein Lead mit Telefonnummer ist final (er wird nie durch ein Duplikat ersetzt)
+    und wird sofort ausgegeben. Ein Lead ohne Telefonnummer wird zurückgehalten,
+    bis entweder ein Duplikat mit Telefonnummer ihn ersetzt, er aus dem
+    Dedup-Fenster fällt oder der Stream endet.
+
+    window=None merkt sich alle Schlüssel (exakt wie die Listen-Variante);
+    mit window werden nur die zuletzt gesehenen Schlüssel gehalten (LRU) und
+    Duplikate außerhalb des Fensters nicht mehr erkannt.
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        if window is not None and window < 1:
+            raise ValueError("dedup_window must be >= 1")
+        self.window = window
+        self.removed = 0
+        self.reasons: Dict[str, int] = {}
+        # key -> zurückgehaltener Lead, None wenn der Lead bereits ausgegeben wurde
+        self._kept: "OrderedDict[str, Optional[Dict[str, Any]]]" = OrderedDict()
+
+    def push(self, row: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Verarbeitet einen Lead; liefert die Leads, die dadurch final geworden sind."""
+        key, reason, phone_norm, new_row = _dedup_entry(row)
+        kept = self._kept
+
+        if key not in kept:
+            final: List[Dict[str, Any]] = []
+            if self.window is not None and len(kept) >= self.window:
+                _, evicted = kept.popitem(last=False)
+                if evicted is not None:
+                    final.append(evicted)
+            if _has_phone(new_row.get("telefon")):
+                kept[key] = None
+                final.append(new_row)
+            else:
+                kept[key] = new_row
+            return final
+
+        if self.window is not None:
+            kept.move_to_end(key)
+        self.removed += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+        if kept[key] is not None and _has_phone(phone_norm):
+            kept[key] = None
+            return [new_row]
+        return []
+
+    def drain(self) -> Iterator[Dict[str, Any]]:
+        """Gibt alle zurückgehaltenen Leads aus (Stream-Ende)."""
+        for row in self._kept.values():
+            if row is not None:
+                yield row
+        self._kept.clear()
+
+
+def iter_clean_leads(
+    raw_rows: Iterable[Dict[str, Any]],
+    report: Optional[Dict[str, Any]] = None,
+    *,
+    min_confidence_phone: Optional[float] = None,
+    min_confidence_email: Optional[float] = None,
+    dedup_window: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streamende Variante von clean_and_validate_leads().
+
+    Junk-Filter, Telefon-Normalisierung, Konfidenz-Filter, Deduplication und
+    Validierung laufen in einem Durchlauf; es wird keine Zwischenliste
+    aufgebaut. Gültige Leads werden ausgegeben, sobald sie final sind; Leads
+    ohne Telefonnummer können deshalb später erscheinen als in der
+    Listen-Variante (gleiche Leads, ggf. andere Reihenfolge).
+
+    Args:
+        raw_rows: beliebiges Iterable von Leads (z.B. read_leads())
+        report: optionales Dict, das mit denselben Kennzahlen wie bei
+            clean_and_validate_leads() befüllt wird (vollständig nach Ende des Streams)
+        dedup_window: max. gemerkte Dedup-Schlüssel (None = unbegrenzt, exakt)
+    """
+    if report is None:
+        report = {}
+    report.update(input_total=0, removed_junk=0, removed_duplicates=0, dedup_reasons={})
+    report.update(_new_validation_report())
+    dedup = _StreamingDeduplicator(dedup_window)
+
+    for r in raw_rows:
+        report["input_total"] += 1
+        if is_junk_row(r):
+            report["removed_junk"] += 1
+            continue
+        if "telefon" in r:
+            r["telefon"] = fix_phone_formatting(r.get("telefon"))
+        if not _passes_confidence(r, min_confidence_phone, min_confidence_email):
+            continue
+
+        final = dedup.push(r)
+        report["removed_duplicates"] = dedup.removed
+        for row in final:
+            if _validate_counted(row, report):
+                yield row
+
+    for row in dedup.drain():
+        if _validate_counted(row, report):
+            yield row
+    report["dedup_reasons"] = dict(dedup.reasons)
+
+
+def _file_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported lead file format: {path} (expected .csv or .jsonl)")
+
+
+def read_leads(path: str) -> Iterator[Dict[str, Any]]:
+    """Liest Leads zeilenweise aus einer CSV- oder JSONL-Datei."""
+    fmt = _file_format(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def write_leads(
+    rows: Iterable[Dict[str, Any]],
+    path: str,
+    fieldnames: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    Schreibt Leads zeilenweise als CSV oder JSONL; liefert die Anzahl geschriebener Zeilen.
+
+    Bei CSV ohne fieldnames bestimmen die Felder des ersten Leads die
+    Spalten; zusätzliche Felder späterer Leads werden ignoriert.
+    """
+    fmt = _file_format(path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "jsonl":
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+                count += 1
+            return count
+
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(fieldnames or row.keys()), extrasaction="ignore")
+                writer.writeheader()
+            writer.writerow(row)
+            count += 1
+        if writer is None and fieldnames:
+            csv.DictWriter(f, fieldnames=list(fieldnames)).writeheader()
+    return count
+
+
+def clean_leads_file(src: str, dst: str, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Bereinigt eine CSV/JSONL-Datei streamend nach dst (CSV/JSONL).
+
+    Der Speicherbedarf hängt nur vom Dedup-Zustand ab, nicht von der
+    Dateigröße. kwargs werden an iter_clean_leads() durchgereicht.
+    """
+    fieldnames = None
+    if _file_format(src) == "csv":
+        with open(src, "r", encoding="utf-8", newline="") as f:
+            fieldnames = next(csv.reader(f), None)
+
+    report: Dict[str, Any] = {}
+    write_leads(iter_clean_leads(read_leads(src), report, **kwargs), dst, fieldnames=fieldnames)
+    return report
@@ -1,13 +1,21 @@
+import copy
+import random
+import tracemalloc
+
 import pytest
 
 from stream1_data_layer.data_cleaner import (
     clean_and_validate_leads,
+    clean_leads_file,
     deduplicate_by_email_domain,
     filter_junk_rows,
     fix_phone_formatting,
+    iter_clean_leads,
+    read_leads,
     validate_dataset,
     validate_lead,
     is_junk_row,
+    write_leads,
 )
 
 
@@ -116,3 +124,113 @@ def test_min_confidence_filters():
 
 def test_validate_dataset_basic():
     pytest.skip("wird in späteren Tickets implementiert")
+
+
+# ---------------------------------------------------------------------------
+# Streaming-Pipeline
+# ---------------------------------------------------------------------------
+
+
+def _golden_rows(n=3000, seed=11):
+    rng = random.Random(seed)
+    phones = ["0151 23456789", "+49 (221) 9876543", "4.912345678e+09", "030-1234567", "123", "", "  ", None]
+    emails = [f"user{i}@firma{i % 40}.de" for i in range(400)] + ["foo@", "kein-email", "", None, " Info@Firma3.de "]
+    names = ["Max Mustermann", "Anna  Schmidt", "Impressum", "AB", "Team Vertrieb", "", "Jürgen Müller"]
+    rows = []
+    for i in range(n):
+        row = {
+            "id": str(i),
+            "name": rng.choice(names),
+            "rolle": rng.choice(["Vertrieb", "CEO", "Newsletter", ""]),
+            "email": rng.choice(emails),
+            "telefon": rng.choice(phones),
+        }
+        if rng.random() < 0.2:
+            row["phone_confidence"] = rng.choice([5, 50, 95, "n/a"])
+        if rng.random() < 0.1:
+            row["whatsapp_link"] = "https://wa.me/49151"
+        rows.append(row)
+    return rows
+
+
+def _by_id(rows):
+    return sorted(rows, key=lambda r: int(r["id"]))
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"min_confidence_phone": 20}, {"dedup_window": 10**6}])
+def test_iter_clean_leads_matches_list_pipeline(kwargs):
+    rows = _golden_rows()
+    list_kwargs = {k: v for k, v in kwargs.items() if k != "dedup_window"}
+    expected, expected_report = clean_and_validate_leads(copy.deepcopy(rows), verbose=False, **list_kwargs)
+
+    report = {}
+    streamed = list(iter_clean_leads(iter(copy.deepcopy(rows)), report, **kwargs))
+
+    assert _by_id(streamed) == _by_id(expected)
+    assert report == expected_report
+    assert expected_report["removed_duplicates"] > 0 and expected_report["removed_junk"] > 0
+
+
+def test_streaming_dedup_releases_phone_upgrades_in_order():
+    rows = [
+        {"id": "1", "name": "Ohne Telefon", "email": "dup@example.com", "telefon": ""},
+        {"id": "2", "name": "Mit Telefon", "email": "other@example.com", "telefon": "0176 12345678"},
+        {"id": "3", "name": "Upgrade", "email": "dup@example.com", "telefon": "0151 23456789"},
+    ]
+    out = iter_clean_leads(rows)
+    assert next(out)["id"] == "2"   # final sofort
+    assert next(out)["id"] == "3"   # ersetzt Lead 1, sobald das Duplikat mit Telefon kommt
+    assert list(out) == []
+
+
+def test_dedup_window_bounds_state():
+    rows = [{"id": str(i), "name": "X Y", "email": f"u{i % 50}@example.com", "telefon": "0176 12345678"}
+            for i in range(200)]
+    report = {}
+    out = list(iter_clean_leads(rows, report, dedup_window=10))
+    # 50 verschiedene Schlüssel rotieren durch ein Fenster von 10: nichts wird als Duplikat erkannt
+    assert len(out) == 200
+    assert report["removed_duplicates"] == 0
+
+    report = {}
+    out = list(iter_clean_leads(copy.deepcopy(rows), report, dedup_window=50))
+    assert len(out) == 50 and report["removed_duplicates"] == 150
+
+
+@pytest.mark.parametrize("src_ext,dst_ext", [(".csv", ".csv"), (".jsonl", ".jsonl"), (".csv", ".jsonl")])
+def test_clean_leads_file_roundtrip(tmp_path, src_ext, dst_ext):
+    rows = [{k: ("" if v is None else str(v)) for k, v in r.items() if k in ("id", "name", "rolle", "email", "telefon")}
+            for r in _golden_rows(1500, seed=3)]
+    src = str(tmp_path / f"in{src_ext}")
+    dst = str(tmp_path / f"out{dst_ext}")
+    assert write_leads(iter(rows), src) == len(rows)
+
+    report = clean_leads_file(src, dst)
+    expected, expected_report = clean_and_validate_leads(list(read_leads(src)), verbose=False)
+
+    assert report == expected_report
+    written = list(read_leads(dst))
+    if dst_ext == ".csv":  # CSV kennt kein None
+        expected = [{k: ("" if v is None else v) for k, v in r.items()} for r in expected]
+    assert _by_id(written) == _by_id(expected)
+
+
+def _synthetic(n):
+    for i in range(n):
+        yield {"id": str(i), "name": f"Lead Nummer{i}", "rolle": "Vertrieb",
+               "email": f"lead{i}@firma{i % 1000}.de", "telefon": f"0176 {10000000 + i}"}
+
+
+def test_streaming_memory_is_bounded():
+    n = 10_000
+    tracemalloc.start()
+    try:
+        clean_and_validate_leads(list(_synthetic(n)), verbose=False)
+        _, list_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        count = sum(1 for _ in iter_clean_leads(_synthetic(n), dedup_window=200))
+        _, stream_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert count == n
+    assert stream_peak < list_peak / 10
@@ -1,9 +1,65 @@
+"""
+Company domain resolution from open/free sources (no LinkedIn, no logins).
+
+Sources: Clearbit autocomplete, OpenCorporates, DuckDuckGo HTML.
+
+- resolve_company_domain(): blocking, sources one after another (legacy callers)
+- resolve_company_domain_async(): races all sources with a deadline and takes
+  the first valid answer; concurrent lookups of the same name share one request
+- resolve_company_domains(): batch resolution (deduplicated names)
+
+Async lookups share one aiohttp session per event loop (close it with
+close_shared_session()); like requests, sessions honour HTTP(S)_PROXY.
+
+Results are kept in a persistent name -> domain cache (SQLite), including
+negative results ("" = no source knows the company) with a shorter TTL.
+Each source has its own rate limit.
+
+Environment:
+- COMPANY_DOMAIN_CACHE: cache database (default: company_domains.db next to SCRAPER_DB)
+- COMPANY_DOMAIN_TTL_DAYS: TTL of resolved domains (default: 30)
+- COMPANY_DOMAIN_NEGATIVE_TTL_HOURS: TTL of negative results (default: 24)
+- COMPANY_DOMAIN_DEADLINE: seconds per async lookup (default: 8)
+"""
+
+import asyncio
+import os
 import re
+import sqlite3
+import threading
+import time
 import urllib.parse
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
+import aiohttp
 import requests
 
+COMPANY_DOMAIN_TTL_DAYS = float(os.getenv("COMPANY_DOMAIN_TTL_DAYS", "30"))
+COMPANY_DOMAIN_NEGATIVE_TTL_HOURS = float(os.getenv("COMPANY_DOMAIN_NEGATIVE_TTL_HOURS", "24"))
+COMPANY_DOMAIN_DEADLINE = float(os.getenv("COMPANY_DOMAIN_DEADLINE", "8"))
+
+USER_AGENT = "Mozilla/5.0 (compatible; OpenDataResolver/1.0)"
+
+# Source name -> endpoint (overridable, e.g. local stubs in tests)
+ENDPOINTS: Dict[str, str] = {
+    "clearbit": "https://autocomplete.clearbit.com/v1/companies/suggest",
+    "opencorporates": "https://api.opencorporates.com/companies/search",
+    "duckduckgo": "https://duckduckgo.com/html/",
+}
+
+# Source name -> (requests per second, concurrent requests)
+RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "clearbit": (5.0, 4),
+    "opencorporates": (1.0, 1),
+    "duckduckgo": (1.0, 2),
+}
+
+TIMEOUTS: Dict[str, float] = {
+    "clearbit": 5,
+    "opencorporates": 6,
+    "duckduckgo": 6,
+}
+
 
 def _clean_domain(dom: str) -> str:
     if not dom:
@@ -44,77 +100,414 @@ def _guess_domain_from_name(name: str) -> str:
     return ""
 
 
-def _from_clearbit(name: str) -> str:
-    try:
-        r = requests.get(
-            "https://autocomplete.clearbit.com/v1/companies/suggest",
-            params={"query": name},
-            timeout=5,
-        )
-        data = r.json()
-        if data and isinstance(data, list):
-            dom = _clean_domain(data[0].get("domain", ""))
+def _normalize_name(name: str) -> str:
+    """Cache key: case- and whitespace-insensitive company name."""
+    return re.sub(r"\s+", " ", (name or "").strip().lower()).strip(" .,;:-")
+
+
+# ----------------------------------------------------------------------
+# Source parsers (shared by the blocking and the async path)
+# ----------------------------------------------------------------------
+
+def _parse_clearbit(data: Any) -> str:
+    if data and isinstance(data, list):
+        return _clean_domain(data[0].get("domain", ""))
+    return ""
+
+
+def _parse_opencorporates(data: Any) -> str:
+    companies = (data or {}).get("results", {}).get("companies", [])
+    for entry in companies:
+        comp = entry.get("company") or {}
+        for key in ("website", "homepage_url", "url"):
+            dom = _domain_from_url(comp.get(key, ""))
             if dom:
                 return dom
-    except Exception:
-        return ""
+        dom_guess = _guess_domain_from_name(comp.get("name", ""))
+        if dom_guess:
+            return dom_guess
     return ""
 
 
-def _from_opencorporates(name: str) -> str:
-    try:
-        r = requests.get(
-            "https://api.opencorporates.com/companies/search",
-            params={"q": name},
-            timeout=6,
-        )
-        data = r.json() if r.ok else {}
-        companies = data.get("results", {}).get("companies", [])
-        for entry in companies:
-            comp = entry.get("company") or {}
-            for key in ("website", "homepage_url", "url"):
-                dom = _domain_from_url(comp.get(key, ""))
-                if dom:
-                    return dom
-            dom_guess = _guess_domain_from_name(comp.get("name", ""))
-            if dom_guess:
-                return dom_guess
-    except Exception:
+def _parse_duckduckgo(html: str) -> str:
+    m = re.search(r'href=\"[^\"]*?[?&]uddg=([^\"&]+)', html or "")
+    if not m:
         return ""
-    return ""
+    target = urllib.parse.unquote(m.group(1))
+    return _domain_from_url(target)
 
 
-def _from_duckduckgo(name: str) -> str:
+def _request_params(source: str, name: str) -> Dict[str, str]:
+    if source == "clearbit":
+        return {"query": name}
+    if source == "opencorporates":
+        return {"q": name}
+    return {"q": name, "kl": "de-de"}
+
+
+_PARSERS: Dict[str, Callable[[Any], str]] = {
+    "clearbit": _parse_clearbit,
+    "opencorporates": _parse_opencorporates,
+    "duckduckgo": _parse_duckduckgo,
+}
+
+
+# ----------------------------------------------------------------------
+# Persistent cache
+# ----------------------------------------------------------------------
+
+def _default_cache_path() -> str:
+    explicit = os.getenv("COMPANY_DOMAIN_CACHE")
+    if explicit:
+        return explicit
+    db_path = os.getenv("SCRAPER_DB", "scraper.db")
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "company_domains.db")
+
+
+class DomainCache:
+    """
+    Persistent name -> domain cache with negative entries.
+
+    An entry with domain "" means all sources answered without a result.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = COMPANY_DOMAIN_TTL_DAYS * 86400,
+        negative_ttl: float = COMPANY_DOMAIN_NEGATIVE_TTL_HOURS * 3600,
+    ):
+        self.path = path or _default_cache_path()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS company_domains ("
+                "name_key TEXT PRIMARY KEY, domain TEXT NOT NULL, resolved_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _fresh(self, domain: str, resolved_at: float) -> bool:
+        ttl = self.ttl if domain else self.negative_ttl
+        return time.time() - resolved_at < ttl
+
+    def get(self, name: str) -> Optional[str]:
+        """Cached domain ("" for a negative entry), or None if unknown/expired."""
+        key = _normalize_name(name)
+        if not key:
+            return None
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is None:
+                try:
+                    row = self._db().execute(
+                        "SELECT domain, resolved_at FROM company_domains WHERE name_key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is None:
+                    return None
+                hit = (row[0], row[1])
+                self._memory[key] = hit
+        return hit[0] if self._fresh(*hit) else None
+
+    def set(self, name: str, domain: str):
+        key = _normalize_name(name)
+        if not key:
+            return
+        entry = (domain or "", time.time())
+        with self._lock:
+            self._memory[key] = entry
+            try:
+                with self._db() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO company_domains (name_key, domain, resolved_at) VALUES (?, ?, ?)",
+                        (key, entry[0], entry[1]),
+                    )
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[DomainCache] = None
+
+
+def get_domain_cache() -> DomainCache:
+    global _cache
+    if _cache is None:
+        _cache = DomainCache()
+    return _cache
+
+
+# ----------------------------------------------------------------------
+# Blocking resolution
+# ----------------------------------------------------------------------
+
+def _fetch_source(source: str, name: str) -> Optional[str]:
+    """Query one source; None on transport/HTTP errors."""
     try:
         r = requests.get(
-            "https://duckduckgo.com/html/",
-            params={"q": name, "kl": "de-de"},
-            headers={"User-Agent": "Mozilla/5.0 (compatible; OpenDataResolver/1.0)"},
-            timeout=6,
+            ENDPOINTS[source],
+            params=_request_params(source, name),
+            headers={"User-Agent": USER_AGENT},
+            timeout=TIMEOUTS[source],
         )
-        if not r.ok:
+        if r.status_code == 404:
             return ""
-        html = r.text
-        m = re.search(r'href=\"[^\"?]*uddg=([^\"&]+)', html)
-        if not m:
-            return ""
-        target = urllib.parse.unquote(m.group(1))
-        dom = _domain_from_url(target)
-        return dom
+        if not r.ok:
+            return None
+        payload = r.text if source == "duckduckgo" else r.json()
+        return _PARSERS[source](payload)
     except Exception:
-        return ""
+        return None
+
+
+def _from_clearbit(name: str) -> str:
+    return _fetch_source("clearbit", name) or ""
+
+
+def _from_opencorporates(name: str) -> str:
+    return _fetch_source("opencorporates", name) or ""
+
+
+def _from_duckduckgo(name: str) -> str:
+    return _fetch_source("duckduckgo", name) or ""
 
 
 def resolve_company_domain(name: str) -> str:
     """
     Try to resolve a company domain from open/free sources (no LinkedIn, no logins).
-    Fast path: Clearbit autocomplete -> OpenCorporates -> DuckDuckGo HTML.
+    Fast path: cache -> Clearbit autocomplete -> OpenCorporates -> DuckDuckGo HTML.
     """
     if not name:
         return ""
 
-    for resolver in (_from_clearbit, _from_opencorporates, _from_duckduckgo):
-        dom = resolver(name)
+    cache = get_domain_cache()
+    cached = cache.get(name)
+    if cached is not None:
+        return cached
+
+    definitive = True
+    for source in ENDPOINTS:
+        dom = _fetch_source(source, name)
         if dom:
+            cache.set(name, dom)
             return dom
+        definitive = definitive and dom is not None
+    if definitive:
+        cache.set(name, "")
     return ""
+
+
+# ----------------------------------------------------------------------
+# Async resolution
+# ----------------------------------------------------------------------
+
+class _SourceLimiter:
+    """Per-source rate limit: min. spacing between requests plus a concurrency cap."""
+
+    def __init__(self, rate: float, concurrency: int):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.concurrency = max(1, concurrency)
+        self._next_start = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        await self._semaphore.acquire()
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        if start > now:
+            try:
+                await asyncio.sleep(start - now)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+_LIMITERS: Dict[str, _SourceLimiter] = {}
+_INFLIGHT: Dict[str, "asyncio.Future[str]"] = {}
+
+
+def _limiter(source: str) -> _SourceLimiter:
+    limiter = _LIMITERS.get(source)
+    if limiter is None:
+        limiter = _LIMITERS[source] = _SourceLimiter(*RATE_LIMITS.get(source, (1.0, 1)))
+    return limiter
+
+
+_SESSIONS: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def _new_session() -> aiohttp.ClientSession:
+    # trust_env: HTTP(S)_PROXY / NO_PROXY like the requests-based code path
+    return aiohttp.ClientSession(trust_env=True)
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """aiohttp session shared by all lookups on the running event loop."""
+    loop = asyncio.get_running_loop()
+    for other in [l for l in _SESSIONS if l.is_closed()]:
+        del _SESSIONS[other]
+    session = _SESSIONS.get(loop)
+    if session is None or session.closed:
+        session = _SESSIONS[loop] = _new_session()
+    return session
+
+
+async def close_shared_session():
+    """Close the shared session of the running event loop (e.g. at the end of a run)."""
+    session = _SESSIONS.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+async def _fetch_source_async(session, source: str, name: str) -> str:
+    """Query one source; raises on transport errors (so they are not cached as negative)."""
+    async with _limiter(source):
+        async with session.get(
+            ENDPOINTS[source],
+            params=_request_params(source, name),
+            headers={"User-Agent": USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=TIMEOUTS[source]),
+        ) as resp:
+            if resp.status == 404:
+                return ""
+            if resp.status >= 400:
+                raise RuntimeError(f"{source} HTTP {resp.status}")
+            if source == "duckduckgo":
+                payload = await resp.text()
+            else:
+                payload = await resp.json(content_type=None)
+    return _PARSERS[source](payload)
+
+
+async def _race_sources(session, name: str, deadline: float) -> Tuple[str, bool]:
+    """
+    Race all sources; first non-empty domain wins.
+
+    Returns:
+        (domain, definitive) - definitive is False if a source failed or the
+        deadline hit before every source answered
+    """
+    tasks = [asyncio.ensure_future(_fetch_source_async(session, source, name)) for source in ENDPOINTS]
+    definitive = True
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=deadline):
+            try:
+                dom = await next_done
+            except asyncio.TimeoutError:
+                return "", False
+            except Exception:
+                definitive = False
+                continue
+            if dom:
+                return dom, True
+        return "", definitive
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def resolve_company_domain_async(
+    name: str,
+    session=None,
+    deadline: float = COMPANY_DOMAIN_DEADLINE,
+    cache: Optional[DomainCache] = None,
+) -> str:
+    """
+    Resolve a company domain without blocking the event loop.
+
+    Args:
+        name: Company name
+        session: aiohttp.ClientSession to use (default: get_shared_session())
+        deadline: Max. seconds for the whole lookup
+        cache: DomainCache (default: shared persistent cache)
+
+    Returns:
+        Domain or "" (not found / deadline)
+    """
+    if not name:
+        return ""
+    cache = cache or get_domain_cache()
+    cached = cache.get(name)
+    if cached is not None:
+        return cached
+
+    key = _normalize_name(name)
+    pending = _INFLIGHT.get(key)
+    if pending is not None and not pending.done():
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    _INFLIGHT[key] = future
+    try:
+        dom, definitive = await _race_sources(session or get_shared_session(), name, deadline)
+        if dom or definitive:
+            cache.set(name, dom)
+        future.set_result(dom)
+        return dom
+    except BaseException as e:
+        future.set_result("")
+        if isinstance(e, Exception):
+            return ""
+        raise
+    finally:
+        if _INFLIGHT.get(key) is future:
+            del _INFLIGHT[key]
+
+
+async def resolve_company_domains(
+    names: Iterable[str],
+    deadline: float = COMPANY_DOMAIN_DEADLINE,
+    concurrency: int = 8,
+    cache: Optional[DomainCache] = None,
+) -> Dict[str, str]:
+    """
+    Resolve many company names at once (one lookup per distinct name).
+
+    Returns:
+        Dict name -> domain ("" if unresolved) for every given name
+    """
+    names = [n for n in names if n]
+    distinct: Dict[str, str] = {}
+    for n in names:
+        distinct.setdefault(_normalize_name(n), n)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    resolved: Dict[str, str] = {}
+
+    async with _new_session() as session:
+        async def _one(key: str, name: str):
+            async with semaphore:
+                resolved[key] = await resolve_company_domain_async(
+                    name, session=session, deadline=deadline, cache=cache
+                )
+
+        await asyncio.gather(*(_one(k, n) for k, n in distinct.items()))
+
+    return {n: resolved.get(_normalize_name(n), "") for n in names}
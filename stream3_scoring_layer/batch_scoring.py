@@ -0,0 +1,279 @@
+"""
+Spaltenbasiertes Batch-Scoring für stream3 (Nachbewertung großer Lead-Mengen).
+
+Statt compute_score_v2() Lead für Lead aufzurufen, werden die Merkmale aller
+Leads einmal in eine Integer-Matrix extrahiert; die Gewichte aus der
+Score-Konfiguration werden als Vektoroperationen angewendet, und die
+dynamische Schwelle (Median bzw. Q1+5) wird im selben Durchlauf aus den
+Score-Arrays berechnet.
+
+Die Ergebnisse sind identisch mit compute_score_v2() + apply_dynamic_threshold()
+(siehe tests/test_batch_scoring.py, Golden-Set).
+"""
+
+from __future__ import annotations
+
+import urllib.parse
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .scoring_enhanced import (
+    BONUS_INDUSTRIES,
+    DEFAULT_SCORE_CONFIG,
+    DYNAMIC_SCORING_SCALE,
+    FREE_MAILS,
+    GENERIC_MAILBOXES,
+    JOB_KEYWORDS,
+    PORTAL_DOMAINS,
+    SALES_KEYWORDS,
+    Lead,
+    ScoreConfig,
+)
+
+# Feature columns (weights applied in score_leads_batch)
+(
+    F_NO_PHONE,
+    F_EMAIL,
+    F_EMAIL_TIER,
+    F_PHONE,
+    F_MOBILE,
+    F_WHATSAPP,
+    F_SALES_HITS,
+    F_JOB_HITS,
+    F_INDUSTRY,
+    F_NRW,
+    F_FRESH,
+    F_PRIVATE_ADDRESS,
+    F_SOCIAL,
+    F_URL_PENALTY,
+) = range(14)
+N_FEATURES = 14
+
+
+def _is_portal(host: str) -> bool:
+    return bool(host) and any(host == d or host.endswith("." + d) for d in PORTAL_DOMAINS)
+
+
+@lru_cache(maxsize=65536)
+def _email_tier(domain: str, local: str) -> int:
+    # portal -15, generic -5, free +5, corporate +10
+    if _is_portal(domain):
+        return -15
+    if local in GENERIC_MAILBOXES:
+        return -5
+    if domain in FREE_MAILS:
+        return 5
+    if domain:
+        return 10
+    return 0
+
+
+@lru_cache(maxsize=65536)
+def _url_features(url_value: str) -> Tuple[bool, int]:
+    """(wa link in url, url penalty)"""
+    url_low = url_value.lower()
+    host = urllib.parse.urlparse(url_value).netloc.lower()
+    penalty = 0
+    if "jobs." in url_value or "/jobs" in url_value or "/karriere" in url_value:
+        penalty -= 15
+    if any(token in url_value for token in ("/datenschutz", "/privacy", "/agb", "/impressum")):
+        penalty -= 20
+    if _is_portal(host):
+        penalty -= 25
+    return ("wa.me" in url_low) or ("api.whatsapp.com" in url_low), penalty
+
+
+def extract_features(text: str, url: str, lead: Lead) -> List[int]:
+    """Merkmalsvektor eines Leads (Spalten F_*), wie von compute_score_v2 ausgewertet."""
+    email = (lead.get("email") or "").strip().lower()
+    telefon = (lead.get("telefon") or "").strip()
+    tags = (lead.get("tags") or "").lower()
+    whatsapp = (lead.get("whatsapp_link") or "").lower()
+    text_low = (text or "").lower()
+    url_wa, url_penalty = _url_features(url or "")
+
+    row = [0] * N_FEATURES
+    row[F_NO_PHONE] = 0 if telefon else 1
+    row[F_PHONE] = 1 if telefon else 0
+    if email:
+        row[F_EMAIL] = 1
+        local, _, domain = email.partition("@")
+        row[F_EMAIL_TIER] = _email_tier(domain, local)
+    row[F_MOBILE] = (lead.get("phone_type") or "").strip().lower() == "mobile"
+    row[F_WHATSAPP] = (
+        ("whatsapp" in tags)
+        or (whatsapp in {"1", "yes", "true"})
+        or ("wa.me" in text_low)
+        or url_wa
+    )
+    if text_low:
+        # "in" is cheaper than count() and most keywords never occur
+        row[F_SALES_HITS] = sum(text_low.count(k) for k in SALES_KEYWORDS if k in text_low)
+        row[F_JOB_HITS] = sum(text_low.count(k) for k in JOB_KEYWORDS if k in text_low)
+    row[F_INDUSTRY] = (lead.get("industry") or "").strip().lower() in BONUS_INDUSTRIES
+    row[F_NRW] = (lead.get("region") or "").strip().upper() == "NRW" or "nrw" in tags
+    row[F_FRESH] = (lead.get("recency_indicator") or "").lower() in {"aktuell", "sofort"}
+    row[F_PRIVATE_ADDRESS] = bool(lead.get("private_address"))
+    row[F_SOCIAL] = bool(lead.get("social_profile_url"))
+    row[F_URL_PENALTY] = url_penalty
+    return row
+
+
+def _dynamic_adjustments(leads: Sequence[Lead]) -> np.ndarray:
+    """Feedback-Anpassung je Lead, einmal pro (E-Mail, Branche, Region) berechnet."""
+    adjustments = np.zeros(len(leads), dtype=np.float64)
+    try:
+        from .feedback_loop import get_feedback_system
+        feedback_system = get_feedback_system()
+    except Exception:
+        return adjustments  # Fallback gracefully if feedback system not available
+    if not feedback_system.adjustments:
+        return adjustments
+
+    cache: Dict[Tuple[Any, Any, Any], float] = {}
+    for i, lead in enumerate(leads):
+        key = (lead.get("email", ""), lead.get("industry", ""), lead.get("region", ""))
+        value = cache.get(key)
+        if value is None:
+            try:
+                value = feedback_system.get_dynamic_score_adjustment(
+                    {"email": key[0], "industry": key[1], "region": key[2]}
+                ) * DYNAMIC_SCORING_SCALE
+            except Exception:
+                value = 0.0
+            cache[key] = value
+        adjustments[i] = value
+    return adjustments
+
+
+def score_leads_batch(
+    leads: Sequence[Lead],
+    config: Optional[ScoreConfig] = None,
+    use_dynamic_scoring: bool = True,
+) -> np.ndarray:
+    """
+    Scores (0–100) für alle Leads, identisch zu compute_score_v2().
+
+    Text und URL werden wie in score_and_filter_leads aus
+    fulltext/text bzw. quelle gelesen.
+
+    Returns:
+        int64-Array mit einem Score pro Lead
+    """
+    config = DEFAULT_SCORE_CONFIG if config is None else config
+    if not leads:
+        return np.zeros(0, dtype=np.int64)
+
+    features = np.array(
+        [
+            extract_features(lead.get("fulltext") or lead.get("text") or "", lead.get("quelle") or "", lead)
+            for lead in leads
+        ],
+        dtype=np.int64,
+    )
+
+    weights = np.zeros(N_FEATURES, dtype=np.int64)
+    weights[F_NO_PHONE] = -100
+    weights[F_EMAIL] = config["email_bonus"]
+    weights[F_EMAIL_TIER] = 1
+    weights[F_PHONE] = config["phone_bonus"]
+    weights[F_MOBILE] = config["mobile_bonus"]
+    weights[F_WHATSAPP] = config["whatsapp_bonus"]
+    weights[F_INDUSTRY] = config["industry_bonus"]
+    weights[F_NRW] = config["nrw_bonus"]
+    weights[F_FRESH] = config["fresh_bonus"]
+    weights[F_PRIVATE_ADDRESS] = config["private_address_bonus"]
+    weights[F_SOCIAL] = config["social_profile_bonus"]
+    weights[F_URL_PENALTY] = 1
+
+    scores = features @ weights
+
+    # Keyword hits are capped, not weighted linearly
+    sales_hits = features[:, F_SALES_HITS]
+    job_hits = features[:, F_JOB_HITS]
+    scores += np.where(sales_hits > 0, np.minimum(sales_hits * 3, config["sales_keywords_bonus"]), 0)
+    scores += np.where(job_hits > 0, np.minimum(job_hits * 2, config["jobseeker_bonus"]), 0)
+
+    result = scores.astype(np.float64)
+    if use_dynamic_scoring:
+        result += _dynamic_adjustments(leads)
+
+    # round() semantics: half to even, like Python's int(round(x))
+    return np.clip(np.rint(result), 0, 100).astype(np.int64)
+
+
+def dynamic_threshold_batch(scores: np.ndarray) -> Tuple[Any, str]:
+    """
+    Schwelle wie apply_dynamic_threshold(): Median für n<8, sonst Q1+5.
+
+    Returns:
+        (threshold, removed_reason)
+    """
+    if scores.size == 0:
+        return 0, ""
+    clipped = np.clip(scores, 0, 100)
+    if int(clipped.sum()) == 0:
+        return 0, ""
+
+    data = np.sort(clipped)
+    n = int(data.size)
+    if n < 8:
+        mid = n // 2
+        threshold = int(data[mid]) if n % 2 else (int(data[mid - 1]) + int(data[mid])) / 2
+    else:
+        # statistics.quantiles(n=4, method="exclusive"), first cut point
+        m = n + 1
+        j = m // 4
+        delta = m - j * 4
+        q1 = (int(data[j - 1]) * (4 - delta) + int(data[j]) * delta) / 4
+        threshold = int(round(q1 + 5))
+    return max(0, min(100, threshold)), "below_dynamic"
+
+
+def score_and_threshold_batch(
+    leads: Sequence[Lead],
+    min_floor: int = 0,
+    config: Optional[ScoreConfig] = None,
+    use_dynamic_scoring: bool = True,
+) -> Tuple[List[Lead], List[Lead], Dict[str, Any]]:
+    """
+    Scort alle Leads (setzt lead["score"]) und filtert in einem Durchlauf.
+
+    Returns:
+        (eligible, filtered, threshold_info) – threshold_info wie apply_dynamic_threshold()
+    """
+    scores = score_leads_batch(leads, config=config, use_dynamic_scoring=use_dynamic_scoring)
+    for lead, score in zip(leads, scores.tolist()):
+        lead["score"] = score
+
+    eligible_mask = scores >= min_floor
+    eligible_scores = scores[eligible_mask]
+    eligible = [lead for lead, ok in zip(leads, eligible_mask.tolist()) if ok]
+    if not eligible:
+        return [], [], {}
+
+    threshold, removed_reason = dynamic_threshold_batch(eligible_scores)
+    passed_mask = eligible_scores >= threshold
+    filtered = [lead for lead, ok in zip(eligible, passed_mask.tolist()) if ok]
+
+    total = len(eligible)
+    passed = len(filtered)
+    removed = total - passed
+    info = {
+        "threshold": threshold,
+        "passed": passed,
+        "removed": removed,
+        "pass_rate": f"{(passed / total * 100.0):.1f}%",
+        "removed_reason": removed_reason if removed > 0 else "",
+    }
+    return eligible, filtered, info
+
+
+__all__ = [
+    "extract_features",
+    "score_leads_batch",
+    "dynamic_threshold_batch",
+    "score_and_threshold_batch",
+]
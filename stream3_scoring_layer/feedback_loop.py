@@ -11,9 +11,14 @@ Dieses Modul implementiert:
 
 from __future__ import annotations
 
+import atexit
+import os
 import sqlite3
 import json
 import statistics
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
@@ -53,6 +58,22 @@ class QualityMetrics:
         return asdict(self)
 
 
+def _hour(ts: float) -> int:
+    """Stunden-Bucket (Epoch // 3600) eines Unix-Timestamps."""
+    return int(ts // 3600)
+
+
+def _sql_timestamp(ts: float) -> str:
+    """UTC-Zeitstempel im Format von SQLite CURRENT_TIMESTAMP."""
+    return datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _close_at_exit(ref):
+    system = ref()
+    if system is not None:
+        system.close()
+
+
 class FeedbackLoopSystem:
     """
     System für Feedback-Sammlung und dynamisches Scoring.
@@ -62,16 +83,46 @@ class FeedbackLoopSystem:
     - Berechnet Qualitäts-Metriken
     - Passt Scoring-Parameter dynamisch an
     - Identifiziert Muster in erfolgreichen/erfolglosen Leads
+    
+    Scoring-Anpassungen, Qualitäts-Muster und stündlich aggregierte Metriken
+    liegen im Speicher und sind die Quelle für alle Lesezugriffe. Feedback
+    wirkt sofort; geschrieben wird gebündelt im Hintergrund (write-behind)
+    über eine einzige, langlebige Verbindung. flush() erzwingt das Schreiben,
+    close() schreibt den Rest und beendet den Writer.
     """
     
+    # Gepufferte Änderungen, ab denen der Writer geweckt wird / max. Sekunden zwischen Schreibvorgängen
+    FLUSH_EVERY = int(os.getenv("FEEDBACK_FLUSH_EVERY", "100"))
+    FLUSH_INTERVAL = float(os.getenv("FEEDBACK_FLUSH_INTERVAL", "2"))
+    # Tage, für die Metriken im Speicher vorgehalten werden (ältere Abfragen: SQL)
+    METRICS_RETENTION_DAYS = int(os.getenv("FEEDBACK_METRICS_DAYS", "90"))
+    
     def __init__(self, db_path: str = "scraper.db"):
         self.db_path = db_path
+        self._lock = threading.RLock()     # In-Memory-Zustand und Queue
+        self._db_lock = threading.Lock()   # Verbindung, serialisiert Flushes
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            db_path, timeout=30, check_same_thread=False
+        )
         self._init_feedback_tables()
+        
+        # Write-behind-Queue
+        self._pending_inserts: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._pending_adjustments: Dict[str, str] = {}        # key -> last_updated
+        self._pending_patterns: Dict[Tuple[str, str], str] = {}  # (type, data) -> last_seen
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        
         self._load_scoring_adjustments()
+        self._load_quality_patterns()
+        self._load_metric_buckets()
+        atexit.register(_close_at_exit, weakref.ref(self))
     
     def _init_feedback_tables(self):
         """Initialisiert Datenbank-Tabellen für Feedback-System."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._db_lock:
+            conn = self._conn
             # Lead Feedback
             conn.execute('''CREATE TABLE IF NOT EXISTS lead_feedback (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -123,22 +174,191 @@ class FeedbackLoopSystem:
     
     def _load_scoring_adjustments(self):
         """Lädt gelernte Scoring-Anpassungen beim Start."""
+        # Vollständige Tabelle (Basis für gleitende Durchschnitte) ...
+        self._adjustment_rows: Dict[str, List[float]] = {}  # key -> [value, confidence, sample_size]
+        # ... und die beim Scoring gelesene Sicht (Start: nur confidence >= 0.6)
         self.adjustments = {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('''
-                    SELECT adjustment_key, adjustment_value, confidence 
-                    FROM scoring_adjustments 
-                    WHERE confidence >= 0.6
-                ''')
-                for row in cursor.fetchall():
-                    self.adjustments[row[0]] = {
-                        'value': row[1],
-                        'confidence': row[2]
+            with self._db_lock:
+                rows = self._conn.execute('''
+                    SELECT adjustment_key, adjustment_value, confidence, sample_size
+                    FROM scoring_adjustments
+                ''').fetchall()
+            for key, value, confidence, sample_size in rows:
+                self._adjustment_rows[key] = [value, confidence, sample_size or 0]
+                if confidence is not None and confidence >= 0.6:
+                    self.adjustments[key] = {
+                        'value': value,
+                        'confidence': confidence
                     }
         except Exception as e:
             logger.warning(f"Could not load scoring adjustments: {e}")
     
+    def _load_quality_patterns(self):
+        """Lädt Qualitäts-Muster in den Speicher."""
+        # (pattern_type, pattern_json) -> [id, success_count, failure_count]
+        self._patterns: Dict[Tuple[str, str], List[Any]] = {}
+        try:
+            with self._db_lock:
+                rows = self._conn.execute('''
+                    SELECT id, pattern_type, pattern_data, success_count, failure_count
+                    FROM quality_patterns
+                    ORDER BY id
+                ''').fetchall()
+            for pattern_id, pattern_type, pattern_json, success_count, failure_count in rows:
+                self._patterns.setdefault(
+                    (pattern_type, pattern_json),
+                    [pattern_id, success_count or 0, failure_count or 0],
+                )
+        except Exception as e:
+            logger.warning(f"Could not load quality patterns: {e}")
+    
+    def _load_metric_buckets(self):
+        """Aggregiert Feedback und Extraktions-Genauigkeit stündlich (letzte METRICS_RETENTION_DAYS)."""
+        # Stunde (Epoch // 3600) -> [count, sum_rating, positive, conversions]
+        self._feedback_buckets: Dict[int, List[float]] = defaultdict(lambda: [0, 0.0, 0, 0])
+        # Stunde -> field_name -> [count, correct]
+        self._accuracy_buckets: Dict[int, Dict[str, List[int]]] = defaultdict(dict)
+        self._oldest_hour = _hour(time.time()) - self.METRICS_RETENTION_DAYS * 24
+        window = (self.METRICS_RETENTION_DAYS,)
+        try:
+            with self._db_lock:
+                feedback_rows = self._conn.execute('''
+                    SELECT CAST(strftime('%s', timestamp) AS INTEGER) / 3600 AS hour,
+                           COUNT(*), SUM(rating),
+                           SUM(CASE WHEN rating >= 0.7 THEN 1 ELSE 0 END),
+                           SUM(CASE WHEN feedback_type = 'conversion' AND rating >= 0.7 THEN 1 ELSE 0 END)
+                    FROM lead_feedback
+                    WHERE timestamp > datetime('now', '-' || ? || ' days')
+                    GROUP BY hour
+                ''', window).fetchall()
+                accuracy_rows = self._conn.execute('''
+                    SELECT CAST(strftime('%s', timestamp) AS INTEGER) / 3600 AS hour,
+                           field_name, COUNT(*), SUM(is_correct)
+                    FROM extraction_accuracy
+                    WHERE timestamp > datetime('now', '-' || ? || ' days')
+                    GROUP BY hour, field_name
+                ''', window).fetchall()
+            for hour, count, rating_sum, positive, conversions in feedback_rows:
+                if hour is not None:
+                    self._feedback_buckets[hour] = [count, rating_sum or 0.0, positive or 0, conversions or 0]
+            for hour, field_name, count, correct in accuracy_rows:
+                if hour is not None:
+                    self._accuracy_buckets[hour][field_name] = [count, correct or 0]
+        except Exception as e:
+            logger.warning(f"Could not load quality metrics: {e}")
+    
+    # ==================== WRITE-BEHIND ====================
+    
+    def _enqueue(self):
+        """Nach jeder Änderung (unter self._lock): Writer starten bzw. wecken."""
+        pending = len(self._pending_inserts) + len(self._pending_adjustments) + len(self._pending_patterns)
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="feedback-writer", daemon=True
+            )
+            self._writer.start()
+        if pending >= self.FLUSH_EVERY:
+            self._wake.set()
+    
+    def _writer_loop(self):
+        while not self._closed:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            if not self._closed:
+                self.flush()
+    
+    def flush(self) -> bool:
+        """
+        Schreibt alle gepufferten Änderungen in einer Transaktion.
+        
+        Returns:
+            True bei Erfolg (bei Fehlern bleiben die Änderungen gepuffert)
+        """
+        with self._db_lock:
+            if self._conn is None:
+                return False
+            with self._lock:
+                inserts, self._pending_inserts = self._pending_inserts, []
+                adjustment_keys, self._pending_adjustments = self._pending_adjustments, {}
+                pattern_keys, self._pending_patterns = self._pending_patterns, {}
+                adjustments = [
+                    (key, *self._adjustment_rows[key], ts) for key, ts in adjustment_keys.items()
+                ]
+                patterns = [
+                    (key, list(self._patterns[key]), ts) for key, ts in pattern_keys.items()
+                ]
+            if not (inserts or adjustments or patterns):
+                return True
+            
+            try:
+                with self._conn:
+                    by_sql: Dict[str, List[Tuple[Any, ...]]] = {}
+                    for sql, params in inserts:
+                        by_sql.setdefault(sql, []).append(params)
+                    for sql, rows in by_sql.items():
+                        self._conn.executemany(sql, rows)
+                    
+                    if adjustments:
+                        self._conn.executemany('''
+                            INSERT INTO scoring_adjustments
+                            (adjustment_key, adjustment_value, confidence, sample_size, last_updated)
+                            VALUES (?, ?, ?, ?, ?)
+                            ON CONFLICT(adjustment_key) DO UPDATE SET
+                                adjustment_value = excluded.adjustment_value,
+                                confidence = excluded.confidence,
+                                sample_size = excluded.sample_size,
+                                last_updated = excluded.last_updated
+                        ''', adjustments)
+                    
+                    new_ids = []
+                    for (pattern_type, pattern_json), (pattern_id, success, failure), ts in patterns:
+                        total = success + failure
+                        success_rate = success / total if total > 0 else 0.0
+                        if pattern_id is None:
+                            cursor = self._conn.execute('''
+                                INSERT INTO quality_patterns
+                                (pattern_type, pattern_data, success_count, failure_count,
+                                 success_rate, discovered_at, last_seen)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                            ''', (pattern_type, pattern_json, success, failure, success_rate, ts, ts))
+                            new_ids.append(((pattern_type, pattern_json), cursor.lastrowid))
+                        else:
+                            self._conn.execute('''
+                                UPDATE quality_patterns
+                                SET success_count = ?,
+                                    failure_count = ?,
+                                    success_rate = ?,
+                                    last_seen = ?
+                                WHERE id = ?
+                            ''', (success, failure, success_rate, ts, pattern_id))
+            except Exception as e:
+                logger.error(f"Error persisting feedback ({len(inserts)} rows): {e}")
+                with self._lock:
+                    self._pending_inserts[:0] = inserts
+                    for key, ts in adjustment_keys.items():
+                        self._pending_adjustments.setdefault(key, ts)
+                    for key, ts in pattern_keys.items():
+                        self._pending_patterns.setdefault(key, ts)
+                return False
+            
+            with self._lock:
+                for key, pattern_id in new_ids:
+                    self._patterns[key][0] = pattern_id
+            return True
+    
+    def close(self):
+        """Schreibt gepufferte Änderungen und schließt die Verbindung."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
     # ==================== FEEDBACK COLLECTION ====================
     
     def record_feedback(self, feedback: FeedbackEntry) -> bool:
@@ -147,31 +367,40 @@ class FeedbackLoopSystem:
         
         Args:
             feedback: FeedbackEntry-Objekt
-            
+        
         Returns:
             True bei Erfolg
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                metadata_json = json.dumps(feedback.metadata) if feedback.metadata else None
-                conn.execute('''
-                    INSERT INTO lead_feedback 
-                    (lead_id, feedback_type, rating, user_id, notes, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?)
+            metadata_json = json.dumps(feedback.metadata) if feedback.metadata else None
+            now = time.time()
+            is_positive = feedback.rating >= 0.7
+            with self._lock:
+                self._pending_inserts.append(('''
+                    INSERT INTO lead_feedback
+                    (lead_id, feedback_type, rating, user_id, notes, metadata, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     feedback.lead_id,
                     feedback.feedback_type,
                     feedback.rating,
                     feedback.user_id,
                     feedback.notes,
-                    metadata_json
-                ))
-                conn.commit()
-            
-            # Aktualisiere Scoring-Adjustments basierend auf neuem Feedback
-            self._update_scoring_adjustments(feedback)
+                    metadata_json,
+                    _sql_timestamp(now),
+                )))
+                
+                bucket = self._feedback_buckets[_hour(now)]
+                bucket[0] += 1
+                bucket[1] += feedback.rating
+                bucket[2] += is_positive
+                bucket[3] += is_positive and feedback.feedback_type == 'conversion'
+                
+                # Aktualisiere Scoring-Adjustments basierend auf neuem Feedback
+                self._update_scoring_adjustments(feedback)
+                self._enqueue()
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error recording feedback: {e}")
             return False
@@ -193,20 +422,25 @@ class FeedbackLoopSystem:
             extracted: Extrahierter Wert
             correct: Korrekter Wert (User-korrigiert)
             confidence: Konfidenz der Extraktion
-            
+        
         Returns:
             True bei Erfolg
         """
         is_correct = 1 if extracted == correct else 0
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
+            now = time.time()
+            with self._lock:
+                self._pending_inserts.append(('''
                     INSERT INTO extraction_accuracy
-                    (lead_id, field_name, extracted_value, correct_value, is_correct, confidence)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (lead_id, field_name, extracted, correct, is_correct, confidence))
-                conn.commit()
+                    (lead_id, field_name, extracted_value, correct_value, is_correct, confidence, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (lead_id, field_name, extracted, correct, is_correct, confidence, _sql_timestamp(now))))
+                
+                counts = self._accuracy_buckets[_hour(now)].setdefault(field_name, [0, 0])
+                counts[0] += 1
+                counts[1] += is_correct
+                self._enqueue()
             return True
         except Exception as e:
             logger.error(f"Error recording extraction accuracy: {e}")
@@ -214,23 +448,74 @@ class FeedbackLoopSystem:
     
     # ==================== QUALITY METRICS ====================
     
+    def _first_hour(self, days: int) -> Optional[int]:
+        """Erste Stunde des Zeitfensters, None wenn es über die Vorhaltezeit hinausgeht."""
+        first = _hour(time.time() - days * 86400)
+        if first < self._oldest_hour:
+            return None
+        # Alte Buckets verwerfen, sobald sie aus der Vorhaltezeit fallen
+        oldest = _hour(time.time()) - self.METRICS_RETENTION_DAYS * 24
+        if oldest > self._oldest_hour:
+            with self._lock:
+                for buckets in (self._feedback_buckets, self._accuracy_buckets):
+                    for hour in [h for h in buckets if h < oldest]:
+                        del buckets[hour]
+                self._oldest_hour = oldest
+        return first
+    
     def get_quality_metrics(self, days: int = 7) -> QualityMetrics:
         """
         Berechnet Qualitäts-Metriken für einen Zeitraum.
         
+        Liest die stündlichen Aggregate im Speicher (auf die Stunde genau);
+        nur Zeiträume über METRICS_RETENTION_DAYS hinaus werden per SQL berechnet.
+        
         Args:
             days: Anzahl Tage zurück
-            
+        
         Returns:
             QualityMetrics-Objekt
         """
+        first = self._first_hour(days)
+        if first is None:
+            return self._query_quality_metrics(days)
+        
+        metrics = QualityMetrics()
+        count = rating_sum = positive = conversions = 0
+        checked = correct = 0
+        with self._lock:
+            for hour, bucket in self._feedback_buckets.items():
+                if hour >= first:
+                    count += bucket[0]
+                    rating_sum += bucket[1]
+                    positive += bucket[2]
+                    conversions += bucket[3]
+            for hour, fields in self._accuracy_buckets.items():
+                if hour >= first:
+                    for field_count, field_correct in fields.values():
+                        checked += field_count
+                        correct += field_correct
+        
+        if count > 0:
+            metrics.avg_rating = rating_sum / count
+            metrics.total_feedback = count
+            metrics.positive_rate = positive / count
+        metrics.conversion_rate = conversions / max(1, metrics.total_feedback)
+        if checked > 0:
+            metrics.extraction_accuracy = correct / checked
+        return metrics
+    
+    def _query_quality_metrics(self, days: int) -> QualityMetrics:
+        """Qualitäts-Metriken per SQL (Zeiträume außerhalb der In-Memory-Aggregate)."""
         metrics = QualityMetrics()
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            self.flush()
+            with self._db_lock:
+                conn = self._conn
                 # Overall feedback metrics
                 cursor = conn.execute('''
-                    SELECT AVG(rating), COUNT(*), 
+                    SELECT AVG(rating), COUNT(*),
                            SUM(CASE WHEN rating >= 0.7 THEN 1 ELSE 0 END)
                     FROM lead_feedback
                     WHERE timestamp > datetime('now', '-' || ? || ' days')
@@ -244,9 +529,9 @@ class FeedbackLoopSystem:
                 
                 # Conversion rate
                 cursor = conn.execute('''
-                    SELECT COUNT(*) 
+                    SELECT COUNT(*)
                     FROM lead_feedback
-                    WHERE feedback_type = 'conversion' 
+                    WHERE feedback_type = 'conversion'
                       AND rating >= 0.7
                       AND timestamp > datetime('now', '-' || ? || ' days')
                 ''', (days,))
@@ -255,7 +540,7 @@ class FeedbackLoopSystem:
                 
                 # Extraction accuracy
                 cursor = conn.execute('''
-                    SELECT AVG(is_correct) 
+                    SELECT AVG(is_correct)
                     FROM extraction_accuracy
                     WHERE timestamp > datetime('now', '-' || ? || ' days')
                 ''', (days,))
@@ -275,13 +560,28 @@ class FeedbackLoopSystem:
         Args:
             field_name: Name des Feldes (email, phone, name)
             days: Anzahl Tage zurück
-            
+        
         Returns:
             Genauigkeit (0.0 - 1.0)
         """
+        first = self._first_hour(days)
+        if first is None:
+            return self._query_field_accuracy(field_name, days)
+        
+        checked = correct = 0
+        with self._lock:
+            for hour, fields in self._accuracy_buckets.items():
+                counts = fields.get(field_name)
+                if counts and hour >= first:
+                    checked += counts[0]
+                    correct += counts[1]
+        return correct / checked if checked else 0.0
+    
+    def _query_field_accuracy(self, field_name: str, days: int) -> float:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('''
+            self.flush()
+            with self._db_lock:
+                cursor = self._conn.execute('''
                     SELECT AVG(is_correct), COUNT(*)
                     FROM extraction_accuracy
                     WHERE field_name = ?
@@ -332,47 +632,27 @@ class FeedbackLoopSystem:
                 self._update_adjustment(key, adjustment, feedback.rating)
     
     def _update_adjustment(self, key: str, adjustment: float, confidence: float):
-        """Aktualisiert eine einzelne Scoring-Anpassung."""
+        """Aktualisiert eine einzelne Scoring-Anpassung (sofort im Speicher, persistiert verzögert)."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                # Hole existierenden Wert
-                cursor = conn.execute('''
-                    SELECT adjustment_value, sample_size 
-                    FROM scoring_adjustments 
-                    WHERE adjustment_key = ?
-                ''', (key,))
-                row = cursor.fetchone()
-                
+            with self._lock:
+                row = self._adjustment_rows.get(key)
                 if row:
                     # Aktualisiere mit gleitendem Durchschnitt
-                    old_value, sample_size = row
+                    old_value, _, sample_size = row
                     new_sample_size = sample_size + 1
                     new_value = (old_value * sample_size + adjustment) / new_sample_size
                     new_confidence = min(1.0, confidence * (new_sample_size / 10))
-                    
-                    conn.execute('''
-                        UPDATE scoring_adjustments
-                        SET adjustment_value = ?,
-                            confidence = ?,
-                            sample_size = ?,
-                            last_updated = datetime('now')
-                        WHERE adjustment_key = ?
-                    ''', (new_value, new_confidence, new_sample_size, key))
                 else:
                     # Erstelle neuen Eintrag
-                    conn.execute('''
-                        INSERT INTO scoring_adjustments
-                        (adjustment_key, adjustment_value, confidence, sample_size)
-                        VALUES (?, ?, ?, 1)
-                    ''', (key, adjustment, confidence * 0.3))
-                
-                conn.commit()
+                    new_value, new_confidence, new_sample_size = adjustment, confidence * 0.3, 1
                 
-                # Update in-memory cache
+                self._adjustment_rows[key] = [new_value, new_confidence, new_sample_size]
                 self.adjustments[key] = {
-                    'value': adjustment if not row else new_value,
-                    'confidence': confidence * 0.3 if not row else new_confidence
+                    'value': new_value,
+                    'confidence': new_confidence
                 }
+                self._pending_adjustments[key] = _sql_timestamp(time.time())
+                self._enqueue()
         
         except Exception as e:
             logger.error(f"Error updating adjustment for {key}: {e}")
@@ -383,7 +663,7 @@ class FeedbackLoopSystem:
         
         Args:
             lead: Lead-Dictionary mit Features
-            
+        
         Returns:
             Score-Anpassung (kann positiv oder negativ sein)
         """
@@ -433,46 +713,19 @@ class FeedbackLoopSystem:
             was_successful: Ob Lead erfolgreich war
         """
         pattern_json = json.dumps(pattern_data, sort_keys=True)
+        key = (pattern_type, pattern_json)
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('''
-                    SELECT id, success_count, failure_count 
-                    FROM quality_patterns
-                    WHERE pattern_type = ? AND pattern_data = ?
-                ''', (pattern_type, pattern_json))
-                row = cursor.fetchone()
-                
-                if row:
-                    pattern_id, success_count, failure_count = row
-                    if was_successful:
-                        success_count += 1
-                    else:
-                        failure_count += 1
-                    
-                    total = success_count + failure_count
-                    success_rate = success_count / total if total > 0 else 0.0
-                    
-                    conn.execute('''
-                        UPDATE quality_patterns
-                        SET success_count = ?,
-                            failure_count = ?,
-                            success_rate = ?,
-                            last_seen = datetime('now')
-                        WHERE id = ?
-                    ''', (success_count, failure_count, success_rate, pattern_id))
+            with self._lock:
+                entry = self._patterns.get(key)
+                if entry is None:
+                    entry = self._patterns[key] = [None, 0, 0]  # id wird beim Flush vergeben
+                if was_successful:
+                    entry[1] += 1
                 else:
-                    success_count = 1 if was_successful else 0
-                    failure_count = 0 if was_successful else 1
-                    success_rate = 1.0 if was_successful else 0.0
-                    
-                    conn.execute('''
-                        INSERT INTO quality_patterns
-                        (pattern_type, pattern_data, success_count, failure_count, success_rate)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (pattern_type, pattern_json, success_count, failure_count, success_rate))
-                
-                conn.commit()
+                    entry[2] += 1
+                self._pending_patterns[key] = _sql_timestamp(time.time())
+                self._enqueue()
         except Exception as e:
             logger.error(f"Error recording quality pattern: {e}")
     
@@ -489,32 +742,25 @@ class FeedbackLoopSystem:
             pattern_type: Art des Musters
             min_samples: Mindest-Anzahl an Samples
             limit: Max. Anzahl Ergebnisse
-            
+        
         Returns:
             Liste von (pattern_data, success_rate) Tupeln
         """
-        patterns = []
-        
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute('''
-                    SELECT pattern_data, success_rate
-                    FROM quality_patterns
-                    WHERE pattern_type = ?
-                      AND (success_count + failure_count) >= ?
-                    ORDER BY success_rate DESC, success_count DESC
-                    LIMIT ?
-                ''', (pattern_type, min_samples, limit))
-                
-                for row in cursor.fetchall():
-                    try:
-                        pattern_data = json.loads(row[0])
-                        patterns.append((pattern_data, row[1]))
-                    except json.JSONDecodeError:
-                        continue
-        except Exception as e:
-            logger.error(f"Error getting best patterns: {e}")
+        candidates = []
+        with self._lock:
+            for (p_type, pattern_json), (_, success, failure) in self._patterns.items():
+                total = success + failure
+                if p_type == pattern_type and total >= min_samples:
+                    success_rate = success / total if total > 0 else 0.0
+                    candidates.append((success_rate, success, pattern_json))
+        candidates.sort(key=lambda c: (c[0], c[1]), reverse=True)
         
+        patterns = []
+        for success_rate, _, pattern_json in candidates[:limit]:
+            try:
+                patterns.append((json.loads(pattern_json), success_rate))
+            except json.JSONDecodeError:
+                continue
         return patterns
     
     # ==================== REPORTING ====================
@@ -565,6 +811,8 @@ def get_feedback_system(db_path: str = "scraper.db") -> FeedbackLoopSystem:
     """Gibt Singleton-Instanz des Feedback-Systems zurück."""
     global _feedback_system
     if _feedback_system is None or _feedback_system.db_path != db_path:
+        if _feedback_system is not None:
+            _feedback_system.close()
         _feedback_system = FeedbackLoopSystem(db_path)
     return _feedback_system
 
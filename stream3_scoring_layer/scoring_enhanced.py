@@ -10,6 +10,9 @@ from .quality_metrics import track_quality_metrics
 Lead = Dict[str, Any]
 ScoreConfig = Dict[str, int]
 
+# From this many leads on, score_and_filter_leads uses the columnar batch scorer
+BATCH_SCORING_MIN_LEADS = 256
+
 DEFAULT_SCORE_CONFIG: ScoreConfig = {
     "email_bonus": 30,
     "corporate_email_bonus": 10,
@@ -59,6 +62,22 @@ PORTAL_DOMAINS = {
     "linkedin.com",
     "xing.com",
 }
+SALES_KEYWORDS: Tuple[str, ...] = (
+    "vertrieb", "sales", "verkauf", "telesales", "callcenter", "call center",
+    "outbound", "d2d", "door to door", "haustür", "haustuer",
+)
+# Expanded job seeker keywords to match CANDIDATE_POSITIVE_SIGNALS from scriptname.py
+JOB_KEYWORDS: Tuple[str, ...] = (
+    "jobsuche", "stellensuche", "arbeitslos", "bewerbung", "lebenslauf", "cv",
+    "suche job", "suche arbeit", "suche stelle", "suche neuen job", "suche neue stelle",
+    "ich suche", "stellengesuch", "auf jobsuche", "offen für angebote", "offen für neue",
+    "suche neue herausforderung", "suche neuen wirkungskreis", "verfügbar ab", "freigestellt",
+    "open to work", "#opentowork", "looking for opportunities", "seeking new",
+    "gekündigt", "wechselwillig", "bin auf der suche", "suche eine neue",
+)
+BONUS_INDUSTRIES = frozenset({"versicherung", "energie", "telekom", "bau", "ecommerce", "household"})
+# Max adjustment points from the feedback loop (adjustments are -1.0 to +1.0)
+DYNAMIC_SCORING_SCALE = 20
 
 
 @dataclass
@@ -148,37 +167,15 @@ def compute_score_v2(
     if has_wa:
         score += config["whatsapp_bonus"]
 
-    sales_keywords = [
-        "vertrieb",
-        "sales",
-        "verkauf",
-        "telesales",
-        "callcenter",
-        "call center",
-        "outbound",
-        "d2d",
-        "door to door",
-        "haustür",
-        "haustuer",
-    ]
-    sales_hits = sum(text_low.count(k) for k in sales_keywords)
+    sales_hits = sum(text_low.count(k) for k in SALES_KEYWORDS)
     if sales_hits > 0:
         score += min(sales_hits * 3, config["sales_keywords_bonus"])
 
-    # Expanded job seeker keywords to match CANDIDATE_POSITIVE_SIGNALS from scriptname.py
-    job_keywords = [
-        "jobsuche", "stellensuche", "arbeitslos", "bewerbung", "lebenslauf", "cv",
-        "suche job", "suche arbeit", "suche stelle", "suche neuen job", "suche neue stelle",
-        "ich suche", "stellengesuch", "auf jobsuche", "offen für angebote", "offen für neue",
-        "suche neue herausforderung", "suche neuen wirkungskreis", "verfügbar ab", "freigestellt",
-        "open to work", "#opentowork", "looking for opportunities", "seeking new",
-        "gekündigt", "wechselwillig", "bin auf der suche", "suche eine neue",
-    ]
-    job_hits = sum(text_low.count(k) for k in job_keywords)
+    job_hits = sum(text_low.count(k) for k in JOB_KEYWORDS)
     if job_hits > 0:
         score += min(job_hits * 2, config["jobseeker_bonus"])
 
-    if industry in {"versicherung", "energie", "telekom", "bau", "ecommerce", "household"}:
+    if industry in BONUS_INDUSTRIES:
         score += config["industry_bonus"]
 
     if region == "NRW" or "nrw" in tags:
@@ -209,8 +206,6 @@ def compute_score_v2(
             feedback_system = get_feedback_system()
             dynamic_adjustment = feedback_system.get_dynamic_score_adjustment(lead)
             # Scale adjustment to 0-100 range
-            # Adjustments are typically -1.0 to +1.0, scaled to ±20 points max
-            DYNAMIC_SCORING_SCALE = 20  # Max adjustment points from feedback
             score += dynamic_adjustment * DYNAMIC_SCORING_SCALE
         except Exception:
             pass  # Fallback gracefully if feedback system not available
@@ -273,12 +268,16 @@ def score_and_filter_leads(
     *,
     base_min_score: Optional[int] = None,
     verbose: bool = False,
+    batch: Optional[bool] = None,
 ) -> Tuple[List[Lead], ScoreSummary]:
     """
     Komplette Scoring-Pipeline:
     1. compute_score_v2() für alle Leads
     2. apply_dynamic_threshold() mit optionaler Untergrenze base_min_score
     3. Quality-Metriken loggen (wird in S4 verdrahtet)
+
+    Schritte 1 und 2 laufen ab BATCH_SCORING_MIN_LEADS Leads (oder mit
+    batch=True) spaltenbasiert in batch_scoring – mit identischem Ergebnis.
     """
     all_leads = list(leads or [])
     if not all_leads:
@@ -287,13 +286,24 @@ def score_and_filter_leads(
 
     min_floor = 0 if base_min_score is None else int(base_min_score)
 
-    for lead in all_leads:
-        text = lead.get("fulltext") or lead.get("text") or ""
-        url = lead.get("quelle") or ""
-        score = compute_score_v2(text, url, lead)
-        lead["score"] = score
+    batch_result = None
+    if batch or (batch is None and len(all_leads) >= BATCH_SCORING_MIN_LEADS):
+        try:
+            from .batch_scoring import score_and_threshold_batch
+            batch_result = score_and_threshold_batch(all_leads, min_floor=min_floor)
+        except ImportError:
+            batch_result = None  # numpy not available
+
+    if batch_result is not None:
+        eligible, filtered, thresh_info = batch_result
+    else:
+        for lead in all_leads:
+            text = lead.get("fulltext") or lead.get("text") or ""
+            url = lead.get("quelle") or ""
+            score = compute_score_v2(text, url, lead)
+            lead["score"] = score
 
-    eligible = [l for l in all_leads if int(l.get("score", 0)) >= min_floor]
+        eligible = [l for l in all_leads if int(l.get("score", 0)) >= min_floor]
 
     if not eligible:
         summary = ScoreSummary(
@@ -306,7 +316,8 @@ def score_and_filter_leads(
         )
         return [], summary
 
-    filtered, thresh_info = apply_dynamic_threshold(eligible, percentile=0.25)
+    if batch_result is None:
+        filtered, thresh_info = apply_dynamic_threshold(eligible, percentile=0.25)
 
     metrics: Dict[str, Any] = {}
     try:
@@ -3,13 +3,12 @@ Context processors for app_settings app.
 Makes settings and tracking codes available in all templates.
 """
 
+from django.utils.functional import SimpleLazyObject
+
 from .models import SystemSettings
 
 
-def tracking_codes(request):
-    """
-    Add tracking codes to template context if analytics is enabled.
-    """
+def _load_tracking_codes():
     try:
         settings = SystemSettings.get_settings()
         
@@ -30,3 +29,17 @@ def tracking_codes(request):
         'meta_pixel_id': '',
         'custom_tracking_code': '',
     }
+
+
+def tracking_codes(request):
+    """
+    Add tracking codes to template context if analytics is enabled.
+    
+    Values are lazy and share one (cached) settings lookup, which only
+    happens when a template actually uses one of them.
+    """
+    codes = SimpleLazyObject(_load_tracking_codes)
+    return {
+        key: SimpleLazyObject(lambda key=key: codes[key])
+        for key in ('analytics_enabled', 'google_analytics_id', 'meta_pixel_id', 'custom_tracking_code')
+    }
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
@@ -55,6 +56,11 @@ class UserPreferences(models.Model):
         return f"Einstellungen für {self.user.username}"
 
 
+SYSTEM_SETTINGS_CACHE_KEY = 'app_settings:system_settings'
+# Other workers with a process-local cache see changes after at most this long
+SYSTEM_SETTINGS_CACHE_TIMEOUT = 300
+
+
 class SystemSettings(models.Model):
     """
     Global system-wide settings (singleton)
@@ -162,10 +168,23 @@ class SystemSettings(models.Model):
         """
         self.pk = 1  # Singleton pattern
         super().save(*args, **kwargs)
+        cache.delete(SYSTEM_SETTINGS_CACHE_KEY)
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        cache.delete(SYSTEM_SETTINGS_CACHE_KEY)
+        return result
     
     @classmethod
-    def get_settings(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
+    def get_settings(cls, cached=True):
+        """
+        Return the singleton, from the cache unless cached=False.
+        Views that edit and save the settings should load them uncached.
+        """
+        obj = cache.get(SYSTEM_SETTINGS_CACHE_KEY) if cached else None
+        if obj is None:
+            obj, _ = cls.objects.get_or_create(pk=1)
+            cache.set(SYSTEM_SETTINGS_CACHE_KEY, obj, SYSTEM_SETTINGS_CACHE_TIMEOUT)
         return obj
     
     def __str__(self):
@@ -1,8 +1,11 @@
 """Tests for app_settings"""
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase, Client, RequestFactory
 from django.contrib.auth.models import User, Group
 from django.urls import reverse
 from django.utils import timezone
+from .context_processors import tracking_codes
 from .models import UserPreferences, SystemSettings, PageView, AnalyticsEvent
 
 
@@ -35,6 +38,9 @@ class UserPreferencesModelTest(TestCase):
 class SystemSettingsModelTest(TestCase):
     """Test SystemSettings model"""
     
+    def setUp(self):
+        cache.clear()
+    
     def test_system_settings_singleton(self):
         """Test that SystemSettings is a singleton"""
         settings1 = SystemSettings.get_settings()
@@ -57,6 +63,7 @@ class SettingsViewsTest(TestCase):
     """Test settings views"""
     
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username='testuser', password='testpass')
         self.admin_user = User.objects.create_user(username='admin', password='adminpass')
@@ -212,6 +219,9 @@ class AnalyticsModelTest(TestCase):
 class SystemSettingsAnalyticsTest(TestCase):
     """Test SystemSettings analytics fields"""
     
+    def setUp(self):
+        cache.clear()
+    
     def test_analytics_defaults(self):
         """Test default analytics settings"""
         settings = SystemSettings.get_settings()
@@ -317,6 +327,7 @@ class ContextProcessorTest(TestCase):
     """Test tracking_codes context processor"""
     
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user(username='testuser', password='testpass')
     
@@ -346,3 +357,49 @@ class ContextProcessorTest(TestCase):
         self.assertTrue(response.context['analytics_enabled'])
         self.assertEqual(response.context['google_analytics_id'], 'G-TEST123')
         self.assertEqual(response.context['meta_pixel_id'], '123456')
+
+
+class SystemSettingsCacheTest(TestCase):
+    """Test cached singleton lookup and lazy tracking codes"""
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+    
+    def test_get_settings_is_cached_until_save(self):
+        """Only the first lookup hits the database; save() invalidates"""
+        SystemSettings.get_settings()
+        with self.assertNumQueries(0):
+            settings = SystemSettings.get_settings()
+        
+        settings.google_analytics_id = 'G-NEW'
+        settings.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(SystemSettings.get_settings().google_analytics_id, 'G-NEW')
+        
+        with self.assertNumQueries(1):
+            SystemSettings.get_settings(cached=False)
+    
+    def test_delete_invalidates_cache(self):
+        """A deleted singleton is recreated with defaults"""
+        settings = SystemSettings.get_settings()
+        settings.enable_analytics = True
+        settings.save()
+        settings.delete()
+        self.assertFalse(SystemSettings.get_settings().enable_analytics)
+    
+    def test_tracking_codes_are_lazy(self):
+        """No query unless a template uses the values, then one shared lookup"""
+        settings = SystemSettings.get_settings(cached=False)
+        settings.enable_analytics = True
+        settings.meta_pixel_id = '123456'
+        settings.save()
+        
+        with self.assertNumQueries(0):
+            context = tracking_codes(self.factory.get('/'))
+        
+        template = Template('{% if analytics_enabled %}{{ meta_pixel_id }}|{{ google_analytics_id }}{% endif %}')
+        with self.assertNumQueries(1):
+            self.assertEqual(template.render(Context(context)), '123456|')
+        with self.assertNumQueries(0):
+            template.render(Context(tracking_codes(self.factory.get('/'))))
@@ -75,7 +75,7 @@ def system_settings_view(request):
         messages.error(request, 'Sie haben keine Berechtigung für diese Seite.')
         return redirect('app_settings:dashboard')
     
-    system_settings = SystemSettings.get_settings()
+    system_settings = SystemSettings.get_settings(cached=False)
     
     if request.method == 'POST':
         try:
@@ -7,7 +7,8 @@ from .models import (
     EmailAttachment,
     EmailLabel,
     EmailSignature,
-    QuickReply
+    QuickReply,
+    BrevoWebhookEvent
 )
 
 
@@ -214,3 +215,11 @@ class QuickReplyAdmin(ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(BrevoWebhookEvent)
+class BrevoWebhookEventAdmin(ModelAdmin):
+    list_display = ['event', 'message_id', 'received_at', 'processed_at', 'attempts', 'error']
+    list_filter = ['event', 'processed_at']
+    search_fields = ['message_id', 'error']
+    readonly_fields = ['event', 'message_id', 'dedup_key', 'payload', 'received_at', 'available_at', 'processed_at', 'attempts', 'error']
@@ -361,21 +361,24 @@ def brevo_webhook(request):
     """
     Brevo Webhook Endpoint
     
-    Receives webhook events from Brevo and processes them.
+    Stores webhook events from Brevo in the inbox and acknowledges them
+    immediately; the process_webhook_events command applies them.
     """
     try:
         event_data = request.data
+        if hasattr(event_data, 'dict'):
+            event_data = event_data.dict()
         
         # TODO: Validate webhook signature
         # if 'X-Brevo-Signature' in request.headers:
         #     signature = request.headers['X-Brevo-Signature']
         #     # Validate signature
         
-        # Process event
-        success = BrevoWebhookHandler.handle_event(event_data)
+        # Queue event(s)
+        queued = BrevoWebhookHandler.enqueue(event_data)
         
-        if success:
-            return JsonResponse({'success': True})
+        if queued:
+            return JsonResponse({'success': True, 'queued': queued})
         else:
             return JsonResponse({'success': False}, status=400)
             
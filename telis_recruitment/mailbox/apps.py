@@ -5,3 +5,7 @@ class MailboxConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mailbox'
     verbose_name = 'Email Postfach'
+    
+    def ready(self):
+        # Signals importieren um sie zu registrieren
+        import mailbox.signals  # noqa
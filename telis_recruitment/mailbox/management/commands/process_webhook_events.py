@@ -0,0 +1,65 @@
+"""
+Django management command to apply queued Brevo webhook events.
+
+The webhook endpoint only stores events in the BrevoWebhookEvent inbox; this
+command drains it in batches (one email lookup and one bulk_update per batch).
+Run it periodically, or permanently with --loop.
+
+Usage:
+    python manage.py process_webhook_events
+    python manage.py process_webhook_events --loop --interval 5
+    python manage.py process_webhook_events --batch-size 1000 --purge-days 14
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from mailbox.services.webhook_handlers import BrevoWebhookHandler
+
+
+class Command(BaseCommand):
+    help = 'Apply queued Brevo webhook events to emails in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BrevoWebhookHandler.BATCH_SIZE,
+            help=f'Events per batch (default: {BrevoWebhookHandler.BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running and poll the inbox'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds between polls of an empty inbox with --loop (default: 5)'
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            default=7,
+            help='Delete processed events older than this many days (default: 7, 0 = keep)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            totals = BrevoWebhookHandler.drain(options['batch_size'])
+            if totals['claimed']:
+                style = self.style.SUCCESS if not totals['failed'] else self.style.WARNING
+                self.stdout.write(style(
+                    f"✅ Processed: {totals['processed']}, retried: {totals['retried']}, "
+                    f"failed: {totals['failed']}"
+                ))
+
+            if options['purge_days']:
+                BrevoWebhookHandler.purge_processed(timedelta(days=options['purge_days']))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,87 @@
+"""
+Django management command to send queued outbound emails.
+
+Drains QUEUED emails per account through the EmailDispatcher, outside of the
+web workers. Progress is stored per email, so re-running the command after an
+interruption continues where it stopped without sending duplicates.
+
+Usage:
+    python manage.py send_queued_emails
+    python manage.py send_queued_emails --account 3 --limit 500
+    python manage.py send_queued_emails --retry-interrupted
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from mailbox.models import Email, EmailAccount
+from mailbox.services.dispatcher import EmailDispatcher
+from mailbox.services.email_sender import EmailSenderService
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbound emails with connection reuse, concurrency and rate limits'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--account',
+            type=int,
+            default=None,
+            help='Only send for this EmailAccount ID'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help='Maximum number of emails per account (default: 1000)'
+        )
+        parser.add_argument(
+            '--max-workers',
+            type=int,
+            default=None,
+            help='Override parallel sends per account'
+        )
+        parser.add_argument(
+            '--retry-interrupted',
+            action='store_true',
+            help='Also resend emails left in "sending" by an interrupted run (may cause duplicates)'
+        )
+
+    def handle(self, *args, **options):
+        accounts = EmailAccount.objects.filter(is_active=True)
+        if options['account']:
+            accounts = accounts.filter(pk=options['account'])
+
+        statuses = [Email.Status.QUEUED]
+        if options['retry_interrupted']:
+            statuses.append(Email.Status.SENDING)
+
+        total_sent = 0
+        total_failed = 0
+        for account in accounts:
+            emails = list(
+                Email.objects.filter(
+                    account=account,
+                    direction=Email.Direction.OUTBOUND,
+                    status__in=statuses,
+                ).filter(
+                    Q(scheduled_for__isnull=True) | Q(scheduled_for__lte=timezone.now())
+                ).order_by('created_at')[:options['limit']]
+            )
+            if not emails:
+                continue
+
+            self.stdout.write(f'Sending {len(emails)} emails via {account.email_address}...')
+            dispatcher = EmailDispatcher(
+                EmailSenderService(account),
+                max_workers=options['max_workers'],
+                retry_interrupted=options['retry_interrupted'],
+            )
+            results = dispatcher.dispatch(emails)
+            sent = sum(1 for success in results.values() if success)
+            total_sent += sent
+            total_failed += len(results) - sent
+
+        style = self.style.SUCCESS if not total_failed else self.style.WARNING
+        self.stdout.write(style(f'✅ Sent: {total_sent}, failed: {total_failed}'))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailaccount',
+            name='imap_sync_state',
+            field=models.JSONField(blank=True, default=dict, help_text='Pro Ordner: UIDVALIDITY, UIDNEXT und zuletzt synchronisierte UID', verbose_name='IMAP Sync-Status'),
+        ),
+    ]
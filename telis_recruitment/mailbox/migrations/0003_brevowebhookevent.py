@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailbox', '0002_emailaccount_imap_sync_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BrevoWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=50, verbose_name='Event')),
+                ('message_id', models.CharField(blank=True, max_length=255, verbose_name='Brevo Message-ID')),
+                ('dedup_key', models.CharField(max_length=64, unique=True, verbose_name='Dedup-Schlüssel')),
+                ('payload', models.JSONField(default=dict, verbose_name='Payload')),
+                ('received_at', models.DateTimeField(auto_now_add=True, verbose_name='Empfangen am')),
+                ('available_at', models.DateTimeField(auto_now_add=True, verbose_name='Verarbeiten ab')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Verarbeitet am')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Versuche')),
+                ('error', models.TextField(blank=True, verbose_name='Fehler')),
+            ],
+            options={
+                'verbose_name': 'Brevo Webhook-Event',
+                'verbose_name_plural': 'Brevo Webhook-Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['processed_at', 'available_at'], name='mailbox_bre_process_fa97f0_idx')],
+            },
+        ),
+    ]
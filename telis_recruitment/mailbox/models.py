@@ -39,7 +39,13 @@ class EmailAccount(models.Model):
     sync_interval_minutes = models.IntegerField(default=5, verbose_name="Synchronisationsintervall (Minuten)")
     last_sync_at = models.DateTimeField(null=True, blank=True, verbose_name="Letzte Synchronisation")
     last_sync_error = models.TextField(blank=True, verbose_name="Letzter Synchronisationsfehler")
-    
+    imap_sync_state = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Pro Ordner: UIDVALIDITY, UIDNEXT und zuletzt synchronisierte UID",
+        verbose_name="IMAP Sync-Status"
+    )  # {"INBOX": {"uidvalidity": 1, "uidnext": 42, "last_uid": 41}}
+
     # Access Control
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='email_accounts', verbose_name="Besitzer")
     shared_with = models.ManyToManyField(User, blank=True, related_name='shared_email_accounts', verbose_name="Geteilt mit")
@@ -366,3 +372,35 @@ class QuickReply(models.Model):
     
     def __str__(self):
         return self.name
+
+
+class BrevoWebhookEvent(models.Model):
+    """
+    Eingangs-Warteschlange für Brevo Webhook-Events.
+    
+    Der Webhook speichert Events nur und antwortet sofort; der Befehl
+    process_webhook_events arbeitet sie gebündelt ab.
+    """
+    
+    event = models.CharField(max_length=50, verbose_name="Event")
+    message_id = models.CharField(max_length=255, blank=True, verbose_name="Brevo Message-ID")
+    # Hash der Payload, damit von Brevo wiederholte Zustellungen nur einmal zählen
+    dedup_key = models.CharField(max_length=64, unique=True, verbose_name="Dedup-Schlüssel")
+    payload = models.JSONField(default=dict, verbose_name="Payload")
+    
+    received_at = models.DateTimeField(auto_now_add=True, verbose_name="Empfangen am")
+    available_at = models.DateTimeField(auto_now_add=True, verbose_name="Verarbeiten ab")
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name="Verarbeitet am")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Versuche")
+    error = models.TextField(blank=True, verbose_name="Fehler")
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Brevo Webhook-Event'
+        verbose_name_plural = 'Brevo Webhook-Events'
+        indexes = [
+            models.Index(fields=['processed_at', 'available_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} - {self.message_id}"
@@ -0,0 +1,406 @@
+"""
+Outbound dispatcher for sending email batches.
+
+Reuses SMTP connections (or the Brevo HTTP client) across messages, sends with
+bounded concurrency under a per-provider rate limit and persists the result of
+every message on its Email row, so an interrupted batch resumes without
+sending anything twice.
+"""
+import smtplib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+import logging
+
+from mailbox.models import Email, EmailAccount
+from mailbox.services import email_sender
+from mailbox.services.email_sender import EmailSenderService
+
+logger = logging.getLogger(__name__)
+
+# Defaults per provider; override via settings.MAILBOX_DISPATCH_LIMITS
+DEFAULT_DISPATCH_LIMITS = {
+    'brevo': {'max_workers': 4, 'rate_per_second': 10.0},
+    'smtp': {'max_workers': 2, 'rate_per_second': 5.0},
+}
+
+# Statuses meaning the provider has already accepted the email
+SENT_STATUSES = {
+    Email.Status.SENT,
+    Email.Status.DELIVERED,
+    Email.Status.OPENED,
+    Email.Status.CLICKED,
+    Email.Status.REPLIED,
+}
+
+# Statuses a dispatcher may claim for sending
+CLAIMABLE_STATUSES = [Email.Status.DRAFT, Email.Status.QUEUED, Email.Status.FAILED]
+
+
+class RateLimiter:
+    """Thread-safe token bucket limiting sends per second"""
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            rate_per_second: Sustained rate; 0 or less disables limiting
+            burst: Number of sends allowed back-to-back
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a send slot is available."""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+
+
+class SMTPConnectionPool:
+    """Pool of authenticated SMTP connections shared by the worker threads"""
+
+    # Errors after which the SMTP session is still in a defined state
+    REUSABLE_ERRORS = (
+        smtplib.SMTPRecipientsRefused,
+        smtplib.SMTPSenderRefused,
+        smtplib.SMTPDataError,
+    )
+
+    def __init__(self, factory: Callable[[], smtplib.SMTP]):
+        """
+        Initialize pool.
+
+        Args:
+            factory: Callable opening a new authenticated connection
+        """
+        self._factory = factory
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _checkout(self) -> smtplib.SMTP:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        connection = self._factory()
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    def _release(self, connection: smtplib.SMTP):
+        with self._lock:
+            self._idle.append(connection)
+
+    @staticmethod
+    def _discard(connection: smtplib.SMTP):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def send(self, job: Dict[str, Any]) -> Optional[str]:
+        """
+        Send one prepared message over a pooled connection.
+
+        A connection the server dropped while idle is replaced once.
+
+        Args:
+            job: Dict with from_email, recipients and message
+
+        Returns:
+            None (SMTP has no provider message ID)
+        """
+        connection = self._checkout()
+        try:
+            try:
+                connection.sendmail(job['from_email'], job['recipients'], job['message'])
+            except smtplib.SMTPServerDisconnected:
+                self._discard(connection)
+                connection = self._factory()
+                with self._lock:
+                    self.connections_opened += 1
+                connection.sendmail(job['from_email'], job['recipients'], job['message'])
+        except self.REUSABLE_ERRORS:
+            self._release(connection)
+            raise
+        except Exception:
+            self._discard(connection)
+            raise
+        self._release(connection)
+        return None
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            try:
+                connection.quit()
+            except Exception:
+                self._discard(connection)
+
+
+class BrevoTransport:
+    """Sends prepared payloads through one shared Brevo API client"""
+
+    def __init__(self, api):
+        """
+        Initialize transport.
+
+        Args:
+            api: sib_api_v3_sdk.TransactionalEmailsApi (holds the HTTP pool)
+        """
+        self.api = api
+
+    def send(self, job: Dict[str, Any]) -> Optional[str]:
+        """
+        Send one prepared payload.
+
+        Args:
+            job: Dict with the SendSmtpEmail payload
+
+        Returns:
+            Brevo message ID
+        """
+        response = self.api.send_transac_email(job['payload'])
+        return response.message_id
+
+    def close(self):
+        """Release the pooled HTTP connections."""
+        rest_client = getattr(getattr(self.api, 'api_client', None), 'rest_client', None)
+        pool_manager = getattr(rest_client, 'pool_manager', None)
+        if pool_manager is not None:
+            try:
+                pool_manager.clear()
+            except Exception:
+                pass
+
+
+class EmailDispatcher:
+    """Concurrent, rate-aware sender for email batches"""
+
+    def __init__(
+        self,
+        sender: EmailSenderService,
+        max_workers: Optional[int] = None,
+        rate_per_second: Optional[float] = None,
+        retry_interrupted: bool = False,
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            sender: EmailSenderService of the sending account
+            max_workers: Parallel sends (default: provider limit)
+            rate_per_second: Max sends per second (default: provider limit)
+            retry_interrupted: Resend emails left in SENDING by an interrupted run.
+                Off by default because such emails may already have been delivered.
+        """
+        self.sender = sender
+        self.account = sender.account
+        self.provider = 'brevo' if self.account.account_type == EmailAccount.AccountType.BREVO else 'smtp'
+
+        limits = dict(DEFAULT_DISPATCH_LIMITS[self.provider])
+        limits.update(getattr(settings, 'MAILBOX_DISPATCH_LIMITS', {}).get(self.provider, {}))
+        self.max_workers = max(1, int(max_workers or limits['max_workers']))
+        self.rate_limiter = RateLimiter(
+            rate_per_second if rate_per_second is not None else limits['rate_per_second']
+        )
+        self.retry_interrupted = retry_interrupted
+
+    def dispatch(self, emails: List[Email]) -> Dict[int, bool]:
+        """
+        Send emails and persist the outcome of each one as it completes.
+
+        Emails already accepted by the provider are reported as sent without
+        resending; each remaining email is claimed with a conditional UPDATE
+        right before it is queued, so concurrent or resumed runs never send
+        the same email twice.
+
+        Args:
+            emails: List of Email instances to send
+
+        Returns:
+            Dictionary mapping email ID to success status
+        """
+        results = {}
+        current_status = dict(
+            Email.objects.filter(pk__in=[e.pk for e in emails]).values_list('pk', 'status')
+        )
+
+        pending = []
+        for email in emails:
+            status = current_status.get(email.pk, email.status)
+            if status in SENT_STATUSES:
+                results[email.id] = True
+            elif status == Email.Status.SENDING and not self.retry_interrupted:
+                logger.warning(f"Email {email.id} was interrupted while sending, not resending")
+                results[email.id] = False
+            else:
+                pending.append(email)
+
+        if not pending:
+            return results
+
+        if not self.account.is_active:
+            logger.error(f"Account {self.account.email_address} is not active")
+            for email in pending:
+                self._mark_failed(email, "Account is not active")
+                results[email.id] = False
+            return results
+
+        try:
+            transport = self._open_transport()
+        except Exception as e:
+            logger.error(f"Could not open {self.provider} transport: {e}")
+            for email in pending:
+                self._mark_failed(email, str(e))
+                results[email.id] = False
+            return results
+
+        # Jobs are prepared lazily with a bounded in-flight window, so memory
+        # stays flat and an interruption leaves unclaimed emails untouched
+        window = self.max_workers * 2
+        queue = iter(pending)
+        in_flight = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mail-dispatch') as executor:
+                while True:
+                    while len(in_flight) < window:
+                        email = next(queue, None)
+                        if email is None:
+                            break
+                        job = self._claim_and_prepare(email)
+                        if job is None:
+                            results[email.id] = False
+                            continue
+                        in_flight[executor.submit(self._send, transport, job)] = email
+
+                    if not in_flight:
+                        break
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        email = in_flight.pop(future)
+                        results[email.id] = self._record_result(email, future)
+        finally:
+            transport.close()
+
+        sent = sum(1 for success in results.values() if success)
+        logger.info(f"Dispatched batch via {self.provider}: {sent}/{len(results)} sent")
+        return results
+
+    def _open_transport(self):
+        """Create the shared transport for this account's provider."""
+        if self.provider == 'brevo':
+            if not email_sender.BREVO_AVAILABLE:
+                raise ImproperlyConfigured(
+                    "Brevo SDK (sib-api-v3-sdk) is not installed. "
+                    "Please install it using: pip install sib-api-v3-sdk"
+                )
+            api = self.sender._create_brevo_api(pool_size=self.max_workers)
+            if api is None:
+                raise ImproperlyConfigured("Brevo API key not configured")
+            return BrevoTransport(api)
+        return SMTPConnectionPool(self.sender._open_smtp_connection)
+
+    def _claim_and_prepare(self, email: Email) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim an email and build its provider payload.
+
+        Args:
+            email: Email instance
+
+        Returns:
+            Job dict, or None if the email was claimed elsewhere or could not be built
+        """
+        claimable = list(CLAIMABLE_STATUSES)
+        if self.retry_interrupted:
+            claimable.append(Email.Status.SENDING)
+
+        claimed = Email.objects.filter(pk=email.pk, status__in=claimable).update(
+            status=Email.Status.SENDING,
+            updated_at=timezone.now(),
+        )
+        if not claimed:
+            logger.info(f"Email {email.id} already claimed by another dispatcher, skipping")
+            return None
+        email.status = Email.Status.SENDING
+
+        try:
+            attachments = list(email.attachments.all())
+            if self.provider == 'brevo':
+                return {'payload': self.sender._build_brevo_email(email, attachments)}
+            message, recipients = self.sender._build_smtp_message(email, attachments)
+            return {'from_email': email.from_email, 'recipients': recipients, 'message': message}
+        except Exception as e:
+            logger.error(f"Error preparing email {email.id}: {e}")
+            self._mark_failed(email, str(e))
+            return None
+
+    def _send(self, transport, job: Dict[str, Any]) -> Optional[str]:
+        """Worker thread: wait for a rate slot, then send."""
+        self.rate_limiter.acquire()
+        return transport.send(job)
+
+    def _record_result(self, email: Email, future) -> bool:
+        """
+        Persist the outcome of one send.
+
+        Args:
+            email: Email instance
+            future: Completed future of the send
+
+        Returns:
+            True if the email was sent
+        """
+        try:
+            message_id = future.result()
+        except Exception as e:
+            logger.error(f"Error sending email {email.id}: {e}")
+            self._mark_failed(email, str(e))
+            return False
+
+        email.status = Email.Status.SENT
+        email.sent_at = timezone.now()
+        update_fields = ['status', 'sent_at', 'updated_at']
+        if message_id:
+            email.brevo_message_id = message_id
+            update_fields.append('brevo_message_id')
+        email.save(update_fields=update_fields)
+        return True
+
+    @staticmethod
+    def _mark_failed(email: Email, detail: str):
+        email.status = Email.Status.FAILED
+        email.status_detail = detail
+        email.save(update_fields=['status', 'status_detail', 'updated_at'])
@@ -2,7 +2,8 @@
 Email receiver service for fetching emails via IMAP.
 """
 import imaplib
-from typing import List, Optional
+import re
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.core.files.base import ContentFile
@@ -15,6 +16,17 @@ from mailbox.services.threading import EmailThreadingService
 
 logger = logging.getLogger(__name__)
 
+# UIDs per UID FETCH command (keeps command lines and responses bounded)
+FETCH_BATCH_SIZE = 25
+
+# Days to look back when a folder has no usable watermark
+INITIAL_SYNC_DAYS = 30
+
+HEADER_FETCH_ITEMS = '(UID BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])'
+BODY_FETCH_ITEMS = '(UID RFC822)'
+
+_FETCH_UID_RE = re.compile(rb'UID (\d+)')
+
 
 class EmailReceiverService:
     """Service zum Empfangen von Emails via IMAP"""
@@ -85,9 +97,10 @@ class EmailReceiverService:
         """
         Hole neue Emails vom Server.
         
-        - Prüft last_sync_at
-        - Parsed Email-Header und Body
-        - Erstellt Email-Records
+        - Nutzt UIDVALIDITY/UIDNEXT-Watermarks pro Ordner (imap_sync_state)
+        - Fällt bei Erst-Sync oder geänderter UIDVALIDITY auf SINCE-Suche zurück
+        - Lädt Header und Bodies in UID-Range-Batches
+        - Überspringt bekannte Message-IDs vor dem Parsen
         - Threading via In-Reply-To/References
         
         Args:
@@ -104,53 +117,84 @@ class EmailReceiverService:
         created_emails = []
         
         try:
-            # Select folder
+            # Select folder; UIDVALIDITY/UIDNEXT arrive as untagged response codes
             self.connection.select(folder, readonly=False)
+            uidvalidity = self._get_response_code('UIDVALIDITY')
+            uidnext = self._get_response_code('UIDNEXT')
+            
+            sync_state = dict(self.account.imap_sync_state or {})
+            folder_state = sync_state.get(folder) or {}
+            incremental = (
+                uidvalidity is not None
+                and folder_state.get('uidvalidity') == uidvalidity
+                and folder_state.get('last_uid') is not None
+            )
             
-            # Determine search criteria based on last sync
-            if self.account.last_sync_at:
-                # Fetch emails since last sync
-                since_date = self.account.last_sync_at.strftime('%d-%b-%Y')
-                search_criteria = f'(SINCE {since_date})'
+            if incremental:
+                last_uid = int(folder_state['last_uid'])
+                if uidnext is not None and uidnext <= last_uid + 1:
+                    # Nothing arrived since the last poll - skip SEARCH and FETCH entirely
+                    email_uids = []
+                else:
+                    email_uids = self._search_uids(f'UID {last_uid + 1}:*')
+                    if email_uids is None:
+                        return created_emails
+                    # "n:*" always matches the highest UID, even if it is below n
+                    email_uids = [uid for uid in email_uids if uid > last_uid]
+                
+                total_available = len(email_uids)
+                # Oldest first, so the watermark advances without gaps
+                email_uids = email_uids[:limit]
             else:
-                # First sync - fetch recent emails
-                since_date = (timezone.now() - timedelta(days=30)).strftime('%d-%b-%Y')
-                search_criteria = f'(SINCE {since_date})'
-            
-            # Search for emails using UID to avoid sequence number issues
-            typ, data = self.connection.uid('search', None, search_criteria)
-            
-            if typ != 'OK':
-                logger.error(f"IMAP search failed: {typ}")
-                return created_emails
-            
-            # Get email UIDs (not sequence numbers)
-            email_ids = data[0].split()
-            
-            total_available = len(email_ids)
-            
-            # Limit number of emails to process in this batch
-            # Process most recent emails first
-            if len(email_ids) > limit:
-                email_ids = email_ids[-limit:]  # Get most recent
-                logger.info(f"Processing {len(email_ids)}/{total_available} emails (limit: {limit})")
+                last_uid = 0
+                if self.account.last_sync_at:
+                    # Fetch emails since last sync
+                    since_date = self.account.last_sync_at.strftime('%d-%b-%Y')
+                else:
+                    # First sync - fetch recent emails
+                    since_date = (timezone.now() - timedelta(days=INITIAL_SYNC_DAYS)).strftime('%d-%b-%Y')
+                
+                email_uids = self._search_uids(f'(SINCE {since_date})')
+                if email_uids is None:
+                    return created_emails
+                
+                total_available = len(email_uids)
+                # Process most recent emails first
+                email_uids = email_uids[-limit:]
+            
+            if total_available > len(email_uids):
+                logger.info(f"Processing {len(email_uids)}/{total_available} emails (limit: {limit})")
             else:
-                logger.info(f"Found {len(email_ids)} emails to fetch")
-            
-            # Fetch each email
-            for email_id in email_ids:
+                logger.info(f"Found {len(email_uids)} emails to fetch in {folder}")
+            
+            # Fetch in UID-range batches; the watermark only covers completed batches
+            synced_uid = last_uid
+            if not email_uids and uidnext:
+                synced_uid = max(synced_uid, uidnext - 1)
+            for start in range(0, len(email_uids), FETCH_BATCH_SIZE):
+                batch = email_uids[start:start + FETCH_BATCH_SIZE]
                 try:
-                    email = self._fetch_and_parse_email(email_id, folder)
-                    if email:
-                        created_emails.append(email)
+                    created_emails.extend(self._fetch_batch(batch, folder))
                 except Exception as e:
-                    logger.error(f"Error fetching email UID {email_id}: {e}")
-                    continue
+                    logger.error(f"Error fetching UID batch {self._format_uid_set(batch)}: {e}")
+                    break
+                synced_uid = max(synced_uid, batch[-1])
+            
+            update_fields = ['last_sync_at', 'last_sync_error']
+            # Without a completed batch a fresh folder keeps falling back to SINCE
+            if uidvalidity is not None and (incremental or synced_uid):
+                sync_state[folder] = {
+                    'uidvalidity': uidvalidity,
+                    'uidnext': uidnext,
+                    'last_uid': synced_uid,
+                }
+                self.account.imap_sync_state = sync_state
+                update_fields.append('imap_sync_state')
             
             # Update last sync time
             self.account.last_sync_at = timezone.now()
             self.account.last_sync_error = ""
-            self.account.save(update_fields=['last_sync_at', 'last_sync_error'])
+            self.account.save(update_fields=update_fields)
             
             logger.info(f"Fetched {len(created_emails)} new emails")
             
@@ -161,6 +205,137 @@ class EmailReceiverService:
         
         return created_emails
     
+    def _get_response_code(self, code: str) -> Optional[int]:
+        """
+        Read a numeric response code (e.g. UIDVALIDITY) left over from SELECT.
+        
+        Args:
+            code: Response code name
+            
+        Returns:
+            Integer value or None if the server did not send it
+        """
+        try:
+            typ, data = self.connection.response(code)
+            value = data[-1] if data else None
+            if isinstance(value, bytes):
+                value = value.decode()
+            return int(value) if value is not None else None
+        except (TypeError, ValueError, IndexError, AttributeError):
+            return None
+    
+    def _search_uids(self, criteria: str) -> Optional[List[int]]:
+        """
+        Run UID SEARCH and return ascending UIDs.
+        
+        Args:
+            criteria: IMAP search criteria
+            
+        Returns:
+            Sorted list of UIDs, or None if the search failed
+        """
+        # Search using UID to avoid sequence number issues
+        typ, data = self.connection.uid('search', None, criteria)
+        
+        if typ != 'OK':
+            logger.error(f"IMAP search failed: {typ}")
+            return None
+        
+        return sorted(int(uid) for uid in (data[0] or b'').split())
+    
+    @staticmethod
+    def _format_uid_set(uids: List[int]) -> str:
+        """
+        Compress UIDs into an IMAP sequence set (e.g. "1:5,7,9:10").
+        
+        Args:
+            uids: UIDs to include
+            
+        Returns:
+            IMAP sequence-set string
+        """
+        ranges = []
+        for uid in sorted(set(uids)):
+            if ranges and uid == ranges[-1][1] + 1:
+                ranges[-1][1] = uid
+            else:
+                ranges.append([uid, uid])
+        return ','.join(str(lo) if lo == hi else f'{lo}:{hi}' for lo, hi in ranges)
+    
+    @staticmethod
+    def _parse_fetch_response(data: list) -> Dict[int, bytes]:
+        """
+        Map UID -> literal payload from an imaplib FETCH response.
+        
+        Args:
+            data: Response data as returned by imaplib's uid('fetch', ...)
+            
+        Returns:
+            Dict of UID to payload bytes
+        """
+        result = {}
+        for index, item in enumerate(data or []):
+            if not isinstance(item, tuple) or len(item) < 2:
+                continue
+            match = _FETCH_UID_RE.search(item[0])
+            # Some servers send the UID item after the literal
+            if not match and index + 1 < len(data) and isinstance(data[index + 1], bytes):
+                match = _FETCH_UID_RE.search(data[index + 1])
+            if match:
+                result[int(match.group(1))] = item[1]
+        return result
+    
+    def _fetch_batch(self, uids: List[int], folder: str) -> List[Email]:
+        """
+        Fetch and store a batch of emails with two round trips.
+        
+        First only the Message-ID headers are fetched for the whole UID range,
+        known messages are dropped, then the remaining bodies are fetched at once.
+        
+        Args:
+            uids: Ascending IMAP UIDs
+            folder: IMAP folder name
+            
+        Returns:
+            Created Email instances
+        """
+        typ, data = self.connection.uid('fetch', self._format_uid_set(uids), HEADER_FETCH_ITEMS)
+        if typ != 'OK':
+            raise imaplib.IMAP4.error(f"Header fetch failed: {typ}")
+        
+        message_ids = {
+            uid: EmailParser.parse_message_id(raw)
+            for uid, raw in self._parse_fetch_response(data).items()
+        }
+        known = set(
+            Email.objects.filter(
+                message_id__in=[mid for mid in message_ids.values() if mid]
+            ).values_list('message_id', flat=True)
+        )
+        wanted = [uid for uid in uids if not message_ids.get(uid) or message_ids[uid] not in known]
+        
+        skipped = len(uids) - len(wanted)
+        if skipped:
+            logger.debug(f"Skipping {skipped} already known emails")
+        if not wanted:
+            return []
+        
+        typ, data = self.connection.uid('fetch', self._format_uid_set(wanted), BODY_FETCH_ITEMS)
+        if typ != 'OK':
+            raise imaplib.IMAP4.error(f"Body fetch failed: {typ}")
+        
+        bodies = self._parse_fetch_response(data)
+        created_emails = []
+        for uid in wanted:
+            raw_email = bodies.get(uid)
+            if raw_email is None:
+                logger.warning(f"Email UID {uid} missing from fetch response")
+                continue
+            email = self._store_email(uid, raw_email, folder)
+            if email:
+                created_emails.append(email)
+        return created_emails
+    
     def _fetch_and_parse_email(self, email_id: bytes, folder: str) -> Optional[Email]:
         """
         Fetch and parse a single email.
@@ -173,15 +348,25 @@ class EmailReceiverService:
             Created Email instance or None
         """
         try:
-            # Fetch email data using UID to avoid sequence number issues
-            typ, data = self.connection.uid('fetch', email_id, '(RFC822)')
-            
-            if typ != 'OK':
-                logger.error(f"Failed to fetch email UID {email_id}")
-                return None
+            emails = self._fetch_batch([int(email_id)], folder)
+            return emails[0] if emails else None
+        except Exception as e:
+            logger.error(f"Error fetching email UID {email_id}: {e}")
+            return None
+    
+    def _store_email(self, uid: int, raw_email: bytes, folder: str) -> Optional[Email]:
+        """
+        Parse a raw email and create its records.
+        
+        Args:
+            uid: IMAP UID of the message
+            raw_email: Raw RFC822 bytes
+            folder: IMAP folder name
             
-            # Parse email
-            raw_email = data[0][1]
+        Returns:
+            Created Email instance or None
+        """
+        try:
             parsed = EmailParser.parse_raw_email(raw_email)
             
             # Check if email already exists
@@ -224,7 +409,7 @@ class EmailReceiverService:
                 status=Email.Status.RECEIVED,
                 received_at=parsed['date'] if parsed['date'] else timezone.now(),
                 is_read=False,
-                imap_uid=email_id.decode(),
+                imap_uid=str(uid),
                 imap_folder=folder,
             )
             
@@ -261,7 +446,7 @@ class EmailReceiverService:
             return email
             
         except Exception as e:
-            logger.error(f"Error parsing email {email_id}: {e}")
+            logger.error(f"Error parsing email UID {uid}: {e}")
             return None
     
     def sync_all_folders(self) -> int:
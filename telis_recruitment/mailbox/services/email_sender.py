@@ -8,7 +8,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from django.utils import timezone
 from django.conf import settings
@@ -114,65 +114,12 @@ class EmailSenderService:
             )
         
         try:
-            # Decrypt API key
-            api_key = decrypt_api_key(self.account.brevo_api_key_encrypted)
-            if not api_key:
+            api_instance = self._create_brevo_api()
+            if api_instance is None:
                 logger.error("Brevo API key not configured")
                 return False
             
-            # Configure API client
-            configuration = sib_api_v3_sdk.Configuration()
-            configuration.api_key['api-key'] = api_key
-            api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
-                sib_api_v3_sdk.ApiClient(configuration)
-            )
-            
-            # Prepare email data
-            send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-                sender={"email": email.from_email, "name": email.from_name or ""},
-                to=[{"email": e['email'], "name": e.get('name', '')} for e in email.to_emails],
-                subject=email.subject,
-                html_content=email.body_html or None,
-                text_content=email.body_text or None,
-            )
-            
-            # Add CC if present
-            if email.cc_emails:
-                send_smtp_email.cc = [{"email": e['email'], "name": e.get('name', '')} for e in email.cc_emails]
-            
-            # Add BCC if present
-            if email.bcc_emails:
-                send_smtp_email.bcc = [{"email": e['email'], "name": e.get('name', '')} for e in email.bcc_emails]
-            
-            # Add reply-to if present
-            if email.reply_to_email:
-                send_smtp_email.reply_to = {"email": email.reply_to_email}
-            
-            # Add headers for threading
-            headers = {}
-            if email.in_reply_to:
-                headers['In-Reply-To'] = email.in_reply_to
-            if email.references:
-                headers['References'] = email.references
-            if headers:
-                send_smtp_email.headers = headers
-            
-            # Add attachments if present
-            if attachments:
-                attachment_list = []
-                for att in attachments:
-                    try:
-                        with open(att.file.path, 'rb') as f:
-                            content = f.read()
-                            attachment_list.append({
-                                'name': att.filename,
-                                'content': base64.b64encode(content).decode(),
-                            })
-                    except Exception as e:
-                        logger.warning(f"Could not attach file {att.filename}: {e}")
-                
-                if attachment_list:
-                    send_smtp_email.attachment = attachment_list
+            send_smtp_email = self._build_brevo_email(email, attachments)
             
             # Send email
             response = api_instance.send_transac_email(send_smtp_email)
@@ -192,6 +139,93 @@ class EmailSenderService:
             email.status_detail = str(e)
             return False
     
+    def _create_brevo_api(self, pool_size: Optional[int] = None):
+        """
+        Erstelle einen Brevo TransactionalEmailsApi-Client.
+        
+        Der Client hält einen HTTP-Connection-Pool und kann für viele
+        Sendungen wiederverwendet werden.
+        
+        Args:
+            pool_size: Maximum number of pooled HTTP connections
+            
+        Returns:
+            TransactionalEmailsApi instance or None if no API key is configured
+        """
+        # Decrypt API key
+        api_key = decrypt_api_key(self.account.brevo_api_key_encrypted)
+        if not api_key:
+            return None
+        
+        # Configure API client
+        configuration = sib_api_v3_sdk.Configuration()
+        configuration.api_key['api-key'] = api_key
+        if pool_size:
+            configuration.connection_pool_maxsize = pool_size
+        return sib_api_v3_sdk.TransactionalEmailsApi(
+            sib_api_v3_sdk.ApiClient(configuration)
+        )
+    
+    def _build_brevo_email(self, email: Email, attachments: Optional[List[EmailAttachment]] = None):
+        """
+        Baue die Brevo SendSmtpEmail-Nutzlast.
+        
+        Args:
+            email: Email instance
+            attachments: List of EmailAttachment instances
+            
+        Returns:
+            sib_api_v3_sdk.SendSmtpEmail instance
+        """
+        # Prepare email data
+        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
+            sender={"email": email.from_email, "name": email.from_name or ""},
+            to=[{"email": e['email'], "name": e.get('name', '')} for e in email.to_emails],
+            subject=email.subject,
+            html_content=email.body_html or None,
+            text_content=email.body_text or None,
+        )
+        
+        # Add CC if present
+        if email.cc_emails:
+            send_smtp_email.cc = [{"email": e['email'], "name": e.get('name', '')} for e in email.cc_emails]
+        
+        # Add BCC if present
+        if email.bcc_emails:
+            send_smtp_email.bcc = [{"email": e['email'], "name": e.get('name', '')} for e in email.bcc_emails]
+        
+        # Add reply-to if present
+        if email.reply_to_email:
+            send_smtp_email.reply_to = {"email": email.reply_to_email}
+        
+        # Add headers for threading
+        headers = {}
+        if email.in_reply_to:
+            headers['In-Reply-To'] = email.in_reply_to
+        if email.references:
+            headers['References'] = email.references
+        if headers:
+            send_smtp_email.headers = headers
+        
+        # Add attachments if present
+        if attachments:
+            attachment_list = []
+            for att in attachments:
+                try:
+                    with open(att.file.path, 'rb') as f:
+                        content = f.read()
+                        attachment_list.append({
+                            'name': att.filename,
+                            'content': base64.b64encode(content).decode(),
+                        })
+                except Exception as e:
+                    logger.warning(f"Could not attach file {att.filename}: {e}")
+            
+            if attachment_list:
+                send_smtp_email.attachment = attachment_list
+        
+        return send_smtp_email
+    
     def _send_via_smtp(self, email: Email, attachments: Optional[List[EmailAttachment]] = None) -> bool:
         """
         Sende via SMTP direkt.
@@ -204,73 +238,13 @@ class EmailSenderService:
             True on success, False on failure
         """
         try:
-            # Decrypt credentials
-            username = self.account.smtp_username
-            password = decrypt_password(self.account.smtp_password_encrypted) if self.account.smtp_password_encrypted else ""
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = email.subject
-            msg['From'] = f"{email.from_name} <{email.from_email}>" if email.from_name else email.from_email
-            msg['To'] = ', '.join([e['email'] for e in email.to_emails])
-            
-            if email.cc_emails:
-                msg['Cc'] = ', '.join([e['email'] for e in email.cc_emails])
-            
-            if email.reply_to_email:
-                msg['Reply-To'] = email.reply_to_email
-            
-            # Add Message-ID
-            msg['Message-ID'] = email.message_id
-            
-            # Add threading headers
-            if email.in_reply_to:
-                msg['In-Reply-To'] = email.in_reply_to
-            if email.references:
-                msg['References'] = email.references
-            
-            # Add body parts
-            if email.body_text:
-                msg.attach(MIMEText(email.body_text, 'plain', 'utf-8'))
-            if email.body_html:
-                msg.attach(MIMEText(email.body_html, 'html', 'utf-8'))
-            
-            # Add attachments
-            if attachments:
-                for att in attachments:
-                    try:
-                        with open(att.file.path, 'rb') as f:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(f.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename="{att.filename}"',
-                            )
-                            msg.attach(part)
-                    except Exception as e:
-                        logger.warning(f"Could not attach file {att.filename}: {e}")
+            message, recipients = self._build_smtp_message(email, attachments)
             
             # Connect to SMTP server and send
             server = None
             try:
-                if self.account.smtp_use_tls:
-                    server = smtplib.SMTP(self.account.smtp_host, self.account.smtp_port)
-                    server.starttls()
-                else:
-                    server = smtplib.SMTP_SSL(self.account.smtp_host, self.account.smtp_port)
-                
-                if username and password:
-                    server.login(username, password)
-                
-                # Collect all recipients
-                all_recipients = [e['email'] for e in email.to_emails]
-                if email.cc_emails:
-                    all_recipients.extend([e['email'] for e in email.cc_emails])
-                if email.bcc_emails:
-                    all_recipients.extend([e['email'] for e in email.bcc_emails])
-                
-                server.sendmail(email.from_email, all_recipients, msg.as_string())
+                server = self._open_smtp_connection()
+                server.sendmail(email.from_email, recipients, message)
                 
                 logger.info(f"SMTP: Email sent successfully")
                 return True
@@ -286,24 +260,113 @@ class EmailSenderService:
             email.status_detail = str(e)
             return False
     
+    def _open_smtp_connection(self) -> smtplib.SMTP:
+        """
+        Öffne eine authentifizierte SMTP-Verbindung für dieses Konto.
+        
+        Returns:
+            Connected smtplib.SMTP (or SMTP_SSL) instance
+        """
+        # Decrypt credentials
+        username = self.account.smtp_username
+        password = decrypt_password(self.account.smtp_password_encrypted) if self.account.smtp_password_encrypted else ""
+        
+        if self.account.smtp_use_tls:
+            server = smtplib.SMTP(self.account.smtp_host, self.account.smtp_port)
+            server.starttls()
+        else:
+            server = smtplib.SMTP_SSL(self.account.smtp_host, self.account.smtp_port)
+        
+        try:
+            if username and password:
+                server.login(username, password)
+        except Exception:
+            server.close()
+            raise
+        
+        return server
+    
+    def _build_smtp_message(
+        self,
+        email: Email,
+        attachments: Optional[List[EmailAttachment]] = None,
+    ) -> Tuple[str, List[str]]:
+        """
+        Baue die MIME-Nachricht und Empfängerliste für SMTP.
+        
+        Args:
+            email: Email instance
+            attachments: List of EmailAttachment instances
+            
+        Returns:
+            Tuple of (serialized message, envelope recipients)
+        """
+        # Create message
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = email.subject
+        msg['From'] = f"{email.from_name} <{email.from_email}>" if email.from_name else email.from_email
+        msg['To'] = ', '.join([e['email'] for e in email.to_emails])
+        
+        if email.cc_emails:
+            msg['Cc'] = ', '.join([e['email'] for e in email.cc_emails])
+        
+        if email.reply_to_email:
+            msg['Reply-To'] = email.reply_to_email
+        
+        # Add Message-ID
+        msg['Message-ID'] = email.message_id
+        
+        # Add threading headers
+        if email.in_reply_to:
+            msg['In-Reply-To'] = email.in_reply_to
+        if email.references:
+            msg['References'] = email.references
+        
+        # Add body parts
+        if email.body_text:
+            msg.attach(MIMEText(email.body_text, 'plain', 'utf-8'))
+        if email.body_html:
+            msg.attach(MIMEText(email.body_html, 'html', 'utf-8'))
+        
+        # Add attachments
+        if attachments:
+            for att in attachments:
+                try:
+                    with open(att.file.path, 'rb') as f:
+                        part = MIMEBase('application', 'octet-stream')
+                        part.set_payload(f.read())
+                        encoders.encode_base64(part)
+                        part.add_header(
+                            'Content-Disposition',
+                            f'attachment; filename="{att.filename}"',
+                        )
+                        msg.attach(part)
+                except Exception as e:
+                    logger.warning(f"Could not attach file {att.filename}: {e}")
+        
+        # Collect all recipients
+        all_recipients = [e['email'] for e in email.to_emails]
+        if email.cc_emails:
+            all_recipients.extend([e['email'] for e in email.cc_emails])
+        if email.bcc_emails:
+            all_recipients.extend([e['email'] for e in email.bcc_emails])
+        
+        return msg.as_string(), all_recipients
+    
     def send_batch_emails(self, emails: List[Email]) -> Dict[int, bool]:
         """
         Send multiple emails in batch.
         
+        Delegates to EmailDispatcher, which reuses connections, sends with
+        bounded concurrency under the provider's rate limit and persists
+        progress per email so an interrupted batch can be resumed.
+        
         Args:
             emails: List of Email instances to send
             
         Returns:
             Dictionary mapping email ID to success status
         """
-        results = {}
-        
-        for email in emails:
-            # Get attachments for this email
-            attachments = list(email.attachments.all()) if hasattr(email, 'attachments') else []
-            
-            # Send email
-            success = self.send_email(email, attachments)
-            results[email.id] = success
+        from mailbox.services.dispatcher import EmailDispatcher
         
-        return results
+        return EmailDispatcher(self).dispatch(emails)
@@ -47,6 +47,27 @@ class EmailParser:
             logger.error(f"Error parsing email: {e}")
             raise
     
+    @staticmethod
+    def parse_message_id(raw_headers: bytes) -> str:
+        """
+        Lese nur die Message-ID aus rohen Header-Bytes.
+        
+        Günstiger als parse_raw_email, da Body und Anhänge nicht
+        verarbeitet werden.
+        
+        Args:
+            raw_headers: Raw header bytes (e.g. BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])
+        
+        Returns:
+            Message-ID or empty string
+        """
+        try:
+            msg = email.message_from_bytes(raw_headers)
+            return EmailParser._get_header(msg, 'Message-ID', '')
+        except Exception as e:
+            logger.warning(f"Error parsing Message-ID header: {e}")
+            return ''
+    
     @staticmethod
     def _decode_header(header_value: str) -> str:
         """
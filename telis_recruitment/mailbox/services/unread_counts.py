@@ -0,0 +1,112 @@
+"""
+Cached unread-conversation counters for the sidebar badge.
+
+Counts are kept per account (``mailbox:unread:<account_id>``) and the active
+account ids per user under an accounts generation, so a warm page needs no
+database query. Signals (mailbox/signals.py) drop the affected entries when
+conversations or accounts change. The default cache is process-local, so
+other workers only see a change after the timeout; with a shared backend
+(Redis/Memcached) invalidation is immediate everywhere.
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from mailbox.models import EmailAccount, EmailConversation
+
+# Upper bound for staleness in other workers of a process-local cache
+UNREAD_COUNT_TIMEOUT = 60
+
+_ACCOUNTS_GENERATION_KEY = 'mailbox:accounts_gen'
+
+
+def _account_key(account_id):
+    return f'mailbox:unread:{account_id}'
+
+
+def _accounts_generation():
+    generation = cache.get(_ACCOUNTS_GENERATION_KEY)
+    if generation is None:
+        # Time-based start so an evicted generation is never reused
+        cache.add(_ACCOUNTS_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(_ACCOUNTS_GENERATION_KEY)
+    return generation
+
+
+def _user_accounts_key(user_id, generation):
+    return f'mailbox:user_accounts:{generation}:{user_id}'
+
+
+def get_user_account_ids(user):
+    """
+    Return the ids of active accounts the user owns or that are shared with them.
+
+    Args:
+        user: Authenticated user
+
+    Returns:
+        List of account ids
+    """
+    key = _user_accounts_key(user.pk, _accounts_generation())
+    account_ids = cache.get(key)
+    if account_ids is None:
+        account_ids = sorted(set(
+            EmailAccount.objects.filter(
+                Q(owner=user) | Q(shared_with=user),
+                is_active=True,
+            ).values_list('id', flat=True)
+        ))
+        cache.set(key, account_ids, UNREAD_COUNT_TIMEOUT)
+    return account_ids
+
+
+def get_unread_count(user):
+    """
+    Number of unread, non-trashed conversations across the user's accounts.
+
+    Missing per-account counters are computed with one grouped query.
+
+    Args:
+        user: Authenticated user
+
+    Returns:
+        Unread conversation count
+    """
+    account_ids = get_user_account_ids(user)
+    if not account_ids:
+        return 0
+
+    keys = {_account_key(account_id): account_id for account_id in account_ids}
+    cached = cache.get_many(list(keys))
+    missing = [account_id for key, account_id in keys.items() if key not in cached]
+
+    if missing:
+        counts = dict.fromkeys(missing, 0)
+        rows = (
+            EmailConversation.objects.filter(account_id__in=missing, is_read=False)
+            .exclude(status=EmailConversation.Status.TRASH)
+            .values('account_id')
+            .annotate(n=Count('id'))
+        )
+        for row in rows:
+            counts[row['account_id']] = row['n']
+        cache.set_many({_account_key(a): n for a, n in counts.items()}, UNREAD_COUNT_TIMEOUT)
+        cached.update({_account_key(a): n for a, n in counts.items()})
+
+    return sum(cached[key] for key in keys)
+
+
+def invalidate_account(account_id):
+    """Drop the unread counter of one account (conversation changed)."""
+    if account_id:
+        cache.delete(_account_key(account_id))
+
+
+def invalidate_user_accounts():
+    """Drop all cached user -> account mappings (account created, shared, deactivated)."""
+    try:
+        cache.incr(_ACCOUNTS_GENERATION_KEY)
+    except ValueError:
+        # Key missing or evicted: start a new generation
+        cache.set(_ACCOUNTS_GENERATION_KEY, time.time_ns(), None)
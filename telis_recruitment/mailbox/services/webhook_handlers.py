@@ -1,24 +1,61 @@
 """
 Webhook handlers for Brevo events.
+
+The webhook endpoint only stores events in the BrevoWebhookEvent inbox
+(BrevoWebhookHandler.enqueue) and answers immediately. The
+process_webhook_events command drains the inbox in batches: one lookup for
+all message IDs of a batch, all events per email coalesced in memory and a
+single bulk_update.
 """
+import hashlib
+import json
 import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
 from typing import Dict, Optional, Any
+
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
-from mailbox.models import Email, EmailAccount
+from mailbox.models import BrevoWebhookEvent, Email
 
 logger = logging.getLogger(__name__)
 
 
 class BrevoWebhookHandler:
     """Handler für Brevo Webhooks"""
-    
+
+    # Events, die in die Inbox übernommen werden
+    EVENT_TYPES = (
+        'delivered', 'opened', 'click', 'soft_bounce',
+        'hard_bounce', 'spam', 'unsubscribed',
+    )
+
+    # Status only moves forward, so late or retried events cannot downgrade it
+    STATUS_RANK = {
+        Email.Status.DELIVERED: 1,
+        Email.Status.OPENED: 2,
+        Email.Status.CLICKED: 3,
+        Email.Status.REPLIED: 4,
+        Email.Status.BOUNCED: 5,
+    }
+
+    UPDATE_FIELDS = [
+        'status', 'status_detail', 'delivered_at', 'opened_at', 'opened_count',
+        'clicked_at', 'clicked_links', 'updated_at',
+    ]
+
+    BATCH_SIZE = 500
+    # Events for unknown message IDs are retried (the send may not be saved yet)
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = timedelta(minutes=1)
+
     @staticmethod
-    def handle_event(event_data: Dict[str, Any]) -> bool:
+    def enqueue(payload: Any) -> int:
         """
-        Verarbeite Brevo Webhook Event.
-        
+        Speichere Brevo Webhook Events in der Inbox.
+
         Events:
         - delivered: Email zugestellt
         - opened: Email geöffnet (+ opened_count)
@@ -27,254 +64,248 @@ class BrevoWebhookHandler:
         - hard_bounce: Permanenter Fehler
         - spam: Als Spam markiert
         - unsubscribed: Abgemeldet
-        - inbound: Eingehende Email (Inbound Parsing)
-        
+
+        Inbound-Events (Inbound Parsing) sind noch nicht implementiert und
+        werden nicht gespeichert.
+
         Args:
-            event_data: Webhook event data from Brevo
-            
+            payload: Webhook event data from Brevo (single event or list)
+
         Returns:
-            True if event was handled successfully, False otherwise
+            Number of accepted events (retried duplicates included)
         """
-        event_type = event_data.get('event')
-        
-        if not event_type:
-            logger.warning("No event type in webhook data")
-            return False
-        
-        logger.info(f"Processing Brevo webhook event: {event_type}")
-        
-        # Route to appropriate handler
-        handlers = {
-            'delivered': BrevoWebhookHandler._handle_delivered,
-            'opened': BrevoWebhookHandler._handle_opened,
-            'click': BrevoWebhookHandler._handle_click,
-            'soft_bounce': BrevoWebhookHandler._handle_soft_bounce,
-            'hard_bounce': BrevoWebhookHandler._handle_hard_bounce,
-            'spam': BrevoWebhookHandler._handle_spam,
-            'unsubscribed': BrevoWebhookHandler._handle_unsubscribed,
-            'inbound': BrevoWebhookHandler._handle_inbound_email,
-        }
-        
-        handler = handlers.get(event_type)
-        if handler:
-            return handler(event_data)
-        else:
-            logger.warning(f"Unknown event type: {event_type}")
-            return False
-    
+        events = payload if isinstance(payload, list) else [payload]
+
+        rows = []
+        for event_data in events:
+            if not isinstance(event_data, dict) or not event_data.get('event'):
+                logger.warning("No event type in webhook data")
+                continue
+
+            event_type = event_data['event']
+            if event_type not in BrevoWebhookHandler.EVENT_TYPES:
+                logger.warning(f"Unknown or unsupported event type: {event_type}")
+                continue
+
+            rows.append(BrevoWebhookEvent(
+                event=event_type,
+                message_id=str(event_data.get('message-id') or '')[:255],
+                dedup_key=hashlib.sha256(
+                    json.dumps(event_data, sort_keys=True, default=str).encode('utf-8')
+                ).hexdigest(),
+                payload=event_data,
+            ))
+
+        if rows:
+            BrevoWebhookEvent.objects.bulk_create(rows, ignore_conflicts=True)
+        return len(rows)
+
     @staticmethod
-    def _find_email_by_message_id(message_id: str) -> Optional[Email]:
+    def process_batch(batch_size: Optional[int] = None) -> Dict[str, int]:
         """
-        Find email by Brevo message ID.
-        
+        Verarbeite einen Batch offener Events aus der Inbox.
+
         Args:
-            message_id: Brevo message ID
-            
+            batch_size: Maximum number of events (default: BATCH_SIZE)
+
         Returns:
-            Email instance or None
+            Dict with counts of 'claimed', 'processed', 'retried' and 'failed' events
         """
-        try:
-            return Email.objects.get(brevo_message_id=message_id)
-        except Email.DoesNotExist:
-            logger.warning(f"Email not found for message_id: {message_id}")
-            return None
-        except Email.MultipleObjectsReturned:
-            logger.warning(f"Multiple emails found for message_id: {message_id}")
-            return Email.objects.filter(brevo_message_id=message_id).first()
-    
-    @staticmethod
-    def _handle_delivered(event_data: Dict[str, Any]) -> bool:
-        """Handle delivered event."""
-        message_id = event_data.get('message-id')
-        if not message_id:
-            return False
-        
-        email = BrevoWebhookHandler._find_email_by_message_id(message_id)
-        if not email:
-            return False
-        
-        email.status = Email.Status.DELIVERED
-        email.delivered_at = timezone.now()
-        
-        # Extract timestamp from event if available
-        if 'ts_event' in event_data:
-            try:
-                email.delivered_at = parse_datetime(event_data['ts_event']) or timezone.now()
-            except:
-                pass
-        
-        email.save(update_fields=['status', 'delivered_at'])
-        logger.info(f"Email {email.id} marked as delivered")
-        return True
-    
-    @staticmethod
-    def _handle_opened(event_data: Dict[str, Any]) -> bool:
-        """Handle opened event."""
-        message_id = event_data.get('message-id')
-        if not message_id:
-            return False
-        
-        email = BrevoWebhookHandler._find_email_by_message_id(message_id)
-        if not email:
-            return False
-        
-        # Update status and increment open count
-        email.status = Email.Status.OPENED
-        email.opened_count += 1
-        
-        # Set opened_at on first open
-        if not email.opened_at:
-            email.opened_at = timezone.now()
-            
-            # Extract timestamp from event if available
-            if 'ts_event' in event_data:
-                try:
-                    email.opened_at = parse_datetime(event_data['ts_event']) or timezone.now()
-                except:
-                    pass
-        
-        email.save(update_fields=['status', 'opened_at', 'opened_count'])
-        logger.info(f"Email {email.id} opened (count: {email.opened_count})")
-        return True
-    
-    @staticmethod
-    def _handle_click(event_data: Dict[str, Any]) -> bool:
-        """Handle click event."""
-        message_id = event_data.get('message-id')
-        if not message_id:
-            return False
-        
-        email = BrevoWebhookHandler._find_email_by_message_id(message_id)
-        if not email:
-            return False
-        
-        # Update status
-        email.status = Email.Status.CLICKED
-        
-        # Set clicked_at on first click
-        if not email.clicked_at:
-            email.clicked_at = timezone.now()
-            
-            # Extract timestamp from event if available
-            if 'ts_event' in event_data:
-                try:
-                    email.clicked_at = parse_datetime(event_data['ts_event']) or timezone.now()
-                except:
-                    pass
-        
-        # Add clicked link to list
-        url = event_data.get('link', '')
-        if url:
-            click_data = {
-                'url': url,
-                'clicked_at': timezone.now().isoformat()
-            }
-            
-            # Extract timestamp from event if available
-            if 'ts_event' in event_data:
+        stats = {'claimed': 0, 'processed': 0, 'retried': 0, 'failed': 0}
+        now = timezone.now()
+
+        with transaction.atomic():
+            # skip_locked lets several consumers run side by side (no-op on SQLite)
+            events = list(
+                BrevoWebhookEvent.objects.select_for_update(skip_locked=True).filter(
+                    processed_at__isnull=True,
+                    available_at__lte=now,
+                ).order_by('id')[:batch_size or BrevoWebhookHandler.BATCH_SIZE]
+            )
+            if not events:
+                return stats
+            stats['claimed'] = len(events)
+
+            # One query for all emails of the batch; first match per message ID
+            message_ids = {event.message_id for event in events if event.message_id}
+            emails = {}
+            for email in Email.objects.select_for_update().filter(
+                brevo_message_id__in=message_ids
+            ).order_by('created_at', 'pk'):
+                emails.setdefault(email.brevo_message_id, email)
+
+            changed = {}
+            done, missing, errors = [], [], {}
+            for event in events:
+                email = emails.get(event.message_id)
                 try:
-                    dt = parse_datetime(event_data['ts_event'])
-                    if dt:
-                        click_data['clicked_at'] = dt.isoformat()
-                except:
-                    pass
-            
-            email.clicked_links.append(click_data)
-        
-        email.save(update_fields=['status', 'clicked_at', 'clicked_links'])
-        logger.info(f"Email {email.id} link clicked: {url}")
-        return True
-    
+                    applied = BrevoWebhookHandler._apply(event.payload, email, event.received_at)
+                except Exception as e:
+                    logger.error(f"Error processing webhook event {event.id}: {e}")
+                    errors.setdefault(str(e)[:500], []).append(event.id)
+                    continue
+                if applied:
+                    done.append(event.id)
+                    if email is not None:
+                        changed[email.pk] = email
+                else:
+                    missing.append(event)
+
+            if changed:
+                for email in changed.values():
+                    email.updated_at = now
+                Email.objects.bulk_update(list(changed.values()), BrevoWebhookHandler.UPDATE_FIELDS)
+
+            BrevoWebhookEvent.objects.filter(pk__in=done).update(
+                processed_at=now, attempts=F('attempts') + 1, error=''
+            )
+            for error, ids in errors.items():
+                BrevoWebhookEvent.objects.filter(pk__in=ids).update(
+                    processed_at=now, attempts=F('attempts') + 1, error=error
+                )
+
+            give_up = [e.id for e in missing if e.attempts + 1 >= BrevoWebhookHandler.MAX_ATTEMPTS]
+            retry = [e.id for e in missing if e.attempts + 1 < BrevoWebhookHandler.MAX_ATTEMPTS]
+            if give_up:
+                BrevoWebhookEvent.objects.filter(pk__in=give_up).update(
+                    processed_at=now, attempts=F('attempts') + 1, error='Email not found'
+                )
+            if retry:
+                BrevoWebhookEvent.objects.filter(pk__in=retry).update(
+                    available_at=now + BrevoWebhookHandler.RETRY_DELAY,
+                    attempts=F('attempts') + 1,
+                    error='Email not found',
+                )
+
+        stats['processed'] = len(done)
+        stats['retried'] = len(retry)
+        stats['failed'] = len(give_up) + sum(len(ids) for ids in errors.values())
+        if give_up:
+            logger.warning(f"{len(give_up)} webhook events dropped: email not found")
+        logger.info(
+            f"Processed {len(done)} Brevo webhook events for {len(changed)} emails "
+            f"({len(retry)} retried, {stats['failed']} failed)"
+        )
+        return stats
+
     @staticmethod
-    def _handle_soft_bounce(event_data: Dict[str, Any]) -> bool:
-        """Handle soft bounce event (temporary failure)."""
-        message_id = event_data.get('message-id')
-        if not message_id:
-            return False
-        
-        email = BrevoWebhookHandler._find_email_by_message_id(message_id)
-        if not email:
-            return False
-        
-        # Don't change status to bounced for soft bounces (might be retried)
-        # Just log the error details
-        error = event_data.get('error', 'Soft bounce')
-        email.status_detail = f"Soft bounce: {error}"
-        email.save(update_fields=['status_detail'])
-        
-        logger.warning(f"Email {email.id} soft bounced: {error}")
-        return True
-    
+    def drain(batch_size: Optional[int] = None, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Verarbeite Batches, bis keine fälligen Events mehr offen sind.
+
+        Returns:
+            Summed counts of all batches (see process_batch)
+        """
+        totals = {'claimed': 0, 'processed': 0, 'retried': 0, 'failed': 0}
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            stats = BrevoWebhookHandler.process_batch(batch_size)
+            if not stats['claimed']:
+                break
+            for key, value in stats.items():
+                totals[key] += value
+            batches += 1
+        return totals
+
     @staticmethod
-    def _handle_hard_bounce(event_data: Dict[str, Any]) -> bool:
-        """Handle hard bounce event (permanent failure)."""
-        message_id = event_data.get('message-id')
-        if not message_id:
-            return False
-        
-        email = BrevoWebhookHandler._find_email_by_message_id(message_id)
-        if not email:
-            return False
-        
-        email.status = Email.Status.BOUNCED
-        error = event_data.get('error', 'Hard bounce')
-        email.status_detail = f"Hard bounce: {error}"
-        email.save(update_fields=['status', 'status_detail'])
-        
-        logger.error(f"Email {email.id} hard bounced: {error}")
-        return True
-    
+    def purge_processed(older_than: timedelta) -> int:
+        """Delete processed inbox rows older than `older_than`"""
+        deleted, _ = BrevoWebhookEvent.objects.filter(
+            processed_at__lt=timezone.now() - older_than
+        ).delete()
+        return deleted
+
     @staticmethod
-    def _handle_spam(event_data: Dict[str, Any]) -> bool:
-        """Handle spam complaint event."""
-        message_id = event_data.get('message-id')
-        if not message_id:
-            return False
-        
-        email = BrevoWebhookHandler._find_email_by_message_id(message_id)
-        if not email:
-            return False
-        
-        email.status_detail = "Marked as spam by recipient"
-        email.save(update_fields=['status_detail'])
-        
-        logger.warning(f"Email {email.id} marked as spam")
-        return True
-    
+    def _event_time(event_data: Dict[str, Any], default: datetime) -> datetime:
+        """Event timestamp from ts_epoch (ms) or ts_event, else `default`"""
+        epoch = event_data.get('ts_epoch')
+        if epoch:
+            try:
+                return datetime.fromtimestamp(int(epoch) / 1000, tz=dt_timezone.utc)
+            except (TypeError, ValueError, OverflowError, OSError):
+                pass
+
+        ts_event = event_data.get('ts_event')
+        if ts_event:
+            try:
+                if isinstance(ts_event, (int, float)) or str(ts_event).isdigit():
+                    return datetime.fromtimestamp(int(ts_event), tz=dt_timezone.utc)
+                dt = parse_datetime(str(ts_event))
+                if dt:
+                    return dt if timezone.is_aware(dt) else timezone.make_aware(dt)
+            except (TypeError, ValueError, OverflowError, OSError):
+                pass
+
+        return default
+
     @staticmethod
-    def _handle_unsubscribed(event_data: Dict[str, Any]) -> bool:
-        """Handle unsubscribe event."""
-        email_address = event_data.get('email')
-        
-        if email_address:
-            logger.info(f"User unsubscribed: {email_address}")
-            # You could add logic here to update lead preferences
-        
-        return True
-    
+    def _promote(email: Email, status: str):
+        rank = BrevoWebhookHandler.STATUS_RANK
+        if rank[status] > rank.get(email.status, 0):
+            email.status = status
+
     @staticmethod
-    def _handle_inbound_email(event_data: Dict[str, Any]) -> bool:
+    def _apply(event_data: Dict[str, Any], email: Optional[Email], received_at: datetime) -> bool:
         """
-        Handle inbound email from Brevo Inbound Parsing.
-        
-        This would create a new Email record from incoming email data.
-        Note: This requires Brevo Inbound Email Parsing to be configured.
-        
-        Args:
-            event_data: Inbound email data from Brevo
-            
+        Apply one event to an (unsaved) email.
+
         Returns:
-            True if email was processed successfully
+            False if the event needs an email that was not found, True otherwise
         """
-        logger.info("Received inbound email via Brevo")
-        
-        # TODO: Implement inbound email parsing
-        # This would involve:
-        # 1. Parse email data from event_data
-        # 2. Find appropriate EmailAccount
-        # 3. Create Email record
-        # 4. Find/create conversation
-        # 5. Link to lead if applicable
-        
-        logger.warning("Inbound email handling not yet implemented")
-        return False
+        event_type = event_data.get('event')
+
+        if event_type == 'unsubscribed':
+            email_address = event_data.get('email')
+            if email_address:
+                logger.info(f"User unsubscribed: {email_address}")
+                # You could add logic here to update lead preferences
+            return True
+
+        if email is None:
+            return False
+
+        event_time = BrevoWebhookHandler._event_time(event_data, received_at)
+
+        if event_type == 'delivered':
+            BrevoWebhookHandler._promote(email, Email.Status.DELIVERED)
+            if not email.delivered_at:
+                email.delivered_at = event_time
+
+        elif event_type == 'opened':
+            BrevoWebhookHandler._promote(email, Email.Status.OPENED)
+            email.opened_count += 1
+            # Set opened_at on first open
+            if not email.opened_at:
+                email.opened_at = event_time
+
+        elif event_type == 'click':
+            BrevoWebhookHandler._promote(email, Email.Status.CLICKED)
+            # Set clicked_at on first click
+            if not email.clicked_at:
+                email.clicked_at = event_time
+
+            # Add clicked link to list
+            url = event_data.get('link', '')
+            if url:
+                email.clicked_links.append({
+                    'url': url,
+                    'clicked_at': event_time.isoformat()
+                })
+
+        elif event_type == 'soft_bounce':
+            # Don't change status to bounced for soft bounces (might be retried)
+            error = event_data.get('error', 'Soft bounce')
+            email.status_detail = f"Soft bounce: {error}"
+            logger.warning(f"Email {email.id} soft bounced: {error}")
+
+        elif event_type == 'hard_bounce':
+            BrevoWebhookHandler._promote(email, Email.Status.BOUNCED)
+            error = event_data.get('error', 'Hard bounce')
+            email.status_detail = f"Hard bounce: {error}"
+            logger.error(f"Email {email.id} hard bounced: {error}")
+
+        elif event_type == 'spam':
+            email.status_detail = "Marked as spam by recipient"
+            logger.warning(f"Email {email.id} marked as spam")
+
+        return True
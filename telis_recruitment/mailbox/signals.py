@@ -0,0 +1,37 @@
+"""
+Django Signals für das Postfach (Invalidierung der Ungelesen-Zähler)
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import EmailAccount, EmailConversation
+from .services.unread_counts import invalidate_account, invalidate_user_accounts
+
+# Nur diese Felder bestimmen, welche Konten ein Benutzer sieht
+_ACCOUNT_ACCESS_FIELDS = {'is_active', 'owner'}
+
+
+@receiver(post_save, sender=EmailConversation)
+@receiver(post_delete, sender=EmailConversation)
+def conversation_changed(sender, instance, **kwargs):
+    """Zähler des Kontos verwerfen, wenn sich Lesestatus/Status einer Konversation ändert."""
+    invalidate_account(instance.account_id)
+
+
+@receiver(post_save, sender=EmailAccount)
+def account_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Konto-Zuordnungen verwerfen, wenn ein Konto angelegt oder freigegeben/deaktiviert wird.
+    
+    Sync-Updates (z.B. nur last_sync_at) lassen den Cache unberührt.
+    """
+    if created or update_fields is None or _ACCOUNT_ACCESS_FIELDS & set(update_fields):
+        invalidate_user_accounts()
+
+
+@receiver(post_delete, sender=EmailAccount)
+@receiver(m2m_changed, sender=EmailAccount.shared_with.through)
+def account_access_changed(sender, **kwargs):
+    """Konto gelöscht oder Freigaben geändert."""
+    if kwargs.get('action', 'post_').startswith('post_'):
+        invalidate_user_accounts()
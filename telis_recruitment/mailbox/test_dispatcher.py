@@ -0,0 +1,244 @@
+"""Tests for the outbound EmailDispatcher against a local SMTP sink"""
+from django.test import TestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from unittest.mock import patch, MagicMock
+import email as email_lib
+import smtplib
+import socketserver
+import threading
+
+from mailbox.models import EmailAccount, EmailConversation, Email
+from mailbox.services.dispatcher import EmailDispatcher, RateLimiter
+from mailbox.services.email_sender import EmailSenderService
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts everything except RCPT to reject@..."""
+
+    def handle(self):
+        sink = self.server.sink
+        with sink.lock:
+            sink.connections += 1
+        self.wfile.write(b'220 sink ESMTP\r\n')
+        in_data = False
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            if in_data:
+                if line == b'.\r\n':
+                    with sink.lock:
+                        sink.messages.append(email_lib.message_from_bytes(b''.join(lines)))
+                    lines = []
+                    in_data = False
+                    self.wfile.write(b'250 OK queued\r\n')
+                else:
+                    lines.append(line[1:] if line.startswith(b'..') else line)
+                continue
+            command = line.strip().upper()
+            if command.startswith(b'EHLO'):
+                self.wfile.write(b'250-sink\r\n250 8BITMIME\r\n')
+            elif command.startswith(b'RCPT TO') and b'REJECT@' in command:
+                self.wfile.write(b'550 No such user\r\n')
+            elif command.startswith((b'HELO', b'MAIL FROM', b'RCPT TO', b'RSET', b'NOOP')):
+                self.wfile.write(b'250 OK\r\n')
+            elif command == b'DATA':
+                in_data = True
+                self.wfile.write(b'354 End data with <CR><LF>.<CR><LF>\r\n')
+            elif command == b'QUIT':
+                self.wfile.write(b'221 Bye\r\n')
+                break
+            else:
+                self.wfile.write(b'502 Not implemented\r\n')
+
+
+class SMTPSink:
+    """Threaded local SMTP server recording connections and messages"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPSinkHandler)
+        self.server.daemon_threads = True
+        self.server.sink = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def message_ids(self):
+        return [msg['Message-ID'] for msg in self.messages]
+
+
+class EmailDispatcherTest(TestCase):
+    """Test EmailDispatcher connection reuse, concurrency and resume"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.sink = SMTPSink().__enter__()
+        self.addCleanup(self.sink.__exit__, None, None, None)
+        self.account = EmailAccount.objects.create(
+            name='SMTP Account',
+            email_address='sender@example.com',
+            account_type='imap_smtp',
+            owner=self.user,
+            is_active=True,
+            smtp_host='127.0.0.1',
+            smtp_port=self.sink.port,
+            smtp_use_tls=False,
+        )
+        self.conversation = EmailConversation.objects.create(
+            account=self.account,
+            subject='Campaign',
+            subject_normalized='Campaign',
+            contact_email='contact@example.com',
+            last_message_at=timezone.now(),
+        )
+        # Plain SMTP against the local sink instead of implicit TLS
+        patcher = patch('mailbox.services.email_sender.smtplib.SMTP_SSL', smtplib.SMTP)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create_emails(self, count, status=Email.Status.QUEUED, recipient='user{}@example.com'):
+        return [
+            Email.objects.create(
+                conversation=self.conversation,
+                account=self.account,
+                direction=Email.Direction.OUTBOUND,
+                message_id=f'<campaign-{i}-{recipient.format(i)}>',
+                from_email='sender@example.com',
+                to_emails=[{'email': recipient.format(i), 'name': ''}],
+                subject=f'Hello {i}',
+                body_text=f'Body {i}',
+                status=status,
+            )
+            for i in range(count)
+        ]
+
+    def test_batch_reuses_connections_and_sends_each_email_once(self):
+        """All emails go out once over at most max_workers connections"""
+        emails = self._create_emails(20)
+
+        dispatcher = EmailDispatcher(EmailSenderService(self.account), max_workers=3, rate_per_second=0)
+        results = dispatcher.dispatch(emails)
+
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(results.values()))
+        self.assertEqual(sorted(self.sink.message_ids()), sorted(e.message_id for e in emails))
+        self.assertLessEqual(self.sink.connections, 3)
+        self.assertEqual(Email.objects.filter(status=Email.Status.SENT, sent_at__isnull=False).count(), 20)
+
+    def test_send_batch_emails_uses_dispatcher(self):
+        """EmailSenderService.send_batch_emails delegates to the dispatcher"""
+        emails = self._create_emails(3)
+
+        results = EmailSenderService(self.account).send_batch_emails(emails)
+
+        self.assertEqual(results, {e.id: True for e in emails})
+        self.assertEqual(len(self.sink.messages), 3)
+
+    def test_resume_skips_already_sent_emails(self):
+        """A resumed batch does not resend emails persisted as sent"""
+        emails = self._create_emails(6)
+        Email.objects.filter(pk__in=[e.pk for e in emails[:4]]).update(status=Email.Status.SENT)
+
+        results = EmailDispatcher(EmailSenderService(self.account), rate_per_second=0).dispatch(emails)
+
+        self.assertTrue(all(results.values()))
+        self.assertEqual(sorted(self.sink.message_ids()), sorted(e.message_id for e in emails[4:]))
+
+    def test_interrupted_sends_only_retried_on_request(self):
+        """Emails left in SENDING may have gone out and are not resent by default"""
+        emails = self._create_emails(2, status=Email.Status.SENDING)
+
+        results = EmailDispatcher(EmailSenderService(self.account), rate_per_second=0).dispatch(emails)
+        self.assertEqual(set(results.values()), {False})
+        self.assertEqual(self.sink.messages, [])
+
+        results = EmailDispatcher(
+            EmailSenderService(self.account), rate_per_second=0, retry_interrupted=True
+        ).dispatch(emails)
+        self.assertEqual(set(results.values()), {True})
+        self.assertEqual(len(self.sink.messages), 2)
+
+    def test_rejected_recipient_fails_only_that_email(self):
+        """A refused recipient marks its email failed and keeps the connection"""
+        emails = self._create_emails(3)
+        emails += self._create_emails(1, recipient='reject@example.com')
+
+        results = EmailDispatcher(
+            EmailSenderService(self.account), max_workers=1, rate_per_second=0
+        ).dispatch(emails)
+
+        self.assertEqual(sum(results.values()), 3)
+        rejected = Email.objects.get(pk=emails[-1].pk)
+        self.assertEqual(rejected.status, Email.Status.FAILED)
+        self.assertIn('reject@example.com', rejected.status_detail)
+        self.assertEqual(self.sink.connections, 1)
+
+    def test_inactive_account_fails_without_connecting(self):
+        """Inactive accounts fail all emails like send_email does"""
+        self.account.is_active = False
+        self.account.save()
+        emails = self._create_emails(2)
+
+        results = EmailDispatcher(EmailSenderService(self.account)).dispatch(emails)
+
+        self.assertEqual(set(results.values()), {False})
+        self.assertEqual(self.sink.connections, 0)
+        self.assertEqual(Email.objects.filter(status_detail='Account is not active').count(), 2)
+
+    @patch('mailbox.services.email_sender.BREVO_AVAILABLE', True)
+    def test_brevo_reuses_one_api_client_and_stores_message_ids(self):
+        """Brevo sends share one API client and persist the Brevo message ID"""
+        self.account.account_type = EmailAccount.AccountType.BREVO
+        self.account.save()
+        emails = self._create_emails(5)
+
+        api = MagicMock()
+        counter = iter(range(100))
+        api.send_transac_email.side_effect = lambda payload: MagicMock(message_id=f'brevo-{next(counter)}')
+        sender = EmailSenderService(self.account)
+
+        with patch.object(sender, '_create_brevo_api', return_value=api) as create_api, \
+                patch.object(sender, '_build_brevo_email', side_effect=lambda email, attachments: email.pk):
+            results = EmailDispatcher(sender, max_workers=2, rate_per_second=0).dispatch(emails)
+
+        self.assertTrue(all(results.values()))
+        create_api.assert_called_once_with(pool_size=2)
+        self.assertEqual(api.send_transac_email.call_count, 5)
+        self.assertEqual(Email.objects.exclude(brevo_message_id='').count(), 5)
+
+
+class RateLimiterTest(TestCase):
+    """Test RateLimiter token bucket"""
+
+    def test_acquire_waits_for_rate(self):
+        """Five acquisitions at 2/s take two seconds of waiting"""
+        now = [0.0]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(2.0, clock=lambda: now[0], sleep=fake_sleep)
+        for _ in range(5):
+            limiter.acquire()
+
+        self.assertAlmostEqual(sum(sleeps), 2.0)
+
+    def test_zero_rate_disables_limit(self):
+        """A rate of zero never sleeps"""
+        limiter = RateLimiter(0, sleep=lambda seconds: self.fail('should not sleep'))
+        for _ in range(10):
+            limiter.acquire()
@@ -0,0 +1,175 @@
+"""Tests for the Brevo webhook inbox and its batched consumer"""
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from io import StringIO
+
+from mailbox.models import BrevoWebhookEvent, EmailAccount, EmailConversation, Email
+from mailbox.services.webhook_handlers import BrevoWebhookHandler
+
+
+class BrevoWebhookInboxTest(TestCase):
+    """Webhook requests only queue events; the consumer applies them in batches"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.account = EmailAccount.objects.create(
+            name='Brevo Account',
+            email_address='sender@example.com',
+            account_type='brevo',
+            owner=self.user,
+        )
+        self.conversation = EmailConversation.objects.create(
+            account=self.account,
+            subject='Campaign',
+            subject_normalized='Campaign',
+            contact_email='contact@example.com',
+            last_message_at=timezone.now(),
+        )
+        self.url = reverse('mailbox:brevo-webhook')
+
+    def _create_emails(self, count):
+        return Email.objects.bulk_create([
+            Email(
+                conversation=self.conversation,
+                account=self.account,
+                direction=Email.Direction.OUTBOUND,
+                message_id=f'<campaign-{i}@example.com>',
+                brevo_message_id=f'brevo-{i}',
+                from_email='sender@example.com',
+                to_emails=[{'email': f'user{i}@example.com', 'name': ''}],
+                subject=f'Hello {i}',
+                body_text=f'Body {i}',
+                status=Email.Status.SENT,
+            )
+            for i in range(count)
+        ])
+
+    def test_webhook_queues_without_touching_emails(self):
+        self._create_emails(1)
+        event = {'event': 'opened', 'message-id': 'brevo-0', 'ts_epoch': 1760000000000}
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, event, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'success': True, 'queued': 1})
+        self.assertFalse(any('mailbox_email"' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(Email.objects.get().opened_count, 0)
+
+        # Brevo retries the same payload: acknowledged, but stored once
+        self.client.post(self.url, event, content_type='application/json')
+        self.assertEqual(BrevoWebhookEvent.objects.count(), 1)
+
+        response = self.client.post(self.url, {'event': 'inbound'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'foo': 'bar'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_events_are_coalesced_per_email(self):
+        self._create_emails(2)
+        BrevoWebhookHandler.enqueue([
+            {'event': 'click', 'message-id': 'brevo-0', 'link': 'https://example.com/a',
+             'ts_event': '2026-01-01T10:05:00+00:00'},
+            {'event': 'opened', 'message-id': 'brevo-0', 'ts_event': '2026-01-01T10:00:00+00:00'},
+            {'event': 'opened', 'message-id': 'brevo-0', 'ts_event': '2026-01-01T11:00:00+00:00'},
+            # Delivered arrives late and must not downgrade the status
+            {'event': 'delivered', 'message-id': 'brevo-0', 'ts_event': '2026-01-01T09:00:00+00:00'},
+            {'event': 'hard_bounce', 'message-id': 'brevo-1', 'error': 'mailbox unavailable'},
+            {'event': 'unsubscribed', 'email': 'user0@example.com'},
+        ])
+
+        stats = BrevoWebhookHandler.process_batch()
+        self.assertEqual(stats, {'claimed': 6, 'processed': 6, 'retried': 0, 'failed': 0})
+
+        first = Email.objects.get(brevo_message_id='brevo-0')
+        self.assertEqual(first.status, Email.Status.CLICKED)
+        self.assertEqual(first.opened_count, 2)
+        self.assertEqual(first.opened_at.isoformat(), '2026-01-01T10:00:00+00:00')
+        self.assertEqual(first.delivered_at.isoformat(), '2026-01-01T09:00:00+00:00')
+        self.assertEqual(first.clicked_links, [
+            {'url': 'https://example.com/a', 'clicked_at': '2026-01-01T10:05:00+00:00'}
+        ])
+        bounced = Email.objects.get(brevo_message_id='brevo-1')
+        self.assertEqual(bounced.status, Email.Status.BOUNCED)
+        self.assertEqual(bounced.status_detail, 'Hard bounce: mailbox unavailable')
+
+        self.assertFalse(BrevoWebhookEvent.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(BrevoWebhookHandler.process_batch()['claimed'], 0)
+
+    def test_unknown_message_id_is_retried_then_dropped(self):
+        BrevoWebhookHandler.enqueue({'event': 'delivered', 'message-id': 'not-sent-yet'})
+
+        self.assertEqual(BrevoWebhookHandler.process_batch()['retried'], 1)
+        # Not due again before RETRY_DELAY
+        self.assertEqual(BrevoWebhookHandler.process_batch()['claimed'], 0)
+
+        # The send is saved in the meantime
+        self._create_emails(1)
+        Email.objects.update(brevo_message_id='not-sent-yet')
+        BrevoWebhookEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(BrevoWebhookHandler.process_batch()['processed'], 1)
+        self.assertEqual(Email.objects.get().status, Email.Status.DELIVERED)
+
+        BrevoWebhookHandler.enqueue({'event': 'opened', 'message-id': 'never-sent'})
+        BrevoWebhookEvent.objects.filter(processed_at__isnull=True).update(
+            attempts=BrevoWebhookHandler.MAX_ATTEMPTS - 1
+        )
+        self.assertEqual(BrevoWebhookHandler.process_batch()['failed'], 1)
+        dropped = BrevoWebhookEvent.objects.get(message_id='never-sent')
+        self.assertIsNotNone(dropped.processed_at)
+        self.assertEqual(dropped.error, 'Email not found')
+
+    def test_command_drains_and_purges(self):
+        self._create_emails(1)
+        BrevoWebhookHandler.enqueue({'event': 'delivered', 'message-id': 'brevo-0'})
+        BrevoWebhookHandler.enqueue({'event': 'opened', 'message-id': 'brevo-0'})
+        BrevoWebhookEvent.objects.filter(event='opened').update(
+            processed_at=timezone.now() - timedelta(days=30)
+        )
+
+        out = StringIO()
+        call_command('process_webhook_events', stdout=out)
+        self.assertIn('Processed: 1', out.getvalue())
+        self.assertEqual(list(BrevoWebhookEvent.objects.values_list('event', flat=True)), ['delivered'])
+
+    def test_burst_throughput(self):
+        """Synthetic campaign burst: queries per batch do not grow with the events"""
+        emails, events_per_email = 200, 10
+        self._create_emails(emails)
+        burst = []
+        for i in range(emails):
+            burst.append({'event': 'delivered', 'message-id': f'brevo-{i}', 'ts_epoch': 1760000000000 + i})
+            for n in range(events_per_email - 2):
+                burst.append({'event': 'opened', 'message-id': f'brevo-{i}', 'ts_epoch': 1760000001000 + n})
+            burst.append({'event': 'click', 'message-id': f'brevo-{i}', 'link': 'https://example.com',
+                          'ts_epoch': 1760000002000 + i})
+
+        start = time.perf_counter()
+        for chunk in range(0, len(burst), 100):
+            response = self.client.post(self.url, burst[chunk:chunk + 100], content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+        ingest = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as ctx:
+            totals = BrevoWebhookHandler.drain(batch_size=1000)
+        drain = time.perf_counter() - start
+
+        self.assertEqual(totals['processed'], emails * events_per_email)
+        # Per batch: claim, email lookup, bulk_update, mark processed (+ savepoint/transaction)
+        self.assertLess(len(ctx.captured_queries), 40)
+        self.assertEqual(
+            set(Email.objects.values_list('status', 'opened_count')),
+            {(Email.Status.CLICKED, events_per_email - 2)},
+        )
+        print(
+            f"\n{len(burst)} events: ingest {len(burst) / ingest:.0f}/s, "
+            f"apply {len(burst) / drain:.0f}/s, {len(ctx.captured_queries)} queries"
+        )
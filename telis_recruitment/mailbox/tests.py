@@ -1,9 +1,15 @@
 """Tests for mailbox app"""
 from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
 from django.contrib.auth.models import User
 from django.core.exceptions import ImproperlyConfigured
 from .context_processors import unread_email_count
 from .models import EmailAccount, EmailConversation, Email
+from app_settings.models import SystemSettings, UserPreferences
+from .services.unread_counts import get_unread_count
 from .services.encryption import encrypt_string, decrypt_string
 from .services.email_sender import EmailSenderService
 from datetime import datetime
@@ -14,6 +20,7 @@ class UnreadEmailCountContextProcessorTest(TestCase):
     """Test unread_email_count context processor"""
     
     def setUp(self):
+        cache.clear()
         self.factory = RequestFactory()
         self.user = User.objects.create_user(username='testuser', password='testpass')
         
@@ -118,6 +125,127 @@ class UnreadEmailCountContextProcessorTest(TestCase):
         self.assertIsInstance(result['unread_email_count'], int)
 
 
+class UnreadCountCacheTest(TestCase):
+    """Test cached per-account unread counters and their invalidation"""
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.account = EmailAccount.objects.create(
+            name='Test Account',
+            email_address='test@example.com',
+            account_type='imap_smtp',
+            owner=self.user,
+            is_active=True
+        )
+    
+    def _conversation(self, n, **kwargs):
+        defaults = dict(
+            subject=f'Subject {n}',
+            subject_normalized=f'Subject {n}',
+            contact_email=f'contact{n}@example.com',
+            account=self.account,
+            status='open',
+            is_read=False,
+            last_message_at=datetime.now(),
+        )
+        defaults.update(kwargs)
+        return EmailConversation.objects.create(**defaults)
+    
+    def _count(self, user=None):
+        return get_unread_count(user or self.user)
+    
+    def test_context_value_is_lazy(self):
+        """Building the context does not query anything"""
+        request = self.factory.get('/')
+        request.user = self.user
+        with self.assertNumQueries(0):
+            unread_email_count(request)
+    
+    def test_warm_count_needs_no_queries(self):
+        """Accounts lookup and one grouped count when cold, nothing when warm"""
+        for n in range(3):
+            self._conversation(n)
+        with self.assertNumQueries(2):
+            self.assertEqual(self._count(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._count(), 3)
+    
+    def test_conversation_changes_update_count(self):
+        """Saving/deleting conversations refreshes the counter of their account"""
+        first = self._conversation(1)
+        second = self._conversation(2)
+        self.assertEqual(self._count(), 2)
+        
+        first.is_read = True
+        first.save(update_fields=['is_read'])
+        self.assertEqual(self._count(), 1)
+        
+        second.status = 'trash'
+        second.save()
+        self.assertEqual(self._count(), 0)
+        
+        third = self._conversation(3)
+        self.assertEqual(self._count(), 1)
+        third.delete()
+        self.assertEqual(self._count(), 0)
+    
+    def test_account_access_changes_update_mapping(self):
+        """Sharing and deactivation are picked up, sync updates keep the cache"""
+        other_user = User.objects.create_user(username='otheruser', password='testpass')
+        self._conversation(1)
+        self.assertEqual(self._count(other_user), 0)
+        
+        self.account.shared_with.add(other_user)
+        self.assertEqual(self._count(other_user), 1)
+        
+        self.account.last_sync_error = 'timeout'
+        self.account.save(update_fields=['last_sync_error'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self._count(other_user), 1)
+        
+        self.account.is_active = False
+        self.account.save(update_fields=['is_active'])
+        self.assertEqual(self._count(), 0)
+        self.assertEqual(self._count(other_user), 0)
+    
+    @override_settings(STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    })
+    def test_page_queries_for_badge_and_tracking_codes(self):
+        """A warm CRM page runs no queries for the badge or the tracking codes"""
+        self._conversation(1)
+        self.client.login(username='testuser', password='testpass')
+        url = reverse('app_settings:dashboard')
+        
+        def page_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, '1 ungelesene E-Mails')
+            return [q['sql'] for q in ctx.captured_queries]
+        
+        def badge_queries(queries):
+            return [
+                sql for sql in queries
+                if 'mailbox_emailconversation' in sql or 'app_settings_systemsettings' in sql
+            ]
+        
+        SystemSettings.get_settings()
+        UserPreferences.objects.create(user=self.user)
+        cache.clear()
+        
+        cold = page_queries()
+        warm = page_queries()
+        self.assertEqual(len(badge_queries(cold)), 2)  # settings, grouped count
+        self.assertEqual(badge_queries(warm), [])
+        # ... and the accounts lookup
+        self.assertEqual(len(warm), len(cold) - 3)
+        self.assertEqual(len(warm), 7)  # session, user, view queries
+
+
 class EncryptionServiceTest(TestCase):
     """Test encryption service security improvements"""
     
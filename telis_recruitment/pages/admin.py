@@ -480,17 +480,17 @@ class FileVersionInlineForUploadedFile(TabularInline):
 class FileVersionAdmin(ModelAdmin):
     """Admin interface for file versions"""
     
-    list_display = ['uploaded_file', 'version', 'created_by', 'created_at', 'note']
-    list_filter = ['created_at', 'created_by']
+    list_display = ['uploaded_file', 'version', 'is_snapshot', 'created_by', 'created_at', 'note']
+    list_filter = ['is_snapshot', 'created_at', 'created_by']
     search_fields = ['uploaded_file__relative_path', 'note']
-    readonly_fields = ['uploaded_file', 'version', 'content', 'created_at', 'created_by']
+    readonly_fields = ['uploaded_file', 'version', 'is_snapshot', 'full_content', 'created_at', 'created_by']
     
     fieldsets = [
         ('Version Information', {
-            'fields': ['uploaded_file', 'version', 'note']
+            'fields': ['uploaded_file', 'version', 'is_snapshot', 'note']
         }),
         ('Content', {
-            'fields': ['content'],
+            'fields': ['full_content'],
             'classes': ['collapse'],
         }),
         ('Metadata', {
@@ -501,6 +501,20 @@ class FileVersionAdmin(ModelAdmin):
     def has_add_permission(self, request):
         """Versions are created automatically"""
         return False
+    
+    def has_delete_permission(self, request, obj=None):
+        """Deltas depend on their predecessors; old versions are pruned by VersionService"""
+        return False
+    
+    def full_content(self, obj):
+        """Content reconstructed from snapshot and deltas"""
+        from .services.version_service import VersionService, VersionServiceError
+        try:
+            content = VersionService(obj.uploaded_file).get_content(obj.version)
+        except VersionServiceError:
+            return '-'
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', content)
+    full_content.short_description = 'Content'
 
 
 @admin.register(ProjectTemplate)
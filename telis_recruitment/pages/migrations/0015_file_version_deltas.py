@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-18 23:18
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def backfill_version_counters(apps, schema_editor):
+    """Start the per-file counter at the highest existing version."""
+    UploadedFile = apps.get_model('pages', 'UploadedFile')
+    FileVersion = apps.get_model('pages', 'FileVersion')
+    max_version = (
+        FileVersion.objects.filter(uploaded_file=OuterRef('pk'))
+        .values('uploaded_file')
+        .annotate(m=Max('version'))
+        .values('m')
+    )
+    UploadedFile.objects.filter(pk__in=FileVersion.objects.values('uploaded_file')).update(
+        version_counter=Subquery(max_version)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0014_alter_landingpage_og_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileversion',
+            name='delta',
+            field=models.BinaryField(blank=True, help_text='zlib-compressed line delta to the previous version', null=True),
+        ),
+        migrations.AddField(
+            model_name='fileversion',
+            name='is_snapshot',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='version_counter',
+            field=models.PositiveIntegerField(default=0, help_text='Last assigned FileVersion number'),
+        ),
+        migrations.AlterField(
+            model_name='fileversion',
+            name='content',
+            field=models.TextField(blank=True, help_text='Full file content (snapshots only)'),
+        ),
+        migrations.RunPython(backfill_version_counters, migrations.RunPython.noop),
+    ]
@@ -348,6 +348,8 @@ class UploadedFile(models.Model):
     file_type = models.CharField(max_length=50, blank=True,
                                 help_text="MIME type or file extension")
     file_size = models.PositiveIntegerField(default=0, help_text="File size in bytes")
+    version_counter = models.PositiveIntegerField(default=0,
+                                                  help_text="Last assigned FileVersion number")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -360,6 +362,16 @@ class UploadedFile(models.Model):
     
     def __str__(self):
         return f"{self.landing_page.slug}/{self.relative_path}"
+    
+    def save(self, *args, **kwargs):
+        # version_counter is owned by VersionService; a full save of a stale
+        # instance must not reset it
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'version_counter'
+            ]
+        super().save(*args, **kwargs)
 
 
 class DomainConfiguration(models.Model):
@@ -527,10 +539,19 @@ class PageTemplate(models.Model):
 
 
 class FileVersion(models.Model):
-    """Version history for uploaded files"""
+    """
+    Version history for uploaded files.
+    
+    Snapshots store the full content; the versions in between store a
+    compressed delta against their predecessor (see VersionService).
+    """
     uploaded_file = models.ForeignKey(UploadedFile, on_delete=models.CASCADE, 
                                      related_name='versions')
-    content = models.TextField(help_text="File content at this version")
+    content = models.TextField(blank=True,
+                               help_text="Full file content (snapshots only)")
+    is_snapshot = models.BooleanField(default=True)
+    delta = models.BinaryField(null=True, blank=True,
+                               help_text="zlib-compressed line delta to the previous version")
     version = models.PositiveIntegerField(help_text="Sequential version number")
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
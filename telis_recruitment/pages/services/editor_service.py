@@ -114,7 +114,7 @@ class EditorService:
             
             # Update file size
             uploaded_file.file_size = len(content.encode('utf-8'))
-            uploaded_file.save()
+            uploaded_file.save(update_fields=['file_size', 'updated_at'])
             
             return {
                 'success': True,
@@ -192,7 +192,7 @@ class EditorService:
             # Update database record
             uploaded_file.relative_path = new_path
             uploaded_file.original_filename = Path(new_path).name
-            uploaded_file.save()
+            uploaded_file.save(update_fields=['relative_path', 'original_filename', 'updated_at'])
             
             return {
                 'success': True,
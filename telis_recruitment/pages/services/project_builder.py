@@ -1,59 +1,121 @@
 """ProjectBuilder service for building and exporting projects"""
 import os
+import json
+import hashlib
+import tempfile
+import threading
+import time
 import zipfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from django.conf import settings
 from django.utils.text import slugify
 from ..models import Project, LandingPage, ProjectAsset, ProjectSettings, ProjectNavigation
 
 
+# Parallele Render-/Kopier-Jobs; override via settings.PAGES_BUILD_MAX_WORKERS
+DEFAULT_BUILD_WORKERS = 4
+
+# Hashes der Eingaben des letzten Builds, liegt im Build-Verzeichnis
+MANIFEST_FILENAME = '.build-manifest.json'
+MANIFEST_VERSION = 1
+
+# Seitenfelder, die in das gebaute HTML einfließen
+PAGE_HASH_FIELDS = ('slug', 'title', 'html', 'css', 'seo_title', 'seo_description', 'seo_image')
+PAGE_BUILD_FIELDS = ('id',) + PAGE_HASH_FIELDS
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class ProjectBuilderError(Exception):
     """Custom exception for project builder errors"""
     pass
 
 
 class ProjectBuilder:
-    """Baut ein Projekt zu einer statischen Website zusammen"""
+    """Baut ein Projekt inkrementell zu einer statischen Website zusammen"""
     
-    def __init__(self, project: Project):
+    def __init__(self, project: Project, max_workers: Optional[int] = None):
         self.project = project
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        self.build_dir = Path(settings.MEDIA_ROOT) / 'builds' / f"{project.slug}-{timestamp}"
+        self.build_dir = Path(settings.MEDIA_ROOT) / 'builds' / project.slug
+        self.max_workers = max(1, int(max_workers or getattr(settings, 'PAGES_BUILD_MAX_WORKERS', DEFAULT_BUILD_WORKERS)))
         self.errors = []
         self.warnings = []
         self.files_count = 0
         self.total_size = 0
+        self.rebuilt_files = []
+        self.reused_count = 0
+        self._lock = threading.Lock()
     
     def build(self) -> Dict:
-        """Hauptmethode: Baut das gesamte Projekt"""
+        """
+        Hauptmethode: Baut das Projekt.
+        
+        Nur Seiten und Assets, deren Eingaben sich laut Content-Hash seit dem
+        letzten Build geändert haben, werden neu gerendert bzw. kopiert; alle
+        anderen Dateien werden per Hardlink aus dem vorherigen Build übernommen.
+        Der Build entsteht in einem temporären Verzeichnis, das erst am Ende
+        gegen das bestehende Build getauscht wird.
+        """
+        started = time.monotonic()
+        self.build_dir.parent.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(prefix=f".{self.project.slug}-", dir=self.build_dir.parent))
         try:
-            # Erstelle Build-Verzeichnis
-            self.build_dir.mkdir(parents=True, exist_ok=True)
+            # mkdtemp legt das Verzeichnis nur für den Besitzer lesbar an
+            os.chmod(temp_dir, 0o755)
+            previous = self._load_manifest()
+            manifest = {}
             
-            # Kopiere alle Assets
-            self._copy_assets()
+            # Assets zuerst, Seiten überschreiben gleichnamige Dateien wie bisher
+            jobs = self._plan_assets(previous)
+            jobs.update(self._plan_pages(previous))
             
-            # Baue alle Seiten
-            self._build_pages()
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='project-build') as executor:
+                futures = {
+                    executor.submit(job, temp_dir, previous.get(path)): path
+                    for path, job in jobs.items()
+                }
+                for future in as_completed(futures):
+                    entry = future.result()
+                    if entry is not None:
+                        manifest[futures[future]] = entry
             
-            # Generiere sitemap.xml
-            self._generate_sitemap()
+            # Generiere sitemap.xml und robots.txt
+            manifest['sitemap.xml'] = self._generate_sitemap(temp_dir)
+            manifest['robots.txt'] = self._generate_robots_txt(temp_dir)
             
-            # Generiere robots.txt
-            self._generate_robots_txt()
+            self._write_manifest(temp_dir, manifest)
+            self._swap_build_dir(temp_dir)
             
+            self.files_count = len(manifest)
+            self.total_size = sum(entry['size'] for entry in manifest.values())
             return {
                 'success': True,
                 'build_dir': str(self.build_dir),
                 'files_count': self.files_count,
                 'total_size': self.total_size,
+                'rebuilt_files': sorted(self.rebuilt_files),
+                'reused_count': self.reused_count,
+                'build_time': time.monotonic() - started,
                 'errors': self.errors,
                 'warnings': self.warnings,
             }
         except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
             self.errors.append(str(e))
             return {
                 'success': False,
@@ -61,8 +123,58 @@ class ProjectBuilder:
                 'warnings': self.warnings,
             }
     
-    def _copy_assets(self):
-        """Kopiert alle globalen Assets ins Build-Verzeichnis"""
+    def _load_manifest(self) -> Dict[str, Dict]:
+        """Lädt die Hashes des vorherigen Builds (leer = Vollbuild)"""
+        manifest_path = self.build_dir / MANIFEST_FILENAME
+        try:
+            data = json.loads(manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION:
+            return {}
+        return data.get('files', {})
+    
+    def _write_manifest(self, target_dir: Path, files: Dict[str, Dict]):
+        manifest_path = target_dir / MANIFEST_FILENAME
+        manifest_path.write_text(
+            json.dumps({'version': MANIFEST_VERSION, 'files': files}, sort_keys=True),
+            encoding='utf-8'
+        )
+    
+    def _swap_build_dir(self, temp_dir: Path):
+        """Ersetzt das bestehende Build durch das fertige temporäre Verzeichnis"""
+        old_dir = None
+        if self.build_dir.exists():
+            old_dir = Path(tempfile.mkdtemp(prefix=f".{self.project.slug}-old-", dir=self.build_dir.parent))
+            os.replace(self.build_dir, old_dir / 'build')
+        os.replace(temp_dir, self.build_dir)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    
+    def _reuse(self, path: str, target_dir: Path, entry: Optional[Dict], input_hash: str) -> Optional[Dict]:
+        """Übernimmt eine unveränderte Datei aus dem vorherigen Build"""
+        if not entry or entry.get('hash') != input_hash:
+            return None
+        source = self.build_dir / path
+        if not source.is_file():
+            return None
+        target = target_dir / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        with self._lock:
+            self.reused_count += 1
+        return entry
+    
+    def _mark_rebuilt(self, path: str):
+        with self._lock:
+            self.rebuilt_files.append(path)
+    
+    def _plan_assets(self, previous: Dict[str, Dict]) -> Dict[str, Callable]:
+        """Erstellt Kopier-Jobs für alle globalen Assets"""
+        jobs = {}
         assets = ProjectAsset.objects.filter(project=self.project)
         
         for asset in assets:
@@ -70,30 +182,51 @@ class ProjectBuilder:
                 continue
             
             try:
-                # Ziel-Pfad im Build-Verzeichnis
-                target_path = self.build_dir / asset.relative_path
-                target_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                # Kopiere Datei
                 source_path = Path(asset.file.path)
-                if source_path.exists():
-                    shutil.copy2(source_path, target_path)
-                    self.files_count += 1
-                    self.total_size += source_path.stat().st_size
-                else:
-                    self.warnings.append(f"Asset file not found: {asset.name}")
             except Exception as e:
                 self.warnings.append(f"Failed to copy asset {asset.name}: {str(e)}")
+                continue
+            jobs[asset.relative_path] = partial(self._copy_asset, asset.relative_path, asset.name, source_path)
+        
+        return jobs
+    
+    def _copy_asset(self, path: str, name: str, source_path: Path,
+                    target_dir: Path, entry: Optional[Dict]) -> Optional[Dict]:
+        """Worker: Kopiert ein Asset, sofern sich sein Inhalt geändert hat"""
+        try:
+            if not source_path.exists():
+                with self._lock:
+                    self.warnings.append(f"Asset file not found: {name}")
+                return None
+            
+            stat = source_path.stat()
+            source = {'source': str(source_path), 'source_size': stat.st_size, 'source_mtime_ns': stat.st_mtime_ns}
+            # Unveränderte Stat-Daten: gespeicherten Hash übernehmen statt neu zu lesen
+            if entry and all(entry.get(key) == value for key, value in source.items()):
+                content_hash = entry['hash']
+            else:
+                content_hash = _hash_file(source_path)
+            
+            new_entry = dict(source, hash=content_hash, size=stat.st_size)
+            if self._reuse(path, target_dir, entry, content_hash):
+                return new_entry
+            
+            target_path = target_dir / path
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_path, target_path)
+            self._mark_rebuilt(path)
+            return new_entry
+        except Exception as e:
+            with self._lock:
+                self.warnings.append(f"Failed to copy asset {name}: {str(e)}")
+            return None
     
-    def _build_pages(self):
-        """Baut alle published Pages des Projekts als HTML-Dateien"""
+    def _plan_pages(self, previous: Dict[str, Dict]) -> Dict[str, Callable]:
+        """Erstellt Render-Jobs für alle published Pages des Projekts"""
         pages = LandingPage.objects.filter(
             project=self.project,
             status='published'
-        )
-        
-        if not pages.exists():
-            self.warnings.append("No published pages found in project")
+        ).only(*PAGE_BUILD_FIELDS)
         
         # Hole Projekteinstellungen
         try:
@@ -109,67 +242,82 @@ class ProjectBuilder:
             parent=None  # Top-level items
         ).prefetch_related('children')
         
-        for page in pages:
-            try:
-                self._build_single_page(page, project_settings, navigation_items)
-            except Exception as e:
-                self.errors.append(f"Failed to build page {page.slug}: {str(e)}")
-    
-    def _build_single_page(self, page: LandingPage, settings: Optional[ProjectSettings], 
-                          navigation: List[ProjectNavigation]):
-        """Baut eine einzelne Seite"""
-        # Bestimme Dateiname
-        if page == self.project.main_page:
-            filename = 'index.html'
-        else:
-            filename = f"{page.slug}.html"
-        
-        # Hole Seiten-HTML
-        html_content = page.html or ''
-        
-        # Erstelle vollständiges HTML-Dokument
-        full_html = self._wrap_page_html(page, html_content, settings, navigation)
-        
-        # Schreibe Datei
-        file_path = self.build_dir / filename
-        file_path.write_text(full_html, encoding='utf-8')
-        
-        self.files_count += 1
-        self.total_size += len(full_html.encode('utf-8'))
-    
-    def _wrap_page_html(self, page: LandingPage, content: str, 
-                       settings: Optional[ProjectSettings], 
-                       navigation: List[ProjectNavigation]) -> str:
-        """Wrapped den Seiten-Content in ein vollständiges HTML-Dokument"""
+        # Für alle Seiten identische Teile einmal vorab aufbauen, damit die
+        # Worker ohne Datenbankzugriff rendern
+        shared = self._build_shared_context(project_settings, navigation_items)
+        shared_hash = _hash_text(json.dumps(shared, sort_keys=True))
         
-        # SEO Title
-        seo_title = page.seo_title or page.title
-        if settings and settings.default_seo_title_suffix:
-            seo_title += f" - {settings.default_seo_title_suffix}"
+        jobs = {}
+        for page in pages:
+            filename = self._page_filename(page)
+            jobs[filename] = partial(self._build_single_page, page, filename, shared, shared_hash)
         
-        # SEO Description
-        seo_description = page.seo_description
-        if not seo_description and settings:
-            seo_description = settings.default_seo_description
+        if not jobs:
+            self.warnings.append("No published pages found in project")
         
-        # SEO Image
-        seo_image = page.seo_image
-        if not seo_image and settings:
-            seo_image = settings.default_seo_image
+        return jobs
+    
+    def _page_filename(self, page: LandingPage) -> str:
+        if page.pk == self.project.main_page_id:
+            return 'index.html'
+        return f"{page.slug}.html"
+    
+    def _build_single_page(self, page: LandingPage, filename: str, shared: Dict, shared_hash: str,
+                           target_dir: Path, entry: Optional[Dict]) -> Optional[Dict]:
+        """Worker: Baut eine einzelne Seite, sofern sich ihre Eingaben geändert haben"""
+        try:
+            input_hash = _hash_text(json.dumps(
+                [filename, shared_hash] + [getattr(page, field) for field in PAGE_HASH_FIELDS]
+            ))
+            reused = self._reuse(filename, target_dir, entry, input_hash)
+            if reused:
+                return reused
+            
+            # Erstelle vollständiges HTML-Dokument
+            full_html = self._wrap_page_html(page, page.html or '', shared)
+            
+            # Schreibe Datei
+            data = full_html.encode('utf-8')
+            (target_dir / filename).write_bytes(data)
+            self._mark_rebuilt(filename)
+            return {'hash': input_hash, 'size': len(data)}
+        except Exception as e:
+            with self._lock:
+                self.errors.append(f"Failed to build page {page.slug}: {str(e)}")
+            return None
+    
+    def _build_shared_context(self, settings: Optional[ProjectSettings],
+                              navigation: List[ProjectNavigation]) -> Dict[str, str]:
+        """Baut die projektweiten Teile des HTML-Dokuments"""
+        shared = {
+            'title_suffix': '',
+            'default_seo_description': '',
+            'default_seo_image': '',
+            'custom_css': '',
+            'favicon_html': '',
+            'analytics_code': '',
+            'custom_head': '',
+            'custom_body': '',
+            'nav_html': self._build_navigation_html(navigation),
+            'global_assets_html': self._build_global_assets_html(),
+        }
+        if not settings:
+            return shared
+        
+        shared['title_suffix'] = settings.default_seo_title_suffix
+        shared['default_seo_description'] = settings.default_seo_description
+        shared['default_seo_image'] = settings.default_seo_image
         
         # Custom CSS aus ProjectSettings
-        custom_css = ''
-        if settings:
-            custom_css = settings.get_css_variables()
+        shared['custom_css'] = settings.get_css_variables()
         
-        # Baue Navigation HTML
-        nav_html = self._build_navigation_html(navigation)
+        if settings.favicon and hasattr(settings.favicon, 'url'):
+            shared['favicon_html'] = f'<link rel="icon" href="{settings.favicon.url}">'
         
         # Analytics Code
         analytics_code = ''
-        if settings:
-            if settings.google_analytics_id:
-                analytics_code += f"""
+        if settings.google_analytics_id:
+            analytics_code += f"""
 <!-- Google Analytics -->
 <script async src="https://www.googletagmanager.com/gtag/js?id={settings.google_analytics_id}"></script>
 <script>
@@ -179,9 +327,9 @@ class ProjectBuilder:
   gtag('config', '{settings.google_analytics_id}');
 </script>
 """
-            
-            if settings.facebook_pixel_id:
-                analytics_code += f"""
+        
+        if settings.facebook_pixel_id:
+            analytics_code += f"""
 <!-- Facebook Pixel -->
 <script>
   !function(f,b,e,v,n,t,s)
@@ -199,19 +347,27 @@ class ProjectBuilder:
   src="https://www.facebook.com/tr?id={settings.facebook_pixel_id}&ev=PageView&noscript=1"
 /></noscript>
 """
+        shared['analytics_code'] = analytics_code
+        
+        # Custom Head/Body Code
+        shared['custom_head'] = settings.custom_head_code
+        shared['custom_body'] = settings.custom_body_code
+        
+        return shared
+    
+    def _wrap_page_html(self, page: LandingPage, content: str, shared: Dict[str, str]) -> str:
+        """Wrapped den Seiten-Content in ein vollständiges HTML-Dokument"""
         
-        # Custom Head Code
-        custom_head = ''
-        if settings and settings.custom_head_code:
-            custom_head = settings.custom_head_code
+        # SEO Title
+        seo_title = page.seo_title or page.title
+        if shared['title_suffix']:
+            seo_title += f" - {shared['title_suffix']}"
         
-        # Custom Body Code
-        custom_body = ''
-        if settings and settings.custom_body_code:
-            custom_body = settings.custom_body_code
+        # SEO Description
+        seo_description = page.seo_description or shared['default_seo_description']
         
-        # Globale Assets (CSS/JS)
-        global_assets_html = self._build_global_assets_html()
+        # SEO Image
+        seo_image = page.seo_image or shared['default_seo_image']
         
         return f"""<!DOCTYPE html>
 <html lang="de">
@@ -221,21 +377,21 @@ class ProjectBuilder:
     <title>{seo_title}</title>
     {f'<meta name="description" content="{seo_description}">' if seo_description else ''}
     {f'<meta property="og:image" content="{seo_image}">' if seo_image else ''}
-    {f'<link rel="icon" href="{settings.favicon.url}">' if settings and settings.favicon and hasattr(settings.favicon, 'url') else ''}
+    {shared['favicon_html']}
     
     <style>
     {page.css or ''}
-    {custom_css}
+    {shared['custom_css']}
     </style>
     
-    {global_assets_html}
-    {analytics_code}
-    {custom_head}
+    {shared['global_assets_html']}
+    {shared['analytics_code']}
+    {shared['custom_head']}
 </head>
 <body>
-    {nav_html}
+    {shared['nav_html']}
     {content}
-    {custom_body}
+    {shared['custom_body']}
 </body>
 </html>"""
     
@@ -282,12 +438,12 @@ class ProjectBuilder:
         
         return html
     
-    def _generate_sitemap(self):
+    def _generate_sitemap(self, target_dir: Path) -> Dict:
         """Generiert sitemap.xml"""
         pages = LandingPage.objects.filter(
             project=self.project,
             status='published'
-        )
+        ).only('slug', 'updated_at')
         
         base_url = self.project.deployed_url or 'https://example.com'
         
@@ -295,7 +451,7 @@ class ProjectBuilder:
         sitemap_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
         
         for page in pages:
-            if page == self.project.main_page:
+            if page.pk == self.project.main_page_id:
                 url = base_url
             else:
                 url = f"{base_url}/{page.slug}.html"
@@ -311,14 +467,9 @@ class ProjectBuilder:
 """
         
         sitemap_content += '</urlset>'
-        
-        sitemap_path = self.build_dir / 'sitemap.xml'
-        sitemap_path.write_text(sitemap_content, encoding='utf-8')
-        
-        self.files_count += 1
-        self.total_size += len(sitemap_content.encode('utf-8'))
+        return self._write_generated_file(target_dir, 'sitemap.xml', sitemap_content)
     
-    def _generate_robots_txt(self):
+    def _generate_robots_txt(self, target_dir: Path) -> Dict:
         """Generiert robots.txt"""
         base_url = self.project.deployed_url or 'https://example.com'
         
@@ -327,12 +478,12 @@ Allow: /
 
 Sitemap: {base_url}/sitemap.xml
 """
-        
-        robots_path = self.build_dir / 'robots.txt'
-        robots_path.write_text(robots_content, encoding='utf-8')
-        
-        self.files_count += 1
-        self.total_size += len(robots_content.encode('utf-8'))
+        return self._write_generated_file(target_dir, 'robots.txt', robots_content)
+    
+    def _write_generated_file(self, target_dir: Path, path: str, content: str) -> Dict:
+        data = content.encode('utf-8')
+        (target_dir / path).write_bytes(data)
+        return {'hash': hashlib.sha256(data).hexdigest(), 'size': len(data)}
     
     def export_zip(self) -> Path:
         """Exportiert das Build als ZIP-Datei"""
@@ -346,6 +497,8 @@ Sitemap: {base_url}/sitemap.xml
         with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
             for root, dirs, files in os.walk(self.build_dir):
                 for file in files:
+                    if file == MANIFEST_FILENAME:
+                        continue
                     file_path = Path(root) / file
                     arcname = file_path.relative_to(self.build_dir)
                     zipf.write(file_path, arcname)
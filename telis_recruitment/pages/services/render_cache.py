@@ -0,0 +1,113 @@
+"""Rendered-page cache for public landing pages"""
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.http import http_date
+
+from pages.models import LandingPage
+
+logger = logging.getLogger(__name__)
+
+# Revision-checked entries can live long; they are replaced as soon as the page changes
+RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Max. cached URL variants (e.g. utm parameters) per page revision
+MAX_VARIANTS_PER_PAGE = 20
+
+
+def _render_cache_key(page_id):
+    return f'pages:render:{page_id}'
+
+
+def get_published_page_revision(slug):
+    """
+    Look up the revision of a published page without loading its content.
+
+    Args:
+        slug: Page slug
+
+    Returns:
+        Dict with id, revision, etag and last_modified, or None if not published
+    """
+    row = (
+        LandingPage.objects.filter(slug=slug, status='published')
+        .values('id', 'updated_at', 'published_at')
+        .first()
+    )
+    if row is None:
+        return None
+
+    # published_at is part of the revision because bulk publish uses update(),
+    # which does not touch updated_at
+    timestamps = [ts for ts in (row['updated_at'], row['published_at']) if ts]
+    last_modified = max(timestamps)
+    revision = '-'.join(str(int(ts.timestamp() * 1_000_000)) for ts in timestamps)
+    return {
+        'id': row['id'],
+        'revision': revision,
+        'etag': f'"page-{row["id"]}-{revision}"',
+        'last_modified': last_modified,
+    }
+
+
+def render_public_page(request, page_id, revision):
+    """
+    Return the rendered HTML of a published page from cache or by rendering it.
+
+    The template embeds request.build_absolute_uri, so entries are kept per
+    URL variant under one key per page, tagged with the page revision.
+
+    Args:
+        request: Current request
+        page_id: LandingPage ID
+        revision: Revision from get_published_page_revision
+
+    Returns:
+        Rendered HTML string
+    """
+    key = _render_cache_key(page_id)
+    variant = hashlib.sha1(request.build_absolute_uri().encode('utf-8')).hexdigest()[:16]
+
+    entry = cache.get(key)
+    if not entry or entry.get('revision') != revision:
+        entry = {'revision': revision, 'variants': {}}
+
+    html = entry['variants'].get(variant)
+    if html is not None:
+        return html
+
+    page = LandingPage.objects.get(pk=page_id)
+    html = render_to_string('pages/public_page.html', {
+        'page': page,
+        'seo_title': page.seo_title or page.title,
+        'seo_description': page.seo_description or '',
+        'seo_image': page.seo_image or '',
+    }, request=request)
+
+    if len(entry['variants']) >= MAX_VARIANTS_PER_PAGE:
+        entry['variants'].clear()
+    entry['variants'][variant] = html
+    cache.set(key, entry, RENDER_CACHE_TIMEOUT)
+    return html
+
+
+def invalidate_page(page_id):
+    """Drop all cached renderings of a page."""
+    cache.delete(_render_cache_key(page_id))
+
+
+def conditional_headers(response, etag, last_modified):
+    """
+    Add validators so clients and proxies revalidate instead of refetching.
+
+    Args:
+        response: HttpResponse
+        etag: Quoted ETag value
+        last_modified: datetime of the last change
+    """
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    response['Cache-Control'] = 'no-cache'
+    return response
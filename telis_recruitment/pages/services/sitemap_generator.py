@@ -1,8 +1,46 @@
 """Sitemap generation for landing pages"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
 from django.urls import reverse
 from django.utils import timezone
 from django.conf import settings
 
+SITEMAP_XML_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+)
+SITEMAP_XML_FOOTER = '</urlset>'
+
+
+def _get_base_url(request=None):
+    if request:
+        return request.build_absolute_uri('/')[:-1]  # Remove trailing slash
+    return getattr(settings, 'SITE_URL', 'http://localhost:8000')
+
+
+def _sitemap_url_entry(base_url, slug, lastmod, changefreq, priority):
+    """Build the <url> element for one page"""
+    lines = ['  <url>']
+    
+    # Build the URL
+    lines.append(f'    <loc>{base_url}/p/{slug}/</loc>')
+    
+    # Last modification date
+    if lastmod:
+        lines.append(f'    <lastmod>{lastmod.strftime("%Y-%m-%d")}</lastmod>')
+    
+    # Change frequency
+    lines.append(f'    <changefreq>{changefreq or "weekly"}</changefreq>')
+    
+    # Priority
+    priority = float(priority) if priority else 0.5
+    lines.append(f'    <priority>{priority:.1f}</priority>')
+    
+    lines.append('  </url>')
+    return '\n'.join(lines)
+
 
 def generate_sitemap_xml(pages, request=None):
     """
@@ -15,38 +53,20 @@ def generate_sitemap_xml(pages, request=None):
     Returns:
         XML string for sitemap
     """
-    # Get base URL
-    if request:
-        base_url = request.build_absolute_uri('/')[:-1]  # Remove trailing slash
-    else:
-        base_url = getattr(settings, 'SITE_URL', 'http://localhost:8000')
+    base_url = _get_base_url(request)
     
-    xml_lines = ['<?xml version="1.0" encoding="UTF-8"?>']
-    xml_lines.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
+    xml_lines = [SITEMAP_XML_HEADER]
     
     for page in pages:
-        xml_lines.append('  <url>')
-        
-        # Build the URL
-        page_url = f"{base_url}/p/{page.slug}/"
-        xml_lines.append(f'    <loc>{page_url}</loc>')
-        
-        # Last modification date
-        lastmod = page.updated_at or page.created_at
-        if lastmod:
-            xml_lines.append(f'    <lastmod>{lastmod.strftime("%Y-%m-%d")}</lastmod>')
-        
-        # Change frequency
-        changefreq = page.sitemap_changefreq or 'weekly'
-        xml_lines.append(f'    <changefreq>{changefreq}</changefreq>')
-        
-        # Priority
-        priority = float(page.sitemap_priority) if page.sitemap_priority else 0.5
-        xml_lines.append(f'    <priority>{priority:.1f}</priority>')
-        
-        xml_lines.append('  </url>')
+        xml_lines.append(_sitemap_url_entry(
+            base_url,
+            page.slug,
+            page.updated_at or page.created_at,
+            page.sitemap_changefreq,
+            page.sitemap_priority,
+        ))
     
-    xml_lines.append('</urlset>')
+    xml_lines.append(SITEMAP_XML_FOOTER)
     
     return '\n'.join(xml_lines)
 
@@ -78,3 +98,55 @@ def generate_sitemap_index(request=None):
     xml_lines.append('</sitemapindex>')
     
     return '\n'.join(xml_lines)
+
+
+def get_cached_sitemap_xml(request=None):
+    """
+    Return the sitemap for all published pages, rebuilding only what changed.
+    
+    A single aggregate query (count + latest change) decides whether the cached
+    document is still current. On change, only the <url> entries of pages whose
+    updated_at moved are rebuilt; the others are reused from the cache.
+    
+    Args:
+        request: Optional request object to build absolute URLs
+        
+    Returns:
+        Tuple of (xml string, version string, last modification datetime or None)
+    """
+    from pages.models import LandingPage
+    
+    base_url = _get_base_url(request)
+    published = LandingPage.objects.filter(status='published')
+    state = published.aggregate(
+        count=Count('id'),
+        latest_update=Max('updated_at'),
+        latest_publish=Max('published_at'),
+    )
+    timestamps = [ts for ts in (state['latest_update'], state['latest_publish']) if ts]
+    last_modified = max(timestamps) if timestamps else None
+    version = ':'.join([str(state['count'])] + [str(int(ts.timestamp() * 1_000_000)) for ts in timestamps])
+    
+    key = 'pages:sitemap:' + hashlib.sha1(base_url.encode('utf-8')).hexdigest()[:16]
+    cached = cache.get(key)
+    if cached and cached['version'] == version:
+        return cached['xml'], version, last_modified
+    
+    old_entries = cached['entries'] if cached else {}
+    entries = {}
+    xml_lines = [SITEMAP_XML_HEADER]
+    rows = published.order_by('-updated_at').values_list(
+        'id', 'slug', 'updated_at', 'created_at', 'sitemap_changefreq', 'sitemap_priority'
+    )
+    for page_id, slug, updated_at, created_at, changefreq, priority in rows:
+        fingerprint = (slug, updated_at, changefreq, priority)
+        entry = old_entries.get(page_id)
+        if not entry or entry[0] != fingerprint:
+            entry = (fingerprint, _sitemap_url_entry(base_url, slug, updated_at or created_at, changefreq, priority))
+        entries[page_id] = entry
+        xml_lines.append(entry[1])
+    xml_lines.append(SITEMAP_XML_FOOTER)
+    
+    xml = '\n'.join(xml_lines)
+    cache.set(key, {'version': version, 'xml': xml, 'entries': entries}, None)
+    return xml, version, last_modified
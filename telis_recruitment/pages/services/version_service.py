@@ -1,7 +1,11 @@
 """Version service for file version management"""
-from typing import Dict, List, Optional
+import difflib
+import json
+import zlib
+from typing import Dict, List, Optional, Tuple
 from django.contrib.auth.models import User
-from django.db.models import Max
+from django.db import transaction
+from django.db.models import Max, Subquery
 from ..models import UploadedFile, FileVersion
 
 
@@ -10,10 +14,51 @@ class VersionServiceError(Exception):
     pass
 
 
+def make_delta(old: str, new: str) -> bytes:
+    """
+    Encode `new` as line operations against `old`.
+    
+    Ops are [i1, i2] (copy old lines i1:i2) or a string (insert text),
+    stored as zlib-compressed JSON.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(',', ':')).encode('utf-8'))
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    """Rebuild the newer content from `old` and a make_delta() result"""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for op in json.loads(zlib.decompress(bytes(delta)).decode('utf-8')):
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0]:op[1]])
+    return ''.join(parts)
+
+
 class VersionService:
-    """Service for handling file version management"""
+    """
+    Service for handling file version management
+    
+    Every SNAPSHOT_INTERVAL-th version (and every version whose delta would
+    not be much smaller than the compressed file) is stored in full; the
+    others store a compressed delta to their predecessor. Reconstructing any version
+    reads at most SNAPSHOT_INTERVAL rows.
+    """
     
     MAX_VERSIONS_PER_FILE = 50  # Keep last 50 versions
+    SNAPSHOT_INTERVAL = 10
+    # Store a snapshot if the delta is at least this fraction of the compressed content
+    MAX_DELTA_RATIO = 0.5
     
     def __init__(self, uploaded_file: UploadedFile):
         self.uploaded_file = uploaded_file
@@ -31,30 +76,52 @@ class VersionService:
         Returns:
             FileVersion instance
         """
-        # Get next version number
-        max_version = FileVersion.objects.filter(
-            uploaded_file=self.uploaded_file
-        ).aggregate(Max('version'))['version__max']
-        
-        next_version = (max_version or 0) + 1
-        
-        # Create version
-        version = FileVersion.objects.create(
-            uploaded_file=self.uploaded_file,
-            content=content,
-            version=next_version,
-            created_by=user,
-            note=note
-        )
-        
-        # Clean up old versions if exceeding limit
-        self._cleanup_old_versions()
+        with transaction.atomic():
+            # Lock the file row so concurrent saves get distinct numbers; the
+            # latest stored version guards against a counter that fell behind
+            counter = UploadedFile.objects.select_for_update().values_list(
+                'version_counter', flat=True
+            ).get(pk=self.uploaded_file.pk)
+            latest = FileVersion.objects.filter(
+                uploaded_file=self.uploaded_file
+            ).aggregate(latest=Max('version'))['latest'] or 0
+            next_version = max(counter, latest) + 1
+            UploadedFile.objects.filter(pk=self.uploaded_file.pk).update(
+                version_counter=next_version
+            )
+            self.uploaded_file.version_counter = next_version
+            
+            try:
+                previous, chain_length = self._reconstruct(next_version - 1)
+            except VersionServiceError:
+                # Broken chain: start over with a snapshot
+                previous, chain_length = None, 0
+            
+            delta = None
+            if previous is not None and chain_length + 1 < self.SNAPSHOT_INTERVAL:
+                delta = make_delta(previous, content)
+                full_size = len(zlib.compress(content.encode('utf-8')))
+                if len(delta) >= full_size * self.MAX_DELTA_RATIO:
+                    delta = None
+            
+            version = FileVersion.objects.create(
+                uploaded_file=self.uploaded_file,
+                content='' if delta is not None else content,
+                is_snapshot=delta is None,
+                delta=delta,
+                version=next_version,
+                created_by=user,
+                note=note
+            )
+            
+            # Clean up old versions if exceeding limit
+            self._cleanup_old_versions(next_version)
         
         return version
     
     def get_versions(self, limit: int = 20) -> List[FileVersion]:
         """
-        Get version history for the file
+        Get version history for the file (metadata only, content deferred)
         
         Args:
             limit: Maximum number of versions to return
@@ -64,7 +131,7 @@ class VersionService:
         """
         return FileVersion.objects.filter(
             uploaded_file=self.uploaded_file
-        ).order_by('-version')[:limit]
+        ).defer('content', 'delta').select_related('created_by').order_by('-version')[:limit]
     
     def get_version(self, version: int) -> FileVersion:
         """
@@ -87,6 +154,32 @@ class VersionService:
         except FileVersion.DoesNotExist:
             raise VersionServiceError(f"Version {version} not found")
     
+    def get_content(self, version: int) -> str:
+        """
+        Full content of a version
+        
+        Raises:
+            VersionServiceError: If version doesn't exist
+        """
+        content, _ = self._reconstruct(version)
+        if content is None:
+            raise VersionServiceError(f"Version {version} not found")
+        return content
+    
+    def get_latest_content(self) -> Optional[str]:
+        """
+        Content of the newest version, or None if there is none
+        
+        Raises:
+            VersionServiceError: If its version chain is broken
+        """
+        latest = FileVersion.objects.filter(
+            uploaded_file=self.uploaded_file
+        ).aggregate(Max('version'))['version__max']
+        if latest is None:
+            return None
+        return self._reconstruct(latest)[0]
+    
     def restore_version(self, version: int) -> Dict:
         """
         Restore file to a specific version
@@ -101,11 +194,11 @@ class VersionService:
             VersionServiceError: If restore fails
         """
         try:
-            file_version = self.get_version(version)
+            file_version, content = self._load(version)
             
             return {
                 'success': True,
-                'content': file_version.content,
+                'content': content,
                 'version': file_version.version,
                 'note': file_version.note,
                 'created_at': file_version.created_at.isoformat()
@@ -128,19 +221,19 @@ class VersionService:
             VersionServiceError: If versions don't exist
         """
         try:
-            v1 = self.get_version(version1)
-            v2 = self.get_version(version2)
+            v1, content1 = self._load(version1)
+            v2, content2 = self._load(version2)
             
             return {
                 'version1': {
                     'number': v1.version,
-                    'content': v1.content,
+                    'content': content1,
                     'created_at': v1.created_at.isoformat(),
                     'note': v1.note
                 },
                 'version2': {
                     'number': v2.version,
-                    'content': v2.content,
+                    'content': content2,
                     'created_at': v2.created_at.isoformat(),
                     'note': v2.note
                 }
@@ -148,17 +241,81 @@ class VersionService:
         except Exception as e:
             raise VersionServiceError(f"Error getting diff: {str(e)}")
     
-    def _cleanup_old_versions(self):
-        """Remove old versions exceeding the limit"""
-        versions = FileVersion.objects.filter(
-            uploaded_file=self.uploaded_file
-        ).order_by('-version')
+    def _chain(self, version: int) -> List[FileVersion]:
+        """Rows from the nearest snapshot up to `version` (one query)"""
+        snapshot = FileVersion.objects.filter(
+            uploaded_file=self.uploaded_file,
+            is_snapshot=True,
+            version__lte=version,
+        ).order_by('-version').values('version')[:1]
+        return list(FileVersion.objects.filter(
+            uploaded_file=self.uploaded_file,
+            version__gte=Subquery(snapshot),
+            version__lte=version,
+        ).order_by('version'))
+    
+    def _reconstruct(self, version: int) -> Tuple[Optional[str], int]:
+        """
+        Content of `version` and the number of deltas since its snapshot
         
-        if versions.count() > self.MAX_VERSIONS_PER_FILE:
-            # Delete oldest versions
-            versions_to_delete = versions[self.MAX_VERSIONS_PER_FILE:]
-            for version in versions_to_delete:
-                version.delete()
+        Returns:
+            (content, chain_length); content is None if the version is missing
+        """
+        rows = self._chain(version)
+        if not rows or rows[-1].version != version:
+            return None, 0
+        return self._replay(rows)
+    
+    @staticmethod
+    def _replay(rows: List[FileVersion]) -> Tuple[str, int]:
+        """
+        Apply the deltas of a chain to its snapshot
+        
+        Raises:
+            VersionServiceError: If a version of the chain is missing
+        """
+        content, chain_length = None, 0
+        for previous, row in zip([None] + rows, rows):
+            if previous is not None and row.version != previous.version + 1:
+                raise VersionServiceError(
+                    f"Version {previous.version + 1} is missing, "
+                    f"cannot reconstruct version {rows[-1].version}"
+                )
+            if row.is_snapshot:
+                content, chain_length = row.content, 0
+            else:
+                content = apply_delta(content, row.delta)
+                chain_length += 1
+        return content, chain_length
+    
+    def _load(self, version: int) -> Tuple[FileVersion, str]:
+        """Version row plus its reconstructed content"""
+        rows = self._chain(version)
+        if not rows or rows[-1].version != version:
+            raise VersionServiceError(f"Version {version} not found")
+        return rows[-1], self._replay(rows)[0]
+    
+    def _cleanup_old_versions(self, latest_version: Optional[int] = None):
+        """
+        Remove old versions exceeding the limit in one DELETE
+        
+        Deletion stops at the snapshot the oldest kept version is based on,
+        so up to SNAPSHOT_INTERVAL - 1 extra versions may remain.
+        """
+        if latest_version is None:
+            latest_version = self.uploaded_file.version_counter
+        oldest_kept = latest_version - self.MAX_VERSIONS_PER_FILE + 1
+        if oldest_kept <= 1:
+            return
+        base_snapshot = FileVersion.objects.filter(
+            uploaded_file=self.uploaded_file,
+            is_snapshot=True,
+            version__lte=oldest_kept,
+        ).order_by('-version').values('version')[:1]
+        FileVersion.objects.filter(
+            uploaded_file=self.uploaded_file,
+            version__lt=Subquery(base_snapshot),
+        ).delete()
     
     @staticmethod
     def should_create_version(old_content: str, new_content: str) -> bool:
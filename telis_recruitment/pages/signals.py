@@ -0,0 +1,19 @@
+"""
+Django Signals für Landing Pages (Render-Cache-Invalidierung)
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import LandingPage
+from .services.render_cache import invalidate_page
+
+
+@receiver(post_save, sender=LandingPage)
+@receiver(post_delete, sender=LandingPage)
+def landing_page_changed(sender, instance, **kwargs):
+    """
+    Gerenderte Fassung beim Speichern/Veröffentlichen/Löschen verwerfen.
+    
+    Andere Worker erkennen die Änderung über die Revision im Cache-Eintrag.
+    """
+    invalidate_page(instance.pk)
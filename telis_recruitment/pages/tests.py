@@ -1,9 +1,15 @@
 """Tests for pages app"""
-from django.test import TestCase, Client
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from datetime import timedelta
+from unittest import mock
 import json
 from .models import LandingPage, PageVersion, PageComponent, PageSubmission, UploadedFile
+from .services.sitemap_generator import generate_sitemap_xml
 from leads.models import Lead
 
 
@@ -98,6 +104,113 @@ class PublicPageViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PublicPageCacheTest(TestCase):
+    """Test render cache, conditional GET and incremental sitemap"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.page = LandingPage.objects.create(
+            slug='cached',
+            title='Cached Page',
+            status='published',
+            html='<h1>Version 1</h1>',
+            created_by=self.user
+        )
+        self.url = reverse('pages_public:page-public', kwargs={'slug': 'cached'})
+    
+    def test_repeat_request_served_from_render_cache(self):
+        """Second hit only checks the revision and does not render"""
+        self.client.get(self.url)
+        
+        with self.assertNumQueries(1), \
+                mock.patch('pages.services.render_cache.render_to_string') as render:
+            response = self.client.get(self.url)
+        
+        render.assert_not_called()
+        self.assertContains(response, '<h1>Version 1</h1>')
+    
+    def test_conditional_get_returns_304(self):
+        """Matching If-None-Match / If-Modified-Since yield 304 Not Modified"""
+        response = self.client.get(self.url)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_publish_invalidates_rendered_page(self):
+        """Saving the page serves the new revision with a new ETag"""
+        first = self.client.get(self.url)
+        
+        self.page.html = '<h1>Version 2</h1>'
+        self.page.save()
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h1>Version 2</h1>')
+        self.assertNotEqual(response['ETag'], first['ETag'])
+    
+    def test_stale_entry_from_other_worker_is_not_served(self):
+        """A cached render for an older revision is replaced even without the signal"""
+        self.client.get(self.url)
+        
+        # Bypass signals like a change made by another process
+        LandingPage.objects.filter(pk=self.page.pk).update(
+            html='<h1>Version 3</h1>',
+            updated_at=self.page.updated_at + timedelta(seconds=5),
+        )
+        
+        self.assertContains(self.client.get(self.url), '<h1>Version 3</h1>')
+    
+    def test_unpublished_page_returns_404(self):
+        """Unpublishing takes effect immediately"""
+        self.client.get(self.url)
+        self.page.status = 'draft'
+        self.page.save()
+        
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+    
+    def test_sitemap_cached_until_pages_change(self):
+        """Sitemap is rebuilt only when a page changes"""
+        first = self.client.get('/sitemap.xml')
+        self.assertContains(first, '/p/cached/')
+        
+        with self.assertNumQueries(1):
+            second = self.client.get('/sitemap.xml')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(
+            self.client.get('/sitemap.xml', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304
+        )
+        
+        LandingPage.objects.create(
+            slug='another', title='Another', status='published', created_by=self.user
+        )
+        third = self.client.get('/sitemap.xml')
+        self.assertContains(third, '/p/another/')
+        self.assertContains(third, '/p/cached/')
+        self.assertNotEqual(third['ETag'], first['ETag'])
+    
+    def test_sitemap_matches_full_generation(self):
+        """Incremental sitemap equals a full rebuild"""
+        LandingPage.objects.create(
+            slug='second', title='Second', status='published', sitemap_priority=0.9, created_by=self.user
+        )
+        self.client.get('/sitemap.xml')
+        self.page.sitemap_changefreq = 'daily'
+        self.page.save()
+        
+        response = self.client.get('/sitemap.xml')
+        pages = LandingPage.objects.filter(status='published').order_by('-updated_at')
+        request = RequestFactory().get('/sitemap.xml')
+        self.assertEqual(response.content.decode(), generate_sitemap_xml(pages, request))
+
+
 class BuilderViewTest(TestCase):
     """Test builder views (staff only)"""
     
@@ -268,6 +381,356 @@ class FileVersionTest(TestCase):
         self.assertEqual(version.note, 'Initial version')
 
 
+class VersionServiceTest(TestCase):
+    """Test snapshot + delta storage of file versions"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass')
+        self.page = LandingPage.objects.create(
+            slug='test',
+            title='Test Page',
+            is_uploaded_site=True,
+            created_by=self.user
+        )
+        self.uploaded_file = UploadedFile.objects.create(
+            landing_page=self.page,
+            original_filename='index.html',
+            relative_path='index.html',
+            file_type='text/html',
+            file_size=100
+        )
+    
+    def _edits(self, count):
+        """Autosave-like history: a large HTML file with one changed line per save"""
+        lines = [f'<p class="row-{i}">Absatz {i} mit etwas Text für die Seite.</p>\n' for i in range(400)]
+        contents = []
+        for n in range(count):
+            lines[(n * 37) % len(lines)] = f'<p class="edited">Bearbeitung {n}</p>\n'
+            if n % 7 == 3:
+                lines.insert(n, f'<h2>Neuer Abschnitt {n}</h2>\n')
+            contents.append(''.join(lines))
+        return contents
+    
+    def test_versions_roundtrip_through_snapshots_and_deltas(self):
+        """Every version reconstructs exactly; full copies only every SNAPSHOT_INTERVAL"""
+        from .models import FileVersion
+        from .services.version_service import VersionService
+        
+        service = VersionService(self.uploaded_file)
+        contents = self._edits(25)
+        for content in contents:
+            service.create_version(content, user=self.user)
+        
+        snapshots = list(FileVersion.objects.filter(
+            uploaded_file=self.uploaded_file, is_snapshot=True
+        ).values_list('version', flat=True).order_by('version'))
+        self.assertEqual(snapshots, [1, 11, 21])
+        for number, content in enumerate(contents, start=1):
+            self.assertEqual(service.get_content(number), content)
+        
+        stored = sum(
+            len(v.content.encode('utf-8')) + len(v.delta or b'')
+            for v in FileVersion.objects.filter(uploaded_file=self.uploaded_file)
+        )
+        self.assertLess(stored, sum(len(c.encode('utf-8')) for c in contents) * 0.15)
+    
+    def test_version_numbers_come_from_file_counter(self):
+        """Numbering continues from the counter, even after versions were deleted"""
+        from .models import FileVersion
+        from .services.version_service import VersionService
+        
+        service = VersionService(self.uploaded_file)
+        service.create_version('<p>a</p>')
+        service.create_version('<p>b</p>')
+        FileVersion.objects.filter(uploaded_file=self.uploaded_file).delete()
+        
+        self.assertEqual(service.create_version('<p>c</p>').version, 3)
+        self.uploaded_file.refresh_from_db()
+        self.assertEqual(self.uploaded_file.version_counter, 3)
+    
+    def test_large_rewrite_is_stored_as_snapshot(self):
+        """A delta that is not much smaller than the file becomes a snapshot"""
+        from .services.version_service import VersionService
+        
+        service = VersionService(self.uploaded_file)
+        service.create_version('body { color: red; }\n' * 50)
+        version = service.create_version(''.join(f'.c{i} {{ margin: {i}px; }}\n' for i in range(50)))
+        self.assertTrue(version.is_snapshot)
+        self.assertEqual(version.delta, None)
+    
+    def test_restore_and_diff_are_snapshot_bounded(self):
+        """One query per reconstructed version, however long the history"""
+        from .services.version_service import VersionService, VersionServiceError
+        
+        service = VersionService(self.uploaded_file)
+        contents = self._edits(30)
+        for content in contents:
+            service.create_version(content, note=f'save {len(content)}')
+        
+        with self.assertNumQueries(1):
+            result = service.restore_version(29)
+        self.assertEqual(result['content'], contents[28])
+        self.assertEqual(result['version'], 29)
+        
+        with self.assertNumQueries(2):
+            diff = service.get_diff(3, 27)
+        self.assertEqual(diff['version1']['content'], contents[2])
+        self.assertEqual(diff['version2']['content'], contents[26])
+        
+        with self.assertRaises(VersionServiceError):
+            service.restore_version(99)
+        self.assertEqual(service.get_latest_content(), contents[-1])
+    
+    def test_cleanup_is_bulk_and_keeps_history_reconstructable(self):
+        """Old versions go in one DELETE, stopping at the base snapshot of the oldest kept one"""
+        from .models import FileVersion
+        from .services.version_service import VersionService
+        
+        service = VersionService(self.uploaded_file)
+        contents = self._edits(24)
+        with mock.patch.object(VersionService, 'MAX_VERSIONS_PER_FILE', 8), \
+                mock.patch.object(VersionService, 'SNAPSHOT_INTERVAL', 5):
+            for content in contents:
+                service.create_version(content)
+            
+            kept = list(FileVersion.objects.filter(
+                uploaded_file=self.uploaded_file
+            ).order_by('version'))
+            # The oldest of the last 8 (v17) needs its base snapshot, nothing older
+            self.assertTrue(kept[0].is_snapshot)
+            self.assertIn(kept[0].version, range(13, 18))
+            self.assertEqual([v.version for v in kept], list(range(kept[0].version, 25)))
+            for v in kept:
+                self.assertEqual(service.get_content(v.version), contents[v.version - 1])
+            
+            with CaptureQueriesContext(connection) as ctx:
+                service.create_version(contents[0])
+            deletes = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('DELETE')]
+            self.assertEqual(len(deletes), 1)
+    
+    def test_missing_version_is_detected(self):
+        """A deleted row in a chain raises instead of returning wrong content"""
+        from .models import FileVersion
+        from .services.version_service import VersionService, VersionServiceError
+        
+        service = VersionService(self.uploaded_file)
+        contents = self._edits(6)
+        for content in contents:
+            service.create_version(content)
+        FileVersion.objects.filter(uploaded_file=self.uploaded_file, version=3).delete()
+        
+        self.assertEqual(service.get_content(2), contents[1])
+        for version in (4, 6):
+            with self.assertRaises(VersionServiceError):
+                service.get_content(version)
+        with self.assertRaises(VersionServiceError):
+            service.get_latest_content()
+        with self.assertRaises(VersionServiceError):
+            service.restore_version(5)
+        
+        # The next save starts a new snapshot instead of extending the broken chain
+        version = service.create_version(contents[0])
+        self.assertTrue(version.is_snapshot)
+        self.assertEqual(service.get_latest_content(), contents[0])
+    
+    def test_editor_save_does_not_reset_version_counter(self):
+        """Saves of a file loaded before create_version keep the counter"""
+        import shutil
+        import tempfile
+        from pathlib import Path
+        from .models import FileVersion
+        from .services.editor_service import EditorService
+        from .services.version_service import VersionService
+    
+        contents = self._edits(4)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        real_mkdir = Path.mkdir
+    
+        def version_in_between(path, *args, **kwargs):
+            # Another request versions the file after the editor loaded it
+            if not FileVersion.objects.exists():
+                VersionService(UploadedFile.objects.get(pk=self.uploaded_file.pk)).create_version(contents[0])
+            real_mkdir(path, *args, **kwargs)
+    
+        with override_settings(MEDIA_ROOT=media_root), \
+                mock.patch.object(Path, 'mkdir', version_in_between):
+            result = EditorService(self.page).save_file_content('index.html', contents[1])
+        self.assertTrue(result['success'])
+    
+        # Stale model instance, full save
+        stale = UploadedFile.objects.get(pk=self.uploaded_file.pk)
+        VersionService(UploadedFile.objects.get(pk=self.uploaded_file.pk)).create_version(contents[1])
+        stale.file_size = 1
+        stale.save()
+    
+        self.uploaded_file.refresh_from_db()
+        self.assertEqual(self.uploaded_file.version_counter, 2)
+        self.assertEqual(self.uploaded_file.file_size, 1)
+    
+        # A counter that fell behind anyway is corrected from the stored versions
+        UploadedFile.objects.filter(pk=self.uploaded_file.pk).update(version_counter=0)
+        service = VersionService(self.uploaded_file)
+        self.assertEqual(service.create_version(contents[2]).version, 3)
+        self.assertEqual(service.create_version(contents[3]).version, 4)
+        self.assertEqual(
+            list(FileVersion.objects.filter(uploaded_file=self.uploaded_file)
+                 .order_by('version').values_list('version', flat=True)),
+            [1, 2, 3, 4]
+        )
+        self.assertEqual(service.get_latest_content(), contents[3])
+    
+    def test_admin_cannot_delete_versions(self):
+        from django.contrib.admin.sites import site
+        from django.test import RequestFactory
+        from .models import FileVersion
+        
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertFalse(site._registry[FileVersion].has_delete_permission(request))
+    
+    def test_listing_defers_content(self):
+        """Version listings do not load content or deltas"""
+        from .services.version_service import VersionService
+        
+        service = VersionService(self.uploaded_file)
+        for content in self._edits(3):
+            service.create_version(content, user=self.user)
+        with self.assertNumQueries(1):
+            versions = list(service.get_versions())
+            self.assertEqual([v.created_by.username for v in versions], ['testuser'] * 3)
+        self.assertEqual(versions[0].get_deferred_fields(), {'content', 'delta'})
+
+
+class ProjectBuilderTest(TestCase):
+    """Test incremental, parallel ProjectBuilder"""
+    
+    def setUp(self):
+        import shutil
+        import tempfile
+        from .models import Project
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='builder', password='testpass')
+        self.project = Project.objects.create(name='Site', slug='site', created_by=self.user)
+    
+    def _create_pages(self, count):
+        return [
+            LandingPage.objects.create(
+                slug=f'{self.project.slug}-page-{i}',
+                title=f'Page {i}',
+                status='published',
+                project=self.project,
+                html=f'<h1>Page {i}</h1>',
+                created_by=self.user
+            )
+            for i in range(count)
+        ]
+    
+    def _build(self):
+        from .services.project_builder import ProjectBuilder
+        result = ProjectBuilder(self.project, max_workers=4).build()
+        self.assertTrue(result['success'], result['errors'])
+        return result
+    
+    def test_full_build_writes_pages_assets_and_sitemap(self):
+        """First build renders every page and copies every asset"""
+        from pathlib import Path
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .models import ProjectAsset
+        pages = self._create_pages(3)
+        self.project.main_page = pages[0]
+        self.project.save()
+        ProjectAsset.objects.create(
+            project=self.project, asset_type='css', name='style', relative_path='css/style.css',
+            include_globally=True, file=SimpleUploadedFile('style.css', b'body {}')
+        )
+        
+        result = self._build()
+        build_dir = Path(result['build_dir'])
+        
+        self.assertEqual(
+            result['rebuilt_files'],
+            ['css/style.css', 'index.html', 'site-page-1.html', 'site-page-2.html']
+        )
+        self.assertEqual(result['files_count'], 6)
+        self.assertIn('<h1>Page 1</h1>', (build_dir / 'site-page-1.html').read_text())
+        self.assertIn('href="css/style.css"', (build_dir / 'index.html').read_text())
+        self.assertEqual((build_dir / 'css/style.css').read_bytes(), b'body {}')
+        self.assertIn('site-page-2.html', (build_dir / 'sitemap.xml').read_text())
+        self.assertTrue((build_dir / 'robots.txt').exists())
+    
+    def test_single_page_edit_rebuilds_only_that_page(self):
+        """Rebuild work after one edit does not grow with project size"""
+        from pathlib import Path
+        from .models import Project
+        for count in (10, 60):
+            self.project = Project.objects.create(name=f'Site {count}', slug=f'site{count}', created_by=self.user)
+            pages = self._create_pages(count)
+            full = self._build()
+            self.assertEqual(len(full['rebuilt_files']), count)
+            
+            pages[5].html = '<h1>Edited</h1>'
+            pages[5].save()
+            incremental = self._build()
+            
+            self.assertEqual(incremental['rebuilt_files'], [f'site{count}-page-5.html'])
+            self.assertEqual(incremental['reused_count'], count - 1)
+            self.assertLess(incremental['build_time'], full['build_time'] + 1.0)
+            build_dir = Path(incremental['build_dir'])
+            self.assertIn('Edited', (build_dir / f'site{count}-page-5.html').read_text())
+            self.assertIn('Page 4', (build_dir / f'site{count}-page-4.html').read_text())
+    
+    def test_settings_change_rebuilds_all_pages(self):
+        """Project-wide inputs are part of every page hash"""
+        from .models import ProjectSettings
+        self._create_pages(3)
+        self._build()
+        
+        ProjectSettings.objects.create(project=self.project, default_seo_title_suffix='Brand')
+        result = self._build()
+        
+        self.assertEqual(len(result['rebuilt_files']), 3)
+    
+    def test_unpublished_page_is_removed_and_old_build_replaced(self):
+        """Swapped build contains only current outputs"""
+        from pathlib import Path
+        pages = self._create_pages(2)
+        first = self._build()
+        pages[1].status = 'draft'
+        pages[1].save()
+        
+        result = self._build()
+        build_dir = Path(result['build_dir'])
+        
+        self.assertEqual(first['build_dir'], result['build_dir'])
+        self.assertFalse((build_dir / 'site-page-1.html').exists())
+        self.assertTrue((build_dir / 'site-page-0.html').exists())
+        self.assertEqual(result['rebuilt_files'], [])
+        leftovers = [p.name for p in build_dir.parent.iterdir() if p.name.startswith('.')]
+        self.assertEqual(leftovers, [])
+    
+    def test_failed_build_keeps_previous_output(self):
+        """An error before the swap leaves the last good build untouched"""
+        from pathlib import Path
+        from .services.project_builder import ProjectBuilder
+        self._create_pages(2)
+        first = self._build()
+        
+        builder = ProjectBuilder(self.project)
+        with mock.patch.object(builder, '_generate_sitemap', side_effect=OSError('disk full')):
+            result = builder.build()
+        
+        self.assertFalse(result['success'])
+        build_dir = Path(first['build_dir'])
+        self.assertTrue((build_dir / 'site-page-0.html').exists())
+        leftovers = [p.name for p in build_dir.parent.iterdir() if p.name.startswith('.')]
+        self.assertEqual(leftovers, [])
+
+
 class ProjectTemplateTest(TestCase):
     """Test ProjectTemplate model"""
     
@@ -1,4 +1,5 @@
 """Views for pages app - builder and public page rendering"""
+import hashlib
 import json
 import logging
 import os
@@ -6,12 +7,14 @@ import zipfile
 import shutil
 from pathlib import Path
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from django.http import Http404, JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.utils.text import slugify
 from django.db import transaction, models as db_models
 from django.db.models import Count
@@ -24,7 +27,8 @@ from .models import (
 from leads.models import Lead
 from leads.services.brevo import sync_lead_to_brevo
 from .services.seo_analyzer import SEOAnalyzer
-from .services.sitemap_generator import generate_sitemap_xml
+from .services.sitemap_generator import get_cached_sitemap_xml
+from .services.render_cache import conditional_headers, get_published_page_revision, render_public_page
 
 logger = logging.getLogger(__name__)
 
@@ -177,20 +181,26 @@ def publish_page(request, slug):
 
 
 def public_page(request, slug):
-    """Public rendering of a landing page"""
-    page = get_object_or_404(LandingPage, slug=slug, status='published')
+    """
+    Public rendering of a landing page
     
-    # Build SEO meta tags
-    seo_title = page.seo_title or page.title
-    seo_description = page.seo_description or ''
-    seo_image = page.seo_image or ''
+    Served from a render cache keyed by page revision, with ETag/Last-Modified
+    so repeat visitors and proxies get a 304 without any rendering.
+    """
+    revision = get_published_page_revision(slug)
+    if revision is None:
+        raise Http404("No LandingPage matches the given query.")
+    
+    not_modified = get_conditional_response(
+        request,
+        etag=revision['etag'],
+        last_modified=int(revision['last_modified'].timestamp()),
+    )
+    if not_modified is not None:
+        return conditional_headers(not_modified, revision['etag'], revision['last_modified'])
     
-    return render(request, 'pages/public_page.html', {
-        'page': page,
-        'seo_title': seo_title,
-        'seo_description': seo_description,
-        'seo_image': seo_image,
-    })
+    html = render_public_page(request, revision['id'], revision['revision'])
+    return conditional_headers(HttpResponse(html), revision['etag'], revision['last_modified'])
 
 
 @csrf_exempt
@@ -1068,6 +1078,8 @@ def build_project(request, slug):
                 'message': 'Projekt erfolgreich gebaut',
                 'files_count': result['files_count'],
                 'total_size': result['total_size'],
+                'rebuilt_count': len(result['rebuilt_files']),
+                'build_time': round(result['build_time'], 3),
                 'warnings': result.get('warnings', [])
             })
         else:
@@ -1330,16 +1342,22 @@ def update_page_slug(request, slug):
 # ============================================================================
 
 def sitemap_xml(request):
-    """Generate sitemap.xml for all published pages"""
-    from django.http import HttpResponse
-    
-    # Get all published pages
-    pages = LandingPage.objects.filter(status='published').order_by('-updated_at')
-    
-    # Generate sitemap XML
-    xml_content = generate_sitemap_xml(pages, request)
+    """Serve sitemap.xml for all published pages, rebuilt only when pages change"""
+    xml_content, version, last_modified = get_cached_sitemap_xml(request)
+    etag = '"sitemap-%s"' % hashlib.sha1(version.encode('utf-8')).hexdigest()[:16]
+    
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is None:
+        response = HttpResponse(xml_content, content_type='application/xml')
     
-    return HttpResponse(xml_content, content_type='application/xml')
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
 
 
 def robots_txt(request):
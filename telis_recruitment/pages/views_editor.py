@@ -119,11 +119,14 @@ def save_file_content(request, slug):
                 version_service = VersionService(uploaded_file)
                 
                 # Check if we should create a version
-                latest_version = version_service.get_versions(limit=1)
+                try:
+                    old_content = version_service.get_latest_content()
+                except VersionServiceError:
+                    # Broken version chain: the new version becomes a snapshot
+                    old_content = None
                 should_create = True
                 
-                if latest_version:
-                    old_content = latest_version[0].content
+                if old_content is not None:
                     should_create = VersionService.should_create_version(
                         old_content, content
                     )
@@ -5,3 +5,7 @@ class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reports'
     verbose_name = 'Reports'
+    
+    def ready(self):
+        # Signals importieren um sie zu registrieren
+        import reports.signals  # noqa
@@ -0,0 +1,40 @@
+"""
+Django management command to rebuild the daily scraper report rollups.
+
+Rollups are maintained automatically when a run finishes. Use this command
+after bulk changes that bypass model signals (e.g. QuerySet.update() or
+imports) or to repair a range of days.
+
+Usage:
+    python manage.py rebuild_report_rollups
+    python manage.py rebuild_report_rollups --days 365
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports.services.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily ScraperRun rollups used by the scraper performance report'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Number of past days to rebuild, including today (default: 30)'
+        )
+
+    def handle(self, *args, **options):
+        end_day = timezone.localdate()
+        start_day = end_day - timedelta(days=max(options['days'], 1) - 1)
+
+        written = rebuild_rollups(start_day, end_day)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Rebuilt rollups {start_day} – {end_day}: {written} rows'
+        ))
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.30 on 2026-10-18 21:28
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+from django.utils import timezone
+
+
+def backfill_rollups(apps, schema_editor):
+    """Rollups für alle bereits beendeten Läufe anlegen"""
+    from reports.services.rollups import aggregate_runs, day_start
+
+    ScraperRun = apps.get_model('scraper_control', 'ScraperRun')
+    ScraperRunDailyRollup = apps.get_model('reports', 'ScraperRunDailyRollup')
+
+    finished = ScraperRun.objects.exclude(status='running')
+    bounds = finished.aggregate(first=Min('started_at'), last=Max('started_at'))
+    if not bounds['first']:
+        return
+
+    day = timezone.localtime(bounds['first']).date()
+    last_day = timezone.localtime(bounds['last']).date()
+    while day <= last_day:
+        runs = finished.filter(
+            started_at__gte=day_start(day),
+            started_at__lt=day_start(day + timedelta(days=1)),
+        )
+        ScraperRunDailyRollup.objects.bulk_create([
+            ScraperRunDailyRollup(date=day, **row) for row in aggregate_runs(runs)
+        ])
+        day += timedelta(days=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        ('scraper_control', '0013_add_postgres_notify_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScraperRunDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Datum')),
+                ('industry', models.CharField(blank=True, max_length=100, verbose_name='Industry')),
+                ('mode', models.CharField(blank=True, max_length=50, verbose_name='Modus')),
+                ('status', models.CharField(max_length=20, verbose_name='Status')),
+                ('run_count', models.PositiveIntegerField(default=0, verbose_name='Läufe')),
+                ('leads_found', models.BigIntegerField(default=0, verbose_name='Leads gefunden')),
+                ('duration_seconds', models.FloatField(default=0.0, verbose_name='Laufzeit gesamt (s)')),
+                ('duration_count', models.PositiveIntegerField(default=0, verbose_name='Läufe mit Laufzeit')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Scraper-Tagesaggregat',
+                'verbose_name_plural': 'Scraper-Tagesaggregate',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scraperrundailyrollup',
+            constraint=models.UniqueConstraint(fields=('date', 'industry', 'mode', 'status'), name='unique_scraper_run_daily_rollup'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
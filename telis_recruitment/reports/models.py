@@ -81,3 +81,35 @@ class ReportHistory(models.Model):
     
     def __str__(self):
         return f"{self.report_type} - {self.generated_at.strftime('%d.%m.%Y %H:%M')}"
+
+
+class ScraperRunDailyRollup(models.Model):
+    """
+    Tägliche Aggregate abgeschlossener Scraper-Läufe.
+    
+    Wird beim Beenden eines Laufs für dessen Tag neu berechnet, damit
+    Reports über lange Zeiträume nur wenige Zeilen lesen statt jeden Lauf.
+    """
+    date = models.DateField(verbose_name="Datum")
+    industry = models.CharField(max_length=100, blank=True, verbose_name="Industry")
+    mode = models.CharField(max_length=50, blank=True, verbose_name="Modus")
+    status = models.CharField(max_length=20, verbose_name="Status")
+    run_count = models.PositiveIntegerField(default=0, verbose_name="Läufe")
+    leads_found = models.BigIntegerField(default=0, verbose_name="Leads gefunden")
+    duration_seconds = models.FloatField(default=0.0, verbose_name="Laufzeit gesamt (s)")
+    duration_count = models.PositiveIntegerField(default=0, verbose_name="Läufe mit Laufzeit")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Scraper-Tagesaggregat"
+        verbose_name_plural = "Scraper-Tagesaggregate"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'industry', 'mode', 'status'],
+                name='unique_scraper_run_daily_rollup'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.industry or '-'} {self.status}: {self.run_count}"
@@ -8,6 +8,8 @@ from django.db.models import Count, Sum, Avg, Q
 from django.db.models.functions import TruncDate
 from django.utils import timezone
 
+from reports.services.rollups import aggregate_runs, day_start, full_day_span
+
 
 class ReportGenerator:
     """Generiert Reports aus der Datenbank mit Filter-Unterstützung"""
@@ -147,57 +149,88 @@ class ReportGenerator:
             ],
         }
     
-    def generate_scraper_report(self) -> Dict[str, Any]:
-        """Scraper-Performance Report MIT Filtern"""
+    def _apply_rollup_filters(self, queryset):
+        """Wendet die ScraperRun-Filter auf ScraperRunDailyRollup an"""
+        for filter_key, field in (('industry', 'industry'), ('run_status', 'status'), ('mode', 'mode')):
+            if self.filters.get(filter_key):
+                values = self.filters[filter_key]
+                if isinstance(values, str):
+                    values = [values]
+                queryset = queryset.filter(**{f'{field}__in': values})
+        return queryset
+    
+    def _scraper_run_groups(self) -> List[Dict[str, Any]]:
+        """
+        Aggregierte ScraperRun-Kennzahlen je Industry und Status.
+        
+        Vollständig im Zeitraum liegende Tage kommen aus den täglichen
+        Rollups, angebrochene Randtage und laufende Runs werden direkt
+        in der Datenbank aggregiert. Es werden nie einzelne Runs geladen.
+        """
         from scraper_control.models import ScraperRun
+        from reports.models import ScraperRunDailyRollup
         
         runs = ScraperRun.objects.filter(
             started_at__range=[self.start_date, self.end_date]
         )
-        
-        # Filter anwenden
         runs = self._apply_scraper_filters(runs)
         
-        total_runs = runs.count()
-        completed = runs.filter(status='completed').count()
-        failed = runs.filter(status='failed').count()
-        
-        # Aggregierte Stats
-        stats = runs.aggregate(
-            total_leads=Sum('leads_found'),
-            avg_leads=Avg('leads_found')
-        )
-        
-        # Berechne durchschnittliche Dauer
-        avg_duration = 0
-        run_count = 0
-        for run in runs:
-            if run.duration:
-                avg_duration += run.duration.total_seconds()
-                run_count += 1
-        
-        if run_count > 0:
-            avg_duration = avg_duration / run_count
+        groups = []
+        span = full_day_span(self.start_date, self.end_date)
+        if span:
+            first_day, last_day = span
+            rollups = self._apply_rollup_filters(
+                ScraperRunDailyRollup.objects.filter(date__range=[first_day, last_day])
+            )
+            groups.extend(rollups.values('industry', 'status').annotate(
+                run_count=Sum('run_count'),
+                leads_found=Sum('leads_found'),
+                duration_seconds=Sum('duration_seconds'),
+                duration_count=Sum('duration_count'),
+            ).order_by())
+            
+            # Beendete Runs der vollständigen Tage sind bereits in den Rollups
+            runs = runs.exclude(
+                Q(started_at__gte=day_start(first_day))
+                & Q(started_at__lt=day_start(last_day + timedelta(days=1)))
+                & ~Q(status='running')
+            )
         
-        # Runs nach Industry (aus params_snapshot)
-        industry_stats = []
+        groups.extend(aggregate_runs(runs, dimensions=('industry', 'status')))
+        return groups
+    
+    def generate_scraper_report(self) -> Dict[str, Any]:
+        """Scraper-Performance Report MIT Filtern"""
+        total_runs = completed = failed = total_leads = duration_count = 0
+        duration_seconds = 0.0
         industry_data = {}
-        for run in runs:
-            industry = run.params_snapshot.get('industry', 'unknown') if run.params_snapshot else 'unknown'
+        
+        for group in self._scraper_run_groups():
+            total_runs += group['run_count']
+            total_leads += group['leads_found']
+            duration_seconds += group['duration_seconds']
+            duration_count += group['duration_count']
+            if group['status'] == 'completed':
+                completed += group['run_count']
+            elif group['status'] == 'failed':
+                failed += group['run_count']
+            
+            # Runs nach Industry (aus params_snapshot)
+            industry = group['industry'] or 'unknown'
             if industry not in industry_data:
                 industry_data[industry] = {'count': 0, 'leads': 0}
-            industry_data[industry]['count'] += 1
-            industry_data[industry]['leads'] += run.leads_found or 0
-        
-        for industry, data in industry_data.items():
-            industry_stats.append({
-                'industry': industry,
-                'count': data['count'],
-                'leads': data['leads']
-            })
+            industry_data[industry]['count'] += group['run_count']
+            industry_data[industry]['leads'] += group['leads_found']
         
+        industry_stats = [
+            {'industry': industry, 'count': data['count'], 'leads': data['leads']}
+            for industry, data in industry_data.items()
+        ]
         industry_stats.sort(key=lambda x: x['leads'], reverse=True)
         
+        avg_duration = duration_seconds / duration_count if duration_count else 0
+        avg_leads = total_leads / total_runs if total_runs else 0
+        
         return {
             'report_type': 'scraper_performance',
             'period': {
@@ -209,8 +242,8 @@ class ReportGenerator:
                 'completed': completed,
                 'failed': failed,
                 'success_rate': round(completed / max(total_runs, 1) * 100, 1),
-                'total_leads_found': stats['total_leads'] or 0,
-                'avg_leads_per_run': round(stats['avg_leads'] or 0, 1),
+                'total_leads_found': total_leads,
+                'avg_leads_per_run': round(avg_leads, 1),
                 'avg_duration_seconds': round(avg_duration, 1),
             },
             'industry_stats': industry_stats,
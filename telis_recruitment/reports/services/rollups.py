@@ -0,0 +1,138 @@
+"""
+Tägliche Rollups für Scraper-Reports.
+
+Aggregiert ScraperRun-Zeilen datenbankseitig (ohne die logs-Spalte zu laden)
+und pflegt ScraperRunDailyRollup pro Kalendertag in der aktuellen Zeitzone.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, DateTimeField, DurationField, F, Sum, Value, When
+from django.db.models.fields.json import KT
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Dimensionen, nach denen Läufe gruppiert werden
+ROLLUP_DIMENSIONS = ('industry', 'mode', 'status')
+
+
+def day_start(day: date) -> datetime:
+    """Beginn eines Kalendertags in der aktuellen Zeitzone"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def aggregate_runs(runs, dimensions: Iterable[str] = ROLLUP_DIMENSIONS, now: datetime = None) -> List[Dict]:
+    """
+    Aggregiert ScraperRuns gruppiert nach Dimensionen in der Datenbank.
+
+    Laufende Runs zählen ihre bisherige Laufzeit bis now, wie
+    ScraperRun.duration.
+
+    Args:
+        runs: ScraperRun-Queryset
+        dimensions: Teilmenge von ROLLUP_DIMENSIONS
+        now: Referenzzeit für laufende Runs
+
+    Returns:
+        Liste von Dicts mit den Dimensionen sowie run_count, leads_found,
+        duration_seconds und duration_count
+    """
+    now = now or timezone.now()
+    duration = Case(
+        When(finished_at__isnull=False, then=F('finished_at') - F('started_at')),
+        When(status='running', then=Value(now, output_field=DateTimeField()) - F('started_at')),
+        default=None,
+        output_field=DurationField(),
+    )
+    dimensions = list(dimensions)
+
+    rows = runs.order_by().annotate(
+        industry=Coalesce(KT('params_snapshot__industry'), Value(''), output_field=CharField()),
+        mode=Coalesce(KT('params_snapshot__mode'), Value(''), output_field=CharField()),
+    ).values(*dimensions).annotate(
+        run_count=Count('id'),
+        leads_found=Coalesce(Sum('leads_found'), 0),
+        duration_total=Sum(duration),
+        duration_count=Count(duration),
+    )
+
+    result = []
+    for row in rows:
+        total = row.pop('duration_total')
+        row['duration_seconds'] = total.total_seconds() if total else 0.0
+        result.append(row)
+    return result
+
+
+def rebuild_daily_rollup(day: date) -> int:
+    """
+    Berechnet die Rollups eines Tages aus den beendeten Runs neu.
+
+    Idempotent: der Tag wird komplett ersetzt, daher sind auch
+    Statuswechsel und gelöschte Runs abgedeckt.
+
+    Args:
+        day: Kalendertag (aktuelle Zeitzone)
+
+    Returns:
+        Anzahl geschriebener Rollup-Zeilen
+    """
+    from reports.models import ScraperRunDailyRollup
+    from scraper_control.models import ScraperRun
+
+    runs = ScraperRun.objects.filter(
+        started_at__gte=day_start(day),
+        started_at__lt=day_start(day + timedelta(days=1)),
+    ).exclude(status='running')
+
+    rollups = [
+        ScraperRunDailyRollup(date=day, **row)
+        for row in aggregate_runs(runs)
+    ]
+
+    # Zwei gleichzeitig endende Runs können denselben Tag neu schreiben
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                ScraperRunDailyRollup.objects.filter(date=day).delete()
+                ScraperRunDailyRollup.objects.bulk_create(rollups)
+            return len(rollups)
+        except IntegrityError:
+            if attempt:
+                raise
+            logger.info(f"Concurrent rollup rebuild for {day}, retrying")
+
+
+def rebuild_rollups(start_day: date, end_day: date) -> int:
+    """
+    Berechnet die Rollups für einen Zeitraum neu (inklusive beider Tage).
+
+    Returns:
+        Anzahl geschriebener Rollup-Zeilen
+    """
+    written = 0
+    day = start_day
+    while day <= end_day:
+        written += rebuild_daily_rollup(day)
+        day += timedelta(days=1)
+    return written
+
+
+def full_day_span(start: datetime, end: datetime):
+    """
+    Ermittelt die vollständig in [start, end] liegenden Kalendertage.
+
+    Returns:
+        (erster Tag, letzter Tag) oder None, wenn kein Tag vollständig enthalten ist
+    """
+    first = timezone.localtime(start).date()
+    if day_start(first) < start:
+        first += timedelta(days=1)
+    last = timezone.localtime(end).date() - timedelta(days=1)
+    if first > last:
+        return None
+    return first, last
@@ -0,0 +1,35 @@
+"""Signal handlers for the reports app"""
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reports.services.rollups import rebuild_daily_rollup
+from scraper_control.models import ScraperRun
+
+logger = logging.getLogger(__name__)
+
+
+def _refresh_rollup(run):
+    if not run.started_at:
+        return
+    try:
+        rebuild_daily_rollup(timezone.localtime(run.started_at).date())
+    except Exception as e:
+        # Reports dürfen das Beenden eines Laufs nie blockieren
+        logger.error(f"Failed to update daily rollup for run {run.pk}: {e}")
+
+
+@receiver(post_save, sender=ScraperRun)
+def update_rollup_on_run_finished(sender, instance, created, **kwargs):
+    """Rollup des Start-Tags neu berechnen, sobald ein Lauf beendet ist"""
+    if instance.status != 'running':
+        _refresh_rollup(instance)
+
+
+@receiver(post_delete, sender=ScraperRun)
+def update_rollup_on_run_deleted(sender, instance, **kwargs):
+    """Gelöschte Läufe aus dem Rollup entfernen"""
+    if instance.status != 'running':
+        _refresh_rollup(instance)
@@ -178,3 +178,139 @@ class ReportHistoryModelTestCase(TestCase):
         self.assertEqual(ReportHistory._meta.verbose_name, 'Report-Historie')
         self.assertEqual(ReportHistory._meta.verbose_name_plural, 'Report-Historien')
         self.assertEqual(ReportHistory._meta.ordering, ['-generated_at'])
+
+
+class ScraperReportRollupTestCase(TestCase):
+    """Test DB-side scraper report aggregation and daily rollups"""
+    
+    def setUp(self):
+        from django.utils import timezone
+        self.now = timezone.now().replace(microsecond=0)
+        self.runs = []
+    
+    def _run(self, days_ago, status='completed', industry='recruiter', mode='standard',
+             leads=5, minutes=10):
+        """Create a run started days_ago and finish it through save()"""
+        from scraper_control.models import ScraperRun
+        started = self.now - timedelta(days=days_ago, hours=1)
+        run = ScraperRun.objects.create(
+            params_snapshot={'industry': industry, 'mode': mode} if industry else {},
+            logs='x' * 1000,
+        )
+        ScraperRun.objects.filter(pk=run.pk).update(started_at=started)
+        run.refresh_from_db()
+        run.status = status
+        run.leads_found = leads
+        if status != 'running':
+            run.finished_at = started + timedelta(minutes=minutes)
+        run.save()
+        self.runs.append(run)
+        return run
+    
+    def _expected(self, start, end):
+        """Reference numbers computed run by run like the previous implementation"""
+        from scraper_control.models import ScraperRun
+        runs = list(ScraperRun.objects.filter(started_at__range=[start, end]))
+        durations = [r.duration.total_seconds() for r in runs if r.duration]
+        industries = {}
+        for run in runs:
+            industry = run.params_snapshot.get('industry', 'unknown') if run.params_snapshot else 'unknown'
+            data = industries.setdefault(industry, {'count': 0, 'leads': 0})
+            data['count'] += 1
+            data['leads'] += run.leads_found
+        return {
+            'total_runs': len(runs),
+            'completed': sum(1 for r in runs if r.status == 'completed'),
+            'failed': sum(1 for r in runs if r.status == 'failed'),
+            'total_leads_found': sum(r.leads_found for r in runs),
+            'avg_duration_seconds': round(sum(durations) / len(durations), 1) if durations else 0,
+            'industries': industries,
+        }
+    
+    def _create_history(self):
+        for days_ago in range(0, 12):
+            self._run(days_ago, leads=days_ago)
+            self._run(days_ago, status='failed', industry='sales', leads=1, minutes=2)
+        self._run(3, status='stopped', industry=None, leads=0, minutes=1)
+        self._run(0, status='running', leads=7)
+    
+    def test_rollups_maintained_when_run_finishes(self):
+        """Finishing a run writes the rollup row for its day"""
+        from django.utils import timezone
+        from reports.models import ScraperRunDailyRollup
+        
+        run = self._run(2, leads=9, minutes=30)
+        
+        rollup = ScraperRunDailyRollup.objects.get(
+            date=timezone.localtime(run.started_at).date(), status='completed'
+        )
+        self.assertEqual(rollup.industry, 'recruiter')
+        self.assertEqual(rollup.mode, 'standard')
+        self.assertEqual(rollup.run_count, 1)
+        self.assertEqual(rollup.leads_found, 9)
+        self.assertAlmostEqual(rollup.duration_seconds, 1800)
+        
+        run.delete()
+        self.assertFalse(ScraperRunDailyRollup.objects.exists())
+    
+    def test_report_matches_run_by_run_computation(self):
+        """Rollups plus live edge days give the same numbers as iterating runs"""
+        from reports.services.report_generator import ReportGenerator
+        self._create_history()
+        start = self.now - timedelta(days=9, hours=5)
+        
+        report = ReportGenerator(start_date=start, end_date=self.now).generate_scraper_report()
+        expected = self._expected(start, self.now)
+        
+        summary = report['summary']
+        for key in ('total_runs', 'completed', 'failed', 'total_leads_found'):
+            self.assertEqual(summary[key], expected[key], key)
+        self.assertAlmostEqual(summary['avg_duration_seconds'], expected['avg_duration_seconds'], delta=0.2)
+        self.assertEqual(
+            {s['industry']: {'count': s['count'], 'leads': s['leads']} for s in report['industry_stats']},
+            expected['industries']
+        )
+    
+    def test_report_reads_rollups_without_loading_runs(self):
+        """Query count does not grow with runs and the logs column is never read"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reports.services.report_generator import ReportGenerator
+        self._create_history()
+        
+        with CaptureQueriesContext(connection) as queries:
+            ReportGenerator(
+                start_date=self.now - timedelta(days=30), end_date=self.now
+            ).generate_scraper_report()
+        
+        self.assertLessEqual(len(queries), 2)
+        for query in queries.captured_queries:
+            self.assertNotIn('"logs"', query['sql'])
+    
+    def test_report_filters_apply_to_rollups(self):
+        """Industry and status filters give the same result as on runs"""
+        from reports.services.report_generator import ReportGenerator
+        self._create_history()
+        
+        report = ReportGenerator(
+            start_date=self.now - timedelta(days=20),
+            end_date=self.now,
+            filters={'industry': 'sales', 'run_status': ['failed']}
+        ).generate_scraper_report()
+        
+        self.assertEqual(report['summary']['total_runs'], 12)
+        self.assertEqual(report['summary']['failed'], 12)
+        self.assertEqual(report['industry_stats'], [{'industry': 'sales', 'count': 12, 'leads': 12}])
+    
+    def test_rebuild_command_restores_rollups(self):
+        """rebuild_report_rollups recreates rows after signal-less updates"""
+        from django.core.management import call_command
+        from io import StringIO
+        from reports.models import ScraperRunDailyRollup
+        self._create_history()
+        expected = ScraperRunDailyRollup.objects.count()
+        ScraperRunDailyRollup.objects.all().delete()
+        
+        call_command('rebuild_report_rollups', '--days', '30', stdout=StringIO())
+        
+        self.assertEqual(ScraperRunDailyRollup.objects.count(), expected)
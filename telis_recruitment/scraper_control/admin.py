@@ -2,7 +2,7 @@ from django.conf import settings
 from django.contrib import admin
 from unfold.admin import ModelAdmin
 from .models import (
-    ScraperConfig, ScraperRun, ScraperLog, ErrorLog,
+    ScraperConfig, ScraperRun, ScraperLog, ScraperLogArchive, ErrorLog,
     SearchRegion, SearchDork, PortalSource, BlacklistEntry,
     UrlSeen, QueryDone
 )
@@ -196,6 +196,21 @@ class ScraperLogAdmin(ModelAdmin):
         return False
 
 
+@admin.register(ScraperLogArchive)
+class ScraperLogArchiveAdmin(ModelAdmin):
+    """Admin interface for ScraperLogArchive"""
+    
+    list_display = ['id', 'run', 'entry_count', 'includes_run_logs', 'first_entry_at', 'last_entry_at', 'compressed_bytes', 'created_at']
+    list_filter = ['includes_run_logs', 'created_at']
+    exclude = ['data']
+    readonly_fields = ['run', 'entry_count', 'includes_run_logs', 'first_entry_at', 'last_entry_at', 'raw_bytes', 'compressed_bytes', 'created_at']
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        """Archives are created by the log retention"""
+        return False
+
+
 @admin.register(ErrorLog)
 class ErrorLogAdmin(ModelAdmin):
     """Admin interface for ErrorLog"""
@@ -0,0 +1,196 @@
+"""
+Config Change Channel - push-based propagation of ScraperConfig changes.
+
+Replaces the polling config watcher: the post_save signal of ScraperConfig
+publishes the new config_version here, and the ProcessManager watcher thread
+blocks on the channel instead of querying the database every few seconds.
+
+Saves in other processes (other gunicorn workers) reach the channel via
+PostgreSQL NOTIFY on CONFIG_NOTIFY_CHANNEL, or, without PostgreSQL, via a
+small version stamp file (path in SCRAPER_CONFIG_STAMP) that the watcher
+stats on every timeout.
+
+Safe runtime parameters (concurrency, delays) are handed to the running
+scraper through a small JSON control file (path in SCRAPER_CONTROL_FILE),
+which the scraper re-reads when its mtime changes. Everything else still
+requires a process restart.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+# ScraperConfig fields the running scraper can apply without restart
+# (config field -> key in the control file / performance params)
+HOT_RELOAD_FIELDS: Dict[str, str] = {
+    'async_limit': 'async_limit',
+    'pool_size': 'pool_size',
+    'sleep_between_queries': 'request_delay',
+}
+
+# Fields that never influence the scraper process
+IGNORED_FIELDS = frozenset({'config_version'})
+
+# PostgreSQL NOTIFY channel for saves from other processes
+CONFIG_NOTIFY_CHANNEL = 'scraper_config'
+
+
+class ConfigChangeChannel:
+    """
+    Version counter with blocking wait.
+
+    Usage:
+        channel.publish(config.config_version)       # post_save signal
+        version = channel.wait(last_seen, timeout)   # watcher thread
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.version = 0
+
+    def publish(self, version: int):
+        """Announce a new config version and wake all waiters."""
+        with self._cond:
+            if version > self.version:
+                self.version = version
+            self._cond.notify_all()
+
+    def wait(self, last_seen: int, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        Block until a version newer than last_seen is published.
+
+        Returns:
+            The new version, or None on timeout
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > last_seen, timeout=timeout)
+            return self.version if self.version > last_seen else None
+
+
+_channel = ConfigChangeChannel()
+
+
+def get_config_channel() -> ConfigChangeChannel:
+    """Get the process-wide config change channel."""
+    return _channel
+
+
+def publish_config_change(version: int):
+    """Publish a saved config version (called from the post_save signal)."""
+    _channel.publish(version)
+    broadcast_config_change(version)
+
+
+def broadcast_config_change(version: int):
+    """Announce a saved config version to the other processes."""
+    if connection.vendor == 'postgresql':
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_notify(%s, %s)",
+                    [CONFIG_NOTIFY_CHANNEL, json.dumps({'config_version': version})],
+                )
+            return
+        except Exception as e:
+            logger.warning(f"Could not send config NOTIFY, using stamp file: {e}")
+    write_config_stamp(version)
+
+
+def handle_config_notification(payload: Dict[str, Any]):
+    """PostgresListener callback: publish a version saved in another process."""
+    try:
+        version = int(payload.get('config_version') or 0)
+    except (TypeError, ValueError):
+        return
+    if version:
+        _channel.publish(version)
+
+
+def config_stamp_path() -> str:
+    """Path of the version stamp file shared by all processes on this host."""
+    return os.environ.get('SCRAPER_CONFIG_STAMP') or os.path.join(
+        tempfile.gettempdir(), 'scraper_config_version'
+    )
+
+
+def write_config_stamp(version: int) -> bool:
+    """Atomically write the latest config version to the stamp file."""
+    path = config_stamp_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(version))
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not write config version stamp {path}: {e}")
+        return False
+
+
+def read_config_stamp() -> Optional[int]:
+    """Config version from the stamp file, or None if there is none."""
+    try:
+        with open(config_stamp_path(), encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return None
+
+
+def diff_config(old: Dict[str, Any], new: Dict[str, Any]) -> Tuple[set, set]:
+    """
+    Split changed config fields into hot-reloadable and restart-requiring.
+
+    Args:
+        old: Previous get_scraper_config() snapshot
+        new: Current get_scraper_config() snapshot
+
+    Returns:
+        Tuple (hot_fields, restart_fields)
+    """
+    changed = {
+        key for key in set(old) | set(new)
+        if key not in IGNORED_FIELDS and old.get(key) != new.get(key)
+    }
+    hot = {key for key in changed if key in HOT_RELOAD_FIELDS}
+    return hot, changed - hot
+
+
+def hot_params(config: Dict[str, Any], fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Map config values to the scraper's performance param names."""
+    fields = HOT_RELOAD_FIELDS if fields is None else fields
+    return {
+        HOT_RELOAD_FIELDS[field]: config[field]
+        for field in fields
+        if field in HOT_RELOAD_FIELDS and config.get(field) is not None
+    }
+
+
+def write_control_file(path: str, version: int, params: Dict[str, Any]) -> bool:
+    """
+    Atomically write the control file read by the running scraper.
+
+    Args:
+        path: Control file path (SCRAPER_CONTROL_FILE of the child)
+        version: Config version the params belong to
+        params: Performance params (async_limit, pool_size, request_delay)
+
+    Returns:
+        True on success
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'params': params}, f)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not write scraper control file {path}: {e}")
+        return False
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Django management command to enforce the scraper log retention.
+
+Moves ScraperLog rows and ScraperRun.logs text older than the live window
+into compressed per-run archives (ScraperLogArchive). Intended for cron;
+the ProcessManager additionally runs a throttled pass after each run.
+
+Usage:
+    python manage.py enforce_log_retention
+    python manage.py enforce_log_retention --days=30
+    python manage.py enforce_log_retention --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from scraper_control.services.log_retention import (
+    DEFAULT_BATCH_SIZE,
+    LOG_RETENTION_DAYS,
+    enforce_log_retention,
+)
+
+
+class Command(BaseCommand):
+    help = 'Archive scraper logs older than the retention window into compressed per-run archives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=LOG_RETENTION_DAYS,
+            help=f'Live window in days (default: {LOG_RETENTION_DAYS})'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows per database round trip (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--max-runs',
+            type=int,
+            default=None,
+            help='Archive at most this many runs in this pass'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be archived without making changes'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        self.stdout.write(f'Enforcing log retention ({options["days"]} days)...')
+
+        summary = enforce_log_retention(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            dry_run=dry_run,
+            max_runs=options['max_runs'],
+        )
+
+        if dry_run:
+            self.stdout.write('\n--- DRY RUN ---')
+            self.stdout.write(f'Cutoff:   {summary["cutoff"]}')
+            self.stdout.write(f'Runs:     {summary["runs"]}')
+            self.stdout.write(f'Entries:  {summary["entries"]}')
+            self.stdout.write(f'Run logs: {summary["run_logs"]}')
+            return
+
+        self.stdout.write(self.style.SUCCESS('\nRetention complete!'))
+        self.stdout.write(f'  Runs archived:     {summary["runs"]}')
+        self.stdout.write(f'  Entries archived:  {summary["entries"]}')
+        self.stdout.write(f'  Run logs archived: {summary["run_logs"]}')
+        self.stdout.write(f'  Archive size:      {summary["bytes"]} bytes')
+
+        if summary['errors']:
+            self.stdout.write(self.style.WARNING(f'\nErrors ({len(summary["errors"])}):'))
+            for error in summary['errors'][:5]:
+                self.stdout.write(f'  - {error}')
+            if len(summary['errors']) > 5:
+                self.stdout.write(f'  ... and {len(summary["errors"]) - 5} more')
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.30 on 2026-10-18 22:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper_control', '0013_add_postgres_notify_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScraperLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField(verbose_name='Daten (gzip JSON-Lines)')),
+                ('entry_count', models.IntegerField(default=0, verbose_name='Einträge')),
+                ('includes_run_logs', models.BooleanField(default=False, help_text='Archiv enthält den Text aus ScraperRun.logs', verbose_name='Enthält Lauf-Logtext')),
+                ('first_entry_at', models.DateTimeField(blank=True, null=True, verbose_name='Erster Eintrag')),
+                ('last_entry_at', models.DateTimeField(blank=True, null=True, verbose_name='Letzter Eintrag')),
+                ('raw_bytes', models.IntegerField(default=0, verbose_name='Unkomprimiert (Bytes)')),
+                ('compressed_bytes', models.IntegerField(default=0, verbose_name='Komprimiert (Bytes)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Archiviert am')),
+            ],
+            options={
+                'verbose_name': 'Scraper-Log-Archiv',
+                'verbose_name_plural': 'Scraper-Log-Archive',
+                'ordering': ['run', 'created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scraperlog',
+            index=models.Index(fields=['run', 'created_at', 'level'], name='scraper_con_run_id_fe26a2_idx'),
+        ),
+        migrations.AddField(
+            model_name='scraperlogarchive',
+            name='run',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_archives', to='scraper_control.scraperrun', verbose_name='Scraper-Lauf'),
+        ),
+        migrations.AddIndex(
+            model_name='scraperlogarchive',
+            index=models.Index(fields=['run', 'created_at'], name='scraper_con_run_id_dadbbd_idx'),
+        ),
+    ]
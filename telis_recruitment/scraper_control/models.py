@@ -505,6 +505,7 @@ class ScraperLog(models.Model):
         verbose_name_plural = "Scraper-Logs"
         indexes = [
             models.Index(fields=['run', 'created_at']),
+            models.Index(fields=['run', 'created_at', 'level']),
             models.Index(fields=['level', 'created_at']),
             models.Index(fields=['portal', 'created_at']),
         ]
@@ -513,6 +514,46 @@ class ScraperLog(models.Model):
         return f"[{self.level}] {self.message[:50]}"
 
 
+class ScraperLogArchive(models.Model):
+    """
+    Compressed archive of old log entries of a scraper run.
+    
+    Written by the log retention (services/log_retention.py): ScraperLog rows
+    and the ScraperRun.logs text outside the live window are moved here as
+    gzip-compressed JSON lines, so the live tables stay small.
+    """
+    
+    run = models.ForeignKey(
+        ScraperRun,
+        on_delete=models.CASCADE,
+        related_name='log_archives',
+        verbose_name="Scraper-Lauf"
+    )
+    data = models.BinaryField(verbose_name="Daten (gzip JSON-Lines)")
+    entry_count = models.IntegerField(default=0, verbose_name="Einträge")
+    includes_run_logs = models.BooleanField(
+        default=False,
+        verbose_name="Enthält Lauf-Logtext",
+        help_text="Archiv enthält den Text aus ScraperRun.logs"
+    )
+    first_entry_at = models.DateTimeField(null=True, blank=True, verbose_name="Erster Eintrag")
+    last_entry_at = models.DateTimeField(null=True, blank=True, verbose_name="Letzter Eintrag")
+    raw_bytes = models.IntegerField(default=0, verbose_name="Unkomprimiert (Bytes)")
+    compressed_bytes = models.IntegerField(default=0, verbose_name="Komprimiert (Bytes)")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Archiviert am")
+    
+    class Meta:
+        ordering = ['run', 'created_at']
+        verbose_name = "Scraper-Log-Archiv"
+        verbose_name_plural = "Scraper-Log-Archive"
+        indexes = [
+            models.Index(fields=['run', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Log-Archiv Run #{self.run_id} ({self.entry_count} Einträge)"
+
+
 class ErrorLog(models.Model):
     """
     Structured error tracking with classification.
@@ -864,9 +905,9 @@ def scraper_config_changed(sender, instance, created, **kwargs):
     """
     Signal handler for ScraperConfig changes.
     
-    Logs configuration changes to help with debugging and observability.
-    The actual restart is handled by the ProcessManager's config watcher thread,
-    which polls the config_version field.
+    Logs configuration changes and publishes the new config_version on the
+    config change channel. The ProcessManager's config watcher thread wakes up
+    on it and either hot-reloads the running scraper or restarts it.
     
     Args:
         sender: The model class (ScraperConfig)
@@ -885,3 +926,9 @@ def scraper_config_changed(sender, instance, created, **kwargs):
             f"(industry={instance.industry}, mode={instance.mode}, qpi={instance.qpi})"
         )
         logger.info("ProcessManager will automatically detect this change and restart the scraper if running")
+    
+    # Notify after commit, so the watcher thread reads the saved row
+    from django.db import transaction
+    from .config_channel import publish_config_change
+    version = instance.config_version
+    transaction.on_commit(lambda: publish_config_change(version))
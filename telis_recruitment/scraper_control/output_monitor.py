@@ -3,6 +3,7 @@ OutputMonitor - Handles process output reading and log management.
 Responsible for reading subprocess output, storing logs, and persisting to database.
 """
 
+import json
 import threading
 import logging
 from typing import Optional, List, Dict, Any
@@ -12,6 +13,9 @@ from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# Levels accepted from structured (JSON-lines) scraper output
+STRUCTURED_LOG_LEVELS = {'DEBUG', 'INFO', 'WARN', 'ERROR', 'CRITICAL'}
+
 
 class OutputMonitor:
     """
@@ -92,6 +96,12 @@ class OutputMonitor:
             line: Log line to process
             error_callback: Callback for error detection
         """
+        structured = self._parse_structured_line(line)
+        if structured:
+            line, level = structured
+        else:
+            level = None
+
         timestamp = timezone.now()
         log_entry = {
             'timestamp': timestamp.isoformat(),
@@ -122,8 +132,9 @@ class OutputMonitor:
                     run.logs = run.logs[-50000:]
                 run.save(update_fields=['logs'])
 
-                # Determine log level from message
-                level = self._detect_log_level(line)
+                # Determine log level from message unless the scraper sent it
+                if level is None:
+                    level = self._detect_log_level(line)
 
                 # Create ScraperLog entry for SSE streaming
                 ScraperLog.objects.create(
@@ -141,6 +152,33 @@ class OutputMonitor:
             except Exception as e:
                 logger.error(f"Failed to update ScraperRun logs: {e}")
 
+    def _parse_structured_line(self, line: str) -> Optional[tuple]:
+        """
+        Parse a JSON-lines record (SCRAPER_LOG_FORMAT=json).
+
+        Args:
+            line: Raw output line
+
+        Returns:
+            Tuple of (display line, level) or None for plain text output
+        """
+        if not line.startswith('{'):
+            return None
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(record, dict) or 'msg' not in record or 'level' not in record:
+            return None
+
+        level = str(record['level']).upper()
+        if level not in STRUCTURED_LOG_LEVELS:
+            level = 'INFO'
+        ts = str(record.get('ts', ''))[:19].replace('T', ' ')
+        ctx = record.get('ctx')
+        ctx_str = (" " + json.dumps(ctx, ensure_ascii=False)) if ctx else ""
+        return f"[{ts}] [{level:7}] {record['msg']}{ctx_str}", level
+
     def _detect_log_level(self, message: str) -> str:
         """
         Detect log level from message content.
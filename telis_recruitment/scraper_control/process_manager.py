@@ -9,6 +9,7 @@ Refactored to use composition with specialized components.
 import os
 import subprocess
 import psutil
+import tempfile
 import threading
 from typing import Optional, Dict, Any, List
 from datetime import datetime
@@ -20,6 +21,15 @@ from .output_monitor import OutputMonitor
 from .retry_controller import RetryController
 from .circuit_breaker import CircuitBreaker, CircuitBreakerState
 from .error_types import ScraperErrorType, create_error_response
+from .config_channel import (
+    CONFIG_NOTIFY_CHANNEL,
+    diff_config,
+    get_config_channel,
+    handle_config_notification,
+    hot_params,
+    read_config_stamp,
+    write_control_file,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -74,11 +84,20 @@ class ProcessManager:
         
         # Config version tracking for automatic restart on config changes
         self.current_config_version: int = 0
+        self.config_snapshot: Dict[str, Any] = {}  # get_scraper_config() of the tracked version
         self.config_watcher_thread: Optional[threading.Thread] = None
-        self.config_check_interval: int = 10  # Check every 10 seconds
+        self.config_listener = None  # PostgresListener for saves in other processes
+        # Seconds between checks of the version stamp file (saves from other
+        # processes without PostgreSQL); a stat call, no database query
+        self.config_check_interval: int = 2
         self.restart_lock = threading.Lock()  # Prevent concurrent restarts
         self.last_restart_user = None  # Track user who last started the process
         
+        # Control file for hot-reloadable params of the running scraper
+        self.control_file: str = os.path.join(
+            tempfile.gettempdir(), f"scraper_control_{os.getpid()}.json"
+        )
+        
         # Load configuration from database (will be set dynamically)
         self._load_config()
         
@@ -100,6 +119,9 @@ class ProcessManager:
             # Track current config version
             self.current_config_version = config.config_version
             
+            from .config_loader import get_scraper_config
+            self.config_snapshot = get_scraper_config()
+            
             logger.info(f"Configuration loaded into all components (version {self.current_config_version})")
         except Exception as e:
             logger.warning(f"Failed to load config from database, using defaults: {e}")
@@ -242,6 +264,13 @@ class ProcessManager:
             # Reset consecutive failures counter on successful run
             if exit_code == 0:
                 self.reset_failure_counter()
+            
+            # Keep the live log tables small (throttled, runs in background)
+            try:
+                from .services.log_retention import schedule_log_retention
+                schedule_log_retention()
+            except Exception as e:
+                logger.warning(f"Could not schedule log retention: {e}")
     
     def _handle_error(self, error_type: str):
         """
@@ -409,6 +438,17 @@ class ProcessManager:
             overrides = config.env_overrides()
             self.launcher.apply_env_overrides(env, overrides)
 
+            # Structured output: levels come from the scraper instead of regex guessing
+            env.setdefault('SCRAPER_LOG_FORMAT', 'json')
+
+            # Hot-reload channel: concurrency/delay changes reach the child without restart
+            if write_control_file(
+                self.control_file,
+                self.current_config_version,
+                hot_params(self.config_snapshot),
+            ):
+                env['SCRAPER_CONTROL_FILE'] = self.control_file
+
             # Ensure all env values are strings (safety filter)
             env = {k: str(v) for k, v in env.items() if v is not None}
             
@@ -653,56 +693,107 @@ class ProcessManager:
         finally:
             self.restart_lock.release()
     
+    def apply_config_change(self) -> Dict[str, Any]:
+        """
+        Apply the current database config to the running scraper.
+        
+        Changes limited to hot-reloadable params (concurrency, delays) are
+        written to the control file the scraper watches; any other change
+        restarts the process.
+        
+        Returns:
+            Dictionary with 'action' ('none', 'hot_reload', 'restart') and details
+        """
+        from .models import ScraperConfig
+        from .config_loader import get_scraper_config
+        
+        new_version = ScraperConfig.get_config().config_version
+        if new_version == self.current_config_version:
+            return {'action': 'none', 'version': new_version}
+        
+        old_version = self.current_config_version
+        logger.info(f"Configuration version changed: {old_version} -> {new_version}")
+        
+        if not self.is_running():
+            self._load_config()
+            return {'action': 'none', 'version': new_version}
+        
+        new_config = get_scraper_config()
+        hot_fields, restart_fields = diff_config(self.config_snapshot, new_config)
+        
+        if not restart_fields:
+            params = hot_params(new_config, hot_fields)
+            if write_control_file(self.control_file, new_version, params):
+                self.current_config_version = new_version
+                self.config_snapshot = new_config
+                logger.info(f"Config v{new_version} applied without restart: {params}")
+                self.output_monitor.log_error(
+                    f"⚙️ Konfiguration v{new_version} live übernommen: "
+                    + ", ".join(f"{k}={v}" for k, v in sorted(params.items()))
+                )
+                return {'action': 'hot_reload', 'version': new_version, 'params': params}
+        
+        # Update tracked version before restarting (restart reloads the snapshot)
+        self.current_config_version = new_version
+        logger.info(
+            f"Triggering automatic restart due to config change "
+            f"({', '.join(sorted(restart_fields)) or 'control file unavailable'})"
+        )
+        restart_result = self.restart_process()
+        if restart_result.get('success'):
+            logger.info(f"Config change restart successful (v{old_version} -> v{new_version})")
+        else:
+            logger.error(f"Config change restart failed: {restart_result.get('error')}")
+        return {'action': 'restart', 'version': new_version, 'result': restart_result}
+    
     def _start_config_watcher(self):
         """
-        Start background thread that watches for configuration changes.
+        Start background thread that reacts to configuration changes.
         
-        Polls the ScraperConfig.config_version every few seconds and triggers
-        an automatic restart when the version changes.
+        The thread blocks on the config change channel, which the ScraperConfig
+        post_save signal notifies, so managers cause no database load and
+        changes apply immediately. Saves from other processes (e.g. other
+        gunicorn workers) arrive via PostgreSQL LISTEN/NOTIFY; without
+        PostgreSQL the version stamp file is checked every
+        config_check_interval seconds.
         """
         if self.config_watcher_thread is not None:
             logger.debug("Config watcher thread already running")
             return
         
+        channel = get_config_channel()
+        
+        from .postgres_listener import PostgresListener
+        listener = PostgresListener(channel=CONFIG_NOTIFY_CHANNEL)
+        if listener.is_postgresql():
+            listener.start(callback=handle_config_notification)
+            if listener._running:
+                self.config_listener = listener
+        
         def config_watcher_loop():
-            """Background loop that checks for config version changes."""
+            """Background loop that waits for config change notifications."""
             logger.info("Config watcher thread started")
+            seen = channel.version
             
             while True:
                 try:
-                    import time
-                    time.sleep(self.config_check_interval)
+                    published = channel.wait(seen, timeout=self.config_check_interval)
+                    if published is None and self.config_listener is None:
+                        stamped = read_config_stamp()
+                        if stamped is not None and stamped > seen:
+                            published = stamped
+                    if published is None:
+                        continue
+                    seen = published
                     
-                    # Only check if a scraper is running
+                    # Only relevant if a scraper is running
                     if not self.is_running():
                         continue
                     
-                    # Check current config version from database
                     try:
-                        from .models import ScraperConfig
-                        config = ScraperConfig.get_config()
-                        new_version = config.config_version
-                        
-                        if new_version != self.current_config_version:
-                            logger.info(
-                                f"Configuration version changed: {self.current_config_version} -> {new_version}"
-                            )
-                            
-                            # Update tracked version
-                            old_version = self.current_config_version
-                            self.current_config_version = new_version
-                            
-                            # Trigger automatic restart
-                            logger.info("Triggering automatic restart due to config change")
-                            restart_result = self.restart_process()
-                            
-                            if restart_result.get('success'):
-                                logger.info(f"Config change restart successful (v{old_version} -> v{new_version})")
-                            else:
-                                logger.error(f"Config change restart failed: {restart_result.get('error')}")
-                    
+                        self.apply_config_change()
                     except Exception as e:
-                        logger.debug(f"Error checking config version: {e}")
+                        logger.debug(f"Error applying config change: {e}")
                         # Don't fail the watcher thread on transient errors
                         continue
                         
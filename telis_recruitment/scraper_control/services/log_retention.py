@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Log retention - moves old scraper logs out of the live tables.
+
+ScraperLog rows and the ScraperRun.logs text of finished runs that are older
+than the retention window are rolled into one gzip-compressed JSON-lines
+archive per run and pass (ScraperLogArchive) and then deleted from the live
+tables. Log viewer, SSE catch-up and report queries therefore only scan the
+live window.
+
+Entry points:
+- enforce_log_retention(): one retention pass (management command
+  ``enforce_log_retention``, cron)
+- schedule_log_retention(): throttled background pass, called by the
+  ProcessManager after a scraper run finished
+- read_archived_logs(): stream archived entries of a run back
+
+Environment:
+- SCRAPER_LOG_RETENTION_DAYS: live window in days (default: 14)
+- SCRAPER_LOG_RETENTION_INTERVAL: min. hours between scheduled passes (default: 24)
+"""
+
+import gzip
+import io
+import json
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterator, Optional
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+LOG_RETENTION_DAYS = int(os.getenv('SCRAPER_LOG_RETENTION_DAYS', '14'))
+LOG_RETENTION_INTERVAL_HOURS = float(os.getenv('SCRAPER_LOG_RETENTION_INTERVAL', '24'))
+
+# Rows fetched per database round trip while archiving
+DEFAULT_BATCH_SIZE = 2000
+
+_schedule_lock = threading.Lock()
+_last_scheduled: Optional[float] = None
+
+
+def _entry(log) -> Dict[str, Any]:
+    return {
+        'id': log.id,
+        'level': log.level,
+        'portal': log.portal,
+        'message': log.message,
+        'created_at': log.created_at.isoformat(),
+    }
+
+
+def _includes_run_logs(run, cutoff) -> bool:
+    """Whether the run's ScraperRun.logs text is due for archiving."""
+    finished_at = run.finished_at or run.started_at
+    return bool(run.logs) and finished_at is not None and finished_at < cutoff
+
+
+def archive_run_logs(run, cutoff, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Archive and delete a run's log rows older than cutoff.
+
+    The ScraperRun.logs text is archived as well once the run finished
+    before the cutoff.
+
+    Args:
+        run: ScraperRun (not running)
+        cutoff: Datetime; older entries leave the live tables
+        batch_size: Rows per database round trip
+
+    Returns:
+        Dict with 'entries', 'run_logs' (1 if the run's logs text was archived)
+        and 'bytes' (compressed size); zeros if nothing was archived
+    """
+    from ..models import ScraperLog, ScraperLogArchive, ScraperRun
+
+    include_run_logs = _includes_run_logs(run, cutoff)
+
+    buffer = io.BytesIO()
+    count = raw_bytes = 0
+    first_at = last_at = None
+    max_id = None
+
+    with transaction.atomic():
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
+            rows = (
+                ScraperLog.objects
+                .filter(run_id=run.id, created_at__lt=cutoff)
+                .order_by('id')
+                .iterator(chunk_size=batch_size)
+            )
+            for log in rows:
+                line = (json.dumps(_entry(log), ensure_ascii=False) + '\n').encode('utf-8')
+                gz.write(line)
+                raw_bytes += len(line)
+                count += 1
+                max_id = log.id
+                first_at = first_at or log.created_at
+                last_at = log.created_at
+
+            if include_run_logs:
+                line = (json.dumps({'kind': 'run_logs', 'message': run.logs}, ensure_ascii=False) + '\n').encode('utf-8')
+                gz.write(line)
+                raw_bytes += len(line)
+
+        if not count and not include_run_logs:
+            return {'entries': 0, 'run_logs': 0, 'bytes': 0}
+
+        data = buffer.getvalue()
+        ScraperLogArchive.objects.create(
+            run_id=run.id,
+            data=data,
+            entry_count=count,
+            includes_run_logs=include_run_logs,
+            first_entry_at=first_at,
+            last_entry_at=last_at,
+            raw_bytes=raw_bytes,
+            compressed_bytes=len(data),
+        )
+
+        if max_id is not None:
+            ScraperLog.objects.filter(run_id=run.id, created_at__lt=cutoff, id__lte=max_id).delete()
+        if include_run_logs:
+            ScraperRun.objects.filter(pk=run.pk).update(logs='')
+
+    return {'entries': count, 'run_logs': int(include_run_logs), 'bytes': len(data)}
+
+
+def enforce_log_retention(
+    days: Optional[int] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    dry_run: bool = False,
+    max_runs: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run one retention pass over all finished runs.
+
+    Args:
+        days: Live window in days (default: SCRAPER_LOG_RETENTION_DAYS)
+        batch_size: Rows per database round trip
+        dry_run: Only count what would be archived
+        max_runs: Stop after this many runs (spreads large backlogs over passes)
+
+    Returns:
+        Summary dict (runs, entries, run_logs, bytes, errors, cutoff)
+    """
+    from ..models import ScraperLog, ScraperRun
+
+    days = LOG_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    summary: Dict[str, Any] = {
+        'cutoff': cutoff.isoformat(),
+        'runs': 0,
+        'entries': 0,
+        'run_logs': 0,
+        'bytes': 0,
+        'errors': [],
+    }
+
+    runs = (
+        ScraperRun.objects
+        .exclude(status='running')
+        .filter(
+            Q(pk__in=ScraperLog.objects.filter(created_at__lt=cutoff).values('run_id'))
+            | (Q(finished_at__lt=cutoff) & ~Q(logs=''))
+            | (Q(finished_at__isnull=True) & Q(started_at__lt=cutoff) & ~Q(logs=''))
+        )
+        .order_by('id')
+    )
+    if max_runs:
+        runs = runs[:max_runs]
+
+    for run in runs.iterator():
+        if dry_run:
+            entries = ScraperLog.objects.filter(run_id=run.id, created_at__lt=cutoff).count()
+            run_logs = int(_includes_run_logs(run, cutoff))
+            if entries or run_logs:
+                summary['runs'] += 1
+                summary['entries'] += entries
+                summary['run_logs'] += run_logs
+            continue
+        try:
+            result = archive_run_logs(run, cutoff, batch_size=batch_size)
+        except Exception as e:
+            logger.error(f"Log retention failed for run {run.id}: {e}", exc_info=True)
+            summary['errors'].append(f"Run {run.id}: {e}")
+            continue
+        if result['entries'] or result['bytes']:
+            summary['runs'] += 1
+            summary['entries'] += result['entries']
+            summary['run_logs'] += result['run_logs']
+            summary['bytes'] += result['bytes']
+
+    if not dry_run and summary['runs']:
+        logger.info(
+            f"Log retention: {summary['entries']} entries of {summary['runs']} runs archived "
+            f"({summary['bytes']} bytes compressed, cutoff {summary['cutoff']})"
+        )
+    return summary
+
+
+def read_archived_logs(run, include_run_logs: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the archived entries of a run in archive order.
+
+    Args:
+        run: ScraperRun or run id
+        include_run_logs: Also yield the archived ScraperRun.logs text
+            (as {'kind': 'run_logs', 'message': ...})
+    """
+    from ..models import ScraperLogArchive
+
+    run_id = getattr(run, 'pk', run)
+    for archive in ScraperLogArchive.objects.filter(run_id=run_id).order_by('created_at', 'id'):
+        with gzip.GzipFile(fileobj=io.BytesIO(bytes(archive.data)), mode='rb') as gz:
+            for line in gz:
+                entry = json.loads(line)
+                if entry.get('kind') == 'run_logs' and not include_run_logs:
+                    continue
+                yield entry
+
+
+def schedule_log_retention(force: bool = False) -> bool:
+    """
+    Start a background retention pass, at most once per retention interval.
+
+    Returns:
+        True if a pass was started
+    """
+    global _last_scheduled
+
+    with _schedule_lock:
+        now = time.monotonic()
+        if (
+            not force
+            and _last_scheduled is not None
+            and now - _last_scheduled < LOG_RETENTION_INTERVAL_HOURS * 3600
+        ):
+            return False
+        _last_scheduled = now
+
+    def _run():
+        from django.db import connection
+        try:
+            enforce_log_retention()
+        except Exception as e:
+            logger.error(f"Scheduled log retention failed: {e}", exc_info=True)
+        finally:
+            connection.close()
+
+    threading.Thread(target=_run, name="LogRetention", daemon=True).start()
+    return True
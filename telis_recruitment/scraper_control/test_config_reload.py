@@ -4,7 +4,10 @@ Tests for automatic configuration reload functionality.
 Tests the config watcher thread and automatic restart on config changes.
 """
 
+import json
+import os
 import pytest
+import tempfile
 import time
 import threading
 from unittest.mock import Mock, patch, MagicMock
@@ -13,6 +16,15 @@ from django.contrib.auth.models import User
 
 from .models import ScraperConfig, ScraperRun
 from .process_manager import ProcessManager, get_manager
+from .config_channel import (
+    ConfigChangeChannel,
+    broadcast_config_change,
+    diff_config,
+    get_config_channel,
+    handle_config_notification,
+    read_config_stamp,
+    write_config_stamp,
+)
 
 
 class TestConfigReload(TestCase):
@@ -231,11 +243,11 @@ class TestConfigReloadIntegration(TestCase):
         assert manager.current_config_version == self.config.config_version
     
     def test_config_watcher_interval(self):
-        """Test that config watcher uses correct interval."""
+        """Test that config watcher uses correct fallback interval."""
         manager = ProcessManager()
         
-        # Should use 10-second interval by default
-        assert manager.config_check_interval == 10
+        # Changes are pushed; without PostgreSQL the stamp file is checked every 2 seconds
+        assert manager.config_check_interval == 2
     
     def test_restart_preserves_user_context(self):
         """Test that restart preserves user context."""
@@ -255,3 +267,142 @@ class TestConfigReloadIntegration(TestCase):
                     mock_start.assert_called_once()
                     call_args = mock_start.call_args
                     assert call_args[1]['user'] == self.user
+
+
+class TestConfigChangeChannel(TestCase):
+    """Tests for push-based config propagation and hot reload."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.config = ScraperConfig.get_config()
+        ProcessManager._instance = None
+        ProcessManager._initialized = False
+        
+        fd, self.control_file = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.stamp_file = f"{self.control_file}.version"
+        stamp_env = patch.dict(os.environ, {'SCRAPER_CONFIG_STAMP': self.stamp_file})
+        stamp_env.start()
+        self.addCleanup(stamp_env.stop)
+    
+    def tearDown(self):
+        """Clean up control and stamp file."""
+        for path in (self.control_file, self.stamp_file):
+            if os.path.exists(path):
+                os.unlink(path)
+    
+    def _running_manager(self):
+        manager = ProcessManager()
+        manager.control_file = self.control_file
+        manager.status = 'running'
+        return manager
+    
+    def test_wait_returns_published_version(self):
+        """Test that waiters wake up on publish and time out otherwise."""
+        channel = ConfigChangeChannel()
+        assert channel.wait(0, timeout=0.01) is None
+        
+        threading.Timer(0.05, channel.publish, args=(3,)).start()
+        assert channel.wait(0, timeout=2) == 3
+        assert channel.wait(3, timeout=0.01) is None
+    
+    def test_post_save_publishes_after_commit(self):
+        """Test that saving the config publishes the new version."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config.qpi = 25
+            self.config.save()
+        
+        assert get_config_channel().version >= self.config.config_version
+    
+    def test_diff_config_splits_hot_and_restart_fields(self):
+        """Test classification of changed fields."""
+        old = {'async_limit': 35, 'sleep_between_queries': 2.7, 'qpi': 10, 'config_version': 1}
+        new = {'async_limit': 20, 'sleep_between_queries': 2.7, 'qpi': 15, 'config_version': 2}
+        
+        hot, restart = diff_config(old, new)
+        
+        assert hot == {'async_limit'}
+        assert restart == {'qpi'}
+    
+    def test_hot_change_writes_control_file_without_restart(self):
+        """Test that concurrency/delay changes reach the scraper without restart."""
+        manager = self._running_manager()
+        
+        with patch.object(manager, 'is_running', return_value=True):
+            with patch.object(manager, 'restart_process') as mock_restart:
+                self.config.async_limit = 12
+                self.config.sleep_between_queries = 1.5
+                self.config.save()
+                
+                result = manager.apply_config_change()
+        
+        assert result['action'] == 'hot_reload'
+        mock_restart.assert_not_called()
+        assert manager.current_config_version == self.config.config_version
+        
+        with open(self.control_file, encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['version'] == self.config.config_version
+        assert data['params'] == {'async_limit': 12, 'request_delay': 1.5}
+    
+    def test_other_change_triggers_restart(self):
+        """Test that non-hot fields still restart the scraper."""
+        manager = self._running_manager()
+        
+        with patch.object(manager, 'is_running', return_value=True):
+            with patch.object(manager, 'restart_process', return_value={'success': True}) as mock_restart:
+                self.config.industry = 'candidates'
+                self.config.save()
+                
+                result = manager.apply_config_change()
+        
+        assert result['action'] == 'restart'
+        mock_restart.assert_called_once()
+    
+    def test_watcher_applies_change_on_notification(self):
+        """Test that the watcher thread reacts to a published version."""
+        manager = self._running_manager()
+        applied = threading.Event()
+        
+        with patch.object(manager, 'is_running', return_value=True):
+            with patch.object(manager, 'apply_config_change', side_effect=lambda: applied.set()):
+                get_config_channel().publish(get_config_channel().version + 1)
+                assert applied.wait(2)
+    
+    def test_save_is_broadcast_to_other_processes(self):
+        """Test that a save writes the version stamp (NOTIFY on PostgreSQL)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.config.qpi = 30
+            self.config.save()
+        assert read_config_stamp() == self.config.config_version
+        
+        fake_connection = MagicMock(vendor='postgresql')
+        cursor = fake_connection.cursor.return_value.__enter__.return_value
+        with patch('scraper_control.config_channel.connection', fake_connection):
+            broadcast_config_change(41)
+        sql, params = cursor.execute.call_args[0]
+        assert 'pg_notify' in sql
+        assert params == ['scraper_config', json.dumps({'config_version': 41})]
+        assert read_config_stamp() == self.config.config_version
+    
+    def test_notification_from_other_process_is_published(self):
+        """Test that the LISTEN callback feeds the local channel."""
+        version = get_config_channel().version + 1
+        handle_config_notification({'config_version': version})
+        assert get_config_channel().version == version
+        handle_config_notification({'config_version': 'garbage'})
+        assert get_config_channel().version == version
+    
+    def test_watcher_applies_stamp_from_other_worker(self):
+        """Test that a version stamped by another worker is applied without a DB poll."""
+        manager = self._running_manager()
+        manager.config_check_interval = 0.05
+        applied = threading.Event()
+        
+        with patch.object(manager, 'is_running', return_value=True):
+            with patch.object(manager, 'apply_config_change', side_effect=lambda: applied.set()) as apply:
+                time.sleep(0.2)
+                # Nothing new: the watcher does not touch the database
+                assert apply.call_count == 0
+                write_config_stamp(get_config_channel().version + 5)
+                assert applied.wait(5)
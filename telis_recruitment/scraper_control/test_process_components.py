@@ -118,6 +118,28 @@ class OutputMonitorTest(TestCase):
         
         self.monitor.clear_logs()
         self.assertEqual(len(self.monitor.logs), 0)
+    
+    def test_parse_structured_line(self):
+        """JSON-lines output provides level and display text without guessing."""
+        line, level = self.monitor._parse_structured_line(
+            '{"ts": "2024-01-01T10:00:00.123", "level": "WARN", "msg": "Drop", "ctx": {"reason": "no_phone"}}'
+        )
+        self.assertEqual(level, 'WARN')
+        self.assertEqual(line, '[2024-01-01 10:00:00] [WARN   ] Drop {"reason": "no_phone"}')
+        
+        # "error" in the message no longer turns an info record into an error
+        line, level = self.monitor._parse_structured_line(
+            '{"ts": "2024-01-01T10:00:00", "level": "INFO", "msg": "0 errors"}'
+        )
+        self.assertEqual(level, 'INFO')
+        
+        self.assertIsNone(self.monitor._parse_structured_line('[2024-01-01 10:00:00] [INFO   ] text'))
+        self.assertIsNone(self.monitor._parse_structured_line('{not json'))
+    
+    def test_process_structured_line_stores_display_text(self):
+        """Structured lines are stored as readable text in the log buffer."""
+        self.monitor._process_log_line('{"ts": "2024-01-01T10:00:00", "level": "ERROR", "msg": "boom"}')
+        self.assertEqual(self.monitor.get_logs(1)[0]['message'], '[2024-01-01 10:00:00] [ERROR  ] boom')
 
 
 class RetryControllerTest(TestCase):
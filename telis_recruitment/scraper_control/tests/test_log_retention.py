@@ -0,0 +1,109 @@
+"""
+Tests for scraper log retention and archival.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from scraper_control.models import ScraperLog, ScraperLogArchive, ScraperRun
+from scraper_control.services.log_retention import (
+    enforce_log_retention,
+    read_archived_logs,
+)
+
+
+class TestLogRetention(TestCase):
+    """Test archiving of logs outside the live window."""
+
+    def setUp(self):
+        self.old = timezone.now() - timedelta(days=30)
+        self.run = ScraperRun.objects.create(status='completed', logs='line 1\nline 2')
+        ScraperRun.objects.filter(pk=self.run.pk).update(started_at=self.old, finished_at=self.old)
+        self.run.refresh_from_db()
+
+        for i in range(5):
+            ScraperLog.objects.create(run=self.run, level='ERROR' if i == 2 else 'INFO', message=f'old {i}')
+        ScraperLog.objects.filter(run=self.run).update(created_at=self.old)
+        ScraperLog.objects.create(run=self.run, level='INFO', message='recent')
+
+    def test_old_entries_are_archived_and_deleted(self):
+        """Test that only entries outside the window leave the live table."""
+        summary = enforce_log_retention(days=14)
+
+        assert summary['runs'] == 1
+        assert summary['entries'] == 5
+        assert list(ScraperLog.objects.values_list('message', flat=True)) == ['recent']
+
+        archive = ScraperLogArchive.objects.get(run=self.run)
+        assert archive.entry_count == 5
+        assert archive.includes_run_logs is True
+        assert 0 < archive.compressed_bytes
+
+        self.run.refresh_from_db()
+        assert self.run.logs == ''
+
+    def test_archived_entries_can_be_read_back(self):
+        """Test that archives round-trip in order."""
+        enforce_log_retention(days=14)
+
+        entries = list(read_archived_logs(self.run))
+        assert [e['message'] for e in entries] == [f'old {i}' for i in range(5)]
+        assert entries[2]['level'] == 'ERROR'
+
+        with_text = list(read_archived_logs(self.run.pk, include_run_logs=True))
+        assert with_text[-1] == {'kind': 'run_logs', 'message': 'line 1\nline 2'}
+
+    def test_running_runs_are_skipped(self):
+        """Test that a running scraper keeps its logs."""
+        ScraperRun.objects.filter(pk=self.run.pk).update(status='running')
+
+        summary = enforce_log_retention(days=14)
+
+        assert summary['runs'] == 0
+        assert ScraperLog.objects.count() == 6
+
+    def test_second_pass_is_a_noop(self):
+        """Test that retention is idempotent."""
+        enforce_log_retention(days=14)
+        summary = enforce_log_retention(days=14)
+
+        assert summary['runs'] == 0
+        assert ScraperLogArchive.objects.count() == 1
+
+    def test_management_command_dry_run(self):
+        """Test that --dry-run changes nothing."""
+        out = StringIO()
+        call_command('enforce_log_retention', '--days=14', '--dry-run', stdout=out)
+
+        assert 'Entries:  5' in out.getvalue()
+        assert 'Run logs: 1' in out.getvalue()
+        assert ScraperLog.objects.count() == 6
+        assert not ScraperLogArchive.objects.exists()
+
+        # A finished run with only its logs text left is still reported
+        ScraperLog.objects.filter(created_at__lt=timezone.now() - timedelta(days=14)).delete()
+        summary = enforce_log_retention(days=14, dry_run=True)
+        assert (summary['runs'], summary['entries'], summary['run_logs']) == (1, 0, 1)
+        assert enforce_log_retention(days=14)['run_logs'] == 1
+
+    def test_logs_api_returns_newest_window(self):
+        """Test that the filtered log API returns the newest entries in order."""
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        self.client.force_login(admin)
+
+        response = self.client.get(reverse('scraper_control:api-logs-filtered'), {'run_id': self.run.pk, 'limit': 2})
+        assert response.status_code == 200
+        assert [e['message'] for e in response.json()] == ['old 4', 'recent']
+
+        enforce_log_retention(days=14)
+        response = self.client.get(
+            reverse('scraper_control:api-logs-filtered'),
+            {'run_id': self.run.pk, 'archived': '1', 'level': 'ERROR'},
+        )
+        assert [e['message'] for e in response.json()] == ['old 2']
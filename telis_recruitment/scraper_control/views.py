@@ -575,17 +575,28 @@ def api_logs_filtered(request):
     - level: Filter by log level (DEBUG, INFO, WARN, ERROR, CRITICAL)
     - start_date: Filter from date (ISO format)
     - end_date: Filter to date (ISO format)
-    - limit: Max results (default 100)
+    - limit: Max results (default 100, max 1000)
+    - archived: With run_id, read the run's archived (retention) entries instead
+    
+    Returns the newest matching entries of the live window in chronological order.
     """
     try:
         from .models import ScraperLog
         from django.db.models import Q
         from datetime import datetime
         
+        limit = min(int(request.query_params.get('limit', 100)), 1000)
         logs = ScraperLog.objects.all()
         
         # Apply filters
         run_id = request.query_params.get('run_id')
+        if run_id and request.query_params.get('archived') in ('1', 'true'):
+            from itertools import islice
+            from .services.log_retention import read_archived_logs
+            level = (request.query_params.get('level') or '').upper()
+            entries = (e for e in read_archived_logs(int(run_id)) if not level or e['level'] == level)
+            data = [dict(entry, run_id=int(run_id)) for entry in islice(entries, limit)]
+            return Response(data, status=http_status.HTTP_200_OK)
         if run_id:
             logs = logs.filter(run_id=run_id)
         
@@ -613,9 +624,8 @@ def api_logs_filtered(request):
             except ValueError:
                 pass
         
-        # Limit results
-        limit = int(request.query_params.get('limit', 100))
-        logs = logs[:limit]
+        # Newest window first (index-backed), returned in chronological order
+        logs = reversed(list(logs.order_by('-created_at', '-id')[:limit]))
         
         data = []
         for log in logs:
@@ -251,6 +251,18 @@ BREVO_WELCOME_TEMPLATE_ID = _get_optional_int('BREVO_WELCOME_TEMPLATE_ID')
 # Brevo Webhook Security
 BREVO_WEBHOOK_SECRET = os.getenv('BREVO_WEBHOOK_SECRET', None)
 
+# Mailbox outbound dispatch: parallel sends and sends per second per provider
+MAILBOX_DISPATCH_LIMITS = {
+    'brevo': {
+        'max_workers': int(os.getenv('MAILBOX_BREVO_MAX_WORKERS', '4')),
+        'rate_per_second': float(os.getenv('MAILBOX_BREVO_RATE_PER_SECOND', '10')),
+    },
+    'smtp': {
+        'max_workers': int(os.getenv('MAILBOX_SMTP_MAX_WORKERS', '2')),
+        'rate_per_second': float(os.getenv('MAILBOX_SMTP_RATE_PER_SECOND', '5')),
+    },
+}
+
 
 # ==========================
 # TinyMCE Configuration
@@ -8,7 +8,8 @@ import pytest
 
 # These imports will work when the modules are in place
 from metrics import MetricsStore, DorkMetrics, HostMetrics
-from adaptive_dorks import AdaptiveDorkSelector
+from adaptive_dorks import AdaptiveDorkSelector, replay_metrics
+from reporting import ReportGenerator
 from wasserfall import WasserfallManager, MODE_CONSERVATIVE, MODE_MODERATE, MODE_AGGRESSIVE
 
 
@@ -99,6 +100,60 @@ class TestMetricsStore:
         
         assert m.queries_total == 1
         assert m.accepted_leads == 1
+    
+    def test_persist_writes_only_dirty_entries(self, temp_db):
+        """Test that persist() flushes only modified dorks and hosts."""
+        store = MetricsStore(temp_db)
+        store.record_query("a")
+        store.record_query("b")
+        store.record_url_fetch("a", "example.com")
+        assert store.persist() == 3
+        
+        store.record_lead_found("b")
+        assert store.dirty_count == 1
+        assert store.persist() == 1
+        assert store.persist() == 0
+        
+        store2 = MetricsStore(temp_db)
+        assert store2.get_dork_metrics("b").leads_found == 1
+        assert store2.get_host_metrics("example.com").hits_total == 1
+    
+    def test_direct_mutation_requires_mark_dirty(self, temp_db):
+        """Test that directly mutated entries are written after mark_dork_dirty."""
+        store = MetricsStore(temp_db)
+        store.record_query("a")
+        store.persist()
+        
+        store.get_dork_metrics("a").serp_hits = 7
+        store.mark_dork_dirty("a")
+        store.persist()
+        
+        assert MetricsStore(temp_db).get_dork_metrics("a").serp_hits == 7
+    
+    def test_auto_flush_by_count(self, temp_db):
+        """Test that the store flushes after auto_flush_count mutations."""
+        store = MetricsStore(temp_db, auto_flush_count=3)
+        store.record_query("a")
+        store.record_query("a")
+        assert MetricsStore(temp_db).dork_cache == {}
+        
+        store.record_query("a")
+        assert store.dirty_count == 0
+        assert MetricsStore(temp_db).get_dork_metrics("a").queries_total == 3
+    
+    def test_max_hosts_evicts_and_reloads(self, temp_db):
+        """Test that clean hosts are evicted beyond max_hosts and reloaded on access."""
+        store = MetricsStore(temp_db, max_hosts=2)
+        for host in ("a.de", "b.de", "c.de"):
+            store.record_drop(host, "no_phone")
+        store.persist()
+        
+        assert len(store.host_cache) == 2
+        assert "a.de" not in store.host_cache
+        
+        h = store.get_host_metrics("a.de")
+        assert h.drops_by_reason["no_phone"] == 1
+        assert len(store.host_cache) == 2
 
 
 class TestAdaptiveDorkSelector:
@@ -156,6 +211,110 @@ class TestAdaptiveDorkSelector:
             assert test_dork not in selector.explore_dorks
 
 
+class TestThompsonDorkSelector:
+    """Test posterior updates, persistence, decay and offline replay."""
+    
+    DAY = 86400.0
+    
+    def test_incremental_updates_and_persistence(self, metrics_store):
+        """Posteriors update per query and survive a restart."""
+        selector = AdaptiveDorkSelector(metrics_store, ["a", "b"])
+        for _ in range(10):
+            selector.record_result("a", leads=0, calls=1, now=1000.0)
+        selector.record_result("b", leads=3, calls=1, now=1000.0)
+        assert selector.posterior_mean("a", now=1000.0) < selector.posterior_mean("b", now=1000.0)
+        
+        assert selector.persist() == 2
+        assert selector.persist() == 0  # nothing dirty
+        
+        reopened = AdaptiveDorkSelector(metrics_store, ["a", "b"])
+        reopened._load_all_dorks()
+        assert reopened.posteriors["a"].calls == 10
+        assert reopened.posteriors["b"].leads == 3
+    
+    def test_seeded_from_metrics_store(self, metrics_store):
+        """Dorks without a stored posterior start from their MetricsStore totals."""
+        m = metrics_store.get_dork_metrics("old")
+        m.queries_total, m.leads_kept, m.last_used = 20, 4, 1000.0
+        selector = AdaptiveDorkSelector(metrics_store, ["old", "new"])
+        selector._load_all_dorks()
+        
+        assert (selector.posteriors["old"].leads, selector.posteriors["old"].calls) == (4, 20)
+        assert "new" not in selector.posteriors
+    
+    def test_time_decay(self, metrics_store):
+        """Evidence halves per half-life, pulling stale dorks back to the prior."""
+        selector = AdaptiveDorkSelector(metrics_store, ["a"], half_life_days=10)
+        selector.record_result("a", leads=0, calls=40, now=0.0)
+        
+        assert selector.posteriors["a"].decayed(10 * self.DAY, selector.half_life) == (0.0, 20.0)
+        stale = selector.posterior_mean("a", now=100 * self.DAY)
+        assert selector.posterior_mean("a", now=0.0) < stale < selector.prior_leads / selector.prior_calls
+        
+        selector.record_result("a", leads=1, calls=1, now=10 * self.DAY)
+        assert selector.posteriors["a"].calls == pytest.approx(21.0)
+    
+    def test_dead_dorks_lose_slots_and_google_quota(self, metrics_store):
+        """Dorks without leads are rarely chosen and never get Google."""
+        import random
+        
+        dorks = [f"dork_{i}" for i in range(12)]
+        selector = AdaptiveDorkSelector(metrics_store, dorks, explore_rate=0.0, rng=random.Random(1))
+        for i, dork in enumerate(dorks):
+            leads = 10 if i < 4 else 0
+            selector.record_result(dork, leads=leads, calls=30, now=0.0)
+        
+        picked = {d: 0 for d in dorks}
+        for _ in range(50):
+            selected = selector.select_dorks(num_dorks=4, google_ratio=0.5, force_update=True, now=0.0)
+            for item in selected:
+                picked[item["dork"]] += 1
+                if item["source"] == "google":
+                    assert item["dork"] in dorks[:4]
+        assert sum(picked[d] for d in dorks[:4]) > 0.9 * 200
+    
+    def test_explore_share_is_reserved(self, metrics_store):
+        """explore_rate still guarantees slots for non-core dorks."""
+        dorks = [f"dork_{i}" for i in range(12)]
+        selector = AdaptiveDorkSelector(metrics_store, dorks, explore_rate=0.5)
+        for dork in dorks[:6]:
+            selector.record_result(dork, leads=30, calls=30, now=0.0)
+        
+        selected = selector.select_dorks(num_dorks=6, force_update=True, now=0.0)
+        assert len(selected) == 6
+        assert sum(1 for d in selected if d["pool"] == "explore") >= 3
+    
+    def test_offline_replay(self):
+        """Replaying historical metrics yields comparable policy statistics."""
+        history = [
+            DorkMetrics(dork=f"dork_{i}", queries_total=50, accepted_leads=[0, 0, 0, 5, 40][i % 5])
+            for i in range(20)
+        ]
+        thompson = replay_metrics(history, runs=100, seed=3)
+        legacy = replay_metrics(history, runs=100, policy="legacy", seed=3)
+        
+        assert thompson["calls"] == legacy["calls"] == 800
+        assert thompson["leads_per_call"] <= thompson["oracle_leads_per_call"] * 1.2
+        assert thompson["google_leads_per_call"] > legacy["google_leads_per_call"]
+        with pytest.raises(ValueError):
+            replay_metrics(history, runs=1, policy="unknown")
+
+
+def test_selection_log_rotation(metrics_store, tmp_path):
+    """The selection log is rotated by size and keeps a bounded number of backups."""
+    reporter = ReportGenerator(metrics_store)
+    log_file = tmp_path / "selection.jsonl"
+    selected = [{"dork": "x" * 200, "pool": "core", "source": "ddg", "score": 0.1}]
+    
+    for _ in range(50):
+        reporter.log_dork_selection(selected, "conservative", log_file=str(log_file), max_bytes=1000, backups=2)
+    
+    assert log_file.stat().st_size <= 1000
+    assert (tmp_path / "selection.jsonl.1").exists()
+    assert (tmp_path / "selection.jsonl.2").exists()
+    assert not (tmp_path / "selection.jsonl.3").exists()
+
+
 class TestWasserfallManager:
     """Test Wasserfall mode management."""
     
@@ -241,3 +400,25 @@ class TestWasserfallManager:
         assert "run_count" in status
         assert "phone_find_rate" in status
         assert status["current_mode"]["name"] == "conservative"
+
+
+def benchmark(runs=300, seeds=5):
+    """Replay a synthetic dork history with both policies."""
+    import random
+    
+    rng = random.Random(3)
+    history = []
+    for i in range(60):
+        queries = rng.randint(5, 200)
+        rate = rng.choice([0, 0, 0, 0.01, 0.05, 0.1, 0.3, 0.6, 1.2])
+        history.append(DorkMetrics(dork=f"dork_{i}", queries_total=queries, accepted_leads=int(rate * queries)))
+    
+    for policy in ("legacy", "thompson"):
+        results = [replay_metrics(history, runs=runs, policy=policy, seed=s) for s in range(seeds)]
+        print(f"{policy:8}: leads/call {sum(r['leads_per_call'] for r in results) / seeds:.3f}, "
+              f"google leads/call {sum(r['google_leads_per_call'] for r in results) / seeds:.3f}, "
+              f"oracle {results[0]['oracle_leads_per_call']:.3f}")
+
+
+if __name__ == "__main__":
+    benchmark()
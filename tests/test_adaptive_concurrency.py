@@ -0,0 +1,233 @@
+"""
+Tests for the AIMD adaptive concurrency controller.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+
+import pytest
+
+from luca_scraper.http.adaptive_concurrency import (
+    AIMDLimit,
+    AdaptiveConcurrency,
+    AdaptiveLimiter,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_aimd_additive_increase_multiplicative_decrease():
+    limit = AIMDLimit(4, minimum=1, maximum=8, cooldown=1.0)
+    # ~+1 per round of `limit` successes
+    for _ in range(5):
+        limit.on_success()
+    assert limit.value == 5
+
+    assert limit.on_congestion(now=10.0)
+    assert limit.value == 2
+    # Within cooldown: one burst counts once
+    assert not limit.on_congestion(now=10.5)
+    assert limit.value == 2
+
+    for _ in range(200):
+        limit.on_success()
+    assert limit.value == 8
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("100000") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0) == 10.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_throttled_host_is_cut_without_slowing_others():
+    clock = FakeClock()
+    ctl = AdaptiveConcurrency(global_limit=20, per_host_limit=4, clock=clock)
+    for _ in range(30):
+        ctl.record("good.de", 200, latency=0.1)
+    clock.now = 5.0
+    ctl.record("bad.de", 429, latency=0.1, retry_after="3")
+
+    snap = ctl.snapshot()
+    assert snap["hosts"]["bad.de"]["limit"] == 2
+    assert snap["hosts"]["bad.de"]["blocked_for"] == 3.0
+    assert snap["hosts"]["good.de"]["limit"] > 4
+    # One throttled host out of 31 responses does not cut the global limit
+    assert snap["global_limit"] >= 20
+
+
+def test_global_limit_cut_on_widespread_congestion():
+    clock = FakeClock()
+    ctl = AdaptiveConcurrency(global_limit=20, per_host_limit=4, clock=clock)
+    for i in range(20):
+        clock.now = float(i)
+        ctl.record(f"host{i}.de", 503)
+    assert ctl.snapshot()["global_limit"] < 20
+
+
+def test_latency_spike_counts_as_congestion():
+    clock = FakeClock()
+    ctl = AdaptiveConcurrency(global_limit=10, per_host_limit=4, clock=clock)
+    for _ in range(5):
+        ctl.record("slow.de", 200, latency=0.2)
+    clock.now = 10.0
+    ctl.record("slow.de", 200, latency=2.5)
+    assert ctl.snapshot()["hosts"]["slow.de"]["limit"] == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_follows_live_limit():
+    aimd = AIMDLimit(1, minimum=1, maximum=4)
+    limiter = AdaptiveLimiter(aimd)
+    await limiter.acquire()
+
+    second = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    aimd.limit = 2
+    limiter.wake()
+    await asyncio.wait_for(second, 1.0)
+    assert limiter.in_flight == 2
+
+
+def test_export_to_metrics_store():
+    from metrics import MetricsStore
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        store = MetricsStore(path)
+        ctl = AdaptiveConcurrency(global_limit=10, per_host_limit=2)
+        ctl.record("example.com", 429, retry_after="30")
+        ctl.export(store)
+
+        conn = sqlite3.connect(path)
+        rows = dict(conn.execute("SELECT scope, concurrency_limit FROM concurrency_state").fetchall())
+        conn.close()
+        assert rows["*"] == 10
+        assert rows["example.com"] == 1
+        assert store.get_host_metrics("example.com").is_backedoff()
+    finally:
+        os.unlink(path)
+
+
+def test_export_never_shortens_backoff_and_prunes_idle_hosts():
+    from metrics import MetricsStore
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        store = MetricsStore(path)
+        store.set_host_backoff("banned.com")  # 7 Tage aus record_lead_dropped
+        week = store.get_host_metrics("banned.com").backoff_until
+
+        now = [0.0]
+        ctl = AdaptiveConcurrency(global_limit=10, per_host_limit=2, idle_ttl=60, clock=lambda: now[0])
+        ctl.record("banned.com", 429, retry_after="5")
+        ctl.record("healthy.com", 200, latency=0.1)
+        snap = ctl.export(store)
+
+        assert store.get_host_metrics("banned.com").backoff_until == week
+        assert not store.get_host_metrics("healthy.com").is_backedoff()
+        assert set(snap["hosts"]) == {"banned.com", "healthy.com"}
+        assert set(store.concurrency_state["hosts"]) == {"banned.com"}
+
+        now[0] = 120.0
+        snap = ctl.export(store)
+        assert ctl.hosts == {}
+        assert store.concurrency_state["hosts"] == {}
+    finally:
+        os.unlink(path)
+
+
+@pytest.mark.asyncio
+async def test_fetch_timeout_lowers_host_limit(monkeypatch):
+    """A request that ends without a response (timeout) counts as congestion."""
+    import scriptname as sn
+    from luca_scraper.http.adaptive_concurrency import set_active_controller
+
+    async def timed_out(url, headers=None, params=None, timeout=None):
+        return None
+
+    monkeypatch.setattr(sn, "http_get_async", timed_out)
+    ctl = AdaptiveConcurrency(global_limit=10, per_host_limit=4)
+    set_active_controller(ctl)
+    try:
+        assert await sn.fetch_response_async("https://slow.example.de/jobs") is None
+    finally:
+        set_active_controller(None)
+
+    host = ctl.snapshot()["hosts"]["slow.example.de"]
+    assert host["limit"] == 2
+    assert sn._LAST_STATUS["https://slow.example.de/jobs"] == -1
+
+
+@pytest.mark.asyncio
+async def test_against_throttling_server():
+    """A local server answering 429 above 2 parallel requests drives the host limit down."""
+    aiohttp = pytest.importorskip("aiohttp")
+    from aiohttp import web
+
+    state = {"active": 0, "max_active": 0, "throttled": 0}
+
+    async def handler(request):
+        state["active"] += 1
+        try:
+            state["max_active"] = max(state["max_active"], state["active"])
+            if state["active"] > 2:
+                state["throttled"] += 1
+                return web.Response(status=429, headers={"Retry-After": "0.2"})
+            await asyncio.sleep(0.02)
+            return web.Response(text="ok")
+        finally:
+            state["active"] -= 1
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+
+    ctl = AdaptiveConcurrency(global_limit=16, per_host_limit=8, cooldown=0.05)
+    statuses = []
+
+    async def one(session):
+        host = "127.0.0.1"
+        await ctl.acquire_host(host)
+        await ctl.acquire_global()
+        try:
+            started = time.monotonic()
+            async with session.get(url) as resp:
+                await resp.read()
+                statuses.append(resp.status)
+                ctl.record(host, resp.status, time.monotonic() - started, resp.headers.get("Retry-After"))
+        finally:
+            ctl.release(host)
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(one(session) for _ in range(60)))
+    finally:
+        await runner.cleanup()
+
+    assert state["throttled"] > 0
+    assert ctl.snapshot()["hosts"]["127.0.0.1"]["limit"] <= 4
+    # Initial burst is throttled, after adapting most requests succeed (AIMD sawtooth)
+    assert statuses[:10].count(429) >= 5
+    assert statuses[20:].count(429) / len(statuses[20:]) < 0.25
@@ -0,0 +1,136 @@
+"""
+Golden tests for the columnar batch scorer (stream3_scoring_layer.batch_scoring).
+
+Run directly for a throughput benchmark on 100k synthetic leads:
+
+    python tests/test_batch_scoring.py
+"""
+
+import random
+import time
+
+import numpy as np
+import pytest
+
+from stream3_scoring_layer import feedback_loop
+from stream3_scoring_layer import scoring_enhanced as se
+from stream3_scoring_layer.batch_scoring import dynamic_threshold_batch, score_leads_batch
+
+
+EMAILS = [
+    "", None, "max@firma.de", "julia@gmail.com", "info@company.com", "carol@stepstone.de",
+    "x@jobs.indeed.com", "noatsign", "info", " Mixed@GMX.de ", "a@b@c.de", "sales@web.de",
+]
+PHONES = ["", None, "+491711234567", "  ", "0211 123456"]
+TEXTS = [
+    "", None, "Vertrieb und Sales im Callcenter, Telesales outbound",
+    "Ich suche neue Herausforderung, offen für neue Angebote #opentowork",
+    "Kontakt per WhatsApp: wa.me/491711234567", "Haustür D2D door to door Verkauf " * 5,
+    "Lebenslauf und Bewerbung, CV anbei, gekündigt, wechselwillig",
+]
+URLS = [
+    "", "https://example.com/kontakt", "https://www.stepstone.de/profil", "https://jobs.example.com/x",
+    "https://example.com/karriere/1", "https://example.com/impressum", "https://api.whatsapp.com/send",
+    "https://de.linkedin.com/in/test", "not a url",
+]
+
+
+def make_leads(n, seed=42):
+    rng = random.Random(seed)
+    leads = []
+    for i in range(n):
+        leads.append({
+            "id": i,
+            "email": rng.choice(EMAILS),
+            "telefon": rng.choice(PHONES),
+            "phone_type": rng.choice(["", "mobile", "Mobile ", "landline", None]),
+            "region": rng.choice(["", "NRW", " nrw", "Bayern", None]),
+            "industry": rng.choice(["", "versicherung", " Energie", "it", None]),
+            "tags": rng.choice(["", "nrw,whatsapp", "vertrieb", None]),
+            "recency_indicator": rng.choice(["", "aktuell", "Sofort", "alt"]),
+            "whatsapp_link": rng.choice(["", "yes", "TRUE", "no", None]),
+            "private_address": rng.choice(["", "Musterstr. 1, Köln", None]),
+            "social_profile_url": rng.choice(["", "https://www.xing.com/profile/x"]),
+            rng.choice(["fulltext", "text"]): rng.choice(TEXTS),
+            "quelle": rng.choice(URLS),
+        })
+    return leads
+
+
+def per_lead_scores(leads, use_dynamic_scoring):
+    return [
+        se.compute_score_v2(
+            lead.get("fulltext") or lead.get("text") or "",
+            lead.get("quelle") or "",
+            lead,
+            use_dynamic_scoring=use_dynamic_scoring,
+        )
+        for lead in leads
+    ]
+
+
+@pytest.fixture
+def feedback(monkeypatch, tmp_path):
+    system = feedback_loop.FeedbackLoopSystem(str(tmp_path / "feedback.db"))
+    system.adjustments = {
+        "email_domain:firma.de": {"value": 0.4, "confidence": 0.9},
+        "industry:versicherung": {"value": -0.3, "confidence": 0.5},
+        "region:NRW": {"value": 0.125, "confidence": 1.0},  # 2.5 points: exercises half-even rounding
+    }
+    monkeypatch.setattr(feedback_loop, "_feedback_system", system)
+    monkeypatch.setattr(feedback_loop, "get_feedback_system", lambda db_path="scraper.db": system)
+    return system
+
+
+def test_batch_matches_per_lead_scorer():
+    leads = make_leads(3000)
+    assert score_leads_batch(leads, use_dynamic_scoring=False).tolist() == per_lead_scores(leads, False)
+
+
+def test_batch_matches_per_lead_scorer_with_feedback(feedback):
+    leads = make_leads(3000, seed=7)
+    assert score_leads_batch(leads, use_dynamic_scoring=True).tolist() == per_lead_scores(leads, True)
+
+
+@pytest.mark.parametrize("n", [1, 2, 5, 7, 8, 9, 12, 101])
+def test_threshold_matches_apply_dynamic_threshold(n):
+    rng = random.Random(n)
+    for _ in range(50):
+        scores = [rng.choice([0, rng.randint(0, 100)]) for _ in range(n)]
+        _, info = se.apply_dynamic_threshold([{"score": s} for s in scores])
+        threshold, _ = dynamic_threshold_batch(np.array(scores))
+        assert threshold == info["threshold"]
+
+
+def test_score_and_filter_leads_batch_equals_per_lead(feedback, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # quality metrics CSV
+    batch_leads = make_leads(1000, seed=3)
+    single_leads = make_leads(1000, seed=3)
+
+    batch_filtered, batch_summary = se.score_and_filter_leads(batch_leads, run_id=1, base_min_score=20, batch=True)
+    single_filtered, single_summary = se.score_and_filter_leads(single_leads, run_id=1, base_min_score=20, batch=False)
+
+    assert [l["id"] for l in batch_filtered] == [l["id"] for l in single_filtered]
+    assert [l["score"] for l in batch_leads] == [l["score"] for l in single_leads]
+    assert (batch_summary.start, batch_summary.eligible, batch_summary.end, batch_summary.threshold) == (
+        single_summary.start, single_summary.eligible, single_summary.end, single_summary.threshold
+    )
+    assert batch_summary.meta["threshold_info"] == single_summary.meta["threshold_info"]
+
+
+def benchmark(n=100_000):
+    leads = make_leads(n)
+    start = time.perf_counter()
+    per_lead_scores(leads, use_dynamic_scoring=True)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score_leads_batch(leads, use_dynamic_scoring=True)
+    batch = time.perf_counter() - start
+
+    print(f"{n} leads: per-lead {single:.2f}s ({n / single:,.0f}/s), "
+          f"batch {batch:.2f}s ({n / batch:,.0f}/s), speedup {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,39 @@
+"""
+Tests for hot-reloading performance params from the ProcessManager control file.
+"""
+
+import json
+import os
+
+import scriptname as sn
+
+
+def write(path, version, params):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": version, "params": params}, f)
+
+
+def test_poll_control_file_applies_hot_params(tmp_path, monkeypatch):
+    monkeypatch.setattr(sn, "_CONTROL_STATE", {"mtime": None, "version": 0, "params": {}})
+    path = str(tmp_path / "control.json")
+
+    assert sn.poll_control_file(path) is False  # missing file
+
+    write(path, 4, {"async_limit": "12", "request_delay": 1.5, "qpi": 99})
+    assert sn.poll_control_file(path) is True
+    assert sn.poll_control_file(path) is False  # unchanged mtime
+
+    params = sn.get_performance_params()
+    assert params["async_limit"] == 12
+    assert params["request_delay"] == 1.5
+    assert "qpi" not in params
+    assert sn._CONTROL_STATE["version"] == 4
+
+
+def test_poll_control_file_ignores_broken_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(sn, "_CONTROL_STATE", {"mtime": None, "version": 0, "params": {"async_limit": 8}})
+    path = tmp_path / "control.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert sn.poll_control_file(str(path)) is False
+    assert sn.get_performance_params()["async_limit"] == 8
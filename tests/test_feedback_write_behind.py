@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Tests für das In-Memory-Modell mit write-behind Persistenz des FeedbackLoopSystem.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from stream3_scoring_layer import feedback_loop
+from stream3_scoring_layer.feedback_loop import FeedbackEntry, FeedbackLoopSystem
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # Writer nur per flush()/close(), damit die Tests deterministisch sind
+    monkeypatch.setattr(FeedbackLoopSystem, "FLUSH_INTERVAL", 3600)
+    monkeypatch.setattr(FeedbackLoopSystem, "FLUSH_EVERY", 10**6)
+    return str(tmp_path / "feedback.db")
+
+
+_connect = sqlite3.connect  # unbeeinflusst vom Monkeypatch unten
+
+
+def _rows(db_path, table):
+    with _connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def _feedback(lead_id, rating, feedback_type="quality", **metadata):
+    return FeedbackEntry(lead_id=lead_id, feedback_type=feedback_type, rating=rating, metadata=metadata or None)
+
+
+def test_feedback_applies_immediately_and_persists_in_batches(db_path, monkeypatch):
+    system = FeedbackLoopSystem(db_path)
+    connects = []
+    monkeypatch.setattr(feedback_loop.sqlite3, "connect", lambda *a, **kw: connects.append(a))
+
+    for i in range(200):
+        system.record_feedback(_feedback(i, 0.9 if i % 2 else 0.3, email_domain="firma.de"))
+        system.record_extraction_accuracy(i, "email", "a@firma.de", "a@firma.de" if i % 4 else "b@firma.de", 0.9)
+        system.record_quality_pattern("email_format", {"format": "first.last"}, i % 2 == 1)
+
+    # Lesezugriffe sehen alles sofort, auf der Platte liegt noch nichts
+    assert system.adjustments["email_domain:firma.de"]["confidence"] > 0
+    metrics = system.get_quality_metrics(days=7)
+    assert metrics.total_feedback == 200
+    assert metrics.positive_rate == 0.5
+    assert system.get_field_accuracy("email", days=7) == 0.75
+    assert system.get_best_patterns("email_format", min_samples=5) == [({"format": "first.last"}, 0.5)]
+    assert _rows(db_path, "lead_feedback") == 0
+
+    assert system.flush()
+    assert connects == []  # eine langlebige Verbindung
+    assert _rows(db_path, "lead_feedback") == 200
+    assert _rows(db_path, "extraction_accuracy") == 200
+    assert _rows(db_path, "quality_patterns") == 1
+    system.close()
+
+
+def test_moving_average_matches_previous_semantics(db_path):
+    system = FeedbackLoopSystem(db_path)
+    ratings = [0.9, 0.8, 0.2, 0.95, 0.7]
+    for i, rating in enumerate(ratings):
+        system.record_feedback(_feedback(i, rating, industry="energie"))
+
+    # Referenz: gleitender Durchschnitt wie bisher (read-modify-write je Feedback)
+    value, confidence, n = None, None, 0
+    for rating in ratings:
+        adjustment = 0.08 if rating >= 0.7 else -0.05
+        if n == 0:
+            value, confidence = adjustment, rating * 0.3
+        else:
+            value = (value * n + adjustment) / (n + 1)
+            confidence = min(1.0, rating * ((n + 1) / 10))
+        n += 1
+    assert system.adjustments["industry:energie"] == {"value": pytest.approx(value), "confidence": pytest.approx(confidence)}
+    system.close()
+
+    with sqlite3.connect(db_path) as conn:
+        row = conn.execute(
+            "SELECT adjustment_value, confidence, sample_size FROM scoring_adjustments WHERE adjustment_key = ?",
+            ("industry:energie",),
+        ).fetchone()
+    assert row == (pytest.approx(value), pytest.approx(confidence), 5)
+
+
+def test_state_survives_restart(db_path):
+    system = FeedbackLoopSystem(db_path)
+    for i in range(12):
+        system.record_feedback(_feedback(i, 0.9, "conversion", email_domain="top.de"))
+    system.record_feedback(_feedback(99, 0.1, email_domain="low.de"))
+    for ok in (True, True, False):
+        system.record_quality_pattern("phone_context", {"ctx": "mobil"}, ok)
+    system.record_extraction_accuracy(1, "phone", "+49", "+49", 0.8)
+    before = system.get_quality_metrics(days=7)
+    system.close()
+
+    reopened = FeedbackLoopSystem(db_path)
+    # Wie bisher: beim Start nur Anpassungen mit confidence >= 0.6 aktiv ...
+    assert "email_domain:top.de" in reopened.adjustments
+    assert "email_domain:low.de" not in reopened.adjustments
+    # ... aber der gleitende Durchschnitt läuft auf der vollständigen Tabelle weiter
+    reopened.record_feedback(_feedback(100, 0.1, email_domain="low.de"))
+    assert reopened.adjustments["email_domain:low.de"]["value"] == pytest.approx(-0.03)
+    assert reopened._adjustment_rows["email_domain:low.de"][2] == 2
+
+    assert reopened.get_quality_metrics(days=7).to_dict() == pytest.approx(
+        {**before.to_dict(), "total_feedback": 14, "avg_rating": (12 * 0.9 + 0.2) / 14,
+         "positive_rate": 12 / 14, "conversion_rate": 12 / 14}
+    )
+    assert reopened.get_field_accuracy("phone", days=7) == 1.0
+
+    reopened.record_quality_pattern("phone_context", {"ctx": "mobil"}, True)
+    reopened.close()
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT success_count, failure_count, success_rate FROM quality_patterns").fetchall()
+    assert rows == [(3, 1, 0.75)]
+
+
+def test_long_windows_fall_back_to_sql(db_path, monkeypatch):
+    system = FeedbackLoopSystem(db_path)
+    system.record_feedback(_feedback(1, 0.8))
+    system.record_extraction_accuracy(1, "name", "Max", "Moritz", 0.5)
+    monkeypatch.setattr(FeedbackLoopSystem, "METRICS_RETENTION_DAYS", 30)
+
+    metrics = system.get_quality_metrics(days=365)  # schreibt vorher die Queue weg
+    assert metrics.total_feedback == 1
+    assert metrics.extraction_accuracy == 0.0
+    assert system.get_field_accuracy("name", days=365) == 0.0
+    assert _rows(db_path, "lead_feedback") == 1
+    system.close()
+
+
+def test_writer_thread_flushes_in_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(FeedbackLoopSystem, "FLUSH_INTERVAL", 0.05)
+    db_path = str(tmp_path / "feedback.db")
+    system = FeedbackLoopSystem(db_path)
+    system.record_feedback(_feedback(1, 0.9, industry="bau"))
+
+    deadline = time.time() + 5
+    while _rows(db_path, "scoring_adjustments") == 0 and time.time() < deadline:
+        time.sleep(0.02)
+    assert _rows(db_path, "lead_feedback") == 1
+    assert _rows(db_path, "scoring_adjustments") == 1
+    system.close()
@@ -0,0 +1,139 @@
+"""Tests for the non-blocking scraper log sink."""
+
+import io
+import json
+import queue
+
+import pytest
+
+from luca_scraper import log_sink
+from luca_scraper.log_sink import LogSink
+
+
+class CountingStream(io.StringIO):
+    """StringIO counting write() and flush() calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+    def flush(self):
+        self.flushes += 1
+        return super().flush()
+
+
+def test_text_format_matches_classic_log_line():
+    stream = CountingStream()
+    sink = LogSink(stream=stream)
+
+    sink.emit("info", "Run gestartet", run_id=5, städte=["Köln"])
+    assert sink.flush()
+    sink.close()
+
+    line = stream.getvalue().rstrip("\n")
+    assert line.endswith('[INFO   ] Run gestartet {"run_id": 5, "städte": ["Köln"]}')
+    assert line.startswith("[") and line[20:22] == "] "
+
+
+def test_level_filter_applies_before_formatting(monkeypatch):
+    calls = []
+    monkeypatch.setattr(log_sink, "format_text", lambda *args: calls.append(args) or "line")
+    stream = CountingStream()
+    sink = LogSink(stream=stream, level="info")
+
+    for _ in range(100):
+        sink.emit("debug", "dropped", url="https://example.com")
+    sink.emit("warn", "kept")
+    sink.flush()
+    sink.close()
+
+    assert [c[2] for c in calls] == ["kept"]
+    assert not sink.enabled_for("debug")
+    assert sink.enabled_for("error")
+
+
+def test_records_are_written_in_batches():
+    stream = CountingStream()
+    sink = LogSink(stream=stream, batch_size=1000)
+    release = queue.Queue()
+    original_write = sink._write
+
+    def held_write(records):
+        # Keep the writer busy while the event loop keeps logging
+        release.get(timeout=5)
+        original_write(records)
+
+    sink._write = held_write
+    sink.emit("info", "first")
+    for i in range(500):
+        sink.emit("info", "url done", i=i)
+    release.put(None)
+    release.put(None)
+    assert sink.flush()
+    sink.close()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 501
+    assert stream.flushes <= 2
+    assert [json.loads(line.split("url done ")[1])["i"] for line in lines[1:]] == list(range(500))
+
+
+def test_json_lines_mode_and_ui_queue_receive_text():
+    stream = CountingStream()
+    ui = queue.Queue()
+    sink = LogSink(stream=stream, fmt="json", ui_queue=lambda: ui)
+
+    sink.emit("fatal", "Abbruch", reason={"code": 7})
+    sink.emit("warn", "Hinweis")
+    sink.flush()
+    sink.close()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["level"] for r in records] == ["CRITICAL", "WARN"]
+    assert records[0]["msg"] == "Abbruch"
+    assert records[0]["ctx"] == {"reason": {"code": 7}}
+    assert "ctx" not in records[1]
+    assert ui.get_nowait().endswith('[FATAL  ] Abbruch {"reason": {"code": 7}}')
+
+
+def test_unserializable_context_does_not_raise():
+    stream = CountingStream()
+    sink = LogSink(stream=stream)
+
+    sink.emit("info", "obj", value=object())
+    sink.flush()
+    sink.close()
+
+    assert "obj" in stream.getvalue()
+
+
+def test_full_queue_drops_only_low_levels():
+    stream = CountingStream()
+    sink = LogSink(stream=stream, max_queue=1)
+    sink._thread = object()  # pretend the writer runs, so nothing drains
+
+    sink.emit("info", "queued")
+    sink.emit("debug", "dropped")
+    sink.emit("info", "dropped")
+
+    assert sink.dropped == 2
+    assert sink._queue.qsize() == 1
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("SCRAPER_LOG_FORMAT", "json")
+    monkeypatch.setenv("SCRAPER_LOG_LEVEL", "warn")
+    sink = LogSink.from_env()
+    assert sink.fmt == "json"
+    assert not sink.enabled_for("info")
+
+    monkeypatch.setenv("SCRAPER_LOG_FORMAT", "xml")
+    assert LogSink.from_env().fmt == "text"
+
+    with pytest.raises(ValueError):
+        LogSink(fmt="xml")
@@ -0,0 +1,200 @@
+"""
+Tests for memory-pressure admission control in the crawl path.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+import pytest
+
+from luca_scraper.memory_guard import MemoryAdmission
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeRss:
+    def __init__(self, mb):
+        self.mb = mb
+
+    def __call__(self):
+        return self.mb
+
+
+def test_slots_follow_pressure_with_hysteresis():
+    rss = FakeRss(500)
+    adm = MemoryAdmission(budget_mb=1000, max_slots=40, sample_interval=0, rss_fn=rss)
+    assert adm.slots() == 40
+    rss.mb = 810  # between soft (700) and hard (900)
+    assert adm.slots() == 18
+    rss.mb = 950
+    assert adm.slots() == 1
+    assert adm.draining
+    rss.mb = 850  # below hard, above resume: still draining
+    assert adm.slots() == 1
+    rss.mb = 600
+    assert adm.slots() == 40
+    assert not adm.draining
+
+
+def test_response_budget_and_headroom_cap_slots():
+    adm = MemoryAdmission(budget_mb=4000, max_slots=200, response_budget_mb=256, max_response_mb=2,
+                          sample_interval=0, rss_fn=FakeRss(100))
+    assert adm.slots() == 128
+    adm = MemoryAdmission(budget_mb=1000, max_slots=40, task_mb=50, sample_interval=0, rss_fn=FakeRss(400))
+    assert adm.slots() == 10  # (900 - 400) / 50
+
+
+def test_config_reload_keeps_response_budget_cap():
+    import scriptname as sn
+
+    adm = MemoryAdmission(budget_mb=4000, max_slots=8, response_budget_mb=32, max_response_mb=2,
+                          sample_interval=0, rss_fn=FakeRss(100))
+    assert adm.max_slots == 8
+    adm.set_max_slots(50)
+    assert adm.max_slots == 16
+
+    for adaptive in (False, True):
+        memory = MemoryAdmission(budget_mb=4000, max_slots=8, response_budget_mb=32, max_response_mb=2,
+                                 sample_interval=0, rss_fn=FakeRss(100))
+        rate = sn._Rate(8, 2, crawl_delay=None, adaptive=adaptive, memory=memory)
+        rate = rate.set_global_limit(50)
+        assert rate.memory is memory
+        assert memory.slots() == 16
+        rate.set_global_limit(4)
+        assert memory.max_slots == (8 if adaptive else 4)  # adaptiv: bis max_factor * Limit
+
+
+@pytest.mark.asyncio
+async def test_admission_resumes_when_pressure_drops():
+    rss = FakeRss(100)
+    adm = MemoryAdmission(budget_mb=1000, max_slots=4, sample_interval=0.01, rss_fn=rss)
+    await adm.acquire()
+    rss.mb = 950
+    await asyncio.sleep(0.02)  # next RSS sample
+    waiter = asyncio.ensure_future(adm.acquire())
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    # Pressure drops without any release (e.g. memory freed elsewhere)
+    rss.mb = 300
+    await asyncio.wait_for(waiter, 1.0)
+    assert adm.in_flight == 2
+    assert adm.throttled == 1
+    adm.release()
+    adm.release()
+    assert adm.in_flight == 0
+
+
+# ----------------------------------------------------------------------
+# Synthetic large-page fixture under a fixed RSS ceiling
+# ----------------------------------------------------------------------
+
+PAGE_MB = 16
+PAGES = 48
+
+DRIVER = textwrap.dedent('''
+    import asyncio, json, sys, urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    import scriptname as sn
+    from luca_scraper.memory_guard import MemoryAdmission
+
+    base, budget_mb, task_mb = sys.argv[1], float(sys.argv[2]), float(sys.argv[3])
+
+    def fetch(url):
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            return resp.read()
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(64))
+        memory = MemoryAdmission(budget_mb, max_slots=32, task_mb=task_mb, sample_interval=0.01) if budget_mb else None
+        rate = sn._Rate(32, 4, crawl_delay=None, adaptive=False, memory=memory)
+        done = 0
+
+        async def one(i):
+            nonlocal done
+            url = f"{base}/page/{i}"
+            host = await rate.acquire(f"http://host{i}.test/")
+            try:
+                body = await asyncio.to_thread(fetch, url)
+                text = body.decode("ascii")  # "parse"
+                await asyncio.sleep(0.05)
+                done += len(text) > 0
+            finally:
+                rate.release(host)
+
+        await asyncio.gather(*(one(i) for i in range(%d)))
+        print(json.dumps({"done": done, "memory": memory.snapshot() if memory else None}))
+
+    print("ready", flush=True)
+    sys.stdin.readline()
+    asyncio.run(main())
+''' % PAGES)
+
+
+class _LargePages(BaseHTTPRequestHandler):
+    body = b"x" * (PAGE_MB * 1024 * 1024)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+def _crawl(tmp_path, base, budget_mb):
+    """Run the driver; returns (baseline RSS, peak RSS, result) in MB."""
+    driver = tmp_path / "driver.py"
+    driver.write_text(DRIVER, encoding="utf-8")
+    env = dict(os.environ, PYTHONPATH=ROOT, SCRAPER_DB=str(tmp_path / "scraper.db"), MEMORY_ADMISSION="0")
+    proc = subprocess.Popen(
+        [sys.executable, str(driver), base, "0", "0"] if budget_mb is None else
+        [sys.executable, str(driver), base, str(budget_mb), str(2 * PAGE_MB)],
+        cwd=str(tmp_path), env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True,
+    )
+    assert proc.stdout.readline().strip() == "ready"
+    ps = psutil.Process(proc.pid)
+    baseline = ps.memory_info().rss / 1024 / 1024
+    peak = baseline
+    proc.stdin.write("\n")
+    proc.stdin.flush()
+    while proc.poll() is None:
+        try:
+            peak = max(peak, ps.memory_info().rss / 1024 / 1024)
+        except psutil.Error:
+            break
+        time.sleep(0.002)
+    out = proc.stdout.read().strip().splitlines()
+    assert proc.returncode == 0
+    return baseline, peak, json.loads(out[-1])
+
+
+def test_large_pages_stay_under_rss_ceiling(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LargePages)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        baseline, peak_free, result = _crawl(tmp_path, base, None)
+        assert result["done"] == PAGES
+        # Ceiling: ~8 pages (body + decoded text) above the idle process
+        ceiling = baseline + 8 * 2 * PAGE_MB
+        assert peak_free > ceiling, "fixture too small to create memory pressure"
+
+        baseline, peak, result = _crawl(tmp_path, base, ceiling)
+        assert result["done"] == PAGES
+        assert result["memory"]["throttled"] > 0
+        assert peak <= ceiling, f"peak {peak:.0f} MB over ceiling {ceiling:.0f} MB"
+    finally:
+        server.shutdown()
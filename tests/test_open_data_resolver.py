@@ -0,0 +1,169 @@
+"""
+Tests for concurrent, cached company-domain resolution against local stub endpoints.
+"""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+
+from stream2_extraction_layer import open_data_resolver as odr
+
+
+@pytest_asyncio.fixture
+async def stubs(monkeypatch, tmp_path):
+    """Local Clearbit/OpenCorporates/DuckDuckGo stubs; behaviour per test via `state`."""
+    from aiohttp import web
+
+    state = {
+        "delay": {"clearbit": 0.0, "opencorporates": 0.0, "duckduckgo": 0.0},
+        "answers": {"clearbit": [], "opencorporates": {}, "duckduckgo": ""},
+        "status": {"clearbit": 200, "opencorporates": 200, "duckduckgo": 200},
+        "hits": {"clearbit": [], "opencorporates": [], "duckduckgo": []},
+    }
+
+    def handler(source):
+        async def handle(request):
+            state["hits"][source].append((time.monotonic(), dict(request.query)))
+            await asyncio.sleep(state["delay"][source])
+            if state["status"][source] != 200:
+                return web.Response(status=state["status"][source])
+            answer = state["answers"][source]
+            if source == "duckduckgo":
+                return web.Response(text=answer, content_type="text/html")
+            return web.json_response(answer)
+        return handle
+
+    app = web.Application()
+    for source in ("clearbit", "opencorporates", "duckduckgo"):
+        app.router.add_get(f"/{source}", handler(source))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    for source in ("clearbit", "opencorporates", "duckduckgo"):
+        monkeypatch.setitem(odr.ENDPOINTS, source, f"http://127.0.0.1:{port}/{source}")
+    monkeypatch.setattr(odr, "RATE_LIMITS", {s: (1000.0, 10) for s in odr.ENDPOINTS})
+    monkeypatch.setattr(odr, "_LIMITERS", {})
+    cache = odr.DomainCache(str(tmp_path / "domains.db"))
+    monkeypatch.setattr(odr, "_cache", cache)
+    state["cache"] = cache
+    yield state
+    await odr.close_shared_session()
+    cache.close()
+    await runner.cleanup()
+
+
+def _oc(website):
+    return {"results": {"companies": [{"company": {"name": "X", "website": website}}]}}
+
+
+@pytest.mark.asyncio
+async def test_first_valid_answer_wins(stubs):
+    stubs["delay"]["clearbit"] = 2.0
+    stubs["answers"]["clearbit"] = [{"domain": "slow.de"}]
+    stubs["answers"]["opencorporates"] = _oc("https://www.fast-gmbh.de/kontakt")
+
+    started = time.monotonic()
+    assert await odr.resolve_company_domain_async("Fast GmbH") == "fast-gmbh.de"
+    assert time.monotonic() - started < 1.5
+    # Cached: no further requests
+    assert await odr.resolve_company_domain_async("fast  gmbh") == "fast-gmbh.de"
+    assert len(stubs["hits"]["opencorporates"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_negative_caching_only_for_definitive_misses(stubs):
+    assert await odr.resolve_company_domain_async("Unknown AG") == ""
+    assert stubs["cache"].get("Unknown AG") == ""
+    await odr.resolve_company_domain_async("Unknown AG")
+    assert len(stubs["hits"]["clearbit"]) == 1
+
+    # Source errors and deadlines are not cached as "not found"
+    stubs["status"]["opencorporates"] = 503
+    assert await odr.resolve_company_domain_async("Flaky AG") == ""
+    assert stubs["cache"].get("Flaky AG") is None
+
+    stubs["status"]["opencorporates"] = 200
+    for source in stubs["delay"]:
+        stubs["delay"][source] = 1.0
+    assert await odr.resolve_company_domain_async("Slow AG", deadline=0.2) == ""
+    assert stubs["cache"].get("Slow AG") is None
+
+
+@pytest.mark.asyncio
+async def test_batch_resolves_each_name_once(stubs):
+    stubs["delay"]["clearbit"] = 0.05
+    stubs["answers"]["clearbit"] = [{"domain": "acme.de"}]
+    names = ["ACME GmbH", "acme gmbh", "Acme  GmbH"] * 10 + ["Other AG"]
+
+    result = await odr.resolve_company_domains(names)
+    assert result["ACME GmbH"] == "acme.de"
+    assert set(result) == set(names)
+    # Two distinct names -> two requests per source
+    assert len(stubs["hits"]["clearbit"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_per_source_rate_limit(stubs, monkeypatch):
+    monkeypatch.setattr(odr, "RATE_LIMITS", {**odr.RATE_LIMITS, "opencorporates": (10.0, 1)})
+    monkeypatch.setattr(odr, "_LIMITERS", {})
+
+    await odr.resolve_company_domains([f"Firma {i}" for i in range(5)])
+    starts = [t for t, _ in stubs["hits"]["opencorporates"]]
+    assert len(starts) == 5
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= 0.08
+
+
+@pytest.mark.asyncio
+async def test_cache_persists_and_sync_path_uses_it(stubs, tmp_path):
+    stubs["answers"]["duckduckgo"] = '<a href="/l/?uddg=https%3A%2F%2Fwww.muster.de%2F">x</a>'
+    assert await asyncio.to_thread(odr.resolve_company_domain, "Muster KG") == "muster.de"
+
+    reopened = odr.DomainCache(str(tmp_path / "domains.db"))
+    assert reopened.get("MUSTER KG") == "muster.de"
+    reopened.close()
+
+    hits = len(stubs["hits"]["duckduckgo"])
+    assert await odr.resolve_company_domain_async("Muster KG") == "muster.de"
+    assert len(stubs["hits"]["duckduckgo"]) == hits
+
+
+@pytest.mark.asyncio
+async def test_lookups_share_a_session_and_honour_proxy_env(stubs, monkeypatch):
+    """Like the former requests code path, HTTP(S)_PROXY is used."""
+    from aiohttp import web
+
+    proxied = []
+
+    async def proxy(request):
+        proxied.append(str(request.url))
+        return web.json_response([{"domain": "proxied.de"}])
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", proxy)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        monkeypatch.setenv("HTTP_PROXY", f"http://127.0.0.1:{port}")
+        monkeypatch.delenv("NO_PROXY", raising=False)
+        monkeypatch.delenv("no_proxy", raising=False)
+        monkeypatch.setitem(odr.ENDPOINTS, "clearbit", "http://lookup.invalid/clearbit")
+
+        session = odr.get_shared_session()
+        assert odr.get_shared_session() is session
+        assert await odr.resolve_company_domain_async("Proxy GmbH") == "proxied.de"
+        assert proxied and proxied[0].startswith("http://lookup.invalid/clearbit")
+        assert odr.get_shared_session() is session
+
+        await odr.close_shared_session()
+        assert session.closed
+    finally:
+        await runner.cleanup()
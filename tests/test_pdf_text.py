@@ -0,0 +1,152 @@
+"""
+Tests for the bounded PDF text extraction worker.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from luca_scraper.extraction import pdf_text
+from luca_scraper.extraction.pdf_text import PdfTextExtractor, extract_pdf_text
+
+
+def make_pdf(pages):
+    """Build a minimal PDF with one line of text per page."""
+    objects = []
+    n = len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n))
+    objects.append("<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n} >>")
+    font_id = 3 + 2 * n
+    for i, text in enumerate(pages):
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{num} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def test_extract_reads_pages():
+    result = extract_pdf_text(make_pdf(["Lebenslauf Max", "Berufserfahrung Vertrieb"]))
+    assert "Lebenslauf" in result["text"]
+    assert "Vertrieb" in result["text"]
+    assert result["pages"] == 2
+    assert result["stopped"] == "end"
+
+
+def test_extract_respects_page_cap():
+    result = extract_pdf_text(make_pdf([f"Seite {i}" for i in range(6)]), max_pages=2)
+    assert result["pages"] == 2
+    assert result["stopped"] == "page_cap"
+    assert "Seite 2" not in result["text"]
+
+
+def test_extract_stops_on_contact():
+    pdf = make_pdf(["Lebenslauf", "Mobil 0171 1234567", "Hobbys"])
+    result = extract_pdf_text(pdf)
+    assert result["stopped"] == "contact"
+    assert result["pages"] == 2
+    assert "Hobbys" not in result["text"]
+
+
+def test_extract_broken_pdf():
+    result = extract_pdf_text(b"%PDF-1.4 garbage")
+    assert result["text"] == ""
+    assert result["stopped"] == "error"
+
+
+def test_extractor_caches_by_content_hash():
+    extractor = PdfTextExtractor(use_processes=False)
+    pdf = make_pdf(["Lebenslauf Anna"])
+
+    async def run():
+        first = await extractor.extract(pdf)
+        second = await extractor.extract(pdf)
+        return first, second
+
+    first, second = asyncio.run(run())
+    extractor.close()
+    assert "Lebenslauf Anna" in first
+    assert first == second
+    assert extractor.stats["parsed"] == 1
+    assert extractor.stats["cache_hits"] == 1
+
+
+def test_extractor_coalesces_concurrent_requests():
+    extractor = PdfTextExtractor(use_processes=False)
+    pdf = make_pdf(["Curriculum Vitae"])
+
+    async def run():
+        return await asyncio.gather(*(extractor.extract(pdf) for _ in range(5)))
+
+    results = asyncio.run(run())
+    extractor.close()
+    assert len(set(results)) == 1
+    assert extractor.stats["parsed"] == 1
+
+
+def test_extractor_skips_oversized_documents():
+    extractor = PdfTextExtractor(use_processes=False, max_bytes=100)
+    assert asyncio.run(extractor.extract(make_pdf(["x" * 200]))) == ""
+    assert extractor.stats["skipped"] == 1
+
+
+def test_extractor_time_budget(monkeypatch):
+    def slow_parse(data, *args):
+        time.sleep(1.0)
+        return {"text": "late", "pages": 1, "stopped": "end"}
+
+    monkeypatch.setattr(pdf_text, "extract_pdf_text", slow_parse)
+    monkeypatch.setattr(pdf_text, "_KILL_GRACE", 0.0)
+    extractor = PdfTextExtractor(use_processes=False, time_budget=0.1)
+
+    assert asyncio.run(extractor.extract(b"%PDF-slow")) == ""
+    assert extractor.stats["timeouts"] == 1
+    extractor.close()
+
+
+def test_extractor_process_pool():
+    extractor = PdfTextExtractor(max_workers=1)
+    try:
+        text = asyncio.run(extractor.extract(make_pdf(["Lebenslauf Prozess"])))
+    finally:
+        extractor.close()
+    assert "Lebenslauf Prozess" in text
+
+
+def test_extractor_timeout_keeps_replacement_pool(monkeypatch):
+    def slow_parse(data, *args):
+        time.sleep(0.3)
+        return {"text": "late", "pages": 1, "stopped": "end"}
+
+    monkeypatch.setattr(pdf_text, "extract_pdf_text", slow_parse)
+    monkeypatch.setattr(pdf_text, "_KILL_GRACE", 0.0)
+    extractor = PdfTextExtractor(use_processes=False, time_budget=0.1)
+
+    async def run():
+        stale = extractor._get_pool()
+        extractor._recycle_pool(stale)
+        fresh = extractor._get_pool()
+        # A late timeout of a job on the old pool must not recycle the new one
+        extractor._recycle_pool(stale)
+        assert extractor._pool is fresh
+        return await asyncio.gather(extractor.extract(b"%PDF-a"), extractor.extract(b"%PDF-b"))
+
+    assert asyncio.run(run()) == ["", ""]
+    assert extractor.stats["timeouts"] == 2
+    extractor.close()
@@ -0,0 +1,137 @@
+"""
+Tests for robots.txt caching, coalescing and Crawl-delay.
+"""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from luca_scraper.http.robots import RobotsCache, parse_robots
+
+
+ROBOTS_BODY = """
+User-agent: *
+Disallow: /private/
+Crawl-delay: 3
+"""
+
+
+class FakeFetcher:
+    def __init__(self, status=200, body=ROBOTS_BODY, delay=0.0):
+        self.status = status
+        self.body = body
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, url, timeout):
+        self.calls.append(url)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.status, self.body
+
+
+@pytest.fixture
+def temp_db():
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    yield path
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def test_parse_robots_rules_and_delay():
+    policy = parse_robots(ROBOTS_BODY, 200)
+    assert policy.allows("https://example.com/team")
+    assert not policy.allows("https://example.com/private/cv.pdf")
+    assert policy.crawl_delay == 3.0
+
+
+def test_missing_robots_allows_everything():
+    policy = parse_robots("", 404)
+    assert policy.allows("https://example.com/private/x")
+    assert policy.crawl_delay is None
+
+
+def test_allowed_and_crawl_delay():
+    fetcher = FakeFetcher()
+    cache = RobotsCache(fetcher=fetcher, max_crawl_delay=2.0)
+
+    async def run():
+        return (
+            await cache.allowed("https://example.com/private/a"),
+            await cache.allowed("https://example.com/kontakt"),
+        )
+
+    assert asyncio.run(run()) == (False, True)
+    assert fetcher.calls == ["https://example.com/robots.txt"]
+    # Capped at max_crawl_delay
+    assert cache.crawl_delay("example.com") == 2.0
+    assert cache.crawl_delay("other.com") == 0.0
+
+
+def test_concurrent_checks_share_one_fetch():
+    fetcher = FakeFetcher(delay=0.05)
+    cache = RobotsCache(fetcher=fetcher)
+
+    async def run():
+        urls = [f"https://example.com/page{i}" for i in range(10)]
+        return await asyncio.gather(*(cache.allowed(u) for u in urls))
+
+    assert all(asyncio.run(run()))
+    assert len(fetcher.calls) == 1
+
+
+def test_server_errors_are_tolerated():
+    cache = RobotsCache(fetcher=FakeFetcher(status=503, body=""))
+    assert asyncio.run(cache.allowed("https://example.com/private/a")) is True
+
+
+def test_persistent_cache_avoids_refetch(temp_db):
+    first = FakeFetcher()
+    asyncio.run(RobotsCache(fetcher=first, db_path=temp_db).allowed("https://example.com/"))
+
+    second = FakeFetcher()
+    cache = RobotsCache(fetcher=second, db_path=temp_db)
+    assert asyncio.run(cache.allowed("https://example.com/private/a")) is False
+    assert second.calls == []
+
+
+def test_expired_entry_is_refetched(temp_db):
+    asyncio.run(RobotsCache(fetcher=FakeFetcher(), db_path=temp_db, ttl=0).allowed("https://example.com/"))
+
+    second = FakeFetcher(body="User-agent: *\nDisallow:\n")
+    cache = RobotsCache(fetcher=second, db_path=temp_db, ttl=0)
+    assert asyncio.run(cache.allowed("https://example.com/private/a")) is True
+    assert len(second.calls) == 1
+
+
+def test_allowed_cached_without_fetch():
+    cache = RobotsCache(fetcher=FakeFetcher())
+    assert cache.allowed_cached("https://example.com/private/a") is True
+    asyncio.run(cache.allowed("https://example.com/"))
+    assert cache.allowed_cached("https://example.com/private/a") is False
+
+
+@pytest.mark.asyncio
+async def test_rate_spaces_requests_by_crawl_delay():
+    """_Rate waits the host's Crawl-delay between request starts."""
+    import time
+
+    import scriptname as sn
+
+    rate = sn._Rate(max_global=4, max_per_host=2, crawl_delay=lambda host: 0.2 if host == "slow.de" else 0.0)
+    start = time.monotonic()
+    for _ in range(2):
+        host = await rate.acquire("https://slow.de/a")
+        rate.release(host)
+    assert time.monotonic() - start >= 0.2
+
+    start = time.monotonic()
+    for _ in range(2):
+        host = await rate.acquire("https://fast.de/a")
+        rate.release(host)
+    assert time.monotonic() - start < 0.2
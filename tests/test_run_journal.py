@@ -0,0 +1,244 @@
+"""
+Tests for the crash-safe run journal and --resume.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from luca_scraper.run_journal import RunJournal, discard_unfinished, load_resume_state
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_journal_roundtrip(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = RunJournal.start(7, ["q1", "q2", "q3"], params={"force": False}, path=path)
+    journal.record_frontier("q1", ["https://a.de/1", {"url": "https://a.de/2", "title": "T"}])
+    journal.record_url("q1", "https://a.de/1", [{"name": "A"}])
+    journal.record_url("q1", "https://a.de/2", [])
+    journal.record_query_done("q1")
+    journal.record_frontier("q2", ["https://b.de/1", "https://b.de/2"])
+    journal.record_url("q2", "https://b.de/1", [{"name": "B"}])
+    journal.record_url("q2", "", [{"name": "Snippet"}])
+    journal.close()  # simulated crash: buffered entries were flushed, run not finished
+
+    state = load_resume_state(path)
+    assert state.journal_id == 7
+    assert state.pending_queries == ["q2", "q3"]
+    assert state.frontier == {"q2": ["https://b.de/1", "https://b.de/2"]}
+    assert state.done_urls == {"https://a.de/1", "https://a.de/2", "https://b.de/1"}
+    assert state.rows_for("q2") == [{"name": "B"}, {"name": "Snippet"}]
+    assert state.rows_for("q1") == []
+
+    resumed = RunJournal.resume(state, run_id=8, path=path)
+    resumed.record_query_done("q2")
+    resumed.close()
+    state = load_resume_state(path)
+    assert state.resumes == 1
+    assert state.pending_queries == ["q3"]
+
+    RunJournal.resume(state, path=path).finish()
+    assert load_resume_state(path) is None
+
+
+def test_fresh_run_supersedes_unfinished(tmp_path):
+    path = str(tmp_path / "journal.db")
+    old = RunJournal.start(1, ["a"], path=path)
+    old.record_frontier("a", ["https://x.de"])
+    old.close()
+
+    RunJournal.start(2, ["b"], path=path).close()
+    state = load_resume_state(path)
+    assert state.journal_id == 2
+    assert state.frontier == {}
+
+    assert discard_unfinished(path) > 0
+    assert load_resume_state(path) is None
+
+
+def test_buffered_writes_are_batched(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = RunJournal.start(1, ["q"], path=path, flush_every=10, flush_interval=3600)
+    for i in range(9):
+        journal.record_url("q", f"https://a.de/{i}")
+    assert load_resume_state(path).done_urls == set()
+    journal.record_url("q", "https://a.de/9")
+    assert len(load_resume_state(path).done_urls) == 10
+    journal.close()
+
+
+# ----------------------------------------------------------------------
+# Kill a run mid-flight against a local HTTP fixture, then resume it
+# ----------------------------------------------------------------------
+
+DRIVER = textwrap.dedent('''
+    # Drives the real run_scrape_once_async; only search, fetch and export are faked
+    import asyncio, json, sys, urllib.request
+
+    import scriptname as sn
+
+    base, out_path, mode = sys.argv[1], sys.argv[2], sys.argv[3]
+
+    def get(url):
+        with urllib.request.urlopen(url, timeout=10) as resp:
+            return resp.read().decode()
+
+    async def search(q, max_results=60, date_restrict=None):
+        return json.loads(await asyncio.to_thread(get, f"{base}/search?q={q}")), False
+
+    async def no_links(*args, **kwargs):
+        return []
+
+    async def fake_process_link(item, run_id, force=False):
+        url = sn._extract_url(item)
+        await asyncio.to_thread(get, url)
+        name = url.rsplit("/", 1)[-1]
+        return 1, [{"quelle": url, "name": name, "email": f"{name}@example.com", "score": 100,
+                    "lead_type": "candidate"}]
+
+    async def keep(leads):
+        return leads
+
+    def export(rows):
+        with open(out_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\\n")
+        return rows
+
+    async def http_get(*args, **kwargs):
+        return None
+
+    sn.QUERIES = ["q0", "q1", "q2"]
+    sn.google_cse_search_async = search
+    sn.duckduckgo_search_async = sn.search_perplexity_async = sn.kleinanzeigen_search_async = no_links
+    sn.try_sitemaps_async = no_links
+    sn.http_get_async = http_get
+    sn.domain_pivot_queries = lambda dom: []
+    sn.process_link_async = fake_process_link
+    sn.enrich_leads_with_telefonbuch = keep
+    sn.insert_leads = export
+    sn.append_csv = sn.append_xlsx = lambda *args, **kwargs: None
+    sn._is_candidates_mode = sn._is_talent_hunt_mode = lambda: False
+    sn.get_performance_params = lambda: {"async_limit": 4, "request_delay": 0}
+    sn._jitter = lambda a, b: 0
+    sn.post_run_learning_analysis = lambda run_id: None
+    sn.ActiveLearningEngine = None
+
+    if mode == "resume":
+        # Query cache says "done" (killed after mark_query_done): the journal frontier must still win
+        from luca_scraper.run_journal import load_resume_state
+        sn.init_db()
+        for q in load_resume_state().frontier:
+            sn.mark_query_done(q, 0)
+
+    run_flag = {"running": mode != "stop"}
+    asyncio.run(sn.run_scrape_once_async(run_flag=run_flag, resume=mode != "fresh"))
+''')
+
+
+class _Fixture(BaseHTTPRequestHandler):
+    hits = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        with self.lock:
+            self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if parsed.path == "/search":
+            q = parse_qs(parsed.query)["q"][0]
+            host = f"http://{self.headers['Host']}"
+            body = json.dumps([f"{host}/page/{q}-{i}" for i in range(5)]).encode()
+        else:
+            time.sleep(0.15)
+            body = b"<html>ok</html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _page_hits():
+    return sum(n for key, n in _Fixture.hits.items() if key.startswith("/page/"))
+
+
+def test_resume_after_kill(tmp_path):
+    _Fixture.hits = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Fixture)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    driver = tmp_path / "driver.py"
+    driver.write_text(DRIVER, encoding="utf-8")
+    out_path = tmp_path / "leads.jsonl"
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        RUN_JOURNAL_PATH=str(tmp_path / "journal.db"),
+        RUN_JOURNAL_FLUSH_EVERY="1",
+        SCRAPER_DB=str(tmp_path / "scraper.db"),
+        ADAPTIVE_CONCURRENCY="0",
+        MEMORY_ADMISSION="0",
+        ASYNC_PER_HOST="2",
+        MAX_PER_DOMAIN="10",
+    )
+    journal_path = str(tmp_path / "journal.db")
+
+    def run(mode):
+        subprocess.run(
+            [sys.executable, str(driver), base, str(out_path), mode],
+            cwd=str(tmp_path), env=env, check=True, timeout=120,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, str(driver), base, str(out_path), "fresh"],
+            cwd=str(tmp_path), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + 60
+        while _page_hits() < 7 and proc.poll() is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert proc.poll() is None, "run finished before it could be killed"
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+
+        assert _Fixture.hits.get("/search?q=q0") == 1
+        killed = load_resume_state(journal_path)
+        assert killed is not None and killed.frontier
+
+        # A resumed run that is stopped right away keeps the journal resumable
+        hits_before = dict(_Fixture.hits)
+        run("stop")
+        assert _Fixture.hits == hits_before
+        stopped = load_resume_state(journal_path)
+        assert stopped.pending_queries == killed.pending_queries
+        assert stopped.done_urls == killed.done_urls
+
+        run("resume")
+    finally:
+        server.shutdown()
+
+    # No search was repeated, at most the URLs in flight at kill time were fetched twice
+    for q in ("q0", "q1", "q2"):
+        assert _Fixture.hits.get(f"/search?q={q}") == 1
+    pages = {k: v for k, v in _Fixture.hits.items() if k.startswith("/page/")}
+    assert len(pages) == 15
+    refetched = sum(n - 1 for n in pages.values())
+    assert refetched <= 2  # per-host limit of the driver
+
+    # Every lead survived the crash and was exported exactly once
+    rows = [json.loads(line) for line in out_path.read_text(encoding="utf-8").splitlines()]
+    names = sorted(r["quelle"].rsplit("/", 1)[-1] for r in rows)
+    assert names == sorted(f"q{q}-{i}" for q in range(3) for i in range(5))
+    assert load_resume_state(journal_path) is None
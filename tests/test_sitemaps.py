@@ -0,0 +1,111 @@
+"""
+Tests for streaming sitemap discovery.
+"""
+
+import asyncio
+import gzip
+
+from luca_scraper.http.sitemaps import SitemapDiscovery, iter_sitemap
+
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*paths, host="https://example.com"):
+    entries = "".join(f"<url><loc>{host}{p}</loc></url>" for p in paths)
+    return f'<?xml version="1.0"?><urlset {NS}>{entries}</urlset>'.encode()
+
+
+def index(*children, host="https://example.com"):
+    entries = "".join(
+        f"<sitemap><loc>{host}{loc}</loc><lastmod>{lastmod}</lastmod></sitemap>"
+        for loc, lastmod in children
+    )
+    return f'<?xml version="1.0"?><sitemapindex {NS}>{entries}</sitemapindex>'.encode()
+
+
+class FakeSite:
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    async def __call__(self, url):
+        self.calls.append(url)
+        await asyncio.sleep(0)
+        return self.pages.get(url)
+
+
+def accept(url):
+    return "/team" in url or "/kontakt" in url
+
+
+def test_iter_sitemap_urlset_and_index():
+    entries = list(iter_sitemap(urlset("/team", "/shop")))
+    assert [e.loc for e in entries] == ["https://example.com/team", "https://example.com/shop"]
+    assert not any(e.is_index for e in entries)
+
+    entries = list(iter_sitemap(index(("/a.xml", "2024-01-01"))))
+    assert entries[0].is_index
+    assert entries[0].lastmod == "2024-01-01"
+
+
+def test_iter_sitemap_gzip():
+    entries = list(iter_sitemap(gzip.compress(urlset("/team"))))
+    assert [e.loc for e in entries] == ["https://example.com/team"]
+
+
+def test_iter_sitemap_malformed_falls_back_to_regex():
+    entries = list(iter_sitemap(b"<urlset><url><loc>https://example.com/team</loc></url><broken"))
+    assert [e.loc for e in entries] == ["https://example.com/team"]
+
+
+def test_discover_filters_while_parsing():
+    site = FakeSite({"https://example.com/sitemap.xml": urlset("/team", "/shop/1", "/kontakt")})
+    discovery = SitemapDiscovery(site, accept=accept)
+    urls = asyncio.run(discovery.discover("https://example.com"))
+    assert urls == ["https://example.com/team", "https://example.com/kontakt"]
+    assert site.calls == ["https://example.com/sitemap.xml"]
+
+
+def test_discover_follows_nested_indexes_within_budget():
+    site = FakeSite({
+        "https://example.com/sitemap.xml": index(("/pages.xml", "2024-02-01"), ("/more.xml", "2024-01-01")),
+        "https://example.com/pages.xml": urlset("/team"),
+        "https://example.com/more.xml": index(("/deep.xml", "2024-01-01")),
+        "https://example.com/deep.xml": gzip.compress(urlset("/kontakt")),
+    })
+    urls = asyncio.run(SitemapDiscovery(site, accept=accept).discover("https://example.com"))
+    assert sorted(urls) == ["https://example.com/kontakt", "https://example.com/team"]
+
+    site.calls.clear()
+    limited = SitemapDiscovery(site, accept=accept, max_fetches=2)
+    urls = asyncio.run(limited.discover("https://example.com"))
+    assert len(site.calls) == 2
+    # Newest child sitemap is fetched first
+    assert urls == ["https://example.com/team"]
+
+
+def test_discover_caches_and_revalidates_by_lastmod():
+    site = FakeSite({
+        "https://example.com/sitemap.xml": index(("/pages.xml", "2024-02-01")),
+        "https://example.com/pages.xml": urlset("/team"),
+    })
+    discovery = SitemapDiscovery(site, accept=accept)
+    asyncio.run(discovery.discover("https://example.com"))
+    assert len(site.calls) == 2
+
+    # Within TTL: no fetch at all
+    asyncio.run(discovery.discover("https://example.com"))
+    assert len(site.calls) == 2
+
+    # After TTL: only the unchanged index is fetched
+    discovery.cache_ttl = 0
+    urls = asyncio.run(discovery.discover("https://example.com"))
+    assert urls == ["https://example.com/team"]
+    assert site.calls[2:] == ["https://example.com/sitemap.xml"]
+
+
+def test_discover_tries_next_candidate():
+    site = FakeSite({"https://example.com/sitemap_index.xml": urlset("/team")})
+    urls = asyncio.run(SitemapDiscovery(site, accept=accept).discover("https://example.com"))
+    assert urls == ["https://example.com/team"]
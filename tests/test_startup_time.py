@@ -0,0 +1,72 @@
+"""
+Startup-time benchmark for the luca_scraper package and scriptname.py.
+
+Imports run in fresh interpreters, so module caches of the test process do
+not hide regressions. Run directly for a timing report:
+
+    python tests/test_startup_time.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules scriptname.py must not import at startup (deferred to first use)
+HEAVY_MODULES = ("pandas", "flask", "pypdf")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def measure_import(module: str) -> dict:
+    """Import a module in a fresh interpreter; returns seconds and loaded modules."""
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "x" * 60)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (ROOT, env.get("PYTHONPATH")) if p)
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    probe = measure_import("luca_scraper")
+    loaded = [m for m in probe["modules"] if m.startswith("luca_scraper.")]
+    assert loaded == []
+    assert probe["seconds"] < 0.5
+
+
+def test_scriptname_defers_heavy_imports():
+    probe = measure_import("scriptname")
+    assert [m for m in HEAVY_MODULES if m in probe["modules"]] == []
+
+
+def test_lazy_attributes_resolve():
+    import luca_scraper
+
+    assert luca_scraper.EMAIL_RE.search("max@example.com")
+    assert callable(luca_scraper.build_queries)
+    assert "classify_lead" in luca_scraper.__all__
+    assert "EMAIL_RE" in dir(luca_scraper)
+
+
+if __name__ == "__main__":
+    for module in ("luca_scraper", "scriptname"):
+        runs = [measure_import(module)["seconds"] for _ in range(5)]
+        print(f"{module:15s} median {statistics.median(runs) * 1000:7.1f} ms  "
+              f"min {min(runs) * 1000:7.1f} ms")